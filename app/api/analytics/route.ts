@@ -1,25 +1,37 @@
-
 import { NextResponse } from "next/server";
+import { readDataVersions } from "@/lib/db/data-versions";
+import { VersionedResponseCache, versionedJsonResponse } from "@/lib/http/response-cache";
 import { analyticsService } from "@/lib/services/analytics-service";
 
 export const dynamic = "force-dynamic";
 
+const analyticsCache = new VersionedResponseCache("analytics");
+
+/** Cached per range and `orders`/`products` data versions; sends an ETag, so unchanged refreshes get 304. */
 export async function GET(request: Request) {
     try {
         const { searchParams } = new URL(request.url);
         const range = searchParams.get("range");
         const days = range ? parseInt(range) : 30;
+        const versions = await readDataVersions().catch(() => null);
 
-        const [salesHistory, topProducts, stats] = await Promise.all([
-            analyticsService.getSalesHistory(days),
-            analyticsService.getTopProducts(10), // Increased limit for top products
-            analyticsService.getStats(),
-        ]);
+        return await versionedJsonResponse(request, analyticsCache, {
+            key: String(days),
+            version: versions ? `${versions.orders}.${versions.products}` : null,
+            serveStale: versions?.pollRunning,
+            compute: async () => {
+                const [salesHistory, topProducts, stats] = await Promise.all([
+                    analyticsService.getSalesHistory(days),
+                    analyticsService.getTopProducts(10), // Increased limit for top products
+                    analyticsService.getStats(),
+                ]);
 
-        return NextResponse.json({
-            salesHistory,
-            topProducts,
-            stats,
+                return {
+                    salesHistory,
+                    topProducts,
+                    stats,
+                };
+            },
         });
     } catch (error) {
         console.error("Analytics fetch failed:", error);
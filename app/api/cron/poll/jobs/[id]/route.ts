@@ -0,0 +1,102 @@
+import { NextRequest, NextResponse } from "next/server";
+import { getPollJob, isPollJobFinished } from "@/lib/jobs/poll-jobs";
+import { NO_STORE_HEADERS } from "@/lib/http/no-store";
+
+export const dynamic = "force-dynamic";
+
+const STREAM_POLL_MS = 1000;
+const KEEP_ALIVE_MS = 15_000;
+// Streams end after this long; EventSource clients reconnect on their own.
+const STREAM_MAX_MS = 5 * 60_000;
+
+/**
+ * Status of a queued poll job (stage, products done/total, summary once finished). With
+ * `Accept: text/event-stream` or `?stream=1` progress is streamed as server-sent events until
+ * the job finishes. Closing the stream never affects the job itself.
+ */
+export async function GET(request: NextRequest, { params }: { params: { id: string } }) {
+  const job = await getPollJob(params.id);
+  if (!job) {
+    return NextResponse.json({ error: "Poll job not found" }, { status: 404, headers: NO_STORE_HEADERS });
+  }
+
+  const wantsStream =
+    request.nextUrl.searchParams.get("stream") === "1" ||
+    (request.headers.get("accept") ?? "").includes("text/event-stream");
+  if (!wantsStream) {
+    return NextResponse.json(job, { headers: NO_STORE_HEADERS });
+  }
+
+  const encoder = new TextEncoder();
+  let open = true;
+  const stream = new ReadableStream<Uint8Array>({
+    async start(controller) {
+      request.signal.addEventListener("abort", () => {
+        open = false;
+      });
+      const write = (chunk: string) => {
+        if (!open) {
+          return;
+        }
+        try {
+          controller.enqueue(encoder.encode(chunk));
+        } catch {
+          // Closed by the client.
+          open = false;
+        }
+      };
+      const send = (event: string, data: unknown) => write(`event: ${event}\ndata: ${JSON.stringify(data)}\n\n`);
+      const streamUntil = Date.now() + STREAM_MAX_MS;
+      let current = job;
+      let lastSent = "";
+      let lastWriteAt = Date.now();
+
+      try {
+        while (open && !request.signal.aborted) {
+          const marker = `${current.status}:${current.updatedAt}:${current.productsDone}`;
+          if (marker !== lastSent) {
+            send(isPollJobFinished(current.status) ? "done" : "progress", current);
+            lastSent = marker;
+            lastWriteAt = Date.now();
+          } else if (Date.now() - lastWriteAt >= KEEP_ALIVE_MS) {
+            write(": keep-alive\n\n");
+            lastWriteAt = Date.now();
+          }
+          if (isPollJobFinished(current.status) || Date.now() >= streamUntil) {
+            break;
+          }
+
+          await new Promise((resolve) => setTimeout(resolve, STREAM_POLL_MS));
+          const next = await getPollJob(params.id);
+          if (!next) {
+            break;
+          }
+          current = next;
+        }
+      } catch (error) {
+        send("error", { error: error instanceof Error ? error.message : "Failed to read poll job" });
+      } finally {
+        if (open) {
+          open = false;
+          try {
+            controller.close();
+          } catch {
+            // Already closed by the client.
+          }
+        }
+      }
+    },
+    cancel() {
+      open = false;
+    }
+  });
+
+  return new Response(stream, {
+    headers: {
+      ...NO_STORE_HEADERS,
+      "Content-Type": "text/event-stream",
+      Connection: "keep-alive",
+      "X-Accel-Buffering": "no"
+    }
+  });
+}
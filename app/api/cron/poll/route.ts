@@ -1,12 +1,13 @@
 import { NextRequest, NextResponse } from "next/server";
-import { acquireJobLock, releaseJobLock } from "@/lib/jobs/lock";
-import { runPoll } from "@/lib/jobs/poll-products";
+import { enqueuePollJob } from "@/lib/jobs/poll-jobs";
+import { runPollJobsInBackground } from "@/lib/jobs/poll-products";
 import { env } from "@/lib/config/env";
 import { PIN_COOKIE_NAME } from "@/lib/auth/pin";
+import { NO_STORE_HEADERS } from "@/lib/http/no-store";
 
-const LOCK_NAME = "poll_job";
 export const dynamic = "force-dynamic";
 
+/** Queues a poll (or joins the one already queued/running) and returns its job id without waiting. */
 export async function POST(request: NextRequest) {
   const secret =
     request.headers.get("x-cron-secret") ||
@@ -17,22 +18,20 @@ export async function POST(request: NextRequest) {
     return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
   }
 
-  const owner = crypto.randomUUID();
-  const acquired = await acquireJobLock(LOCK_NAME, owner, 240);
-
-  if (!acquired) {
-    return NextResponse.json({ ok: true, skipped: true, message: "Poll job already running" });
-  }
-
   try {
-    const summary = await runPoll();
-    return NextResponse.json(summary);
+    const job = await enqueuePollJob("cron");
+    if (env.POLL_JOB_RUNNER === "in_process") {
+      runPollJobsInBackground();
+    }
+
+    return NextResponse.json(
+      { ok: true, jobId: job.id, status: job.status, deduplicated: job.deduplicated, statusUrl: `/api/cron/poll/jobs/${job.id}` },
+      { status: 202, headers: NO_STORE_HEADERS }
+    );
   } catch (error) {
     return NextResponse.json(
-      { ok: false, error: error instanceof Error ? error.message : "Poll failed" },
-      { status: 500 }
+      { ok: false, error: error instanceof Error ? error.message : "Failed to queue poll" },
+      { status: 500, headers: NO_STORE_HEADERS }
     );
-  } finally {
-    await releaseJobLock(LOCK_NAME, owner);
   }
 }
@@ -0,0 +1,28 @@
+import { NextResponse } from "next/server";
+import { runPollWorker, runQueuedPollJobs } from "@/lib/jobs/poll-products";
+import { NO_STORE_HEADERS } from "@/lib/http/no-store";
+
+export const dynamic = "force-dynamic";
+
+// Returns before the next 5-minute cron tick; unfinished leases are renewed by whoever picks them up.
+const WORKER_DEADLINE_MS = 200_000;
+
+/**
+ * Executes queued poll jobs, then drains sharded poll batches until the queue is empty
+ * (auth is enforced by middleware).
+ */
+export async function POST() {
+  try {
+    const workerId = `route:${crypto.randomUUID()}`;
+    const pollJobs = await runQueuedPollJobs(workerId);
+    const summary = await runPollWorker(workerId, {
+      deadline: Date.now() + WORKER_DEADLINE_MS
+    });
+    return NextResponse.json({ ...summary, pollJobs }, { headers: NO_STORE_HEADERS });
+  } catch (error) {
+    return NextResponse.json(
+      { ok: false, error: error instanceof Error ? error.message : "Poll worker failed" },
+      { status: 500, headers: NO_STORE_HEADERS }
+    );
+  }
+}
@@ -1,6 +1,8 @@
 import { NextRequest, NextResponse } from "next/server";
 import { acquireJobLock, releaseJobLock } from "@/lib/jobs/lock";
 import { syncShipmentsJob } from "@/lib/jobs/sync-shipments";
+import { applyShipmentEvents } from "@/lib/jobs/apply-shipment-events";
+import { prisma } from "@/lib/db/prisma";
 import { env } from "@/lib/config/env";
 import { PIN_COOKIE_NAME } from "@/lib/auth/pin";
 
@@ -29,6 +31,33 @@ export async function POST(request: NextRequest) {
 
     try {
         const body = await request.json().catch(() => ({}));
+
+        // With webhooks on, events keep packages current; this call applies anything still queued
+        // and only sweeps the API as a periodic reconciliation.
+        if (env.TRENDYOL_WEBHOOK_SECRET) {
+            const events = await applyShipmentEvents(`cron:${owner}`);
+            const reconcileMs = env.SHIPMENT_RECONCILE_HOURS * 60 * 60 * 1000;
+            const lastSweep = await prisma.jobRun.findFirst({
+                where: { job: "shipment_sync", status: "ok" },
+                orderBy: { startedAt: "desc" },
+                select: { startedAt: true }
+            });
+
+            if (!body.forceFull && lastSweep && Date.now() - lastSweep.startedAt.getTime() < reconcileMs) {
+                return NextResponse.json({
+                    ok: true,
+                    events,
+                    reconciliation: { skipped: true, lastSweepAt: lastSweep.startedAt.toISOString() }
+                });
+            }
+
+            const summary = await syncShipmentsJob({
+                lookbackHours: body.lookbackHours ?? env.SHIPMENT_RECONCILE_HOURS * 2,
+                forceFull: body.forceFull ?? false
+            });
+            return NextResponse.json({ ok: true, events, reconciliation: { skipped: false }, ...summary });
+        }
+
         const summary = await syncShipmentsJob({
             lookbackHours: body.lookbackHours ?? 24,
             forceFull: body.forceFull ?? false
@@ -2,9 +2,11 @@ import { NextRequest, NextResponse } from "next/server";
 import { z } from "zod";
 import { env } from "@/lib/config/env";
 import { prisma } from "@/lib/db/prisma";
+import { readDataVersions } from "@/lib/db/data-versions";
 import { formatApiError, isDatabaseUnavailableError } from "@/lib/db/errors";
 import { buildDashboardRows } from "@/lib/dashboard/service";
 import { NO_STORE_HEADERS } from "@/lib/http/no-store";
+import { VersionedResponseCache, versionedJsonResponse } from "@/lib/http/response-cache";
 import { trendyolClient } from "@/lib/trendyol/client";
 import { syncCatalogFromTrendyol } from "@/lib/trendyol/sync-catalog";
 
@@ -22,6 +24,61 @@ const querySchema = z.object({
   sort: z.enum(["latest", "largest_delta", "low_margin"]).optional()
 });
 
+type DashboardQuery = z.infer<typeof querySchema>;
+
+const dashboardCache = new VersionedResponseCache("dashboard");
+
+async function computeDashboard(query: DashboardQuery) {
+  if (env.AUTO_SYNC_CATALOG && trendyolClient.isConfigured()) {
+    const productCount = await prisma.product.count();
+    if (productCount === 0) {
+      try {
+        await syncCatalogFromTrendyol({
+          maxPages: env.AUTO_SYNC_MAX_PAGES,
+          pageSize: env.AUTO_SYNC_PAGE_SIZE,
+          hydratePrices: true,
+          hydrateLimit: 100,
+          createInitialSnapshots: true
+        });
+      } catch {
+        // Best-effort bootstrap; dashboard should still render.
+      }
+    }
+  }
+
+  let rows = await buildDashboardRows();
+
+  if (query.search) {
+    const term = query.search.toLowerCase();
+    rows = rows.filter(
+      (row) => row.sku.toLowerCase().includes(term) || row.title.toLowerCase().includes(term)
+    );
+  }
+
+  if (query.lostBuyboxOnly) {
+    rows = rows.filter((row) => row.buyboxStatus === "LOSE");
+  }
+
+  if (query.lowMarginRisk) {
+    rows = rows.filter((row) => row.lowMarginRisk);
+  }
+
+  if (query.sort === "largest_delta") {
+    rows = rows.sort((a, b) => (b.deltaSar ?? 0) - (a.deltaSar ?? 0));
+  } else if (query.sort === "low_margin") {
+    rows = rows.sort((a, b) => (a.marginPct ?? 0) - (b.marginPct ?? 0));
+  } else {
+    rows = rows.sort((a, b) => {
+      const aTime = a.lastCheckedAt ? new Date(a.lastCheckedAt).getTime() : 0;
+      const bTime = b.lastCheckedAt ? new Date(b.lastCheckedAt).getTime() : 0;
+      return bTime - aTime;
+    });
+  }
+
+  return { rows };
+}
+
+/** Cached per query and `products` data version; sends an ETag, so unchanged refreshes get 304. */
 export async function GET(request: NextRequest) {
   const parsed = querySchema.safeParse(Object.fromEntries(request.nextUrl.searchParams.entries()));
 
@@ -34,54 +91,15 @@ export async function GET(request: NextRequest) {
 
   try {
     const query = parsed.data;
+    const versions = await readDataVersions().catch(() => null);
 
-    if (env.AUTO_SYNC_CATALOG && trendyolClient.isConfigured()) {
-      const productCount = await prisma.product.count();
-      if (productCount === 0) {
-        try {
-          await syncCatalogFromTrendyol({
-            maxPages: env.AUTO_SYNC_MAX_PAGES,
-            pageSize: env.AUTO_SYNC_PAGE_SIZE,
-            hydratePrices: true,
-            hydrateLimit: 100,
-            createInitialSnapshots: true
-          });
-        } catch {
-          // Best-effort bootstrap; dashboard should still render.
-        }
-      }
-    }
-
-    let rows = await buildDashboardRows();
-
-    if (query.search) {
-      const term = query.search.toLowerCase();
-      rows = rows.filter(
-        (row) => row.sku.toLowerCase().includes(term) || row.title.toLowerCase().includes(term)
-      );
-    }
-
-    if (query.lostBuyboxOnly) {
-      rows = rows.filter((row) => row.buyboxStatus === "LOSE");
-    }
-
-    if (query.lowMarginRisk) {
-      rows = rows.filter((row) => row.lowMarginRisk);
-    }
-
-    if (query.sort === "largest_delta") {
-      rows = rows.sort((a, b) => (b.deltaSar ?? 0) - (a.deltaSar ?? 0));
-    } else if (query.sort === "low_margin") {
-      rows = rows.sort((a, b) => (a.marginPct ?? 0) - (b.marginPct ?? 0));
-    } else {
-      rows = rows.sort((a, b) => {
-        const aTime = a.lastCheckedAt ? new Date(a.lastCheckedAt).getTime() : 0;
-        const bTime = b.lastCheckedAt ? new Date(b.lastCheckedAt).getTime() : 0;
-        return bTime - aTime;
-      });
-    }
-
-    return NextResponse.json({ rows }, { headers: NO_STORE_HEADERS });
+    return await versionedJsonResponse(request, dashboardCache, {
+      key: JSON.stringify(query),
+      version: versions?.products ?? null,
+      // Mid-poll every chunk bumps the version; the previous rows are served meanwhile.
+      serveStale: versions?.pollRunning,
+      compute: () => computeDashboard(query)
+    });
   } catch (error) {
     if (isDatabaseUnavailableError(error)) {
       return NextResponse.json(
@@ -0,0 +1,68 @@
+import type { NextRequest } from "next/server";
+import { dashboardLiveUpdates, formatServerSentEvent } from "@/lib/dashboard/live-updates";
+import { NO_STORE_HEADERS } from "@/lib/http/no-store";
+
+export const dynamic = "force-dynamic";
+
+const KEEP_ALIVE_MS = 15_000;
+// A client this many messages behind is dropped; it reconnects and reloads the full table.
+const MAX_QUEUED_MESSAGES = 100;
+
+/**
+ * Server-sent events with dashboard row deltas (`rows`) and new alerts (`alerts`) as snapshot,
+ * alert and price-change writes land. Clients load `/api/dashboard` once and patch rows by id.
+ */
+export async function GET(request: NextRequest) {
+  const encoder = new TextEncoder();
+  let close = () => {};
+
+  const stream = new ReadableStream<Uint8Array>({
+    start(controller) {
+      let closed = false;
+
+      const send = (chunk: string) => {
+        if (closed) {
+          return;
+        }
+        if ((controller.desiredSize ?? 0) < -MAX_QUEUED_MESSAGES) {
+          close();
+          return;
+        }
+        controller.enqueue(encoder.encode(chunk));
+      };
+
+      const unsubscribe = dashboardLiveUpdates.subscribe((update) => send(formatServerSentEvent(update)));
+      const keepAlive = setInterval(() => send(": keep-alive\n\n"), KEEP_ALIVE_MS);
+
+      close = () => {
+        if (closed) {
+          return;
+        }
+        closed = true;
+        clearInterval(keepAlive);
+        unsubscribe();
+        try {
+          controller.close();
+        } catch {
+          // Already closed by the client.
+        }
+      };
+
+      request.signal.addEventListener("abort", () => close());
+      send("retry: 5000\n\n");
+    },
+    cancel() {
+      close();
+    }
+  });
+
+  return new Response(stream, {
+    headers: {
+      ...NO_STORE_HEADERS,
+      "Content-Type": "text/event-stream",
+      Connection: "keep-alive",
+      // Stops reverse proxies from buffering the stream.
+      "X-Accel-Buffering": "no"
+    }
+  });
+}
@@ -1,4 +1,5 @@
 import { NextRequest, NextResponse } from "next/server";
+import { getBuyboxCacheStats } from "@/lib/trendyol/buybox-cache";
 import { trendyolClient } from "@/lib/trendyol/client";
 import { prisma } from "@/lib/db/prisma";
 
@@ -19,7 +20,8 @@ export async function GET(request: NextRequest) {
 
     return NextResponse.json({
       hint: `Use ?barcode=${product.barcode} to test`,
-      sampleProduct: product
+      sampleProduct: product,
+      cache: getBuyboxCacheStats()
     });
   }
 
@@ -61,6 +63,7 @@ export async function GET(request: NextRequest) {
         storeFrontCode,
         isConfigured: trendyolClient.isConfigured()
       },
+      cache: getBuyboxCacheStats(),
       productRaw: productData.raw,
       buyboxRaw: buyboxResult.raw,
       buyboxEntries: buyboxResult.entries,
@@ -0,0 +1,28 @@
+import { NextRequest, NextResponse } from "next/server";
+import { prisma } from "@/lib/db/prisma";
+import { NO_STORE_HEADERS } from "@/lib/http/no-store";
+
+export const dynamic = "force-dynamic";
+
+export async function GET(request: NextRequest) {
+  const job = request.nextUrl.searchParams.get("job") || undefined;
+  const limit = Math.min(200, Math.max(1, Number(request.nextUrl.searchParams.get("limit")) || 20));
+
+  const runs = await prisma.jobRun.findMany({
+    where: job ? { job } : undefined,
+    orderBy: { startedAt: "desc" },
+    take: limit,
+    select: {
+      id: true,
+      job: true,
+      status: true,
+      startedAt: true,
+      durationMs: true,
+      stagesJson: true,
+      countersJson: true,
+      error: true
+    }
+  });
+
+  return NextResponse.json({ runs }, { headers: NO_STORE_HEADERS });
+}
@@ -0,0 +1,33 @@
+import { NextRequest, NextResponse } from "next/server";
+import { prisma } from "@/lib/db/prisma";
+import { NO_STORE_HEADERS } from "@/lib/http/no-store";
+
+export const dynamic = "force-dynamic";
+
+export async function GET(request: NextRequest) {
+  const limit = Math.min(100, Math.max(1, Number(request.nextUrl.searchParams.get("limit")) || 10));
+
+  const runs = await prisma.pollRun.findMany({
+    orderBy: { createdAt: "desc" },
+    take: limit
+  });
+  const counts = runs.length
+    ? await prisma.pollBatch.groupBy({
+        by: ["runId", "status"],
+        where: { runId: { in: runs.map((run) => run.id) } },
+        _count: { _all: true }
+      })
+    : [];
+
+  return NextResponse.json(
+    {
+      runs: runs.map((run) => ({
+        ...run,
+        batches: Object.fromEntries(
+          counts.filter((row) => row.runId === run.id).map((row) => [row.status, row._count._all])
+        )
+      }))
+    },
+    { headers: NO_STORE_HEADERS }
+  );
+}
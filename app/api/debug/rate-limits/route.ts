@@ -0,0 +1,32 @@
+import { NextResponse } from "next/server";
+import { prisma } from "@/lib/db/prisma";
+import { NO_STORE_HEADERS } from "@/lib/http/no-store";
+import { getCircuitBreakerMetrics } from "@/lib/trendyol/circuit-breaker";
+import { getRateLimiterMetrics } from "@/lib/trendyol/rate-limiter";
+
+export const dynamic = "force-dynamic";
+
+export async function GET() {
+  let shared: unknown[] = [];
+  let sharedCircuits: unknown[] = [];
+  let warning: string | null = null;
+
+  try {
+    [shared, sharedCircuits] = await Promise.all([
+      prisma.trendyolRateLimit.findMany({ orderBy: { family: "asc" } }),
+      prisma.trendyolCircuitBreaker.findMany({ orderBy: { family: "asc" } })
+    ]);
+  } catch (error) {
+    warning = error instanceof Error ? error.message : "Failed to load shared rate-limit buckets";
+  }
+
+  return NextResponse.json(
+    {
+      process: getRateLimiterMetrics(),
+      shared,
+      circuits: { process: getCircuitBreakerMetrics(), shared: sharedCircuits },
+      warning
+    },
+    { headers: NO_STORE_HEADERS }
+  );
+}
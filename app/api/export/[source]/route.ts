@@ -0,0 +1,60 @@
+import { NextRequest, NextResponse } from "next/server";
+import { z } from "zod";
+import { EXPORT_FORMATS, exportStream } from "@/lib/export/format";
+import { EXPORTS, EXPORT_SOURCES, exportRows } from "@/lib/export/sources";
+import { NO_STORE_HEADERS } from "@/lib/http/no-store";
+import { exportRowsWritten } from "@/lib/metrics/registry";
+
+export const dynamic = "force-dynamic";
+
+const DEFAULT_RANGE_DAYS = 30;
+
+const querySchema = z.object({
+  source: z.enum(EXPORT_SOURCES),
+  format: z.enum(EXPORT_FORMATS).default("csv"),
+  gzip: z
+    .enum(["0", "1", "true", "false"])
+    .optional()
+    .transform((value) => value === "1" || value === "true"),
+  from: z.coerce.date().optional(),
+  to: z.coerce.date().optional(),
+  productId: z.string().min(1).optional()
+});
+
+/**
+ * Streams `products` (latest state and margins), `snapshots`, `orders` (one row per item) or
+ * `shipments` as CSV or NDJSON (`?format=`), gzipped with `?gzip=1`. Dated sources cover
+ * `?from=`/`?to=` (default: the last 30 days); `snapshots` also take `?productId=`.
+ */
+export async function GET(request: NextRequest, { params }: { params: { source: string } }) {
+  const parsed = querySchema.safeParse({
+    source: params.source,
+    ...Object.fromEntries(request.nextUrl.searchParams)
+  });
+
+  if (!parsed.success) {
+    return NextResponse.json({ error: parsed.error.flatten() }, { status: 400, headers: NO_STORE_HEADERS });
+  }
+
+  const { source, format, gzip, productId } = parsed.data;
+  const to = parsed.data.to ?? new Date();
+  const from = parsed.data.from ?? new Date(to.getTime() - DEFAULT_RANGE_DAYS * 24 * 60 * 60 * 1000);
+  if (from >= to) {
+    return NextResponse.json({ error: "from must be before to" }, { status: 400, headers: NO_STORE_HEADERS });
+  }
+
+  const body = exportStream(format, EXPORTS[source].columns, exportRows(source, { from, to, productId }), {
+    gzip,
+    onChunk: (rows) => exportRowsWritten.inc({ source, format }, rows)
+  });
+  const filename = `${source}-${to.toISOString().slice(0, 10)}.${format}${gzip ? ".gz" : ""}`;
+
+  return new Response(body, {
+    headers: {
+      ...NO_STORE_HEADERS,
+      "Content-Type": gzip ? "application/gzip" : format === "csv" ? "text/csv; charset=utf-8" : "application/x-ndjson",
+      "Content-Disposition": `attachment; filename="${filename}"`,
+      "X-Accel-Buffering": "no"
+    }
+  });
+}
@@ -0,0 +1,41 @@
+import { NextResponse } from "next/server";
+import { formatApiError } from "@/lib/db/errors";
+import { NO_STORE_HEADERS } from "@/lib/http/no-store";
+import { sallaClient } from "@/lib/salla/client";
+import { getSallaMirrorStatus, refreshSallaMirror } from "@/lib/salla/mirror";
+
+export const dynamic = "force-dynamic";
+
+export async function GET() {
+  try {
+    const status = await getSallaMirrorStatus();
+    return NextResponse.json(status, { headers: NO_STORE_HEADERS });
+  } catch (error) {
+    return NextResponse.json(
+      { error: formatApiError(error, "Failed to read Salla mirror status") },
+      { status: 500, headers: NO_STORE_HEADERS }
+    );
+  }
+}
+
+export async function POST() {
+  if (!(await sallaClient.hasCredential())) {
+    return NextResponse.json(
+      { error: "Salla is not connected. Connect via OAuth or set SALLA_ACCESS_TOKEN." },
+      { status: 400, headers: NO_STORE_HEADERS }
+    );
+  }
+
+  try {
+    const summary = await refreshSallaMirror();
+    return NextResponse.json({ ok: true, ...summary }, { headers: NO_STORE_HEADERS });
+  } catch (error) {
+    return NextResponse.json(
+      {
+        ok: false,
+        error: error instanceof Error ? error.message : "Salla mirror refresh failed"
+      },
+      { status: 502, headers: NO_STORE_HEADERS }
+    );
+  }
+}
@@ -8,10 +8,12 @@ export const dynamic = "force-dynamic";
 
 const bodySchema = z.object({
   activeOnly: z.boolean().default(true),
-  limit: z.number().int().min(1).max(500).default(100),
+  limit: z.number().int().min(1).max(20000).optional(),
   offset: z.number().int().min(0).default(0),
   persist: z.boolean().default(true),
-  dryRun: z.boolean().default(false)
+  dryRun: z.boolean().default(false),
+  source: z.enum(["mirror", "api"]).default("mirror"),
+  unmatchedOnly: z.boolean().default(false)
 });
 
 export async function POST(request: NextRequest) {
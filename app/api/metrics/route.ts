@@ -0,0 +1,52 @@
+import { NextResponse } from "next/server";
+import { NO_STORE_HEADERS } from "@/lib/http/no-store";
+import { metrics, renderGauge } from "@/lib/metrics/registry";
+import { getBuyboxCacheStats } from "@/lib/trendyol/buybox-cache";
+import { getCircuitBreakerMetrics } from "@/lib/trendyol/circuit-breaker";
+import { getRateLimiterMetrics } from "@/lib/trendyol/rate-limiter";
+
+export const dynamic = "force-dynamic";
+
+export async function GET() {
+  const limiter = getRateLimiterMetrics();
+  const families = Object.entries(limiter.families);
+  const cache = getBuyboxCacheStats();
+  const circuits = Object.entries(getCircuitBreakerMetrics().families);
+  const circuitStateValue = { CLOSED: 0, HALF_OPEN: 1, OPEN: 2 } as const;
+
+  const body = [
+    metrics.render(),
+    renderGauge(
+      "trendyol_rate_limit_rate_per_second",
+      "Current adaptive request rate per endpoint family.",
+      families.map(([family, stats]) => ({ labels: { family }, value: stats.ratePerSecond }))
+    ),
+    renderGauge(
+      "trendyol_rate_limit_throttled",
+      "429 responses seen by this process per endpoint family.",
+      families.map(([family, stats]) => ({ labels: { family }, value: stats.throttled }))
+    ),
+    renderGauge(
+      "trendyol_circuit_state",
+      "Circuit state last seen by this process per endpoint family (0 closed, 1 half-open, 2 open).",
+      circuits.map(([family, stats]) => ({ labels: { family }, value: circuitStateValue[stats.state] }))
+    ),
+    renderGauge("buybox_cache_entries", "Buybox cache entries held by this process.", [{ value: cache.size }]),
+    renderGauge("buybox_quarantined_barcodes", "Barcodes skipped because buybox-information rejects them.", [
+      { value: cache.quarantineSize }
+    ]),
+    renderGauge("buybox_cache_lookups", "Buybox cache lookups by result since the last reset.", [
+      { labels: { result: "hit" }, value: cache.hits },
+      { labels: { result: "miss" }, value: cache.misses },
+      { labels: { result: "coalesced" }, value: cache.coalesced },
+      { labels: { result: "error" }, value: cache.errors }
+    ])
+  ].join("\n");
+
+  return new NextResponse(`${body}\n`, {
+    headers: {
+      ...NO_STORE_HEADERS,
+      "Content-Type": "text/plain; version=0.0.4; charset=utf-8"
+    }
+  });
+}
@@ -1,32 +1,27 @@
 import { NextResponse } from "next/server";
-import { acquireJobLock, releaseJobLock } from "@/lib/jobs/lock";
-import { runPoll } from "@/lib/jobs/poll-products";
+import { env } from "@/lib/config/env";
+import { enqueuePollJob } from "@/lib/jobs/poll-jobs";
+import { runPollJobsInBackground } from "@/lib/jobs/poll-products";
 import { NO_STORE_HEADERS } from "@/lib/http/no-store";
 
-const LOCK_NAME = "poll_job";
-
 export const dynamic = "force-dynamic";
 
+/** Queues a manual poll (or joins the active one); progress is read from the returned status URL. */
 export async function POST() {
-  const owner = crypto.randomUUID();
-  const acquired = await acquireJobLock(LOCK_NAME, owner, 240);
+  try {
+    const job = await enqueuePollJob("manual");
+    if (env.POLL_JOB_RUNNER === "in_process") {
+      runPollJobsInBackground();
+    }
 
-  if (!acquired) {
     return NextResponse.json(
-      { ok: true, skipped: true, message: "Poll job already running" },
-      { headers: NO_STORE_HEADERS }
+      { ok: true, jobId: job.id, status: job.status, deduplicated: job.deduplicated, statusUrl: `/api/cron/poll/jobs/${job.id}` },
+      { status: 202, headers: NO_STORE_HEADERS }
     );
-  }
-
-  try {
-    const summary = await runPoll();
-    return NextResponse.json(summary, { headers: NO_STORE_HEADERS });
   } catch (error) {
     return NextResponse.json(
-      { ok: false, error: error instanceof Error ? error.message : "Poll failed" },
+      { ok: false, error: error instanceof Error ? error.message : "Failed to queue poll" },
       { status: 500, headers: NO_STORE_HEADERS }
     );
-  } finally {
-    await releaseJobLock(LOCK_NAME, owner);
   }
 }
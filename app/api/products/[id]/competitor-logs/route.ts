@@ -1,21 +1,37 @@
 import { NextRequest, NextResponse } from "next/server";
 import { prisma } from "@/lib/db/prisma";
+import { expandSnapshotRuns } from "@/lib/jobs/snapshot-runs";
 
 export async function GET(
     request: NextRequest,
     { params }: { params: { id: string } }
 ) {
     try {
-        const logs = await prisma.competitorLog.findMany({
+        // Latest 100 runs via the (productId, checkedAt) index; each row covers checkedAt..lastSeenAt.
+        const rows = await prisma.competitorLog.findMany({
             where: {
                 productId: params.id,
             },
             orderBy: {
-                checkedAt: "asc",
+                checkedAt: "desc",
             },
             take: 100, // Limit to last 100 data points for chart performance
+            include: {
+                competitor: { select: { name: true } },
+            },
         });
 
+        const logs = expandSnapshotRuns(rows)
+            .reverse()
+            .map((row) => ({
+                id: row.id.toString(),
+                competitorName: row.competitor.name,
+                price: row.price,
+                isBuyBoxWinner: row.isBuyBoxWinner,
+                checkedAt: row.checkedAt,
+                observations: row.observations,
+            }));
+
         return NextResponse.json({ logs });
     } catch (error) {
         console.error("Failed to fetch competitor logs:", error);
@@ -11,7 +11,18 @@ export async function GET(request: NextRequest, { params }: { params: { id: stri
     include: {
       snapshots: {
         orderBy: { checkedAt: "desc" },
-        take: 100
+        take: 100,
+        // Raw payloads stay out of the details response.
+        select: {
+          id: true,
+          checkedAt: true,
+          lastSeenAt: true,
+          observations: true,
+          ourPrice: true,
+          competitorMinPrice: true,
+          competitorCount: true,
+          buyboxStatus: true
+        }
       },
       alerts: {
         orderBy: { createdAt: "desc" },
@@ -25,7 +36,7 @@ export async function GET(request: NextRequest, { params }: { params: { id: stri
     return NextResponse.json({ error: "Product not found" }, { status: 404 });
   }
 
-  const effectiveSettings = await getEffectiveSettingsForProduct(product.id);
+  const effectiveSettings = await getEffectiveSettingsForProduct(product.id, product.settings);
   const minPrice = product.settings?.minPrice ? Number(product.settings.minPrice) : 0;
   const breakEven = enforcedFloorPrice(effectiveSettings, minPrice);
   const feeRate = product.settings?.commissionRate !== null && product.settings?.commissionRate !== undefined
@@ -44,11 +55,6 @@ export async function GET(request: NextRequest, { params }: { params: { id: stri
         : null
     },
     effectiveSettings,
-    breakEven,
-    chart: product.snapshots.map((snapshot: (typeof product.snapshots)[number]) => ({
-      checkedAt: snapshot.checkedAt,
-      ourPrice: snapshot.ourPrice,
-      competitorMinPrice: snapshot.competitorMinPrice
-    }))
+    breakEven
   });
 }
@@ -0,0 +1,34 @@
+import { NextRequest, NextResponse } from "next/server";
+import { prisma } from "@/lib/db/prisma";
+import { NO_STORE_HEADERS } from "@/lib/http/no-store";
+import { loadPriceHistory, resolveHistoryWindow } from "@/lib/pricing/price-history";
+
+export const dynamic = "force-dynamic";
+
+/** Downsampled price / competitor-min / buybox-win series: `?range=7d` or `?from=&to=`, `&points=200`. */
+export async function GET(request: NextRequest, { params }: { params: { id: string } }) {
+  const product = await prisma.product.findUnique({ where: { id: params.id }, select: { id: true } });
+  if (!product) {
+    return NextResponse.json({ error: "Product not found" }, { status: 404 });
+  }
+
+  const search = request.nextUrl.searchParams;
+  const window = resolveHistoryWindow({
+    from: search.get("from"),
+    to: search.get("to"),
+    range: search.get("range"),
+    points: search.get("points")
+  });
+  const points = await loadPriceHistory(product.id, window);
+
+  return NextResponse.json(
+    {
+      productId: product.id,
+      from: window.from.toISOString(),
+      to: window.to.toISOString(),
+      bucketSeconds: Math.round(window.bucketSeconds),
+      points
+    },
+    { headers: NO_STORE_HEADERS }
+  );
+}
@@ -1,7 +1,9 @@
 import { NextRequest, NextResponse } from "next/server";
 import { z } from "zod";
+import { bumpDataVersion } from "@/lib/db/data-versions";
 import { prisma } from "@/lib/db/prisma";
 import { normalizeFeeRate } from "@/lib/pricing/calculator";
+import { invalidateProductSettingsCache } from "@/lib/pricing/settings-cache";
 
 export const dynamic = "force-dynamic";
 
@@ -135,6 +137,8 @@ export async function PATCH(request: NextRequest, { params }: { params: { id: st
       competitorDropPct: rest.competitorDropPct ?? undefined
     }
   });
+  invalidateProductSettingsCache(params.id);
+  await bumpDataVersion("products");
 
   return NextResponse.json({ ok: true, settings: decorateSettingsWithFeePercent(settings as unknown as Record<string, unknown>) });
 }
@@ -1,6 +1,7 @@
 import { NextRequest, NextResponse } from "next/server";
 import { z } from "zod";
 import { NO_STORE_HEADERS } from "@/lib/http/no-store";
+import { withJobRun } from "@/lib/jobs/job-run";
 import { trendyolClient } from "@/lib/trendyol/client";
 import { syncCatalogFromTrendyol } from "@/lib/trendyol/sync-catalog";
 
@@ -33,7 +34,7 @@ export async function POST(request: NextRequest) {
       );
     }
 
-    const summary = await syncCatalogFromTrendyol(parsed.data);
+    const summary = await withJobRun("catalog_sync", () => syncCatalogFromTrendyol(parsed.data));
 
     return NextResponse.json(
       {
@@ -0,0 +1,73 @@
+import { NextRequest, NextResponse } from "next/server";
+import { z } from "zod";
+import { NO_STORE_HEADERS } from "@/lib/http/no-store";
+import { runBulkPriceApply } from "@/lib/pricing/bulk-apply";
+import type { ProductsSuggestBatchEvent } from "@/lib/table/products-batch";
+import { trendyolClient } from "@/lib/trendyol/client";
+
+export const dynamic = "force-dynamic";
+
+const bodySchema = z.object({
+  productIds: z.array(z.string().min(1)).min(1).max(5000)
+});
+
+/**
+ * Applies suggested prices to `productIds` on the server and streams progress as NDJSON
+ * (`progress`, `failure` per rejected item, then `done`). The run is not tied to the request:
+ * closing the page only stops the progress stream.
+ */
+export async function POST(request: NextRequest) {
+  const payload = await request.json().catch(() => ({}));
+  const parsed = bodySchema.safeParse(payload);
+
+  if (!parsed.success) {
+    return NextResponse.json({ error: parsed.error.flatten() }, { status: 400, headers: NO_STORE_HEADERS });
+  }
+
+  if (!trendyolClient.isConfigured()) {
+    return NextResponse.json(
+      { error: "Trendyol credentials are not configured" },
+      { status: 400, headers: NO_STORE_HEADERS }
+    );
+  }
+
+  const encoder = new TextEncoder();
+  let open = true;
+  const stream = new ReadableStream<Uint8Array>({
+    start(controller) {
+      const send = (event: ProductsSuggestBatchEvent) => {
+        if (!open) {
+          return;
+        }
+        try {
+          controller.enqueue(encoder.encode(`${JSON.stringify(event)}\n`));
+        } catch {
+          open = false;
+        }
+      };
+
+      runBulkPriceApply(parsed.data.productIds, send)
+        .catch((error) => {
+          console.error("[bulk-apply] Bulk price update failed:", error);
+          send({ type: "error", error: error instanceof Error ? error.message : "Bulk price update failed" });
+        })
+        .finally(() => {
+          if (open) {
+            open = false;
+            controller.close();
+          }
+        });
+    },
+    cancel() {
+      open = false;
+    }
+  });
+
+  return new Response(stream, {
+    headers: {
+      ...NO_STORE_HEADERS,
+      "Content-Type": "application/x-ndjson",
+      "X-Accel-Buffering": "no"
+    }
+  });
+}
@@ -1,6 +1,7 @@
 import { NextRequest, NextResponse } from "next/server";
 import type { Prisma } from "@prisma/client";
 import { z } from "zod";
+import { publishProductChanges } from "@/lib/dashboard/product-changes";
 import { prisma } from "@/lib/db/prisma";
 import { computeFees, enforcedFloorPrice } from "@/lib/pricing/calculator";
 import { getEffectiveSettingsForProduct } from "@/lib/pricing/effective-settings";
@@ -65,7 +66,7 @@ export async function POST(request: NextRequest) {
       ? Number(latestSnapshot.competitorMinPrice)
       : null;
 
-  const settings = await getEffectiveSettingsForProduct(product.id);
+  const settings = await getEffectiveSettingsForProduct(product.id, product.settings);
   if (!Number.isFinite(settings.costPrice) || settings.costPrice <= 0) {
     return NextResponse.json(
       {
@@ -125,6 +126,7 @@ export async function POST(request: NextRequest) {
   });
 
   const snapshot = await refreshSnapshotForProduct(product);
+  await publishProductChanges("price_change", [product.id]);
 
   return NextResponse.json({
     ok: true,
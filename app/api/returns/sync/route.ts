@@ -6,8 +6,8 @@ export const dynamic = "force-dynamic";
 
 export async function POST(request: Request) {
     try {
-        const { totalSynced } = await returnService.syncReturns();
-        return NextResponse.json({ ok: true, totalSynced });
+        const { totalSynced, source } = await returnService.syncReturns();
+        return NextResponse.json({ ok: true, totalSynced, source });
     } catch (error) {
         console.error("Return sync failed:", error);
         return NextResponse.json(
@@ -1,11 +1,13 @@
 import { NextRequest, NextResponse } from "next/server";
 import { z } from "zod";
 import { env } from "@/lib/config/env";
+import { bumpDataVersion } from "@/lib/db/data-versions";
 import { prisma } from "@/lib/db/prisma";
 import { formatApiError, isDatabaseUnavailableError } from "@/lib/db/errors";
 import { NO_STORE_HEADERS } from "@/lib/http/no-store";
 import { getOrCreateGlobalSettings } from "@/lib/pricing/effective-settings";
 import { normalizeFeeRate } from "@/lib/pricing/calculator";
+import { invalidateGlobalSettingsCache } from "@/lib/pricing/settings-cache";
 import { sallaClient } from "@/lib/salla/client";
 
 export const dynamic = "force-dynamic";
@@ -164,6 +166,8 @@ export async function POST(request: NextRequest) {
         competitorDropPct: parsed.data.competitorDropPct
       }
     });
+    invalidateGlobalSettingsCache();
+    await bumpDataVersion("products");
 
     return NextResponse.json(
       {
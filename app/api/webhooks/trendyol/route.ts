@@ -0,0 +1,55 @@
+import { NextRequest, NextResponse } from "next/server";
+import { env } from "@/lib/config/env";
+import { applyShipmentEventsInBackground } from "@/lib/jobs/apply-shipment-events";
+import { enqueueShipmentEvents, packagesFromWebhookBody } from "@/lib/trendyol/shipments/webhook-events";
+
+export const dynamic = "force-dynamic";
+
+function webhookSecret(request: NextRequest) {
+  const header = request.headers.get("x-webhook-secret");
+  if (header) {
+    return header;
+  }
+
+  const authorization = request.headers.get("authorization") ?? "";
+  if (/^Basic\s+/i.test(authorization)) {
+    const decoded = Buffer.from(authorization.replace(/^Basic\s+/i, ""), "base64").toString("utf8");
+    return decoded.slice(decoded.indexOf(":") + 1);
+  }
+  return authorization.replace(/^Bearer\s+/i, "") || null;
+}
+
+/**
+ * Receives Trendyol order/package status events, appends them to the `webhook_events` queue
+ * and acknowledges immediately; they are applied to shipment packages, orders and returns in
+ * batches afterwards. Redelivered events are dropped.
+ */
+export async function POST(request: NextRequest) {
+  if (!env.TRENDYOL_WEBHOOK_SECRET) {
+    return NextResponse.json({ error: "Webhook ingestion is not configured" }, { status: 404 });
+  }
+  if (webhookSecret(request) !== env.TRENDYOL_WEBHOOK_SECRET) {
+    return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
+  }
+
+  const body = await request.json().catch(() => null);
+  const packages = packagesFromWebhookBody(body);
+  if (!packages.length) {
+    return NextResponse.json({ error: "No shipment package events in payload" }, { status: 400 });
+  }
+
+  try {
+    const queued = await enqueueShipmentEvents(packages);
+    applyShipmentEventsInBackground();
+    return NextResponse.json(
+      { ok: true, received: packages.length, queued, duplicates: packages.length - queued },
+      { status: 202 }
+    );
+  } catch (error) {
+    // A 5xx makes Trendyol redeliver, and the event key keeps the redelivery from doubling up.
+    return NextResponse.json(
+      { ok: false, error: error instanceof Error ? error.message : "Failed to queue events" },
+      { status: 500 }
+    );
+  }
+}
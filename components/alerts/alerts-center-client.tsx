@@ -1,7 +1,7 @@
 "use client";
 
 import { CheckCheck, RefreshCw, Search } from "lucide-react";
-import { useCallback, useEffect, useMemo, useState } from "react";
+import { useCallback, useEffect, useMemo, useRef, useState } from "react";
 import { Badge } from "@/components/ui/badge";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
@@ -22,6 +22,7 @@ import {
   TableRow
 } from "@/components/ui/table";
 import { useToast } from "@/components/ui/toaster";
+import { mergeAlertsById, subscribeToDashboardUpdates } from "@/lib/dashboard/live-client";
 import { cn } from "@/lib/utils/cn";
 
 interface AlertItem {
@@ -157,9 +158,21 @@ export function AlertsCenterClient() {
     }
   }, [alerts.length, toast]);
 
+  // `loadAlerts` changes with the list length; the list is loaded once and then kept current
+  // by the event stream, so neither effect depends on it.
+  const loadAlertsRef = useRef(loadAlerts);
+  loadAlertsRef.current = loadAlerts;
+
+  useEffect(() => {
+    void loadAlertsRef.current();
+  }, []);
+
   useEffect(() => {
-    void loadAlerts();
-  }, [loadAlerts]);
+    return subscribeToDashboardUpdates<never, AlertItem>({
+      onAlerts: (incoming) => setAlerts((current) => mergeAlertsById(current, incoming)),
+      onReconnect: () => void loadAlertsRef.current()
+    });
+  }, []);
 
   const markRead = useCallback(
     async (alertIds: string[]) => {
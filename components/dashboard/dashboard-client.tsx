@@ -7,9 +7,12 @@ import { AnalyticsCharts } from "@/components/dashboard/analytics-charts";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card";
 import { useToast } from "@/components/ui/toaster";
+import { mergeRowsById, subscribeToDashboardUpdates } from "@/lib/dashboard/live-client";
+import { waitForPollJob } from "@/lib/jobs/poll-job-client";
 import { cn } from "@/lib/utils/cn";
 
 interface DashboardRowSummary {
+  productId: string;
   buyboxStatus: "WIN" | "LOSE" | "UNKNOWN";
   lowMarginRisk: boolean;
 }
@@ -22,6 +25,7 @@ interface DashboardResponse {
 
 interface PollRunResponse {
   ok: boolean;
+  statusUrl?: string;
   processed?: number;
   alertsCreated?: number;
   error?: string;
@@ -52,7 +56,7 @@ export function DashboardClient() {
     setLoading(true);
     try {
       const response = await fetch("/api/dashboard?sort=latest&lostBuyboxOnly=false&lowMarginRisk=false", {
-        cache: "no-store"
+        cache: "no-cache"
       });
       const data = (await readJsonResponse(response)) as DashboardResponse;
 
@@ -80,10 +84,16 @@ export function DashboardClient() {
         method: "POST",
         headers: { "Content-Type": "application/json" }
       });
-      const data = (await readJsonResponse(response)) as PollRunResponse;
+      const queued = (await readJsonResponse(response)) as PollRunResponse;
 
-      if (!response.ok || !data.ok) {
-        throw new Error(data.error || data.message || "Poll failed");
+      if (!response.ok || !queued.ok || !queued.statusUrl) {
+        throw new Error(queued.error || queued.message || "Poll failed");
+      }
+
+      const job = await waitForPollJob(queued.statusUrl);
+      const data = (job.summary ?? {}) as unknown as PollRunResponse;
+      if (job.status === "FAILED" || !data.ok) {
+        throw new Error(job.error || data.error || data.message || "Poll failed");
       }
 
       toast({
@@ -107,6 +117,13 @@ export function DashboardClient() {
     loadSummary();
   }, [loadSummary]);
 
+  useEffect(() => {
+    return subscribeToDashboardUpdates<DashboardRowSummary, never>({
+      onRows: (updates) => setRows((current) => mergeRowsById(current, updates)),
+      onReconnect: () => void loadSummary()
+    });
+  }, [loadSummary]);
+
   const summary = useMemo(() => {
     const total = rows.length;
     const lost = rows.filter((row) => row.buyboxStatus === "LOSE").length;
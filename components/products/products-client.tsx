@@ -16,6 +16,8 @@ import { Label } from "@/components/ui/label";
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select";
 import { useToast } from "@/components/ui/toaster";
 import { Badge } from "@/components/ui/badge";
+import { mergeRowsById, subscribeToDashboardUpdates } from "@/lib/dashboard/live-client";
+import { waitForPollJob } from "@/lib/jobs/poll-job-client";
 import { formatSar } from "@/lib/utils/money";
 import { cn } from "@/lib/utils/cn";
 import { Tooltip, TooltipContent, TooltipProvider, TooltipTrigger } from "@/components/ui/tooltip";
@@ -26,9 +28,10 @@ import {
   type ProductsTableDensity
 } from "@/lib/table/products-table-state";
 import {
-  runProductsSuggestBatch,
+  readProductsSuggestBatchStream,
   type ProductsSuggestBatchFailure,
-  type ProductsSuggestBatchItem
+  type ProductsSuggestBatchItem,
+  type ProductsSuggestBatchResult
 } from "@/lib/table/products-batch";
 
 interface ProductRow {
@@ -65,6 +68,7 @@ interface DashboardResponse {
 
 interface PollRunResponse {
   ok: boolean;
+  statusUrl?: string;
   processed?: number;
   skipped?: number;
   alertsCreated?: number;
@@ -181,6 +185,7 @@ export function ProductsClient() {
   const [loading, setLoading] = useState(true);
   const [polling, setPolling] = useState(false);
   const [apiWarning, setApiWarning] = useState<string | null>(null);
+  const [liveConnected, setLiveConnected] = useState(false);
   const warningToastRef = useRef<string | null>(null);
   const abortRef = useRef<AbortController | null>(null);
 
@@ -309,7 +314,7 @@ export function ProductsClient() {
 
     try {
       const response = await fetch("/api/dashboard", {
-        cache: "no-store",
+        cache: "no-cache",
         signal: controller.signal
       });
       const data = (await readJsonResponse(response)) as DashboardResponse;
@@ -375,10 +380,16 @@ export function ProductsClient() {
           method: "POST",
           headers: { "Content-Type": "application/json" }
         });
-        const data = (await readJsonResponse(response)) as PollRunResponse;
+        const queued = (await readJsonResponse(response)) as PollRunResponse;
 
-        if (!response.ok || !data.ok) {
-          throw new Error(data.error || data.message || "Poll failed");
+        if (!response.ok || !queued.ok || !queued.statusUrl) {
+          throw new Error(queued.error || queued.message || "Poll failed");
+        }
+
+        const job = await waitForPollJob(queued.statusUrl);
+        const data = (job.summary ?? {}) as unknown as PollRunResponse;
+        if (job.status === "FAILED" || !data.ok) {
+          throw new Error(job.error || data.error || data.message || "Poll failed");
         }
 
         const firstError = data.errors?.[0];
@@ -412,7 +423,20 @@ export function ProductsClient() {
     loadRows();
   }, [loadRows]);
 
+  // Row deltas from the event stream replace the periodic full reload while it is connected.
+  useEffect(() => {
+    return subscribeToDashboardUpdates<ProductRow, never>({
+      onRows: (updates) => setRows((current) => mergeRowsById(current, updates)),
+      onReconnect: () => void loadRows(),
+      onStatus: setLiveConnected
+    });
+  }, [loadRows]);
+
   useEffect(() => {
+    if (liveConnected) {
+      return;
+    }
+
     const timer = setInterval(() => {
       const msRemaining = nextUpdate - Date.now();
       const secRemaining = Math.max(0, Math.ceil(msRemaining / 1000));
@@ -429,7 +453,7 @@ export function ProductsClient() {
     }, 1000);
 
     return () => clearInterval(timer);
-  }, [nextUpdate, loadRows, inlineEditRowId]);
+  }, [nextUpdate, loadRows, inlineEditRowId, liveConnected]);
 
   const executePriceUpdate = useCallback(
     async (row: ProductRow, method: "SUGGESTED" | "CUSTOM", customValue?: number): Promise<PriceUpdateResult> => {
@@ -683,10 +707,23 @@ export function ProductsClient() {
       failures: []
     });
 
-    const result = await runProductsSuggestBatch({
-      items,
-      concurrency: 3,
-      onProgress: (progress) => {
+    const productIds = items.map((item) => item.productId);
+    productIds.forEach((productId) => setRowUpdating(productId, true));
+
+    let result: ProductsSuggestBatchResult;
+    try {
+      const response = await fetch("/api/products/update-price/bulk", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ productIds })
+      });
+
+      if (!response.ok) {
+        const data = await readJsonResponse(response);
+        throw new Error(typeof data?.error === "string" ? data.error : `Bulk update failed (${response.status})`);
+      }
+
+      result = await readProductsSuggestBatchStream(response, (progress) => {
         setBatchState((current) => ({
           ...current,
           running: true,
@@ -695,53 +732,24 @@ export function ProductsClient() {
           succeeded: progress.succeeded,
           failed: progress.failed
         }));
-      },
-      execute: async (item) => {
-        const row = rowsById.get(item.productId);
-        if (!row) {
-          return {
-            ok: false,
-            error: "Product not found in current dataset"
-          };
-        }
-
-        if (row.suggestedPrice === null) {
-          return {
-            ok: false,
-            error: "No suggested price available"
-          };
-        }
-
-        setRowUpdating(item.productId, true);
-        try {
-          const updateResult = await executePriceUpdate(row, "SUGGESTED");
-          if (updateResult.ok) {
-            setLossInfoForRow(item.productId, null);
-            return { ok: true };
-          }
-
-          if (updateResult.status === 422) {
-            const info = toLossGuardInfo(updateResult.data);
-            return {
-              ok: false,
-              error: updateResult.error || "Price is below enforced floor",
-              status: 422,
-              enforcedFloor: info?.enforcedFloor,
-              attemptedPrice: info?.attemptedPrice,
-              projectedProfit: info?.projectedProfit
-            };
-          }
+      });
+    } catch (error) {
+      setBatchState(INITIAL_BATCH_STATE);
+      toast({
+        title: "Batch suggest failed",
+        description: error instanceof Error ? error.message : "Unknown error",
+        variant: "destructive"
+      });
+      await loadRows();
+      return;
+    } finally {
+      productIds.forEach((productId) => setRowUpdating(productId, false));
+    }
 
-          return {
-            ok: false,
-            error: updateResult.error || "Failed to apply suggested price",
-            status: updateResult.status
-          };
-        } finally {
-          setRowUpdating(item.productId, false);
-        }
-      }
-    });
+    const failedIds = new Set(result.failures.map((failure) => failure.productId));
+    productIds
+      .filter((productId) => !failedIds.has(productId))
+      .forEach((productId) => setLossInfoForRow(productId, null));
 
     setBatchState({
       running: false,
@@ -768,16 +776,7 @@ export function ProductsClient() {
     }
 
     await loadRows();
-  }, [
-    batchState.running,
-    executePriceUpdate,
-    loadRows,
-    rowsById,
-    selectedRows,
-    setLossInfoForRow,
-    setRowUpdating,
-    toast
-  ]);
+  }, [batchState.running, loadRows, selectedRows, setLossInfoForRow, setRowUpdating, toast]);
 
   const clearSelection = useCallback(() => {
     setRowSelection({});
@@ -1090,7 +1089,11 @@ export function ProductsClient() {
           </div>
           <div className="flex flex-wrap items-center gap-3">
             <span className="text-xs text-muted-foreground font-medium tabular-nums">
-              {inlineEditRowId ? "Auto-refresh paused while editing" : `Next update in ${timeLeft}s`}
+              {liveConnected
+                ? "Live updates"
+                : inlineEditRowId
+                  ? "Auto-refresh paused while editing"
+                  : `Next update in ${timeLeft}s`}
             </span>
             {batchState.running ? (
               <span className="text-xs text-primary font-medium tabular-nums">
@@ -0,0 +1,91 @@
+import type { AlertSeverity, AlertType, Prisma } from "@prisma/client";
+import { publishProductChanges } from "@/lib/dashboard/product-changes";
+import { prisma } from "@/lib/db/prisma";
+
+export const ALERT_DEDUPE_MINUTES = 15;
+export const MISSING_DATA_DEDUPE_MINUTES = 60 * 12;
+
+// The longest dedupe window; older alerts can never suppress anything.
+const LOOKBACK_MINUTES = Math.max(ALERT_DEDUPE_MINUTES, MISSING_DATA_DEDUPE_MINUTES);
+// Past this many products the lookback is loaded for all products instead of an IN list.
+const MAX_FILTERED_PRODUCTS = 1000;
+const INSERT_CHUNK_SIZE = 500;
+
+export interface PendingAlert {
+  productId: string;
+  type: AlertType;
+  severity: AlertSeverity;
+  message: string;
+  metadataJson?: Prisma.InputJsonValue;
+}
+
+/**
+ * Alert suppression for one poll run: the latest alert time per (product, type) is loaded once,
+ * suppression is decided in memory, and surviving alerts are inserted in bulk by `flush`.
+ */
+export class AlertDedupe {
+  private readonly pending: PendingAlert[] = [];
+
+  constructor(
+    private readonly lastCreated = new Map<string, number>(),
+    private readonly now: () => number = Date.now
+  ) {}
+
+  static async load(productIds: string[], now: () => number = Date.now) {
+    const since = new Date(now() - LOOKBACK_MINUTES * 60_000);
+    const rows = productIds.length
+      ? await prisma.alert.groupBy({
+          by: ["productId", "type"],
+          where: {
+            createdAt: { gte: since },
+            ...(productIds.length <= MAX_FILTERED_PRODUCTS ? { productId: { in: productIds } } : {})
+          },
+          _max: { createdAt: true }
+        })
+      : [];
+
+    const lastCreated = new Map<string, number>();
+    for (const row of rows) {
+      if (row._max.createdAt) {
+        lastCreated.set(`${row.productId}:${row.type}`, row._max.createdAt.getTime());
+      }
+    }
+
+    return new AlertDedupe(lastCreated, now);
+  }
+
+  /** Queues the alert unless one of the same type was created (or queued) within `dedupeMinutes`. */
+  offer(alert: PendingAlert, dedupeMinutes = ALERT_DEDUPE_MINUTES) {
+    const key = `${alert.productId}:${alert.type}`;
+    const now = this.now();
+    const last = this.lastCreated.get(key);
+    if (last !== undefined && now - last < dedupeMinutes * 60_000) {
+      return false;
+    }
+
+    this.lastCreated.set(key, now);
+    this.pending.push(alert);
+    return true;
+  }
+
+  get pendingCount() {
+    return this.pending.length;
+  }
+
+  /** Inserts the queued alerts and announces their products on the change feed; returns how many were written. */
+  async flush() {
+    const batch = this.pending.splice(0, this.pending.length);
+    let inserted = 0;
+
+    for (let i = 0; i < batch.length; i += INSERT_CHUNK_SIZE) {
+      const { count } = await prisma.alert.createMany({ data: batch.slice(i, i + INSERT_CHUNK_SIZE) });
+      inserted += count;
+    }
+
+    if (inserted > 0) {
+      await publishProductChanges("alert", batch.map((alert) => alert.productId));
+    }
+
+    return inserted;
+  }
+}
@@ -29,6 +29,25 @@ const envSchema = z.object({
   TRENDYOL_BASE_URL: z.string().url().default("https://apigw.trendyol.com"),
   TRENDYOL_USER_AGENT: z.string().optional(),
   TRENDYOL_STOREFRONT_CODE: z.string().default("SA"),
+  TRENDYOL_WEBHOOK_SECRET: z.preprocess(
+    (value) => (typeof value === "string" && value.trim() === "" ? undefined : value),
+    z.string().min(8).optional()
+  ),
+  SHIPMENT_RECONCILE_HOURS: z.coerce.number().positive().max(168).default(6),
+  TRENDYOL_RATE_LIMIT_BACKEND: z.enum(["postgres", "memory"]).default("postgres"),
+  TRENDYOL_RATE_LIMIT_BURST: z.coerce.number().int().min(1).max(100).default(5),
+  TRENDYOL_RATE_LIMIT_PRODUCTS_PER_SECOND: z.coerce.number().positive().max(100).default(5),
+  TRENDYOL_RATE_LIMIT_BUYBOX_PER_SECOND: z.coerce.number().positive().max(100).default(5),
+  TRENDYOL_RATE_LIMIT_SHIPMENTS_PER_SECOND: z.coerce.number().positive().max(100).default(5),
+  TRENDYOL_RATE_LIMIT_PRICES_PER_SECOND: z.coerce.number().positive().max(100).default(2),
+  TRENDYOL_CIRCUIT_FAILURE_RATE: z.coerce.number().positive().max(1).default(0.5),
+  TRENDYOL_CIRCUIT_MIN_REQUESTS: z.coerce.number().int().min(1).default(20),
+  TRENDYOL_CIRCUIT_CONSECUTIVE_FAILURES: z.coerce.number().int().min(1).default(5),
+  TRENDYOL_CIRCUIT_WINDOW_SECONDS: z.coerce.number().int().min(5).max(3600).default(60),
+  TRENDYOL_CIRCUIT_OPEN_SECONDS: z.coerce.number().int().min(1).max(3600).default(30),
+  TRENDYOL_CIRCUIT_MAX_OPEN_SECONDS: z.coerce.number().int().min(1).max(86400).default(600),
+  BUYBOX_CACHE_TTL_SECONDS: z.coerce.number().int().min(0).max(3600).default(120),
+  BUYBOX_QUARANTINE_HOURS: z.coerce.number().positive().max(720).default(24),
 
   SALLA_BASE_URL: z.string().url().default("https://api.salla.dev/admin/v2"),
   SALLA_OAUTH_BASE_URL: z.string().url().default("https://accounts.salla.sa"),
@@ -43,6 +62,7 @@ const envSchema = z.object({
     z.string().url().optional()
   ),
   SALLA_COST_SOURCE: z.enum(["PRE_TAX", "COST_PRICE"]).default("PRE_TAX"),
+  SALLA_MIRROR_MAX_AGE_MINUTES: z.coerce.number().int().min(1).default(360),
 
   DEFAULT_VAT_RATE: z
     .string()
@@ -54,7 +74,21 @@ const envSchema = z.object({
     .transform((value) => (value ? Number(value) : 15)),
   AUTO_SYNC_CATALOG: booleanLike.default(true),
   AUTO_SYNC_MAX_PAGES: z.coerce.number().int().min(1).max(500).default(50),
-  AUTO_SYNC_PAGE_SIZE: z.coerce.number().int().min(1).max(200).default(50)
+  AUTO_SYNC_PAGE_SIZE: z.coerce.number().int().min(1).max(200).default(50),
+  POLL_TICK_BUDGET: z.coerce.number().int().min(0).default(0),
+  POLL_MODE: z.enum(["single", "sharded"]).default("single"),
+  POLL_SOURCE: z.enum(["api", "synced_table"]).default("api"),
+  POLL_SYNCED_MAX_AGE_MINUTES: z.coerce.number().int().min(1).max(1440).default(15),
+  POLL_SHARD_BATCH_SIZE: z.coerce.number().int().min(1).max(1000).default(50),
+  POLL_SHARD_LEASE_SECONDS: z.coerce.number().int().min(15).max(3600).default(120),
+  POLL_JOB_RUNNER: z.enum(["in_process", "worker"]).default("in_process"),
+  POLL_JOB_LEASE_SECONDS: z.coerce.number().int().min(15).max(3600).default(120),
+  SNAPSHOT_MODE: z.enum(["dense", "change_only"]).default("dense"),
+  SNAPSHOT_HEARTBEAT_MINUTES: z.coerce.number().int().min(5).max(1440).default(60),
+  RESPONSE_CACHE_TTL_SECONDS: z.coerce.number().int().min(0).max(3600).default(300),
+  LIVE_UPDATES_POLL_MS: z.coerce.number().int().min(200).max(60_000).default(1000),
+  SETTINGS_CACHE_TTL_SECONDS: z.coerce.number().int().min(0).max(3600).default(60),
+  JOB_METRICS_LOG: booleanLike.default(true)
 });
 
 export const env = envSchema.parse({
@@ -0,0 +1,78 @@
+const STREAM_URL = "/api/dashboard/stream";
+// Same cap as GET /api/alerts.
+const MAX_ALERTS = 200;
+
+export interface LiveUpdateHandlers<Row, Alert> {
+  onRows?: (rows: Row[]) => void;
+  onAlerts?: (alerts: Alert[]) => void;
+  /** The stream (re)connected; anything written while it was down has to be loaded in full. */
+  onReconnect?: () => void;
+  onStatus?: (connected: boolean) => void;
+}
+
+/**
+ * Browser-side: follows the dashboard event stream until the returned function is called.
+ * EventSource reconnects by itself; `onReconnect` fires on every reconnect after the first open.
+ */
+export function subscribeToDashboardUpdates<Row, Alert>(handlers: LiveUpdateHandlers<Row, Alert>) {
+  if (typeof EventSource === "undefined") {
+    return () => {};
+  }
+
+  const source = new EventSource(STREAM_URL);
+  let opened = false;
+
+  const parse = <T>(event: MessageEvent, key: string): T[] => {
+    try {
+      const data = JSON.parse(event.data) as Record<string, unknown>;
+      return Array.isArray(data[key]) ? (data[key] as T[]) : [];
+    } catch {
+      return [];
+    }
+  };
+
+  source.addEventListener("open", () => {
+    handlers.onStatus?.(true);
+    if (opened) {
+      handlers.onReconnect?.();
+    }
+    opened = true;
+  });
+  source.addEventListener("error", () => handlers.onStatus?.(false));
+  source.addEventListener("rows", (event) => handlers.onRows?.(parse<Row>(event as MessageEvent, "rows")));
+  source.addEventListener("alerts", (event) => handlers.onAlerts?.(parse<Alert>(event as MessageEvent, "alerts")));
+
+  return () => source.close();
+}
+
+/** Replaces rows by `productId`, keeping their position; rows not shown yet are appended. */
+export function mergeRowsById<Row extends { productId: string }>(current: Row[], updates: Row[]) {
+  if (!updates.length) {
+    return current;
+  }
+
+  const pending = new Map(updates.map((row) => [row.productId, row]));
+  const merged = current.map((row) => {
+    const next = pending.get(row.productId);
+    if (!next) {
+      return row;
+    }
+    pending.delete(row.productId);
+    return next;
+  });
+
+  return pending.size ? [...merged, ...Array.from(pending.values())] : merged;
+}
+
+/** Adds alerts not shown yet, newest first; alerts already shown keep their local state (read flags). */
+export function mergeAlertsById<Alert extends { id: string; createdAt: string }>(current: Alert[], incoming: Alert[]) {
+  const known = new Set(current.map((alert) => alert.id));
+  const added = incoming.filter((alert) => !known.has(alert.id));
+  if (!added.length) {
+    return current;
+  }
+
+  return [...added, ...current]
+    .sort((a, b) => new Date(b.createdAt).getTime() - new Date(a.createdAt).getTime())
+    .slice(0, MAX_ALERTS);
+}
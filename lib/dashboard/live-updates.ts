@@ -0,0 +1,190 @@
+import type { AlertSeverity, AlertType } from "@prisma/client";
+import { env } from "@/lib/config/env";
+import { prisma } from "@/lib/db/prisma";
+import {
+  latestProductChangeId,
+  readProductChanges,
+  type ProductChangeEvent
+} from "@/lib/dashboard/product-changes";
+import { buildDashboardRows, type DashboardRowDTO } from "@/lib/dashboard/service";
+
+export interface LiveAlert {
+  id: string;
+  createdAt: Date;
+  type: AlertType;
+  severity: AlertSeverity;
+  message: string;
+  isRead: boolean;
+  metadataJson: unknown;
+  product: { sku: string; title: string };
+}
+
+/** `id` is the last change event covered, sent as the SSE event id. */
+export type LiveUpdate =
+  | { type: "rows"; id: string; rows: DashboardRowDTO[] }
+  | { type: "alerts"; id: string; alerts: LiveAlert[] };
+
+type Listener = (update: LiveUpdate) => void;
+
+const READ_LIMIT = 500;
+const MAX_ALERTS = 200;
+// Alerts are inserted before their change event; this also covers clock skew between writers.
+const ALERT_LOOKBACK_MS = 2 * 60_000;
+// Event ids are taken at insert but become visible at commit, so a slow writer can commit an id
+// below one already read. Each read reaches back this many ids and drops the events already sent.
+const REREAD_WINDOW = 100n;
+
+/** Products whose dashboard rows changed, and products with new alerts since the oldest alert event. */
+export function coalesceProductChanges(events: ProductChangeEvent[]) {
+  const rowIds = new Set<string>();
+  const alertIds = new Set<string>();
+  let alertsSince: Date | null = null;
+
+  for (const event of events) {
+    if (event.kind === "alert") {
+      event.productIds.forEach((id) => alertIds.add(id));
+      if (!alertsSince || event.createdAt < alertsSince) {
+        alertsSince = event.createdAt;
+      }
+    } else {
+      event.productIds.forEach((id) => rowIds.add(id));
+    }
+  }
+
+  return { rowIds: Array.from(rowIds), alertIds: Array.from(alertIds), alertsSince };
+}
+
+export function formatServerSentEvent(update: LiveUpdate) {
+  const { type, id, ...payload } = update;
+  return `id: ${id}\nevent: ${type}\ndata: ${JSON.stringify(payload)}\n\n`;
+}
+
+/**
+ * Fans change events out to every open dashboard stream in this process. One loop per process
+ * reads `product_change_events` while anyone is subscribed, rebuilds only the affected rows once
+ * and hands the same delta to every subscriber, so open tabs cost nothing extra per change.
+ */
+export class DashboardLiveUpdates {
+  private readonly listeners = new Set<Listener>();
+  private cursor: bigint | null = null;
+  // Ids at or below this were written before anyone subscribed and are never re-read.
+  private floor = 0n;
+  private readonly seen = new Set<bigint>();
+  private timer: ReturnType<typeof setTimeout> | null = null;
+  private running = false;
+
+  constructor(private readonly pollMs: number) {}
+
+  get subscribers() {
+    return this.listeners.size;
+  }
+
+  subscribe(listener: Listener) {
+    this.listeners.add(listener);
+    if (!this.timer && !this.running) {
+      this.schedule(0);
+    }
+
+    return () => {
+      this.listeners.delete(listener);
+      if (!this.listeners.size && this.timer) {
+        clearTimeout(this.timer);
+        this.timer = null;
+        this.reset();
+      }
+    };
+  }
+
+  private schedule(delayMs: number) {
+    this.timer = setTimeout(() => void this.tick(), delayMs);
+  }
+
+  private async tick() {
+    this.timer = null;
+    this.running = true;
+    try {
+      await this.poll();
+    } catch (error) {
+      console.warn("[live-updates] Failed to read change events:", error instanceof Error ? error.message : error);
+    } finally {
+      this.running = false;
+      if (this.listeners.size) {
+        this.schedule(this.pollMs);
+      } else {
+        // Nobody was listening to what happened since; the next subscriber starts from then.
+        this.reset();
+      }
+    }
+  }
+
+  private reset() {
+    this.cursor = null;
+    this.floor = 0n;
+    this.seen.clear();
+  }
+
+  /**
+   * Reads the events written since the last pass, plus a trailing window of ids for events that
+   * committed late, and broadcasts the affected rows and alerts.
+   */
+  async poll() {
+    if (this.cursor === null) {
+      this.cursor = await latestProductChangeId();
+      this.floor = this.cursor;
+      return;
+    }
+
+    const windowStart = this.cursor - REREAD_WINDOW;
+    const read = await readProductChanges(windowStart > this.floor ? windowStart : this.floor, READ_LIMIT);
+    const events = read.filter((event) => !this.seen.has(BigInt(event.id)));
+    if (!events.length) {
+      return;
+    }
+
+    for (const event of events) {
+      const eventId = BigInt(event.id);
+      this.seen.add(eventId);
+      if (eventId > this.cursor) {
+        this.cursor = eventId;
+      }
+    }
+    for (const seenId of Array.from(this.seen)) {
+      if (seenId <= this.cursor - REREAD_WINDOW) {
+        this.seen.delete(seenId);
+      }
+    }
+
+    const id = String(this.cursor);
+    const { rowIds, alertIds, alertsSince } = coalesceProductChanges(events);
+
+    if (rowIds.length) {
+      const rows = await buildDashboardRows({ productIds: rowIds });
+      this.broadcast({ type: "rows", id, rows });
+    }
+
+    if (alertIds.length && alertsSince) {
+      const alerts = await prisma.alert.findMany({
+        where: {
+          productId: { in: alertIds },
+          createdAt: { gte: new Date(alertsSince.getTime() - ALERT_LOOKBACK_MS) }
+        },
+        include: { product: { select: { sku: true, title: true } } },
+        orderBy: { createdAt: "desc" },
+        take: MAX_ALERTS
+      });
+      this.broadcast({ type: "alerts", id, alerts });
+    }
+  }
+
+  private broadcast(update: LiveUpdate) {
+    for (const listener of Array.from(this.listeners)) {
+      try {
+        listener(update);
+      } catch (error) {
+        console.warn("[live-updates] Subscriber failed:", error instanceof Error ? error.message : error);
+      }
+    }
+  }
+}
+
+export const dashboardLiveUpdates = new DashboardLiveUpdates(env.LIVE_UPDATES_POLL_MS);
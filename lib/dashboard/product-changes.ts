@@ -0,0 +1,89 @@
+import { invalidateDataVersions } from "@/lib/db/data-versions";
+import { prisma } from "@/lib/db/prisma";
+
+/** What kind of write touched the products: dashboard rows change on snapshots and price changes. */
+export type ProductChangeKind = "snapshot" | "alert" | "price_change";
+
+export interface ProductChangeEvent {
+  id: bigint;
+  kind: ProductChangeKind;
+  productIds: string[];
+  createdAt: Date;
+}
+
+/** The channel the `product_change_events` insert trigger notifies. */
+export const PRODUCT_CHANGES_CHANNEL = "product_changes";
+
+const RETENTION_MINUTES = 60;
+const PRUNE_INTERVAL_MS = 10 * 60_000;
+
+// Compared in UTC, like the rate-limit buckets; matches what Prisma writes for `createdAt`.
+const NOW_UTC = `(now() AT TIME ZONE 'UTC')`;
+
+// Also bumps the `products` data version, so cached dashboard responses are recomputed.
+const PUBLISH_SQL = `
+WITH "bumped" AS (
+  INSERT INTO "data_versions" ("scope", "version", "updatedAt")
+  VALUES ('products', 1, ${NOW_UTC})
+  ON CONFLICT ("scope") DO UPDATE
+  SET "version" = "data_versions"."version" + 1, "updatedAt" = EXCLUDED."updatedAt"
+)
+INSERT INTO "product_change_events" ("kind", "productIds", "createdAt")
+VALUES ($1, $2::text[], ${NOW_UTC})`;
+
+const READ_SQL = `
+SELECT "id", "kind", "productIds", "createdAt"
+FROM "product_change_events"
+WHERE "id" > $1::bigint
+ORDER BY "id"
+LIMIT $2`;
+
+const LATEST_SQL = `SELECT COALESCE(MAX("id"), 0) AS "id" FROM "product_change_events"`;
+
+const PRUNE_SQL = `
+DELETE FROM "product_change_events"
+WHERE "createdAt" < ${NOW_UTC} - $1::int * INTERVAL '1 minute'`;
+
+let lastPrunedAt = 0;
+let publishFailed = false;
+
+/**
+ * Records that a write touched `productIds`, so open dashboards refresh just those rows and
+ * cached dashboard responses are recomputed.
+ * Best-effort: a failure is logged once and never fails the write it describes.
+ */
+export async function publishProductChanges(kind: ProductChangeKind, productIds: Iterable<string>) {
+  const ids = Array.from(new Set(productIds));
+  if (!ids.length) {
+    return;
+  }
+
+  try {
+    await prisma.$executeRawUnsafe(PUBLISH_SQL, kind, ids);
+    invalidateDataVersions();
+    publishFailed = false;
+
+    if (Date.now() - lastPrunedAt >= PRUNE_INTERVAL_MS) {
+      lastPrunedAt = Date.now();
+      await prisma.$executeRawUnsafe(PRUNE_SQL, RETENTION_MINUTES);
+    }
+  } catch (error) {
+    if (!publishFailed) {
+      console.warn(
+        "[product-changes] Failed to publish change events:",
+        error instanceof Error ? error.message : error
+      );
+    }
+    publishFailed = true;
+  }
+}
+
+/** Change events after `afterId`, oldest first. */
+export async function readProductChanges(afterId: bigint, limit: number) {
+  return prisma.$queryRawUnsafe<ProductChangeEvent[]>(READ_SQL, String(afterId), limit);
+}
+
+export async function latestProductChangeId() {
+  const [row] = await prisma.$queryRawUnsafe<Array<{ id: bigint | number }>>(LATEST_SQL);
+  return BigInt(row?.id ?? 0);
+}
@@ -26,9 +26,17 @@ export interface DashboardRowDTO {
 
 const toNumber = (value: unknown) => (value === null || value === undefined ? null : Number(value));
 
-export async function buildDashboardRows() {
+/**
+ * Dashboard rows for active products (every product when none is active). With `productIds`,
+ * only those products' rows are built, whether active or not; live updates use this.
+ */
+export async function buildDashboardRows(options: { productIds?: string[] } = {}) {
+  if (options.productIds && !options.productIds.length) {
+    return [];
+  }
+
   let products = await prisma.product.findMany({
-    where: { active: true },
+    where: options.productIds ? { id: { in: options.productIds } } : { active: true },
     include: {
       settings: true,
       snapshots: {
@@ -43,7 +51,7 @@ export async function buildDashboardRows() {
     orderBy: { updatedAt: "desc" }
   });
 
-  if (!products.length) {
+  if (!products.length && !options.productIds) {
     products = await prisma.product.findMany({
       include: {
         settings: true,
@@ -64,7 +72,7 @@ export async function buildDashboardRows() {
 
   for (const product of products) {
     const latestSnapshot = product.snapshots[0];
-    const settings = await getEffectiveSettingsForProduct(product.id);
+    const settings = await getEffectiveSettingsForProduct(product.id, product.settings);
     const minPrice = product.settings?.minPrice ? Number(product.settings.minPrice) : 0;
     const breakEven = enforcedFloorPrice(settings, minPrice);
 
@@ -122,7 +130,7 @@ export async function buildDashboardRows() {
       marginPct: pricing?.profitPct ?? null,
       breakEvenPrice: breakEven,
       lowMarginRisk: ourPrice !== null ? ourPrice <= breakEven * 1.03 : false,
-      lastCheckedAt: latestSnapshot?.checkedAt?.toISOString() ?? null
+      lastCheckedAt: latestSnapshot?.lastSeenAt?.toISOString() ?? null
     });
   }
 
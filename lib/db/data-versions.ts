@@ -0,0 +1,75 @@
+import { prisma } from "@/lib/db/prisma";
+
+/**
+ * `products`: snapshots, alerts, price changes, catalog and settings writes (dashboard, products
+ * table). `orders`: order writes (analytics).
+ */
+export type DataScope = "products" | "orders";
+
+export interface DataVersions {
+  products: string;
+  orders: string;
+  /** A poll job or sharded poll run is in progress, so `products` is about to move again. */
+  pollRunning: boolean;
+}
+
+// Another process's bump is seen within this long; this process's own bumps immediately.
+const VERSION_CACHE_MS = 1000;
+
+// Compared in UTC, like the rate-limit buckets; matches what Prisma writes for timestamps.
+const NOW_UTC = `(now() AT TIME ZONE 'UTC')`;
+
+const BUMP_SQL = `
+INSERT INTO "data_versions" ("scope", "version", "updatedAt")
+VALUES ($1, 1, ${NOW_UTC})
+ON CONFLICT ("scope") DO UPDATE
+SET "version" = "data_versions"."version" + 1, "updatedAt" = EXCLUDED."updatedAt"`;
+
+const READ_SQL = `
+SELECT COALESCE(MAX("version") FILTER (WHERE "scope" = 'products'), 0) AS "products",
+       COALESCE(MAX("version") FILTER (WHERE "scope" = 'orders'), 0) AS "orders",
+       EXISTS (
+         SELECT 1 FROM "poll_jobs" WHERE "status" = 'RUNNING' AND "leaseExpiresAt" > ${NOW_UTC}
+       ) OR EXISTS (
+         SELECT 1 FROM "poll_runs" WHERE "status" = 'RUNNING' AND "createdAt" > ${NOW_UTC} - INTERVAL '15 minutes'
+       ) AS "pollRunning"
+FROM "data_versions"`;
+
+let cached: { value: DataVersions; readAt: number } | null = null;
+let bumpFailed = false;
+
+/** Marks data in `scope` as changed. Best-effort: a failure is logged once and never fails the write. */
+export async function bumpDataVersion(scope: DataScope) {
+  try {
+    await prisma.$executeRawUnsafe(BUMP_SQL, scope);
+    cached = null;
+    bumpFailed = false;
+  } catch (error) {
+    if (!bumpFailed) {
+      console.warn("[data-versions] Failed to bump data version:", error instanceof Error ? error.message : error);
+    }
+    bumpFailed = true;
+  }
+}
+
+/** Forgets the last read, after this process changed a version some other way. */
+export function invalidateDataVersions() {
+  cached = null;
+}
+
+export async function readDataVersions(): Promise<DataVersions> {
+  if (cached && Date.now() - cached.readAt < VERSION_CACHE_MS) {
+    return cached.value;
+  }
+
+  const [row] = await prisma.$queryRawUnsafe<
+    Array<{ products: bigint | number; orders: bigint | number; pollRunning: boolean }>
+  >(READ_SQL);
+  const value = {
+    products: String(row?.products ?? 0),
+    orders: String(row?.orders ?? 0),
+    pollRunning: Boolean(row?.pollRunning)
+  };
+  cached = { value, readAt: Date.now() };
+  return value;
+}
@@ -1,15 +1,43 @@
 import { PrismaClient } from "@prisma/client";
 import { env } from "@/lib/config/env";
+import { dbQueryDuration } from "@/lib/metrics/registry";
 
 declare global {
-  var __prisma__: PrismaClient | undefined;
+  var __prisma__: ReturnType<typeof createClient> | undefined;
 }
 
-const createClient = () =>
-  new PrismaClient({
-    log: env.NODE_ENV === "development" ? ["warn", "error"] : ["error"]
+const STATEMENT_TABLE = /\b(?:FROM|INTO|UPDATE)\s+(?:"?\w+"?\.)?"?(\w+)"?/i;
+
+/** Low-cardinality labels for a statement: its verb and the first table it touches. */
+export function statementLabels(query: string) {
+  const operation = query.trimStart().split(/\s/, 1)[0]?.toLowerCase() || "unknown";
+  const table = STATEMENT_TABLE.exec(query)?.[1] ?? "";
+  return { operation, table };
+}
+
+const createClient = () => {
+  const client = new PrismaClient({
+    // Query events feed the DB latency histogram; they are not printed.
+    log:
+      env.NODE_ENV === "development"
+        ? [
+            { emit: "event", level: "query" },
+            { emit: "stdout", level: "warn" },
+            { emit: "stdout", level: "error" }
+          ]
+        : [
+            { emit: "event", level: "query" },
+            { emit: "stdout", level: "error" }
+          ]
   });
 
+  client.$on("query", (event) => {
+    dbQueryDuration.observe(statementLabels(event.query), event.duration / 1000);
+  });
+
+  return client;
+};
+
 export const prisma = global.__prisma__ ?? createClient();
 
 if (env.NODE_ENV !== "production") {
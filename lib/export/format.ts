@@ -0,0 +1,89 @@
+import type { ExportRow } from "@/lib/export/sources";
+
+export const EXPORT_FORMATS = ["csv", "ndjson"] as const;
+
+export type ExportFormat = (typeof EXPORT_FORMATS)[number];
+
+// Rows encoded per enqueued chunk; the stream asks for more only as the client reads.
+const ROWS_PER_CHUNK = 500;
+
+function exportValue(value: unknown) {
+  if (value instanceof Date) {
+    return value.toISOString();
+  }
+  if (typeof value === "bigint") {
+    return value.toString();
+  }
+  return value ?? null;
+}
+
+/** One CSV field: empty for null, quoted when it holds a comma, quote or line break. */
+export function csvCell(value: unknown) {
+  const normalized = exportValue(value);
+  if (normalized === null) {
+    return "";
+  }
+
+  const text = typeof normalized === "object" ? JSON.stringify(normalized) : String(normalized);
+  return /[",\r\n]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text;
+}
+
+export function encodeExportRow(format: ExportFormat, columns: readonly string[], row: ExportRow) {
+  if (format === "csv") {
+    return `${columns.map((column) => csvCell(row[column])).join(",")}\n`;
+  }
+
+  const record: Record<string, unknown> = {};
+  for (const column of columns) {
+    record[column] = exportValue(row[column]);
+  }
+  return `${JSON.stringify(record)}\n`;
+}
+
+/**
+ * Encodes `rows` as CSV (with a header line) or NDJSON, optionally gzipped on the fly. The stream
+ * is pulled: rows are read only as the consumer takes chunks, so memory stays flat however many
+ * rows there are. Cancelling the stream stops reading rows.
+ */
+export function exportStream(
+  format: ExportFormat,
+  columns: readonly string[],
+  rows: AsyncIterable<ExportRow>,
+  options: { gzip?: boolean; onChunk?: (rows: number) => void } = {}
+): ReadableStream<Uint8Array> {
+  const encoder = new TextEncoder();
+  const iterator = rows[Symbol.asyncIterator]();
+
+  const stream = new ReadableStream<Uint8Array>({
+    start(controller) {
+      if (format === "csv") {
+        controller.enqueue(encoder.encode(`${columns.map(csvCell).join(",")}\n`));
+      }
+    },
+    async pull(controller) {
+      let chunk = "";
+      let count = 0;
+      while (count < ROWS_PER_CHUNK) {
+        const next = await iterator.next();
+        if (next.done) {
+          break;
+        }
+        chunk += encodeExportRow(format, columns, next.value);
+        count += 1;
+      }
+
+      if (count) {
+        controller.enqueue(encoder.encode(chunk));
+        options.onChunk?.(count);
+      }
+      if (count < ROWS_PER_CHUNK) {
+        controller.close();
+      }
+    },
+    async cancel() {
+      await iterator.return?.();
+    }
+  });
+
+  return options.gzip ? stream.pipeThrough(new CompressionStream("gzip")) : stream;
+}
@@ -0,0 +1,226 @@
+import type { ProductSettings } from "@prisma/client";
+import { prisma } from "@/lib/db/prisma";
+import { computeFees, enforcedFloorPrice } from "@/lib/pricing/calculator";
+import { getOrCreateGlobalSettings, mergeSettings } from "@/lib/pricing/effective-settings";
+
+export const EXPORT_SOURCES = ["products", "snapshots", "orders", "shipments"] as const;
+
+export type ExportSource = (typeof EXPORT_SOURCES)[number];
+
+export type ExportRow = Record<string, unknown>;
+
+export interface ExportFilters {
+  /** Range of snapshot `checkedAt`, order `createdDate` or package `lastModifiedAt`; products ignore it. */
+  from: Date;
+  to: Date;
+  productId?: string;
+}
+
+/** Rows read per query; an export holds at most one page in memory. */
+export const EXPORT_PAGE_SIZE = 1000;
+
+// Keyset position after the last row of a page; null before the first page.
+type Cursor = string[] | null;
+
+interface ExportPage {
+  rows: ExportRow[];
+  cursor: Cursor;
+}
+
+interface SourceDefinition {
+  columns: readonly string[];
+  page(cursor: Cursor, filters: ExportFilters, limit: number): Promise<ExportPage>;
+}
+
+const PRODUCTS_SQL = `
+SELECT p."id", p."sku", p."barcode", p."title", p."category", p."active", p."trendyolProductId" AS "listingId",
+       s."ourPrice"::float8 AS "ourPrice", s."competitorMinPrice"::float8 AS "competitorMinPrice",
+       s."competitorCount", COALESCE(s."buyboxStatus"::text, 'UNKNOWN') AS "buyboxStatus", s."lastSeenAt" AS "lastCheckedAt"
+FROM "Product" p
+LEFT JOIN LATERAL (
+  SELECT "ourPrice", "competitorMinPrice", "competitorCount", "buyboxStatus", "lastSeenAt"
+  FROM "PriceSnapshot"
+  WHERE "productId" = p."id"
+  ORDER BY "checkedAt" DESC
+  LIMIT 1
+) s ON true
+WHERE ($1::text IS NULL OR p."id" > $1)
+ORDER BY p."id"
+LIMIT $2`;
+
+// Ordered by product, then time, so the (productId, checkedAt) index serves both filter and order.
+const SNAPSHOTS_SQL = `
+SELECT s."id", s."productId", p."sku", s."checkedAt", s."lastSeenAt", s."observations",
+       s."ourPrice"::float8 AS "ourPrice", s."competitorMinPrice"::float8 AS "competitorMinPrice",
+       s."competitorCount", s."buyboxStatus"::text AS "buyboxStatus", s."buyboxSellerId"
+FROM "PriceSnapshot" s
+JOIN "Product" p ON p."id" = s."productId"
+WHERE s."checkedAt" >= $4::timestamp AND s."checkedAt" < $5::timestamp
+  AND ($6::text IS NULL OR s."productId" = $6)
+  AND ($1::text IS NULL OR (s."productId", s."checkedAt", s."id") > ($1, $2::timestamp, $3))
+ORDER BY s."productId", s."checkedAt", s."id"
+LIMIT $7`;
+
+// One row per order item (orders without items get one row). Customer e-mail and identity numbers are left out.
+const ORDERS_SQL = `
+WITH page AS (
+  SELECT "id", "orderNumber", "status", "totalPrice", "currency", "createdDate",
+         "customerFirstName", "customerLastName", "shipmentPackageId"
+  FROM "orders"
+  WHERE "createdDate" >= $3::timestamp AND "createdDate" < $4::timestamp
+    AND ($1::timestamp IS NULL OR ("createdDate", "id") > ($1::timestamp, $2))
+  ORDER BY "createdDate", "id"
+  LIMIT $5
+)
+SELECT page."id" AS "orderId", page."orderNumber", page."status", page."totalPrice"::float8 AS "totalPrice",
+       page."currency", page."createdDate", page."customerFirstName", page."customerLastName",
+       page."shipmentPackageId", oi."sku", oi."barcode", oi."merchantSku", oi."productName", oi."quantity",
+       oi."price"::float8 AS "itemPrice"
+FROM page
+LEFT JOIN "order_items" oi ON oi."orderId" = page."id"
+ORDER BY page."createdDate", page."id", oi."id"`;
+
+const SHIPMENTS_SQL = `
+SELECT "id", "sellerId"::text AS "sellerId", "packageNumber", "orderNumber", "status", "cargoProvider",
+       "trackingNumber", "linesCount", "createdAt", "lastModifiedAt", "estimatedDeliveryStart",
+       "estimatedDeliveryEnd", "syncedAt"
+FROM "shipment_packages"
+WHERE "lastModifiedAt" >= $3::timestamp AND "lastModifiedAt" < $4::timestamp
+  AND ($1::timestamp IS NULL OR ("lastModifiedAt", "id") > ($1::timestamp, $2))
+ORDER BY "lastModifiedAt", "id"
+LIMIT $5`;
+
+// Timestamps are passed as UTC ISO strings and cast to `timestamp`, matching what Prisma stores.
+const iso = (value: unknown) => (value instanceof Date ? value.toISOString() : String(value));
+
+// Margins use the same effective settings and fee formula as the dashboard; products without a
+// settings row have no cost price, so their margins are left empty.
+async function withMargins(rows: ExportRow[]) {
+  if (!rows.length) {
+    return rows;
+  }
+
+  const [globalSettings, productSettings] = await Promise.all([
+    getOrCreateGlobalSettings(),
+    prisma.productSettings.findMany({ where: { productId: { in: rows.map((row) => String(row.id)) } } })
+  ]);
+  const settingsById = new Map<string, ProductSettings>(productSettings.map((row) => [row.productId, row]));
+
+  return rows.map((row) => {
+    const stored = settingsById.get(String(row.id));
+    if (!stored) {
+      return { ...row, costPrice: null, breakEvenPrice: null, marginSar: null, marginPct: null };
+    }
+
+    const settings = mergeSettings(globalSettings, stored);
+    const ourPrice = typeof row.ourPrice === "number" ? row.ourPrice : null;
+    const pricing = ourPrice !== null ? computeFees(ourPrice, settings) : null;
+    // No floor satisfies a 100% minimum profit; that is exported empty, as the Python export does.
+    const floor = enforcedFloorPrice(settings, stored.minPrice ? Number(stored.minPrice) : 0);
+    return {
+      ...row,
+      costPrice: settings.costPrice,
+      breakEvenPrice: Number.isFinite(floor) ? floor : null,
+      marginSar: pricing?.profitSar ?? null,
+      marginPct: pricing?.profitPct ?? null
+    };
+  });
+}
+
+export const EXPORTS: Record<ExportSource, SourceDefinition> = {
+  products: {
+    columns: [
+      "id", "sku", "barcode", "title", "category", "active", "listingId", "ourPrice", "competitorMinPrice",
+      "competitorCount", "buyboxStatus", "lastCheckedAt", "costPrice", "breakEvenPrice", "marginSar", "marginPct"
+    ],
+    async page(cursor, _filters, limit) {
+      const rows = await prisma.$queryRawUnsafe<ExportRow[]>(PRODUCTS_SQL, cursor?.[0] ?? null, limit);
+      const last = rows.at(-1);
+      return {
+        rows: await withMargins(rows),
+        cursor: rows.length === limit && last ? [String(last.id)] : null
+      };
+    }
+  },
+  snapshots: {
+    columns: [
+      "id", "productId", "sku", "checkedAt", "lastSeenAt", "observations", "ourPrice", "competitorMinPrice",
+      "competitorCount", "buyboxStatus", "buyboxSellerId"
+    ],
+    async page(cursor, filters, limit) {
+      const rows = await prisma.$queryRawUnsafe<ExportRow[]>(
+        SNAPSHOTS_SQL,
+        cursor?.[0] ?? null,
+        cursor?.[1] ?? null,
+        cursor?.[2] ?? null,
+        filters.from.toISOString(),
+        filters.to.toISOString(),
+        filters.productId ?? null,
+        limit
+      );
+      const last = rows.at(-1);
+      return {
+        rows,
+        cursor: rows.length === limit && last ? [String(last.productId), iso(last.checkedAt), String(last.id)] : null
+      };
+    }
+  },
+  orders: {
+    columns: [
+      "orderId", "orderNumber", "status", "totalPrice", "currency", "createdDate", "customerFirstName",
+      "customerLastName", "shipmentPackageId", "sku", "barcode", "merchantSku", "productName", "quantity", "itemPrice"
+    ],
+    async page(cursor, filters, limit) {
+      const rows = await prisma.$queryRawUnsafe<ExportRow[]>(
+        ORDERS_SQL,
+        cursor?.[0] ?? null,
+        cursor?.[1] ?? null,
+        filters.from.toISOString(),
+        filters.to.toISOString(),
+        limit
+      );
+      // The limit counts orders; a page has one row per item.
+      const orders = new Set(rows.map((row) => row.orderId)).size;
+      const last = rows.at(-1);
+      return {
+        rows,
+        cursor: orders === limit && last ? [iso(last.createdDate), String(last.orderId)] : null
+      };
+    }
+  },
+  shipments: {
+    columns: [
+      "id", "sellerId", "packageNumber", "orderNumber", "status", "cargoProvider", "trackingNumber", "linesCount",
+      "createdAt", "lastModifiedAt", "estimatedDeliveryStart", "estimatedDeliveryEnd", "syncedAt"
+    ],
+    async page(cursor, filters, limit) {
+      const rows = await prisma.$queryRawUnsafe<ExportRow[]>(
+        SHIPMENTS_SQL,
+        cursor?.[0] ?? null,
+        cursor?.[1] ?? null,
+        filters.from.toISOString(),
+        filters.to.toISOString(),
+        limit
+      );
+      const last = rows.at(-1);
+      return {
+        rows,
+        cursor: rows.length === limit && last ? [iso(last.lastModifiedAt), String(last.id)] : null
+      };
+    }
+  }
+};
+
+/**
+ * Every row of `source`, read one keyset page at a time (no offsets, so late pages cost the same
+ * as early ones). The next page is only queried once the consumer has taken the previous one.
+ */
+export async function* exportRows(source: ExportSource, filters: ExportFilters, pageSize = EXPORT_PAGE_SIZE) {
+  const definition = EXPORTS[source];
+  let cursor: Cursor = null;
+  do {
+    const page = await definition.page(cursor, filters, pageSize);
+    yield* page.rows;
+    cursor = page.cursor;
+  } while (cursor);
+}
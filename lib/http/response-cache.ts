@@ -0,0 +1,146 @@
+import { createHash } from "node:crypto";
+import { NextResponse } from "next/server";
+import { env } from "@/lib/config/env";
+import { NO_STORE_HEADERS } from "@/lib/http/no-store";
+import { responseCacheRequests } from "@/lib/metrics/registry";
+
+export type ResponseCacheResult = "hit" | "miss" | "stale";
+
+interface CacheEntry {
+  version: string;
+  etag: string;
+  payload: string;
+}
+
+const DEFAULT_MAX_ENTRIES = 32;
+
+// Browsers revalidate every time; unchanged data comes back as 304 without a body.
+const CACHE_HEADERS = { "Cache-Control": "private, no-cache" } as const;
+
+/**
+ * Serialized JSON responses per key, valid for one data version. Concurrent requests for a
+ * version being computed share the computation. Least recently used keys are evicted first.
+ */
+export class VersionedResponseCache {
+  private readonly entries = new Map<string, CacheEntry>();
+  private readonly inflight = new Map<string, { version: string; promise: Promise<CacheEntry> }>();
+
+  constructor(
+    readonly name: string,
+    private readonly maxEntries = DEFAULT_MAX_ENTRIES
+  ) {}
+
+  get size() {
+    return this.entries.size;
+  }
+
+  /** Derived from the version alone, so a matching `If-None-Match` is answered before anything is computed. */
+  etagFor(key: string, version: string) {
+    const digest = createHash("sha1").update(`${this.name}\0${key}\0${version}`).digest("base64url");
+    return `W/"${digest.slice(0, 20)}"`;
+  }
+
+  /**
+   * The entry for `version`. With `serveStale`, an entry for an older version is returned right
+   * away while the current one is computed in the background (at most one computation per key).
+   */
+  async get(
+    key: string,
+    version: string,
+    compute: () => Promise<unknown>,
+    options: { serveStale?: boolean } = {}
+  ): Promise<{ entry: CacheEntry; result: ResponseCacheResult }> {
+    const entry = this.entries.get(key);
+    if (entry?.version === version) {
+      this.entries.delete(key);
+      this.entries.set(key, entry);
+      return { entry, result: "hit" };
+    }
+
+    if (entry && options.serveStale) {
+      if (!this.inflight.has(key)) {
+        this.compute(key, version, compute).catch((error) => {
+          console.warn(
+            `[response-cache] Background refresh of ${this.name} failed:`,
+            error instanceof Error ? error.message : error
+          );
+        });
+      }
+      return { entry, result: "stale" };
+    }
+
+    const running = this.inflight.get(key);
+    const fresh = running?.version === version ? await running.promise : await this.compute(key, version, compute);
+    return { entry: fresh, result: "miss" };
+  }
+
+  private compute(key: string, version: string, compute: () => Promise<unknown>) {
+    const promise = (async () => {
+      const payload = JSON.stringify(await compute());
+      const entry = { version, etag: this.etagFor(key, version), payload };
+      this.entries.delete(key);
+      this.entries.set(key, entry);
+      while (this.entries.size > this.maxEntries) {
+        this.entries.delete(this.entries.keys().next().value as string);
+      }
+      return entry;
+    })();
+
+    const tracked = { version, promise };
+    this.inflight.set(key, tracked);
+    const untrack = () => {
+      if (this.inflight.get(key) === tracked) {
+        this.inflight.delete(key);
+      }
+    };
+    promise.then(untrack, untrack);
+    return promise;
+  }
+
+  clear() {
+    this.entries.clear();
+    this.inflight.clear();
+  }
+}
+
+const matchesEtag = (header: string | null, etag: string) =>
+  !!header && header.split(",").some((candidate) => candidate.trim() === etag || candidate.trim() === "*");
+
+/**
+ * JSON response for `key` at data `version`: `304` when the client already has it, otherwise the
+ * cached (or newly computed) body with its ETag. Entries also expire every
+ * `RESPONSE_CACHE_TTL_SECONDS`, which bounds time-dependent fields (cooldowns, date ranges).
+ * Without a version (it could not be read) or with the cache disabled, `compute` runs uncached.
+ */
+export async function versionedJsonResponse(
+  request: Request,
+  cache: VersionedResponseCache,
+  options: { key: string; version: string | null; serveStale?: boolean; compute: () => Promise<unknown> }
+) {
+  const ttlMs = env.RESPONSE_CACHE_TTL_SECONDS * 1000;
+  if (options.version === null || ttlMs <= 0) {
+    responseCacheRequests.inc({ cache: cache.name, result: "bypass" });
+    return NextResponse.json(await options.compute(), { headers: NO_STORE_HEADERS });
+  }
+
+  const version = `${options.version}.${Math.floor(Date.now() / ttlMs)}`;
+  const ifNoneMatch = request.headers.get("if-none-match");
+  const currentEtag = cache.etagFor(options.key, version);
+  if (matchesEtag(ifNoneMatch, currentEtag)) {
+    responseCacheRequests.inc({ cache: cache.name, result: "not_modified" });
+    return new NextResponse(null, { status: 304, headers: { ...CACHE_HEADERS, ETag: currentEtag } });
+  }
+
+  const { entry, result } = await cache.get(options.key, version, options.compute, {
+    serveStale: options.serveStale
+  });
+  if (matchesEtag(ifNoneMatch, entry.etag)) {
+    responseCacheRequests.inc({ cache: cache.name, result: "not_modified" });
+    return new NextResponse(null, { status: 304, headers: { ...CACHE_HEADERS, ETag: entry.etag } });
+  }
+
+  responseCacheRequests.inc({ cache: cache.name, result });
+  return new NextResponse(entry.payload, {
+    headers: { ...CACHE_HEADERS, "Content-Type": "application/json", ETag: entry.etag }
+  });
+}
@@ -0,0 +1,262 @@
+import { env } from "@/lib/config/env";
+import { bumpDataVersion } from "@/lib/db/data-versions";
+import { prisma } from "@/lib/db/prisma";
+import { addStageRows, timeStage, withJobRun } from "@/lib/jobs/job-run";
+import { orderService } from "@/lib/services/order-service";
+import { returnService } from "@/lib/services/return-service";
+import { trendyolClient } from "@/lib/trendyol/client";
+import type { TrendyolShipmentPackage } from "@/lib/trendyol/shipments/types";
+import {
+  claimShipmentEvents,
+  completeShipmentEvents,
+  pruneAppliedShipmentEvents,
+  releaseShipmentEvents
+} from "@/lib/trendyol/shipments/webhook-events";
+
+export interface ShipmentEventsSummary {
+  batches: number;
+  events: number;
+  packagesApplied: number;
+  staleSkipped: number;
+  ordersUpserted: number;
+  returnsUpserted: number;
+  failedBatches: number;
+  failedEvents: number;
+  pruned: number;
+}
+
+const BATCH_SIZE = 200;
+const LEASE_SECONDS = 120;
+const APPLIED_RETENTION_DAYS = 7;
+
+// Compared in UTC, like the rate-limit buckets; matches what Prisma writes for `syncedAt`.
+const NOW_UTC = `(now() AT TIME ZONE 'UTC')`;
+
+const toTimestamp = (column: string) => `to_timestamp(v."${column}" / 1000.0) AT TIME ZONE 'UTC'`;
+
+// An event older than the stored package (webhooks can arrive out of order, and the
+// reconciliation sweep may have stored a newer state) does not overwrite it.
+const UPSERT_PACKAGES_SQL = `
+INSERT INTO "shipment_packages" (
+  "id", "sellerId", "packageNumber", "orderNumber", "status", "cargoProvider", "trackingNumber",
+  "trackingLink", "lastModifiedAt", "createdAt", "estimatedDeliveryStart", "estimatedDeliveryEnd",
+  "linesCount", "rawPayload", "syncedAt"
+)
+SELECT gen_random_uuid()::text, $1::bigint, v."packageNumber", v."orderNumber", v."status", v."cargoProvider",
+       v."trackingNumber", v."trackingLink", ${toTimestamp("lastModifiedMs")}, ${toTimestamp("createdMs")},
+       ${toTimestamp("deliveryStartMs")}, ${toTimestamp("deliveryEndMs")}, v."linesCount", v."rawPayload"::jsonb, ${NOW_UTC}
+FROM unnest(
+  $2::text[], $3::text[], $4::text[], $5::text[], $6::text[], $7::text[],
+  $8::float8[], $9::float8[], $10::float8[], $11::float8[], $12::int[], $13::text[]
+) AS v(
+  "packageNumber", "orderNumber", "status", "cargoProvider", "trackingNumber", "trackingLink",
+  "lastModifiedMs", "createdMs", "deliveryStartMs", "deliveryEndMs", "linesCount", "rawPayload"
+)
+ON CONFLICT ("sellerId", "packageNumber") DO UPDATE
+SET "status" = EXCLUDED."status",
+    "cargoProvider" = EXCLUDED."cargoProvider",
+    "trackingNumber" = EXCLUDED."trackingNumber",
+    "trackingLink" = EXCLUDED."trackingLink",
+    "lastModifiedAt" = EXCLUDED."lastModifiedAt",
+    "estimatedDeliveryStart" = EXCLUDED."estimatedDeliveryStart",
+    "estimatedDeliveryEnd" = EXCLUDED."estimatedDeliveryEnd",
+    "linesCount" = EXCLUDED."linesCount",
+    "rawPayload" = EXCLUDED."rawPayload",
+    "syncedAt" = EXCLUDED."syncedAt"
+WHERE "shipment_packages"."lastModifiedAt" IS NULL
+   OR EXCLUDED."lastModifiedAt" >= "shipment_packages"."lastModifiedAt"
+RETURNING "packageNumber"`;
+
+const lastModifiedMs = (pkg: TrendyolShipmentPackage) =>
+  pkg.packageLastModifiedDate ?? (pkg as { lastModifiedDate?: number }).lastModifiedDate ?? null;
+
+/** The newest event per package in a batch (arrival order breaks ties), in arrival order. */
+export function latestPackageEvents(packages: TrendyolShipmentPackage[]) {
+  const latest = new Map<string, TrendyolShipmentPackage>();
+  for (const pkg of packages) {
+    const key = String(pkg.packageNumber);
+    const current = latest.get(key);
+    if (!current || (lastModifiedMs(pkg) ?? 0) >= (lastModifiedMs(current) ?? 0)) {
+      latest.delete(key);
+      latest.set(key, pkg);
+    }
+  }
+  return Array.from(latest.values());
+}
+
+/**
+ * Applies one batch of package events: a single set-based upsert into `shipment_packages`,
+ * then the order of every package whose stored state actually moved forward, and one set-based
+ * pass deriving return requests from the packages that became `Returned`.
+ */
+export async function applyShipmentEventBatch(packages: TrendyolShipmentPackage[]) {
+  const events = latestPackageEvents(packages);
+  if (!events.length) {
+    return { packagesApplied: 0, staleSkipped: 0, ordersUpserted: 0, returnsUpserted: 0 };
+  }
+
+  const msOrNull = (value: number | null | undefined) => (typeof value === "number" ? value : null);
+  const rows = await timeStage("event_packages", () =>
+    prisma.$queryRawUnsafe<Array<{ packageNumber: string }>>(
+      UPSERT_PACKAGES_SQL,
+      String(trendyolClient.getSellerId()),
+      events.map((pkg) => String(pkg.packageNumber)),
+      events.map((pkg) => pkg.orderNumber ?? null),
+      events.map((pkg) => pkg.shipmentPackageStatus),
+      events.map((pkg) => pkg.cargoProviderName ?? null),
+      events.map((pkg) => (pkg.cargoTrackingNumber ? String(pkg.cargoTrackingNumber) : null)),
+      events.map((pkg) => pkg.cargoTrackingLink ?? null),
+      events.map((pkg) => msOrNull(lastModifiedMs(pkg))),
+      events.map((pkg) => msOrNull(pkg.shipmentPackageCreationDate)),
+      events.map((pkg) => msOrNull(pkg.estimatedDeliveryStartDate)),
+      events.map((pkg) => msOrNull(pkg.estimatedDeliveryEndDate)),
+      events.map((pkg) => pkg.lines?.length ?? 0),
+      events.map((pkg) => JSON.stringify(pkg))
+    )
+  );
+  addStageRows("event_packages", rows.length);
+
+  const applied = new Set(rows.map((row) => row.packageNumber));
+  let ordersUpserted = 0;
+  const returned: string[] = [];
+
+  for (const pkg of events) {
+    if (!applied.has(String(pkg.packageNumber))) {
+      continue;
+    }
+    if (pkg.orderNumber) {
+      await timeStage("event_orders", () => orderService.upsertOrder(pkg));
+      ordersUpserted += 1;
+    }
+    if (pkg.shipmentPackageStatus === "Returned") {
+      returned.push(String(pkg.packageNumber));
+    }
+  }
+  addStageRows("event_orders", ordersUpserted);
+  if (ordersUpserted > 0) {
+    await bumpDataVersion("orders");
+  }
+
+  const returns = await timeStage("event_returns", () =>
+    returnService.deriveReturnsFromPackages({ packageNumbers: returned })
+  );
+  const returnsUpserted = returns.requests;
+  addStageRows("event_returns", returnsUpserted);
+
+  return {
+    packagesApplied: applied.size,
+    staleSkipped: events.length - applied.size,
+    ordersUpserted,
+    returnsUpserted
+  };
+}
+
+type ApplyResult = Awaited<ReturnType<typeof applyShipmentEventBatch>>;
+
+const addResult = (summary: ShipmentEventsSummary, result: ApplyResult) => {
+  summary.packagesApplied += result.packagesApplied;
+  summary.staleSkipped += result.staleSkipped;
+  summary.ordersUpserted += result.ordersUpserted;
+  summary.returnsUpserted += result.returnsUpserted;
+};
+
+const errorMessage = (error: unknown) =>
+  error instanceof Error ? error.message : "Failed to apply shipment events";
+
+/**
+ * Applies queued webhook events in batches of 200 until the queue is empty or the deadline
+ * passes, recorded in `job_runs` as `shipment_events`. When a batch fails its events are applied
+ * one at a time, so only the events that fail on their own are released for a later pass.
+ */
+export async function applyShipmentEvents(
+  workerId: string,
+  options: { deadline?: number } = {}
+): Promise<ShipmentEventsSummary> {
+  return withJobRun("shipment_events", async () => {
+    const summary: ShipmentEventsSummary = {
+      batches: 0,
+      events: 0,
+      packagesApplied: 0,
+      staleSkipped: 0,
+      ordersUpserted: 0,
+      returnsUpserted: 0,
+      failedBatches: 0,
+      failedEvents: 0,
+      pruned: 0
+    };
+    if (!trendyolClient.isConfigured()) {
+      return summary;
+    }
+
+    const deadline = options.deadline ?? Date.now() + 60_000;
+    while (Date.now() < deadline) {
+      const claimed = await timeStage("event_claim", () => claimShipmentEvents(workerId, BATCH_SIZE, LEASE_SECONDS));
+      if (!claimed.length) {
+        break;
+      }
+
+      const ids = claimed.map((event) => event.id);
+      summary.batches += 1;
+      summary.events += claimed.length;
+      try {
+        const result = await applyShipmentEventBatch(claimed.map((event) => event.payload));
+        await completeShipmentEvents(ids, workerId);
+        addResult(summary, result);
+        continue;
+      } catch (error) {
+        summary.failedBatches += 1;
+        console.warn(`[shipment-events] Batch of ${claimed.length} failed, applying one by one:`, errorMessage(error));
+      }
+
+      // Events are applied in arrival order; the upsert keeps the newest state of each package.
+      const failedBefore = summary.failedEvents;
+      for (const event of claimed) {
+        try {
+          addResult(summary, await applyShipmentEventBatch([event.payload]));
+          await completeShipmentEvents([event.id], workerId);
+        } catch (error) {
+          summary.failedEvents += 1;
+          await releaseShipmentEvents([event.id], workerId, errorMessage(error));
+        }
+      }
+      if (summary.failedEvents > failedBefore) {
+        // Released events are claimable again at once; leave them to a later pass.
+        break;
+      }
+    }
+
+    if (summary.batches > 0) {
+      summary.pruned = await pruneAppliedShipmentEvents(APPLIED_RETENTION_DAYS);
+    }
+    return summary;
+  });
+}
+
+let inProcessApplier: Promise<unknown> | null = null;
+let applyRequested = false;
+
+/**
+ * Applies queued events in this server process without awaiting them, so the webhook can return.
+ * Events that arrive while a pass is running get one more pass once it ends.
+ */
+export function applyShipmentEventsInBackground() {
+  if (!env.TRENDYOL_WEBHOOK_SECRET) {
+    return;
+  }
+  if (inProcessApplier) {
+    applyRequested = true;
+    return;
+  }
+
+  applyRequested = false;
+  inProcessApplier = applyShipmentEvents(`app:${crypto.randomUUID()}`)
+    .catch((error) => {
+      console.warn("[shipment-events] Background apply failed:", error instanceof Error ? error.message : error);
+    })
+    .finally(() => {
+      inProcessApplier = null;
+      if (applyRequested) {
+        applyShipmentEventsInBackground();
+      }
+    });
+}
@@ -1,4 +1,5 @@
 import { prisma } from "@/lib/db/prisma";
+import { publishProductChanges } from "@/lib/dashboard/product-changes";
 import { trendyolClient } from "@/lib/trendyol/client";
 import { computeFees, enforcedFloorPrice } from "@/lib/pricing/calculator";
 import { getEffectiveSettingsForProduct } from "@/lib/pricing/effective-settings";
@@ -66,7 +67,7 @@ export async function runAutoPilot() {
                     ? Number(latestSnapshot.competitorMinPrice)
                     : null;
 
-            const effectiveSettings = await getEffectiveSettingsForProduct(product.id);
+            const effectiveSettings = await getEffectiveSettingsForProduct(product.id, settings);
 
             const computed = suggestedPrice({
                 competitorMin,
@@ -127,6 +128,7 @@ export async function runAutoPilot() {
             });
 
             await refreshSnapshotForProduct(product);
+            await publishProductChanges("price_change", [product.id]);
             updated++;
 
         } catch (error) {
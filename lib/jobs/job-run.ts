@@ -0,0 +1,232 @@
+import { AsyncLocalStorage } from "node:async_hooks";
+import type { Prisma } from "@prisma/client";
+import { env } from "@/lib/config/env";
+import { prisma } from "@/lib/db/prisma";
+import {
+  circuitOpens,
+  circuitRejections,
+  dbQueryDuration,
+  httpRequestDuration,
+  httpRetries,
+  jobRunDuration,
+  jobStageDuration,
+  jobStageRows,
+  rateLimitWait,
+  type SeriesTotals
+} from "@/lib/metrics/registry";
+import { getCircuitBreakerMetrics } from "@/lib/trendyol/circuit-breaker";
+
+export interface JobStageStats {
+  calls: number;
+  durationMs: number;
+  maxMs: number;
+  rows: number;
+}
+
+export interface JobRunCounters {
+  http: Record<string, { requests: number; totalMs: number }>;
+  retries: Record<string, number>;
+  rateLimitWaits: Record<string, { waits: number; totalMs: number }>;
+  db: Record<string, { statements: number; totalMs: number }>;
+  /** Families whose circuit rejected or opened during the run, or is not closed at its end. */
+  circuits: Record<string, { rejected: number; opened: number; state: string }>;
+}
+
+interface CounterSnapshot {
+  http: Record<string, SeriesTotals>;
+  retries: Record<string, number>;
+  circuitRejections: Record<string, number>;
+  circuitOpens: Record<string, number>;
+  rateLimitWaits: Record<string, SeriesTotals>;
+  db: Record<string, SeriesTotals>;
+}
+
+const storage = new AsyncLocalStorage<JobRun>();
+
+const snapshotCounters = (): CounterSnapshot => ({
+  http: httpRequestDuration.totalsBy("family"),
+  retries: httpRetries.totalsBy("family"),
+  circuitRejections: circuitRejections.totalsBy("family"),
+  circuitOpens: circuitOpens.totalsBy("family"),
+  rateLimitWaits: rateLimitWait.totalsBy("family"),
+  db: dbQueryDuration.totalsBy("operation")
+});
+
+function diffCounts(after: Record<string, number>, before: Record<string, number>) {
+  const diff: Record<string, number> = {};
+  for (const [key, value] of Object.entries(after)) {
+    const delta = value - (before[key] ?? 0);
+    if (delta > 0) {
+      diff[key] = delta;
+    }
+  }
+  return diff;
+}
+
+function diffTotals(after: Record<string, SeriesTotals>, before: Record<string, SeriesTotals>) {
+  const diff: Record<string, { count: number; totalMs: number }> = {};
+  for (const [key, totals] of Object.entries(after)) {
+    const count = totals.count - (before[key]?.count ?? 0);
+    if (count > 0) {
+      diff[key] = { count, totalMs: Math.round((totals.sum - (before[key]?.sum ?? 0)) * 1000) };
+    }
+  }
+  return diff;
+}
+
+/**
+ * Timing record for one sync or poll run. Stages are timed explicitly; HTTP, retry,
+ * rate-limit, circuit-breaker and DB figures are the process-wide metric deltas over the run, so
+ * they also count work done meanwhile by queued poll jobs, webhooks or requests in the same process.
+ */
+export class JobRun {
+  readonly id = crypto.randomUUID();
+  readonly startedAt = new Date();
+  private readonly stages = new Map<string, JobStageStats>();
+  private readonly baseline = snapshotCounters();
+
+  constructor(readonly job: string) {}
+
+  private stageStats(stage: string) {
+    let stats = this.stages.get(stage);
+    if (!stats) {
+      stats = { calls: 0, durationMs: 0, maxMs: 0, rows: 0 };
+      this.stages.set(stage, stats);
+    }
+    return stats;
+  }
+
+  async stage<T>(stage: string, fn: () => Promise<T>): Promise<T> {
+    const started = performance.now();
+    try {
+      return await fn();
+    } finally {
+      const elapsedMs = performance.now() - started;
+      const stats = this.stageStats(stage);
+      stats.calls += 1;
+      stats.durationMs += elapsedMs;
+      stats.maxMs = Math.max(stats.maxMs, elapsedMs);
+      jobStageDuration.observe({ job: this.job, stage }, elapsedMs / 1000);
+    }
+  }
+
+  addRows(stage: string, rows: number) {
+    if (rows <= 0) {
+      return;
+    }
+    this.stageStats(stage).rows += rows;
+    jobStageRows.inc({ job: this.job, stage }, rows);
+  }
+
+  getStages(): Record<string, JobStageStats> {
+    return Object.fromEntries(
+      Array.from(this.stages, ([stage, stats]) => [
+        stage,
+        { ...stats, durationMs: Math.round(stats.durationMs), maxMs: Math.round(stats.maxMs) }
+      ])
+    );
+  }
+
+  getCounters(): JobRunCounters {
+    const now = snapshotCounters();
+    const http = diffTotals(now.http, this.baseline.http);
+    const waits = diffTotals(now.rateLimitWaits, this.baseline.rateLimitWaits);
+    const db = diffTotals(now.db, this.baseline.db);
+    const retries = diffCounts(now.retries, this.baseline.retries);
+    const rejected = diffCounts(now.circuitRejections, this.baseline.circuitRejections);
+    const opened = diffCounts(now.circuitOpens, this.baseline.circuitOpens);
+    const circuits: JobRunCounters["circuits"] = {};
+    for (const [family, stats] of Object.entries(getCircuitBreakerMetrics().families)) {
+      if (rejected[family] || opened[family] || stats.state !== "CLOSED") {
+        circuits[family] = { rejected: rejected[family] ?? 0, opened: opened[family] ?? 0, state: stats.state };
+      }
+    }
+
+    return {
+      http: Object.fromEntries(Object.entries(http).map(([key, v]) => [key, { requests: v.count, totalMs: v.totalMs }])),
+      retries,
+      rateLimitWaits: Object.fromEntries(Object.entries(waits).map(([key, v]) => [key, { waits: v.count, totalMs: v.totalMs }])),
+      db: Object.fromEntries(Object.entries(db).map(([key, v]) => [key, { statements: v.count, totalMs: v.totalMs }])),
+      circuits
+    };
+  }
+
+  /** Emits the run as JSON lines and stores it in `job_runs`; never throws. */
+  async finish(status: "ok" | "error", summary?: unknown, error?: unknown) {
+    const finishedAt = new Date();
+    const durationMs = finishedAt.getTime() - this.startedAt.getTime();
+    const stages = this.getStages();
+    const counters = this.getCounters();
+    const errorMessage = error === undefined ? null : error instanceof Error ? error.message : String(error);
+
+    jobRunDuration.observe({ job: this.job, status }, durationMs / 1000);
+
+    if (env.JOB_METRICS_LOG) {
+      for (const [stage, stats] of Object.entries(stages)) {
+        console.log(JSON.stringify({ event: "job_stage", job: this.job, runId: this.id, stage, ...stats }));
+      }
+      console.log(
+        JSON.stringify({ event: "job_run", job: this.job, runId: this.id, status, durationMs, ...counters, error: errorMessage })
+      );
+    }
+
+    try {
+      await prisma.jobRun.create({
+        data: {
+          id: this.id,
+          job: this.job,
+          status,
+          startedAt: this.startedAt,
+          finishedAt,
+          durationMs,
+          stagesJson: stages as unknown as Prisma.InputJsonValue,
+          countersJson: counters as unknown as Prisma.InputJsonValue,
+          summaryJson: summary === undefined ? undefined : (summary as Prisma.InputJsonValue),
+          error: errorMessage
+        }
+      });
+    } catch (persistError) {
+      console.warn(
+        `[job-run] Failed to record ${this.job} run:`,
+        persistError instanceof Error ? persistError.message : persistError
+      );
+    }
+  }
+}
+
+/**
+ * Runs `fn` as a recorded job run. Code called from it can add stage timings through
+ * `timeStage`/`addStageRows` without the run being passed down.
+ */
+export async function withJobRun<T>(
+  job: string,
+  fn: (run: JobRun) => Promise<T>,
+  options: { summarize?: (result: T) => unknown } = {}
+): Promise<T> {
+  const run = new JobRun(job);
+  let result: T;
+
+  try {
+    result = await storage.run(run, () => fn(run));
+  } catch (error) {
+    await run.finish("error", undefined, error);
+    throw error;
+  }
+
+  await run.finish("ok", options.summarize ? options.summarize(result) : result);
+  return result;
+}
+
+export function currentJobRun() {
+  return storage.getStore() ?? null;
+}
+
+/** Times `fn` as `stage` of the current run; runs it untimed outside a run. */
+export function timeStage<T>(stage: string, fn: () => Promise<T>): Promise<T> {
+  const run = storage.getStore();
+  return run ? run.stage(stage, fn) : fn();
+}
+
+export function addStageRows(stage: string, rows: number) {
+  storage.getStore()?.addRows(stage, rows);
+}
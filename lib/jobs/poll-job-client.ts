@@ -0,0 +1,31 @@
+import type { PollJobView } from "@/lib/jobs/poll-jobs";
+
+const DEFAULT_INTERVAL_MS = 2000;
+const DEFAULT_TIMEOUT_MS = 10 * 60_000;
+
+/**
+ * Browser-side: follows a queued poll job until it finishes and returns its final status.
+ * `onProgress` sees every intermediate status (stage, products done/total).
+ */
+export async function waitForPollJob(
+  statusUrl: string,
+  options: { intervalMs?: number; timeoutMs?: number; onProgress?: (job: PollJobView) => void } = {}
+): Promise<PollJobView> {
+  const deadline = Date.now() + (options.timeoutMs ?? DEFAULT_TIMEOUT_MS);
+
+  while (Date.now() < deadline) {
+    const response = await fetch(statusUrl, { cache: "no-store" });
+    const job = (await response.json()) as PollJobView & { error?: string };
+    if (!response.ok) {
+      throw new Error(job.error || `Failed to read poll job (${response.status})`);
+    }
+    if (job.status === "COMPLETED" || job.status === "FAILED") {
+      return job;
+    }
+
+    options.onProgress?.(job);
+    await new Promise((resolve) => setTimeout(resolve, options.intervalMs ?? DEFAULT_INTERVAL_MS));
+  }
+
+  throw new Error("Poll is still running; check back later");
+}
@@ -0,0 +1,273 @@
+import { AsyncLocalStorage } from "node:async_hooks";
+import type { Prisma } from "@prisma/client";
+import { prisma } from "@/lib/db/prisma";
+
+export type PollJobStatus = "QUEUED" | "RUNNING" | "COMPLETED" | "FAILED";
+
+export interface PollJobProgress {
+  stage?: string;
+  productsDone?: number;
+  productsTotal?: number;
+}
+
+export interface ClaimedPollJob {
+  id: string;
+  attempts: number;
+  /** When the first attempt started; a retried job skips products already refreshed since then. */
+  startedAt: Date;
+}
+
+/** A job whose worker stops renewing its lease this many times (process died) is marked FAILED. */
+export const MAX_POLL_JOB_ATTEMPTS = 3;
+
+// Progress rows are written at most this often; stage changes are written immediately.
+const CHECKPOINT_INTERVAL_MS = 1000;
+
+// Compared in UTC, like the rate-limit buckets, so workers on any machine agree on lease expiry.
+const NOW_UTC = `(now() AT TIME ZONE 'UTC')`;
+
+// The partial unique index on poll_jobs allows one QUEUED/RUNNING job; a conflicting insert returns nothing.
+const ENQUEUE_SQL = `
+INSERT INTO "poll_jobs" ("id", "status", "requestedBy", "createdAt", "updatedAt")
+VALUES (gen_random_uuid()::text, 'QUEUED', $1, ${NOW_UTC}, ${NOW_UTC})
+ON CONFLICT DO NOTHING
+RETURNING "id", "status", "createdAt"`;
+
+const CLAIM_SQL = `
+UPDATE "poll_jobs" j
+SET "status" = 'RUNNING',
+    "leasedBy" = $1,
+    "leaseExpiresAt" = ${NOW_UTC} + $2::int * INTERVAL '1 second',
+    "attempts" = j."attempts" + 1,
+    "startedAt" = COALESCE(j."startedAt", ${NOW_UTC}),
+    "updatedAt" = ${NOW_UTC}
+FROM (
+  SELECT pj."id"
+  FROM "poll_jobs" pj
+  WHERE pj."attempts" < $3
+    AND (pj."status" = 'QUEUED' OR (pj."status" = 'RUNNING' AND pj."leaseExpiresAt" < ${NOW_UTC}))
+  ORDER BY pj."createdAt"
+  LIMIT 1
+  FOR UPDATE OF pj SKIP LOCKED
+) next
+WHERE j."id" = next."id"
+RETURNING j."id", j."attempts", j."startedAt"`;
+
+const CHECKPOINT_SQL = `
+UPDATE "poll_jobs"
+SET "stage" = COALESCE($3, "stage"),
+    "productsDone" = COALESCE($4, "productsDone"),
+    "productsTotal" = COALESCE($5, "productsTotal"),
+    "leaseExpiresAt" = ${NOW_UTC} + $6::int * INTERVAL '1 second',
+    "updatedAt" = ${NOW_UTC}
+WHERE "id" = $1 AND "leasedBy" = $2 AND "status" = 'RUNNING'`;
+
+const FINISH_SQL = `
+UPDATE "poll_jobs"
+SET "status" = $3,
+    "stage" = NULL,
+    "leaseExpiresAt" = NULL,
+    "summaryJson" = $4::jsonb,
+    "error" = $5,
+    "finishedAt" = ${NOW_UTC},
+    "updatedAt" = ${NOW_UTC}
+WHERE "id" = $1 AND "leasedBy" = $2 AND "status" = 'RUNNING'`;
+
+const FAIL_ABANDONED_SQL = `
+UPDATE "poll_jobs"
+SET "status" = 'FAILED',
+    "error" = 'Abandoned by its worker ' || "attempts" || ' times',
+    "finishedAt" = ${NOW_UTC},
+    "updatedAt" = ${NOW_UTC}
+WHERE "status" = 'RUNNING' AND "leaseExpiresAt" < ${NOW_UTC} AND "attempts" >= $1`;
+
+/**
+ * Progress of the poll job being executed. The lease is renewed on a timer, so long stages
+ * without checkpoints (catalog sync) keep it; a lost lease makes the next checkpoint throw.
+ */
+class PollJobTracker {
+  private readonly pending: PollJobProgress = {};
+  private lastWriteAt = 0;
+  private heartbeat: ReturnType<typeof setInterval> | null = null;
+  lost = false;
+
+  constructor(
+    readonly job: ClaimedPollJob,
+    readonly workerId: string,
+    private readonly leaseSeconds: number
+  ) {}
+
+  start() {
+    this.heartbeat = setInterval(() => {
+      void this.write().catch((error) => {
+        console.warn("[poll-jobs] Lease renewal failed:", error instanceof Error ? error.message : error);
+      });
+    }, Math.max(1000, (this.leaseSeconds * 1000) / 3));
+  }
+
+  stop() {
+    if (this.heartbeat) {
+      clearInterval(this.heartbeat);
+      this.heartbeat = null;
+    }
+  }
+
+  async checkpoint(progress: PollJobProgress) {
+    const stageChanged = progress.stage !== undefined && progress.stage !== this.pending.stage;
+    Object.assign(this.pending, progress);
+    if (stageChanged || Date.now() - this.lastWriteAt >= CHECKPOINT_INTERVAL_MS) {
+      await this.write();
+    }
+    if (this.lost) {
+      throw new Error(`Poll job ${this.job.id} lease was lost to another worker`);
+    }
+  }
+
+  async write() {
+    this.lastWriteAt = Date.now();
+    const updated = await prisma.$executeRawUnsafe(
+      CHECKPOINT_SQL,
+      this.job.id,
+      this.workerId,
+      this.pending.stage ?? null,
+      this.pending.productsDone ?? null,
+      this.pending.productsTotal ?? null,
+      Math.ceil(this.leaseSeconds)
+    );
+    this.lost = updated === 0;
+  }
+}
+
+const storage = new AsyncLocalStorage<PollJobTracker>();
+
+/**
+ * Queues a poll unless one is already queued or running, in which case that job is returned.
+ * Repeated or retried requests therefore never start a second poll.
+ */
+export async function enqueuePollJob(requestedBy: string) {
+  await prisma.$executeRawUnsafe(FAIL_ABANDONED_SQL, MAX_POLL_JOB_ATTEMPTS);
+
+  // The active job can finish between the conflicting insert and the read; try once more then.
+  for (let attempt = 0; attempt < 2; attempt += 1) {
+    const [inserted] = await prisma.$queryRawUnsafe<Array<{ id: string; status: PollJobStatus; createdAt: Date }>>(
+      ENQUEUE_SQL,
+      requestedBy
+    );
+    if (inserted) {
+      return { id: inserted.id, status: inserted.status, deduplicated: false };
+    }
+
+    const active = await prisma.pollJob.findFirst({
+      where: { status: { in: ["QUEUED", "RUNNING"] } },
+      select: { id: true, status: true }
+    });
+    if (active) {
+      return { id: active.id, status: active.status as PollJobStatus, deduplicated: true };
+    }
+  }
+
+  throw new Error("Could not queue a poll job");
+}
+
+/** Claims the oldest queued job (or a running one whose worker's lease expired) without blocking. */
+export async function claimPollJob(workerId: string, leaseSeconds: number): Promise<ClaimedPollJob | null> {
+  await prisma.$executeRawUnsafe(FAIL_ABANDONED_SQL, MAX_POLL_JOB_ATTEMPTS);
+  const rows = await prisma.$queryRawUnsafe<ClaimedPollJob[]>(
+    CLAIM_SQL,
+    workerId,
+    Math.ceil(leaseSeconds),
+    MAX_POLL_JOB_ATTEMPTS
+  );
+
+  return rows[0] ?? null;
+}
+
+/** Whether a job is waiting for a runner (queued, or abandoned by a worker whose lease expired). */
+export async function hasRunnablePollJob() {
+  const waiting = await prisma.pollJob.count({
+    where: {
+      attempts: { lt: MAX_POLL_JOB_ATTEMPTS },
+      OR: [{ status: "QUEUED" }, { status: "RUNNING", leaseExpiresAt: { lt: new Date() } }]
+    }
+  });
+  return waiting > 0;
+}
+
+/**
+ * Runs `fn` as the claimed job: renews its lease, lets `pollJobCheckpoint` record progress and
+ * stores the outcome. Returns false when the lease was lost and another worker owns the job.
+ */
+export async function executePollJob<T>(
+  job: ClaimedPollJob,
+  workerId: string,
+  leaseSeconds: number,
+  fn: () => Promise<T>
+) {
+  const tracker = new PollJobTracker(job, workerId, leaseSeconds);
+  tracker.start();
+
+  let status: PollJobStatus = "COMPLETED";
+  let summary: T | undefined;
+  let errorMessage: string | null = null;
+  try {
+    summary = await storage.run(tracker, fn);
+  } catch (error) {
+    status = "FAILED";
+    errorMessage = (error instanceof Error ? error.message : String(error)).slice(0, 1000);
+  } finally {
+    tracker.stop();
+  }
+
+  if (tracker.lost) {
+    return false;
+  }
+
+  const updated = await prisma.$executeRawUnsafe(
+    FINISH_SQL,
+    job.id,
+    workerId,
+    status,
+    summary === undefined ? null : JSON.stringify(summary),
+    errorMessage
+  );
+  return updated > 0;
+}
+
+/** Records progress of the poll job being executed; does nothing outside one. */
+export async function pollJobCheckpoint(progress: PollJobProgress) {
+  await storage.getStore()?.checkpoint(progress);
+}
+
+/** The poll job being executed, if any. */
+export function currentPollJob() {
+  return storage.getStore()?.job ?? null;
+}
+
+export async function getPollJob(id: string) {
+  const job = await prisma.pollJob.findUnique({ where: { id } });
+  if (!job) {
+    return null;
+  }
+
+  return {
+    id: job.id,
+    status: job.status as PollJobStatus,
+    requestedBy: job.requestedBy,
+    stage: job.stage,
+    productsDone: job.productsDone,
+    productsTotal: job.productsTotal,
+    attempts: job.attempts,
+    createdAt: job.createdAt.toISOString(),
+    startedAt: job.startedAt?.toISOString() ?? null,
+    updatedAt: job.updatedAt.toISOString(),
+    finishedAt: job.finishedAt?.toISOString() ?? null,
+    summary: (job.summaryJson ?? null) as Prisma.JsonValue,
+    error: job.error
+  };
+}
+
+export type PollJobView = NonNullable<Awaited<ReturnType<typeof getPollJob>>>;
+
+export function isPollJobFinished(status: PollJobStatus) {
+  return status === "COMPLETED" || status === "FAILED";
+}
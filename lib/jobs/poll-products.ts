@@ -1,14 +1,38 @@
-import type { AlertType, Prisma, PriceChangeMethod, Product } from "@prisma/client";
+import type { Prisma, PriceChangeMethod, PriceSnapshot, Product, ProductSettings } from "@prisma/client";
+import { AlertDedupe, MISSING_DATA_DEDUPE_MINUTES } from "@/lib/alerts/dedupe";
 import { detectAlerts } from "@/lib/alerts/detector";
 import { buildMissingProductDataMessage, detectMissingProductFields } from "@/lib/alerts/missing-product-data";
 import { env } from "@/lib/config/env";
+import { publishProductChanges } from "@/lib/dashboard/product-changes";
 import { prisma } from "@/lib/db/prisma";
+import { addStageRows, timeStage, withJobRun, type JobStageStats } from "@/lib/jobs/job-run";
+import { claimPollJob, currentPollJob, executePollJob, pollJobCheckpoint } from "@/lib/jobs/poll-jobs";
+import { loadPollSignals, planPollTick, type PollTier, type TierFreshness } from "@/lib/jobs/poll-schedule";
+import {
+  completePollBatch,
+  createPollRun,
+  finalizePollRuns,
+  getPollRunProgress,
+  leasePollBatch,
+  releasePollBatch,
+  renewPollLease,
+  type PollBatchResult,
+  type PollShardItem
+} from "@/lib/jobs/poll-shards";
+import { canExtendSnapshot } from "@/lib/jobs/snapshot-runs";
 import { enforcedFloorPrice } from "@/lib/pricing/calculator";
 import { getEffectiveSettingsForProduct, getOrCreateGlobalSettings } from "@/lib/pricing/effective-settings";
 import { suggestedPrice } from "@/lib/pricing/suggested-price";
+import { buyboxCache } from "@/lib/trendyol/buybox-cache";
 import { trendyolClient } from "@/lib/trendyol/client";
 import { syncCatalogFromTrendyol } from "@/lib/trendyol/sync-catalog";
-import type { TrendyolProductItem } from "@/lib/trendyol/types";
+import {
+  isSyncedRowFresh,
+  loadSyncedCatalog,
+  syncedRowToPollInputs,
+  type SyncedCatalog
+} from "@/lib/trendyol/synced-catalog";
+import type { TrendyolCompetitorData, TrendyolProductItem } from "@/lib/trendyol/types";
 
 export interface PollRunSummary {
   ok: boolean;
@@ -21,6 +45,50 @@ export interface PollRunSummary {
   catalogSyncError?: string;
   errors?: Array<{ sku: string; message: string }>;
   message?: string;
+  runId?: string;
+  stages?: Record<string, JobStageStats>;
+  schedule?: {
+    budget: number;
+    selected: number;
+    deferred: number;
+    tiers: Record<PollTier, TierFreshness>;
+  };
+  shards?: Awaited<ReturnType<typeof getPollRunProgress>> & { batchesDrained: number };
+  source?: {
+    mode: "synced_table";
+    latestSyncedAt: string | null;
+    /** Age of the newest `trendyol_products` sync when the poll started. */
+    lagSeconds: number | null;
+    /** Age of the oldest synced row the poll used instead of the API. */
+    maxRowLagSeconds: number | null;
+    fromTable: number;
+    apiFallback: number;
+    productsCreated: number;
+    catalogSyncSkipped: boolean;
+    /** Catalog pages not re-fetched plus buybox batches (10 barcodes each) not requested. */
+    apiCallsSaved: number;
+  };
+  /** Set when a poll job resumed after its previous worker died. */
+  resumedFrom?: { startedAt: string; alreadyRefreshed: number };
+}
+
+export interface PollWorkerSummary extends PollBatchResult {
+  ok: boolean;
+  workerId: string;
+  batches: number;
+  lostLeases: number;
+  durationMs: number;
+  message?: string;
+  runId?: string;
+  stages?: Record<string, JobStageStats>;
+}
+
+type PollProduct = Product & { settings: ProductSettings | null };
+
+/** Data already known for a product, so its snapshot needs fewer (or no) API calls. */
+interface PollInputs {
+  catalogItem?: TrendyolProductItem;
+  competitor?: TrendyolCompetitorData;
 }
 
 async function lastDownwardChangeAt(productId: string) {
@@ -43,19 +111,19 @@ async function lastDownwardChangeAt(productId: string) {
   return null;
 }
 
-async function shouldCreateAlert(productId: string, type: AlertType, dedupeMinutes = 15) {
-  const since = new Date(Date.now() - dedupeMinutes * 60 * 1000);
-  const recent = await prisma.alert.findFirst({
+async function productsRefreshedSince(products: PollProduct[], since: Date) {
+  const rows = await prisma.priceSnapshot.findMany({
     where: {
-      productId,
-      type,
-      createdAt: {
-        gte: since
-      }
-    }
+      productId: { in: products.map((product) => product.id) },
+      // Runs never outlast the heartbeat, so older rows can be skipped through the (productId, checkedAt) index.
+      checkedAt: { gte: new Date(since.getTime() - env.SNAPSHOT_HEARTBEAT_MINUTES * 60_000) },
+      lastSeenAt: { gte: since }
+    },
+    select: { productId: true },
+    distinct: ["productId"]
   });
 
-  return !recent;
+  return new Set(rows.map((row) => row.productId));
 }
 
 function inferBuyBoxStatus(
@@ -98,10 +166,18 @@ function buildCatalogLookup(items: TrendyolProductItem[]) {
   return map;
 }
 
+/**
+ * Records the product's current price/buybox state. In `SNAPSHOT_MODE=change_only` an observation
+ * matching the latest row only extends it; pass `previous` when the caller already loaded that row.
+ * `competitor` skips the buybox lookup when the data is already known (synced catalog table).
+ */
 export async function refreshSnapshotForProduct(
   product: Product,
-  catalogItem?: TrendyolProductItem
+  catalogItem?: TrendyolProductItem,
+  options: { previous?: PriceSnapshot | null; competitor?: TrendyolCompetitorData } = {}
 ) {
+  const { previous, competitor: knownCompetitor } = options;
+
   const [priceStock, competitor] = await Promise.all([
     catalogItem
       ? Promise.resolve({
@@ -117,11 +193,12 @@ export async function refreshSnapshotForProduct(
         barcode: product.barcode ?? undefined,
         productId: product.trendyolProductId ?? undefined
       }),
-    trendyolClient.fetchCompetitorPrices({
-      sku: product.sku,
-      barcode: product.barcode ?? undefined,
-      productId: product.trendyolProductId ?? undefined
-    })
+    // Served from the buybox cache, which the catalog sync earlier in the poll has usually filled.
+    knownCompetitor ??
+      buyboxCache.fetchCompetitorPrices({
+        sku: product.sku,
+        barcode: product.barcode ?? undefined
+      })
   ]);
 
   const buyboxStatus = inferBuyBoxStatus(
@@ -132,14 +209,35 @@ export async function refreshSnapshotForProduct(
     competitor.competitorCount
   );
 
+  const values = {
+    ourPrice: priceStock.ourPrice,
+    competitorMinPrice: competitor.competitorMinPrice,
+    competitorCount: competitor.competitorCount,
+    buyboxStatus,
+    buyboxSellerId: competitor.buyboxSellerId
+  };
+
+  if (env.SNAPSHOT_MODE === "change_only") {
+    const latest =
+      previous !== undefined
+        ? previous
+        : await prisma.priceSnapshot.findFirst({
+          where: { productId: product.id },
+          orderBy: { checkedAt: "desc" }
+        });
+
+    if (latest && canExtendSnapshot(latest, values, env.SNAPSHOT_HEARTBEAT_MINUTES)) {
+      return prisma.priceSnapshot.update({
+        where: { id: latest.id },
+        data: { lastSeenAt: new Date(), observations: { increment: 1 } }
+      });
+    }
+  }
+
   return prisma.priceSnapshot.create({
     data: {
       productId: product.id,
-      ourPrice: priceStock.ourPrice,
-      competitorMinPrice: competitor.competitorMinPrice,
-      competitorCount: competitor.competitorCount,
-      buyboxStatus,
-      buyboxSellerId: competitor.buyboxSellerId,
+      ...values,
       rawPayloadJson: {
         priceStock: priceStock.raw,
         competitor: competitor.raw
@@ -148,7 +246,319 @@ export async function refreshSnapshotForProduct(
   });
 }
 
+/** Refreshes one product's snapshot and queues the alerts it triggers on `dedupe`. */
+async function pollProduct(product: PollProduct, dedupe: AlertDedupe, inputs: PollInputs) {
+  const [previousSnapshot, lastDecreaseAt, effectiveSettings] = await timeStage("product_context", () =>
+    Promise.all([
+      prisma.priceSnapshot.findFirst({
+        where: { productId: product.id },
+        orderBy: { checkedAt: "desc" }
+      }),
+      lastDownwardChangeAt(product.id),
+      getEffectiveSettingsForProduct(product.id, product.settings)
+    ])
+  );
+
+  const missingFields = detectMissingProductFields({
+    sku: product.sku,
+    title: product.title,
+    costPrice: effectiveSettings.costPrice
+  });
+  if (missingFields.length > 0) {
+    dedupe.offer(
+      {
+        productId: product.id,
+        type: "MISSING_PRODUCT_DATA",
+        severity: "WARN",
+        message: buildMissingProductDataMessage(product.sku, missingFields),
+        metadataJson: {
+          missingFields,
+          costPrice: effectiveSettings.costPrice
+        } as Prisma.InputJsonValue
+      },
+      MISSING_DATA_DEDUPE_MINUTES
+    );
+  }
+
+  const snapshot = await timeStage("snapshot", () =>
+    refreshSnapshotForProduct(product, inputs.catalogItem, {
+      previous: previousSnapshot,
+      competitor: inputs.competitor
+    })
+  );
+  addStageRows("snapshot", 1);
+
+  const ourPrice = snapshot.ourPrice !== null ? Number(snapshot.ourPrice) : null;
+  const competitorMin =
+    snapshot.competitorMinPrice !== null ? Number(snapshot.competitorMinPrice) : null;
+
+  const suggestion = suggestedPrice({
+    competitorMin,
+    ourPrice,
+    settings: effectiveSettings,
+    minPrice: product.settings?.minPrice ? Number(product.settings.minPrice) : 0,
+    lastDownwardChangeAt: lastDecreaseAt
+  });
+
+  const breakEven = enforcedFloorPrice(
+    effectiveSettings,
+    product.settings?.minPrice ? Number(product.settings.minPrice) : 0
+  );
+
+  const alertCandidates = detectAlerts({
+    productId: product.id,
+    sku: product.sku,
+    ourPrice,
+    competitorMin,
+    previousCompetitorMin:
+      previousSnapshot?.competitorMinPrice !== null && previousSnapshot?.competitorMinPrice !== undefined
+        ? Number(previousSnapshot.competitorMinPrice)
+        : null,
+    buyboxStatus: snapshot.buyboxStatus,
+    breakEvenPrice: breakEven,
+    suggestedPrice: suggestion.suggested,
+    settings: effectiveSettings
+  });
+
+  for (const candidate of alertCandidates) {
+    dedupe.offer({
+      productId: product.id,
+      type: candidate.type,
+      severity: candidate.severity,
+      message: candidate.message,
+      metadataJson: candidate.metadata as Prisma.InputJsonValue
+    });
+  }
+}
+
+/**
+ * Polls products 10 at a time; `afterChunk` runs between chunks (sharded workers renew their lease
+ * and poll jobs record progress there). Each chunk's refreshed products go to the change feed for
+ * live dashboards. Alerts are deduplicated in memory across the run and inserted in bulk after each
+ * chunk, so they land with their snapshots and survive a run that is cut short.
+ */
+export async function pollProducts(
+  products: PollProduct[],
+  inputsFor: (product: PollProduct) => PollInputs,
+  afterChunk?: (chunkSize: number) => Promise<void>
+): Promise<PollBatchResult> {
+  let skipped = 0;
+  let alertsCreated = 0;
+  const errors: Array<{ sku: string; message: string }> = [];
+  const dedupe = await timeStage("alert_dedupe", () => AlertDedupe.load(products.map((product) => product.id)));
+
+  // Process in batches to improve speed but respect rate limits
+  const BATCH_SIZE = 10;
+  for (let i = 0; i < products.length; i += BATCH_SIZE) {
+    const batch = products.slice(i, i + BATCH_SIZE);
+    const refreshed: string[] = [];
+    await Promise.all(
+      batch.map(async (product) => {
+        try {
+          await pollProduct(product, dedupe, inputsFor(product));
+          refreshed.push(product.id);
+        } catch (error) {
+          skipped += 1;
+          if (errors.length < 20) {
+            errors.push({
+              sku: product.sku,
+              message: error instanceof Error ? error.message : "Unknown poll error"
+            });
+          }
+        }
+      })
+    );
+    await timeStage("change_feed", () => publishProductChanges("snapshot", refreshed));
+    if (dedupe.pendingCount) {
+      const inserted = await timeStage("alert_insert", () => dedupe.flush());
+      addStageRows("alert_insert", inserted);
+      alertsCreated += inserted;
+    }
+    await afterChunk?.(batch.length);
+  }
+
+  return { processed: products.length - skipped, alertsCreated, skipped, errors };
+}
+
+// The coordinator stops leasing batches after this and leaves the rest of the run to poll workers.
+const COORDINATOR_DRAIN_MS = 200_000;
+
+function shardCatalogItem(item?: TrendyolProductItem): PollShardItem["catalog"] {
+  if (!item) {
+    return null;
+  }
+
+  return {
+    sku: item.sku,
+    barcode: item.barcode ?? null,
+    title: item.title,
+    productId: item.productId ?? null,
+    category: item.category ?? null,
+    active: item.active,
+    ourPrice: item.ourPrice ?? null,
+    stock: item.stock ?? null
+  };
+}
+
+async function pollShardBatch(items: PollShardItem[], afterChunk: (chunkSize: number) => Promise<void>) {
+  const inputsById = new Map<string, PollInputs>(
+    items.map((item) => [
+      item.productId,
+      { catalogItem: item.catalog ?? undefined, competitor: item.competitor ?? undefined }
+    ])
+  );
+  const products = await timeStage("load_products", () =>
+    prisma.product.findMany({
+      where: { id: { in: Array.from(inputsById.keys()) }, active: true },
+      include: { settings: true }
+    })
+  );
+  addStageRows("load_products", products.length);
+
+  return pollProducts(products, (product) => inputsById.get(product.id) ?? {}, afterChunk);
+}
+
+/**
+ * Leases and polls batches from `poll_batches` until the queue is empty or the deadline passes.
+ * With `idleWaitMs`, an empty queue is re-checked after that delay instead of returning.
+ */
+async function drainPollBatches(
+  workerId: string,
+  options: { deadline: number; idleWaitMs?: number; shouldStop?: () => boolean }
+) {
+  const leaseSeconds = env.POLL_SHARD_LEASE_SECONDS;
+  const totals = {
+    processed: 0,
+    alertsCreated: 0,
+    skipped: 0,
+    errors: [] as PollBatchResult["errors"],
+    batches: 0,
+    lostLeases: 0
+  };
+
+  while (Date.now() < options.deadline && !options.shouldStop?.()) {
+    const batch = await timeStage("shard_lease", () => leasePollBatch(workerId, leaseSeconds));
+    if (!batch) {
+      // Lets a run whose last batch was abandoned by a dead worker complete.
+      await finalizePollRuns();
+      if (!options.idleWaitMs) {
+        break;
+      }
+      await new Promise((resolve) => setTimeout(resolve, options.idleWaitMs));
+      continue;
+    }
+
+    try {
+      const result = await pollShardBatch(batch.items, async () => {
+        await renewPollLease(batch.id, workerId, leaseSeconds);
+      });
+      const recorded = await timeStage("shard_complete", () => completePollBatch(batch.id, workerId, result));
+
+      totals.batches += 1;
+      totals.lostLeases += recorded ? 0 : 1;
+      totals.processed += result.processed;
+      totals.alertsCreated += result.alertsCreated;
+      totals.skipped += result.skipped;
+      totals.errors.push(...result.errors.slice(0, Math.max(0, 20 - totals.errors.length)));
+    } catch (error) {
+      const message = error instanceof Error ? error.message : "Unknown poll worker error";
+      await releasePollBatch(batch.id, workerId, message);
+      if (totals.errors.length < 20) {
+        totals.errors.push({ sku: `batch:${batch.id}`, message });
+      }
+    }
+  }
+
+  return totals;
+}
+
+/** Runs one sharded poll worker pass, recorded in `job_runs` as `poll_worker`. */
+export async function runPollWorker(
+  workerId: string,
+  options: { deadline: number; idleWaitMs?: number; shouldStop?: () => boolean }
+): Promise<PollWorkerSummary> {
+  return withJobRun("poll_worker", async (run) => {
+    const start = Date.now();
+
+    if (!trendyolClient.isConfigured()) {
+      return {
+        ok: true,
+        workerId,
+        batches: 0,
+        lostLeases: 0,
+        processed: 0,
+        alertsCreated: 0,
+        skipped: 0,
+        errors: [],
+        durationMs: Date.now() - start,
+        message: "Trendyol credentials are not configured"
+      };
+    }
+
+    await timeStage("settings", () => getOrCreateGlobalSettings());
+    const drained = await drainPollBatches(workerId, options);
+
+    return {
+      ok: true,
+      workerId,
+      ...drained,
+      durationMs: Date.now() - start,
+      runId: run.id,
+      stages: run.getStages()
+    };
+  });
+}
+
+/** Runs one poll, recorded in `job_runs` with per-stage timings that are also returned in the summary. */
 export async function runPoll(): Promise<PollRunSummary> {
+  return withJobRun("poll", async (run) => ({
+    ...(await pollOnce()),
+    runId: run.id,
+    stages: run.getStages()
+  }));
+}
+
+/**
+ * Executes queued poll jobs one after another until none is left, each recorded as a `poll` run.
+ * A job whose worker died is claimed again once its lease expires and resumes where it stopped.
+ */
+export async function runQueuedPollJobs(workerId: string, options: { shouldStop?: () => boolean } = {}) {
+  const leaseSeconds = env.POLL_JOB_LEASE_SECONDS;
+  const executed: string[] = [];
+
+  while (!options.shouldStop?.()) {
+    const job = await claimPollJob(workerId, leaseSeconds);
+    if (!job) {
+      break;
+    }
+    await executePollJob(job, workerId, leaseSeconds, () => runPoll());
+    executed.push(job.id);
+  }
+
+  return executed;
+}
+
+let inProcessRunner: Promise<unknown> | null = null;
+
+/**
+ * Starts executing queued poll jobs in this server process without awaiting them, so the request
+ * that queued the job can return. Does nothing while this process is already executing jobs.
+ */
+export function runPollJobsInBackground() {
+  if (inProcessRunner) {
+    return;
+  }
+
+  inProcessRunner = runQueuedPollJobs(`app:${crypto.randomUUID()}`)
+    .catch((error) => {
+      console.warn("[poll-jobs] Background poll runner failed:", error instanceof Error ? error.message : error);
+    })
+    .finally(() => {
+      inProcessRunner = null;
+    });
+}
+
+async function pollOnce(): Promise<PollRunSummary> {
   const start = Date.now();
 
   if (!trendyolClient.isConfigured()) {
@@ -164,23 +574,40 @@ export async function runPoll(): Promise<PollRunSummary> {
     };
   }
 
-  await getOrCreateGlobalSettings();
+  await timeStage("settings", () => getOrCreateGlobalSettings());
 
   let catalogSynced = 0;
   let catalogPagesFetched = 0;
   let catalogSyncError: string | undefined;
   let catalogLookup = new Map<string, TrendyolProductItem>();
 
-  if (env.AUTO_SYNC_CATALOG) {
+  let synced: SyncedCatalog | null = null;
+  if (env.POLL_SOURCE === "synced_table") {
+    await pollJobCheckpoint({ stage: "synced_catalog" });
+    synced = await timeStage("synced_catalog", () =>
+      loadSyncedCatalog(String(trendyolClient.getSellerId()), env.POLL_SYNCED_MAX_AGE_MINUTES)
+    );
+    addStageRows("synced_catalog", synced?.rows.size ?? 0);
+  }
+  // A fresh synced table replaces re-paging the catalog; a stale or missing one falls back to the API.
+  const syncedLagMs = synced?.latestSyncedAt ? start - synced.latestSyncedAt.getTime() : null;
+  const catalogSyncSkipped = syncedLagMs !== null && syncedLagMs <= env.POLL_SYNCED_MAX_AGE_MINUTES * 60_000;
+
+  if (env.AUTO_SYNC_CATALOG && !catalogSyncSkipped) {
+    await pollJobCheckpoint({ stage: "catalog_sync" });
     try {
-      const syncSummary = await syncCatalogFromTrendyol({
-        maxPages: env.AUTO_SYNC_MAX_PAGES,
-        pageSize: env.AUTO_SYNC_PAGE_SIZE,
-        hydratePrices: false,
-        hydrateLimit: 0,
-        createInitialSnapshots: false,
-        includeItems: true
-      });
+      const syncSummary = await timeStage("catalog_sync", () =>
+        syncCatalogFromTrendyol({
+          maxPages: env.AUTO_SYNC_MAX_PAGES,
+          pageSize: env.AUTO_SYNC_PAGE_SIZE,
+          hydratePrices: false,
+          hydrateLimit: 0,
+          createInitialSnapshots: false,
+          includeItems: true,
+          // A tick budget limits buybox lookups to the products actually refreshed.
+          prefetchBuybox: env.POLL_TICK_BUDGET === 0
+        })
+      );
       catalogSynced = syncSummary.totalSynced;
       catalogPagesFetched = syncSummary.pagesFetched;
       if (syncSummary.items?.length) {
@@ -192,10 +619,14 @@ export async function runPoll(): Promise<PollRunSummary> {
     }
   }
 
-  const products = await prisma.product.findMany({
-    where: { active: true },
-    include: { settings: true }
-  });
+  await pollJobCheckpoint({ stage: "load_products" });
+  const products = await timeStage("load_products", () =>
+    prisma.product.findMany({
+      where: { active: true },
+      include: { settings: true }
+    })
+  );
+  addStageRows("load_products", products.length);
 
   if (!products.length) {
     return {
@@ -213,133 +644,130 @@ export async function runPoll(): Promise<PollRunSummary> {
     };
   }
 
-  let alertsCreated = 0;
-  let skipped = 0;
-  const errors: Array<{ sku: string; message: string }> = [];
-
-  // Process in batches to improve speed but respect rate limits
-  const BATCH_SIZE = 10;
-  for (let i = 0; i < products.length; i += BATCH_SIZE) {
-    const batch = products.slice(i, i + BATCH_SIZE);
-    await Promise.all(
-      batch.map(async (product) => {
-        try {
-          const [previousSnapshot, lastDecreaseAt, effectiveSettings] = await Promise.all([
-            prisma.priceSnapshot.findFirst({
-              where: { productId: product.id },
-              orderBy: { checkedAt: "desc" }
-            }),
-            lastDownwardChangeAt(product.id),
-            getEffectiveSettingsForProduct(product.id)
-          ]);
-
-          const missingFields = detectMissingProductFields({
-            sku: product.sku,
-            title: product.title,
-            costPrice: effectiveSettings.costPrice
-          });
-          if (missingFields.length > 0) {
-            const shouldCreateMissingDataAlert = await shouldCreateAlert(
-              product.id,
-              "MISSING_PRODUCT_DATA",
-              60 * 12
-            );
-
-            if (shouldCreateMissingDataAlert) {
-              await prisma.alert.create({
-                data: {
-                  productId: product.id,
-                  type: "MISSING_PRODUCT_DATA",
-                  severity: "WARN",
-                  message: buildMissingProductDataMessage(product.sku, missingFields),
-                  metadataJson: {
-                    missingFields,
-                    costPrice: effectiveSettings.costPrice
-                  } as Prisma.InputJsonValue
-                }
-              });
-              alertsCreated += 1;
-            }
-          }
-
-          const catalogMatch =
-            catalogLookup.get(product.sku) ??
-            (product.barcode ? catalogLookup.get(product.barcode) : undefined) ??
-            (product.trendyolProductId ? catalogLookup.get(product.trendyolProductId) : undefined);
+  // With a tick budget, only the most urgent due products (by cadence tier) are refreshed.
+  let dueProducts = products;
+  let schedule: PollRunSummary["schedule"];
+  if (env.POLL_TICK_BUDGET > 0) {
+    const signals = await timeStage("schedule", () => loadPollSignals(products));
+    const plan = planPollTick(products, signals, env.POLL_TICK_BUDGET);
+    dueProducts = plan.selected;
+    schedule = {
+      budget: env.POLL_TICK_BUDGET,
+      selected: plan.selected.length,
+      deferred: plan.deferred,
+      tiers: plan.tiers
+    };
+  }
 
-          const snapshot = await refreshSnapshotForProduct(product, catalogMatch);
+  // A poll job retried after its worker died skips the products the earlier attempt already refreshed.
+  const job = currentPollJob();
+  let resumedFrom: PollRunSummary["resumedFrom"];
+  if (job && job.attempts > 1) {
+    const refreshed = await timeStage("resume", () => productsRefreshedSince(dueProducts, job.startedAt));
+    resumedFrom = { startedAt: job.startedAt.toISOString(), alreadyRefreshed: refreshed.size };
+    dueProducts = dueProducts.filter((product) => !refreshed.has(product.id));
+  }
 
-          const ourPrice = snapshot.ourPrice !== null ? Number(snapshot.ourPrice) : null;
-          const competitorMin =
-            snapshot.competitorMinPrice !== null ? Number(snapshot.competitorMinPrice) : null;
+  const catalogFor = (product: PollProduct) =>
+    catalogLookup.get(product.sku) ??
+    (product.barcode ? catalogLookup.get(product.barcode) : undefined) ??
+    (product.trendyolProductId ? catalogLookup.get(product.trendyolProductId) : undefined);
+
+  let source: PollRunSummary["source"];
+  const syncedInputs = new Map<string, PollInputs>();
+  if (synced) {
+    let maxRowLagMs: number | null = null;
+    for (const product of dueProducts) {
+      const row = synced.rows.get(product.id);
+      if (row && isSyncedRowFresh(row, env.POLL_SYNCED_MAX_AGE_MINUTES, start)) {
+        syncedInputs.set(product.id, syncedRowToPollInputs(row));
+        maxRowLagMs = Math.max(maxRowLagMs ?? 0, start - row.syncedAt.getTime());
+      }
+    }
 
-          const suggestion = suggestedPrice({
-            competitorMin,
-            ourPrice,
-            settings: effectiveSettings,
-            minPrice: product.settings?.minPrice ? Number(product.settings.minPrice) : 0,
-            lastDownwardChangeAt: lastDecreaseAt
-          });
+    const catalogPagesSaved =
+      env.AUTO_SYNC_CATALOG && catalogSyncSkipped
+        ? Math.min(env.AUTO_SYNC_MAX_PAGES, Math.ceil(products.length / env.AUTO_SYNC_PAGE_SIZE))
+        : 0;
+    source = {
+      mode: "synced_table",
+      latestSyncedAt: synced.latestSyncedAt?.toISOString() ?? null,
+      lagSeconds: syncedLagMs === null ? null : Math.round(syncedLagMs / 1000),
+      maxRowLagSeconds: maxRowLagMs === null ? null : Math.round(maxRowLagMs / 1000),
+      fromTable: syncedInputs.size,
+      apiFallback: dueProducts.length - syncedInputs.size,
+      productsCreated: synced.productsCreated,
+      catalogSyncSkipped,
+      apiCallsSaved: catalogPagesSaved + Math.ceil(syncedInputs.size / 10)
+    };
+  }
 
-          const breakEven = enforcedFloorPrice(
-            effectiveSettings,
-            product.settings?.minPrice ? Number(product.settings.minPrice) : 0
-          );
+  const inputsFor = (product: PollProduct): PollInputs =>
+    syncedInputs.get(product.id) ?? { catalogItem: catalogFor(product) };
 
-          const alertCandidates = detectAlerts({
+  if (env.POLL_MODE === "sharded") {
+    await pollJobCheckpoint({ stage: "shard_enqueue", productsTotal: dueProducts.length, productsDone: 0 });
+    const shardRun = await timeStage("shard_enqueue", () =>
+      createPollRun(
+        dueProducts.map((product) => {
+          const inputs = inputsFor(product);
+          return {
             productId: product.id,
-            sku: product.sku,
-            ourPrice,
-            competitorMin,
-            previousCompetitorMin:
-              previousSnapshot?.competitorMinPrice !== null && previousSnapshot?.competitorMinPrice !== undefined
-                ? Number(previousSnapshot.competitorMinPrice)
-                : null,
-            buyboxStatus: snapshot.buyboxStatus,
-            breakEvenPrice: breakEven,
-            suggestedPrice: suggestion.suggested,
-            settings: effectiveSettings
-          });
-
-          for (const candidate of alertCandidates) {
-            const shouldCreate = await shouldCreateAlert(product.id, candidate.type, 15);
-            if (!shouldCreate) {
-              continue;
-            }
-
-            await prisma.alert.create({
-              data: {
-                productId: product.id,
-                type: candidate.type,
-                severity: candidate.severity,
-                message: candidate.message,
-                metadataJson: candidate.metadata as Prisma.InputJsonValue
-              }
-            });
-            alertsCreated += 1;
-          }
-        } catch (error) {
-          skipped += 1;
-          if (errors.length < 20) {
-            errors.push({
-              sku: product.sku,
-              message: error instanceof Error ? error.message : "Unknown poll error"
-            });
-          }
-        }
-      })
+            catalog: shardCatalogItem(inputs.catalogItem),
+            competitor: inputs.competitor ?? null
+          };
+        }),
+        env.POLL_SHARD_BATCH_SIZE,
+        "poll"
+      )
     );
+    addStageRows("shard_enqueue", dueProducts.length);
+
+    // The coordinator works the queue alongside the workers until shortly before its lock expires.
+    await pollJobCheckpoint({ stage: "shard_drain" });
+    const drained = await drainPollBatches(`coordinator:${shardRun.id}`, {
+      deadline: start + COORDINATOR_DRAIN_MS
+    });
+    const shards = await getPollRunProgress(shardRun.id);
+
+    return {
+      ok: true,
+      processed: drained.processed,
+      alertsCreated: drained.alertsCreated,
+      skipped: drained.skipped,
+      catalogSynced,
+      catalogPagesFetched,
+      catalogSyncError,
+      errors: drained.errors.length ? drained.errors : undefined,
+      schedule,
+      shards: { ...shards, batchesDrained: drained.batches },
+      source,
+      resumedFrom,
+      message: shards.status === "RUNNING" ? "Remaining batches are left to poll workers" : undefined,
+      durationMs: Date.now() - start
+    };
   }
 
+  let productsDone = 0;
+  await pollJobCheckpoint({ stage: "poll_products", productsTotal: dueProducts.length, productsDone });
+  const { alertsCreated, skipped, errors } = await pollProducts(dueProducts, inputsFor, async (chunkSize) => {
+    productsDone += chunkSize;
+    await pollJobCheckpoint({ productsDone });
+  });
+  await pollJobCheckpoint({ stage: "done", productsDone: dueProducts.length });
+
   return {
     ok: true,
-    processed: products.length - skipped,
+    processed: dueProducts.length - skipped,
     alertsCreated,
     skipped,
     catalogSynced,
     catalogPagesFetched,
     catalogSyncError,
     errors: errors.length ? errors : undefined,
+    schedule,
+    source,
+    resumedFrom,
     durationMs: Date.now() - start
   };
 }
@@ -0,0 +1,200 @@
+import type { AlertType, BuyBoxStatus } from "@prisma/client";
+import { prisma } from "@/lib/db/prisma";
+
+export type PollTier = "hot" | "warm" | "cold";
+
+export const POLL_TIERS: PollTier[] = ["hot", "warm", "cold"];
+
+/** Target refresh interval per tier. Hot SKUs are refreshed on every 5-minute tick. */
+export const TIER_INTERVAL_MINUTES: Record<PollTier, number> = {
+  hot: 5,
+  warm: 15,
+  cold: 60
+};
+
+const ACTIVITY_ALERT_TYPES: AlertType[] = ["LOST_BUYBOX", "PRICE_WAR", "COMPETITOR_DROP"];
+const SIGNAL_WINDOW_HOURS = 24;
+const SALES_WINDOW_DAYS = 7;
+
+export interface PollSignals {
+  lastCheckedAt: Date | null;
+  lastStatus: BuyBoxStatus | null;
+  lastCompetitorCount: number | null;
+  /** Distinct competitor-min / own prices seen in the signal window. */
+  priceLevels: number;
+  recentAlerts: number;
+  unitsSold: number;
+}
+
+export interface TierFreshness {
+  products: number;
+  due: number;
+  refreshed: number;
+  deferred: number;
+  targetMinutes: number;
+  /** Oldest snapshot age in the tier once this tick's refreshes land; null when a product has none. */
+  maxAgeMinutes: number | null;
+}
+
+export interface PollPlan<T> {
+  selected: T[];
+  deferred: number;
+  tiers: Record<PollTier, TierFreshness>;
+}
+
+const emptySignals = (): PollSignals => ({
+  lastCheckedAt: null,
+  lastStatus: null,
+  lastCompetitorCount: null,
+  priceLevels: 0,
+  recentAlerts: 0,
+  unitsSold: 0
+});
+
+export function classifyTier(signals: PollSignals): PollTier {
+  if (signals.lastStatus === "LOSE" || signals.recentAlerts > 0 || signals.priceLevels > 2) {
+    return "hot";
+  }
+
+  const uncontested = signals.lastStatus === "WIN" && (signals.lastCompetitorCount ?? 0) <= 1;
+  if (uncontested && signals.priceLevels <= 2 && signals.unitsSold === 0) {
+    return "cold";
+  }
+
+  return "warm";
+}
+
+/**
+ * Picks the products to refresh this tick. Each product's urgency is its snapshot age over its
+ * tier's interval; due products (urgency >= 1) are taken most-urgent first up to `budget`.
+ * Products that were never snapshotted always come first.
+ */
+export function planPollTick<T extends { id: string }>(
+  products: T[],
+  signals: Map<string, PollSignals>,
+  budget: number,
+  now = Date.now()
+): PollPlan<T> {
+  const tiers = Object.fromEntries(
+    POLL_TIERS.map((tier) => [
+      tier,
+      { products: 0, due: 0, refreshed: 0, deferred: 0, targetMinutes: TIER_INTERVAL_MINUTES[tier], maxAgeMinutes: 0 }
+    ])
+  ) as Record<PollTier, TierFreshness>;
+
+  const candidates = products.map((product) => {
+    const productSignals = signals.get(product.id) ?? emptySignals();
+    const tier = classifyTier(productSignals);
+    const ageMinutes = productSignals.lastCheckedAt
+      ? (now - productSignals.lastCheckedAt.getTime()) / 60_000
+      : null;
+    // Half a minute of slack so a tier's products are due on the tick that matches its interval.
+    const urgency =
+      ageMinutes === null ? Number.POSITIVE_INFINITY : (ageMinutes + 0.5) / TIER_INTERVAL_MINUTES[tier];
+    return { product, tier, ageMinutes, urgency };
+  });
+
+  const due = candidates.filter((candidate) => candidate.urgency >= 1).sort((a, b) => b.urgency - a.urgency);
+  const selected = budget > 0 ? due.slice(0, budget) : due;
+  const selectedIds = new Set(selected.map((candidate) => candidate.product.id));
+
+  for (const candidate of candidates) {
+    const freshness = tiers[candidate.tier];
+    freshness.products += 1;
+    if (candidate.urgency >= 1) {
+      freshness.due += 1;
+    }
+
+    if (selectedIds.has(candidate.product.id)) {
+      freshness.refreshed += 1;
+      continue;
+    }
+    if (candidate.urgency >= 1) {
+      freshness.deferred += 1;
+    }
+
+    if (candidate.ageMinutes === null) {
+      freshness.maxAgeMinutes = null;
+    } else if (freshness.maxAgeMinutes !== null) {
+      freshness.maxAgeMinutes = Math.max(freshness.maxAgeMinutes, Math.round(candidate.ageMinutes));
+    }
+  }
+
+  return {
+    selected: selected.map((candidate) => candidate.product),
+    deferred: due.length - selected.length,
+    tiers
+  };
+}
+
+/**
+ * Loads scheduling signals for every product with one query per signal source. Snapshot rows are
+ * matched on `lastSeenAt` so a change-only row still counts while its run overlaps the window.
+ * Rows of one product never overlap, so only the last row starting before the window can reach
+ * into it; each product's rows are read by `checkedAt` from that row on, through the existing
+ * `(productId, checkedAt)` index, instead of scanning the table for recent `lastSeenAt` values.
+ */
+export async function loadPollSignals(products: Array<{ id: string; barcode: string | null }>) {
+  const now = Date.now();
+  const signalSince = new Date(now - SIGNAL_WINDOW_HOURS * 3_600_000);
+  const salesSince = new Date(now - SALES_WINDOW_DAYS * 86_400_000);
+
+  const [snapshots, alerts, sales] = await Promise.all([
+    prisma.$queryRaw<
+      Array<{
+        productId: string;
+        lastCheckedAt: Date;
+        lastStatus: BuyBoxStatus;
+        lastCompetitorCount: number | null;
+        priceLevels: number;
+      }>
+    >`
+      SELECT p."id" AS "productId", s.*
+      FROM "Product" p
+      CROSS JOIN LATERAL (
+        SELECT MAX("lastSeenAt") AS "lastCheckedAt",
+               (ARRAY_AGG("buyboxStatus" ORDER BY "checkedAt" DESC))[1] AS "lastStatus",
+               (ARRAY_AGG("competitorCount" ORDER BY "checkedAt" DESC))[1] AS "lastCompetitorCount",
+               GREATEST(COUNT(DISTINCT "competitorMinPrice"), COUNT(DISTINCT "ourPrice"))::int AS "priceLevels"
+        FROM "PriceSnapshot"
+        WHERE "productId" = p."id"
+          AND "checkedAt" >= COALESCE(
+            (SELECT MAX("checkedAt") FROM "PriceSnapshot" WHERE "productId" = p."id" AND "checkedAt" < ${signalSince}),
+            ${signalSince}
+          )
+          AND "lastSeenAt" >= ${signalSince}
+      ) s
+      WHERE p."id" = ANY(${products.map((product) => product.id)}::text[])
+        AND s."lastCheckedAt" IS NOT NULL`,
+    prisma.alert.groupBy({
+      by: ["productId"],
+      where: { createdAt: { gte: signalSince }, type: { in: ACTIVITY_ALERT_TYPES } },
+      _count: { _all: true }
+    }),
+    prisma.$queryRaw<Array<{ barcode: string; units: number }>>`
+      SELECT oi."barcode", SUM(oi."quantity")::int AS "units"
+      FROM "order_items" oi
+      JOIN "orders" o ON o."id" = oi."orderId"
+      WHERE o."createdDate" >= ${salesSince} AND oi."barcode" IS NOT NULL
+      GROUP BY oi."barcode"`
+  ]);
+
+  const snapshotByProduct = new Map(snapshots.map((row) => [row.productId, row]));
+  const alertsByProduct = new Map(alerts.map((row) => [row.productId, row._count._all]));
+  const unitsByBarcode = new Map(sales.map((row) => [row.barcode, Number(row.units)]));
+
+  const signals = new Map<string, PollSignals>();
+  for (const product of products) {
+    const snapshot = snapshotByProduct.get(product.id);
+    signals.set(product.id, {
+      lastCheckedAt: snapshot ? new Date(snapshot.lastCheckedAt) : null,
+      lastStatus: snapshot?.lastStatus ?? null,
+      lastCompetitorCount: snapshot?.lastCompetitorCount ?? null,
+      priceLevels: snapshot ? Number(snapshot.priceLevels) : 0,
+      recentAlerts: alertsByProduct.get(product.id) ?? 0,
+      unitsSold: product.barcode ? unitsByBarcode.get(product.barcode) ?? 0 : 0
+    });
+  }
+
+  return signals;
+}
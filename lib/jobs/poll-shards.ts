@@ -0,0 +1,254 @@
+import type { Prisma } from "@prisma/client";
+import { prisma } from "@/lib/db/prisma";
+import type { TrendyolCompetitorData, TrendyolProductItem } from "@/lib/trendyol/types";
+
+export type PollRunStatus = "RUNNING" | "COMPLETED" | "SUPERSEDED";
+export type PollBatchStatus = "PENDING" | "LEASED" | "DONE" | "FAILED" | "CANCELLED";
+
+export interface PollShardItem {
+  productId: string;
+  /** Price/stock from the coordinator's catalog sync, so workers skip the per-product lookup. */
+  catalog?: Omit<TrendyolProductItem, "raw"> | null;
+  /** Buybox data from the synced catalog table, when the poll reads it instead of the API. */
+  competitor?: TrendyolCompetitorData | null;
+}
+
+export interface PollBatchResult {
+  processed: number;
+  alertsCreated: number;
+  skipped: number;
+  errors: Array<{ sku: string; message: string }>;
+}
+
+export interface LeasedPollBatch {
+  id: string;
+  runId: string;
+  items: PollShardItem[];
+  attempts: number;
+}
+
+/** A batch whose lease expires this many times (worker died mid-batch) is marked FAILED. */
+export const MAX_BATCH_ATTEMPTS = 3;
+
+// Compared in UTC, like the rate-limit buckets, so workers on any machine agree on lease expiry.
+const NOW_UTC = `(now() AT TIME ZONE 'UTC')`;
+
+const LEASE_SQL = `
+UPDATE "poll_batches" b
+SET "status" = 'LEASED',
+    "leasedBy" = $1,
+    "leaseExpiresAt" = ${NOW_UTC} + $2::int * INTERVAL '1 second',
+    "attempts" = b."attempts" + 1
+FROM (
+  SELECT pb."id"
+  FROM "poll_batches" pb
+  JOIN "poll_runs" r ON r."id" = pb."runId"
+  WHERE r."status" = 'RUNNING'
+    AND pb."attempts" < $3
+    AND (pb."status" = 'PENDING' OR (pb."status" = 'LEASED' AND pb."leaseExpiresAt" < ${NOW_UTC}))
+  ORDER BY r."createdAt", pb."position"
+  LIMIT 1
+  FOR UPDATE OF pb SKIP LOCKED
+) next
+WHERE b."id" = next."id"
+RETURNING b."id", b."runId", b."items", b."attempts"`;
+
+const RENEW_SQL = `
+UPDATE "poll_batches"
+SET "leaseExpiresAt" = ${NOW_UTC} + $3::int * INTERVAL '1 second'
+WHERE "id" = $1 AND "leasedBy" = $2 AND "status" = 'LEASED'`;
+
+const RELEASE_SQL = `
+UPDATE "poll_batches"
+SET "status" = CASE WHEN "attempts" >= $3 THEN 'FAILED' ELSE 'PENDING' END,
+    "leasedBy" = NULL,
+    "leaseExpiresAt" = NULL,
+    "resultJson" = $4::jsonb
+WHERE "id" = $1 AND "leasedBy" = $2 AND "status" = 'LEASED'`;
+
+const FAIL_ABANDONED_SQL = `
+UPDATE "poll_batches"
+SET "status" = 'FAILED', "completedAt" = ${NOW_UTC}
+WHERE "status" = 'LEASED' AND "leaseExpiresAt" < ${NOW_UTC} AND "attempts" >= $1`;
+
+const COMPLETE_RUNS_SQL = `
+UPDATE "poll_runs" r
+SET "status" = 'COMPLETED', "completedAt" = ${NOW_UTC}
+WHERE r."status" = 'RUNNING'
+  AND NOT EXISTS (
+    SELECT 1 FROM "poll_batches" b
+    WHERE b."runId" = r."id" AND b."status" IN ('PENDING', 'LEASED')
+  )
+RETURNING r."id"`;
+
+export function chunkPollItems(items: PollShardItem[], batchSize: number) {
+  const size = Math.max(1, Math.floor(batchSize));
+  const batches: PollShardItem[][] = [];
+  for (let i = 0; i < items.length; i += size) {
+    batches.push(items.slice(i, i + size));
+  }
+  return batches;
+}
+
+/** Rolls batch results up into the run summary stored on `poll_runs`. */
+export function summarizePollBatches(
+  batches: Array<{ status: string; leasedBy: string | null; resultJson: unknown }>
+) {
+  const summary = {
+    batches: { done: 0, failed: 0, cancelled: 0 },
+    processed: 0,
+    alertsCreated: 0,
+    skipped: 0,
+    errors: [] as Array<{ sku: string; message: string }>,
+    workers: [] as string[]
+  };
+  const workers = new Set<string>();
+
+  for (const batch of batches) {
+    if (batch.status === "DONE") summary.batches.done += 1;
+    if (batch.status === "FAILED") summary.batches.failed += 1;
+    if (batch.status === "CANCELLED") summary.batches.cancelled += 1;
+    if (batch.leasedBy) workers.add(batch.leasedBy);
+
+    const result = batch.resultJson as Partial<PollBatchResult> | null;
+    if (batch.status !== "DONE" || !result) {
+      continue;
+    }
+    summary.processed += result.processed ?? 0;
+    summary.alertsCreated += result.alertsCreated ?? 0;
+    summary.skipped += result.skipped ?? 0;
+    for (const error of result.errors ?? []) {
+      if (summary.errors.length < 20) summary.errors.push(error);
+    }
+  }
+
+  summary.workers = Array.from(workers).sort();
+  return summary;
+}
+
+/**
+ * Queues one poll run split into batches. While an earlier run still has batches no worker has
+ * leased, nothing is planned and that run is returned, so it can finish even when workers are
+ * slower than the schedule. Products in batches still being worked on are left out of a new run.
+ */
+export async function createPollRun(items: PollShardItem[], batchSize: number, createdBy: string) {
+  return prisma.$transaction(async (tx) => {
+    const queued = await tx.pollRun.findFirst({
+      where: { status: "RUNNING", batches: { some: { status: "PENDING" } } },
+      orderBy: { createdAt: "asc" }
+    });
+    if (queued) {
+      return queued;
+    }
+
+    const leased = await tx.pollBatch.findMany({
+      where: { status: "LEASED", run: { status: "RUNNING" } },
+      select: { items: true }
+    });
+    const inFlight = new Set(
+      leased.flatMap((batch) => (batch.items as unknown as PollShardItem[]).map((item) => item.productId))
+    );
+    const planned = inFlight.size ? items.filter((item) => !inFlight.has(item.productId)) : items;
+    const batches = chunkPollItems(planned, batchSize);
+
+    const run = await tx.pollRun.create({
+      data: {
+        status: batches.length ? "RUNNING" : "COMPLETED",
+        createdBy,
+        totalBatches: batches.length,
+        totalProducts: planned.length,
+        completedAt: batches.length ? null : new Date()
+      }
+    });
+
+    if (batches.length) {
+      await tx.pollBatch.createMany({
+        data: batches.map((batchItems, position) => ({
+          runId: run.id,
+          position,
+          items: batchItems as unknown as Prisma.InputJsonValue
+        }))
+      });
+    }
+
+    return run;
+  });
+}
+
+/** Claims the next pending batch (or one whose worker's lease expired) without blocking other workers. */
+export async function leasePollBatch(workerId: string, leaseSeconds: number): Promise<LeasedPollBatch | null> {
+  const rows = await prisma.$queryRawUnsafe<
+    Array<{ id: string; runId: string; items: PollShardItem[]; attempts: number }>
+  >(LEASE_SQL, workerId, Math.ceil(leaseSeconds), MAX_BATCH_ATTEMPTS);
+
+  return rows[0] ?? null;
+}
+
+export async function renewPollLease(batchId: string, workerId: string, leaseSeconds: number) {
+  const updated = await prisma.$executeRawUnsafe(RENEW_SQL, batchId, workerId, Math.ceil(leaseSeconds));
+  return updated > 0;
+}
+
+/** Records a finished batch. Returns false when the lease was lost and the batch handed to another worker. */
+export async function completePollBatch(batchId: string, workerId: string, result: PollBatchResult) {
+  const { count } = await prisma.pollBatch.updateMany({
+    where: { id: batchId, leasedBy: workerId, status: "LEASED" },
+    data: {
+      status: "DONE",
+      leaseExpiresAt: null,
+      resultJson: result as unknown as Prisma.InputJsonValue,
+      completedAt: new Date()
+    }
+  });
+
+  await finalizePollRuns();
+  return count > 0;
+}
+
+/** Hands a batch back after an unexpected error; it is retried until it runs out of attempts. */
+export async function releasePollBatch(batchId: string, workerId: string, message: string) {
+  await prisma.$executeRawUnsafe(
+    RELEASE_SQL,
+    batchId,
+    workerId,
+    MAX_BATCH_ATTEMPTS,
+    JSON.stringify({ error: message.slice(0, 500) })
+  );
+  await finalizePollRuns();
+}
+
+/** Fails batches abandoned too often and completes every run whose batches have all reported in. */
+export async function finalizePollRuns() {
+  await prisma.$executeRawUnsafe(FAIL_ABANDONED_SQL, MAX_BATCH_ATTEMPTS);
+  const completed = await prisma.$queryRawUnsafe<Array<{ id: string }>>(COMPLETE_RUNS_SQL);
+
+  for (const { id } of completed) {
+    const batches = await prisma.pollBatch.findMany({
+      where: { runId: id },
+      select: { status: true, leasedBy: true, resultJson: true }
+    });
+    await prisma.pollRun.update({
+      where: { id },
+      data: { summaryJson: summarizePollBatches(batches) as unknown as Prisma.InputJsonValue }
+    });
+  }
+
+  return completed.map((row) => row.id);
+}
+
+export async function getPollRunProgress(runId: string) {
+  const [run, counts] = await Promise.all([
+    prisma.pollRun.findUnique({ where: { id: runId } }),
+    prisma.pollBatch.groupBy({ by: ["status"], where: { runId }, _count: { _all: true } })
+  ]);
+
+  return {
+    id: runId,
+    status: (run?.status ?? "UNKNOWN") as PollRunStatus | "UNKNOWN",
+    totalBatches: run?.totalBatches ?? 0,
+    totalProducts: run?.totalProducts ?? 0,
+    batches: Object.fromEntries(counts.map((row) => [row.status, row._count._all])) as Partial<
+      Record<PollBatchStatus, number>
+    >
+  };
+}
@@ -0,0 +1,60 @@
+import type { BuyBoxStatus } from "@prisma/client";
+
+export interface SnapshotValues {
+  ourPrice: number | null;
+  competitorMinPrice: number | null;
+  competitorCount: number | null;
+  buyboxStatus: BuyBoxStatus;
+  buyboxSellerId: string | null;
+}
+
+interface StoredSnapshot {
+  checkedAt: Date;
+  ourPrice: unknown;
+  competitorMinPrice: unknown;
+  competitorCount: number | null;
+  buyboxStatus: BuyBoxStatus;
+  buyboxSellerId: string | null;
+}
+
+const toNumber = (value: unknown) => (value === null || value === undefined ? null : Number(value));
+
+/**
+ * In change-only mode an observation extends the latest row (`lastSeenAt`, `observations`)
+ * when every tracked field matches it and the row is younger than the heartbeat interval.
+ */
+export function canExtendSnapshot(
+  previous: StoredSnapshot | null | undefined,
+  next: SnapshotValues,
+  heartbeatMinutes: number,
+  now = Date.now()
+) {
+  if (!previous || now - previous.checkedAt.getTime() >= heartbeatMinutes * 60_000) {
+    return false;
+  }
+
+  return (
+    toNumber(previous.ourPrice) === next.ourPrice &&
+    toNumber(previous.competitorMinPrice) === next.competitorMinPrice &&
+    previous.competitorCount === next.competitorCount &&
+    previous.buyboxStatus === next.buyboxStatus &&
+    previous.buyboxSellerId === next.buyboxSellerId
+  );
+}
+
+/**
+ * Turns run-length rows (newest first, as history queries load them) into points at both ends
+ * of each run, so a chart draws the same steps it would from one row per poll.
+ */
+export function expandSnapshotRuns<T extends { checkedAt: Date; lastSeenAt: Date }>(rows: T[]) {
+  const points: T[] = [];
+
+  for (const row of rows) {
+    if (row.lastSeenAt.getTime() > row.checkedAt.getTime()) {
+      points.push({ ...row, checkedAt: row.lastSeenAt });
+    }
+    points.push(row);
+  }
+
+  return points;
+}
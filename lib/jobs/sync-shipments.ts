@@ -1,14 +1,21 @@
 import { prisma } from "@/lib/db/prisma";
+import { addStageRows, timeStage, withJobRun } from "@/lib/jobs/job-run";
+import { returnService } from "@/lib/services/return-service";
 import { trendyolClient } from "@/lib/trendyol/client";
 import type { Prisma } from "@prisma/client";
 
-export async function syncShipmentsJob(
-    options: {
-        lookbackHours?: number;
-        forceFull?: boolean;
-        maxPages?: number;
-    } = {}
-) {
+interface ShipmentSyncOptions {
+    lookbackHours?: number;
+    forceFull?: boolean;
+    maxPages?: number;
+}
+
+/** Syncs recent shipment packages; each call is recorded in `job_runs`. */
+export async function syncShipmentsJob(options: ShipmentSyncOptions = {}) {
+    return withJobRun("shipment_sync", () => syncShipmentPages(options));
+}
+
+async function syncShipmentPages(options: ShipmentSyncOptions) {
     if (!trendyolClient.isConfigured()) {
         throw new Error("Trendyol client not configured");
     }
@@ -24,18 +31,22 @@ export async function syncShipmentsJob(
 
     let page = 0;
     let totalSynced = 0;
+    const returnedPackages: string[] = [];
 
     console.log(`Starting shipment sync. Start=${new Date(startDate).toISOString()}, MaxPages=${maxPages}`);
 
     while (page < maxPages) {
-        const result = await trendyolClient.fetchShipmentPackages({
-            page,
-            size: 50,
-            startDate,
-            endDate: now,
-            orderByField: "PackageLastModifiedDate",
-            orderByDirection: "DESC"
-        });
+        const result = await timeStage("shipment_pages", () =>
+            trendyolClient.fetchShipmentPackages({
+                page,
+                size: 50,
+                startDate,
+                endDate: now,
+                orderByField: "PackageLastModifiedDate",
+                orderByDirection: "DESC"
+            })
+        );
+        addStageRows("shipment_pages", result.content.length);
 
         if (!result.content.length) {
             break;
@@ -49,41 +60,47 @@ export async function syncShipmentsJob(
             const deliveryStart = pkg.estimatedDeliveryStartDate ? new Date(pkg.estimatedDeliveryStartDate) : null;
             const deliveryEnd = pkg.estimatedDeliveryEndDate ? new Date(pkg.estimatedDeliveryEndDate) : null;
 
-            await prisma.shipmentPackage.upsert({
-                where: {
-                    sellerId_packageNumber: {
+            await timeStage("shipment_upsert", () =>
+                prisma.shipmentPackage.upsert({
+                    where: {
+                        sellerId_packageNumber: {
+                            sellerId,
+                            packageNumber: String(pkg.packageNumber)
+                        }
+                    },
+                    create: {
                         sellerId,
-                        packageNumber: String(pkg.packageNumber)
+                        packageNumber: String(pkg.packageNumber),
+                        orderNumber: pkg.orderNumber,
+                        status: pkg.shipmentPackageStatus,
+                        cargoProvider: pkg.cargoProviderName,
+                        trackingNumber: pkg.cargoTrackingNumber ? String(pkg.cargoTrackingNumber) : null,
+                        trackingLink: pkg.cargoTrackingLink,
+                        lastModifiedAt,
+                        createdAt,
+                        estimatedDeliveryStart: deliveryStart,
+                        estimatedDeliveryEnd: deliveryEnd,
+                        linesCount: pkg.lines?.length ?? 0,
+                        rawPayload: pkg as unknown as Prisma.InputJsonValue
+                    },
+                    update: {
+                        status: pkg.shipmentPackageStatus,
+                        cargoProvider: pkg.cargoProviderName,
+                        trackingNumber: pkg.cargoTrackingNumber ? String(pkg.cargoTrackingNumber) : null,
+                        trackingLink: pkg.cargoTrackingLink,
+                        lastModifiedAt,
+                        estimatedDeliveryStart: deliveryStart,
+                        estimatedDeliveryEnd: deliveryEnd,
+                        linesCount: pkg.lines?.length ?? 0,
+                        rawPayload: pkg as unknown as Prisma.InputJsonValue,
+                        syncedAt: new Date()
                     }
-                },
-                create: {
-                    sellerId,
-                    packageNumber: String(pkg.packageNumber),
-                    orderNumber: pkg.orderNumber,
-                    status: pkg.shipmentPackageStatus,
-                    cargoProvider: pkg.cargoProviderName,
-                    trackingNumber: pkg.cargoTrackingNumber ? String(pkg.cargoTrackingNumber) : null,
-                    trackingLink: pkg.cargoTrackingLink,
-                    lastModifiedAt,
-                    createdAt,
-                    estimatedDeliveryStart: deliveryStart,
-                    estimatedDeliveryEnd: deliveryEnd,
-                    linesCount: pkg.lines?.length ?? 0,
-                    rawPayload: pkg as unknown as Prisma.InputJsonValue
-                },
-                update: {
-                    status: pkg.shipmentPackageStatus,
-                    cargoProvider: pkg.cargoProviderName,
-                    trackingNumber: pkg.cargoTrackingNumber ? String(pkg.cargoTrackingNumber) : null,
-                    trackingLink: pkg.cargoTrackingLink,
-                    lastModifiedAt,
-                    estimatedDeliveryStart: deliveryStart,
-                    estimatedDeliveryEnd: deliveryEnd,
-                    linesCount: pkg.lines?.length ?? 0,
-                    rawPayload: pkg as unknown as Prisma.InputJsonValue,
-                    syncedAt: new Date()
-                }
-            });
+                })
+            );
+            addStageRows("shipment_upsert", 1);
+            if (pkg.shipmentPackageStatus === "Returned") {
+                returnedPackages.push(String(pkg.packageNumber));
+            }
 
             totalSynced++;
         }
@@ -95,5 +112,11 @@ export async function syncShipmentsJob(
         }
     }
 
-    return { totalSynced, pagesFetched: page };
+    // Returns come from the packages just stored instead of a separate API scan.
+    const returns = await timeStage("returns_derive", () =>
+        returnService.deriveReturnsFromPackages({ packageNumbers: returnedPackages })
+    );
+    addStageRows("returns_derive", returns.requests);
+
+    return { totalSynced, pagesFetched: page, returnsDerived: returns.requests };
 }
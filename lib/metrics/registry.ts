@@ -0,0 +1,229 @@
+type Labels = Record<string, string>;
+
+// Seconds; covers fast DB statements through slow Trendyol pages.
+export const DEFAULT_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30];
+
+interface CounterSeries {
+  labels: Labels;
+  value: number;
+}
+
+interface HistogramSeries {
+  labels: Labels;
+  counts: number[];
+  count: number;
+  sum: number;
+}
+
+export interface SeriesTotals {
+  count: number;
+  sum: number;
+}
+
+const seriesKey = (labels: Labels) =>
+  Object.keys(labels)
+    .sort()
+    .map((name) => `${name}=${labels[name]}`)
+    .join(",");
+
+const escapeLabel = (value: string) => value.replace(/\\/g, "\\\\").replace(/\n/g, "\\n").replace(/"/g, '\\"');
+
+const formatLabels = (labels: Labels, extra?: Labels) => {
+  const entries = Object.entries({ ...labels, ...extra });
+  return entries.length ? `{${entries.map(([name, value]) => `${name}="${escapeLabel(value)}"`).join(",")}}` : "";
+};
+
+const formatNumber = (value: number) => (Number.isFinite(value) ? String(value) : value > 0 ? "+Inf" : "-Inf");
+
+export class Counter {
+  private readonly series = new Map<string, CounterSeries>();
+
+  constructor(
+    readonly name: string,
+    readonly help: string
+  ) {}
+
+  inc(labels: Labels = {}, value = 1) {
+    const key = seriesKey(labels);
+    const series = this.series.get(key);
+    if (series) {
+      series.value += value;
+    } else {
+      this.series.set(key, { labels: { ...labels }, value });
+    }
+  }
+
+  /** Current value per value of `label`, summed over the other labels. */
+  totalsBy(label: string) {
+    const totals: Record<string, number> = {};
+    for (const series of this.series.values()) {
+      const group = series.labels[label] ?? "";
+      totals[group] = (totals[group] ?? 0) + series.value;
+    }
+    return totals;
+  }
+
+  render() {
+    const lines = [`# HELP ${this.name} ${this.help}`, `# TYPE ${this.name} counter`];
+    for (const series of this.series.values()) {
+      lines.push(`${this.name}${formatLabels(series.labels)} ${formatNumber(series.value)}`);
+    }
+    return lines.join("\n");
+  }
+
+  reset() {
+    this.series.clear();
+  }
+}
+
+export class Histogram {
+  private readonly series = new Map<string, HistogramSeries>();
+
+  constructor(
+    readonly name: string,
+    readonly help: string,
+    private readonly buckets: number[] = DEFAULT_BUCKETS
+  ) {}
+
+  observe(labels: Labels, value: number) {
+    const key = seriesKey(labels);
+    let series = this.series.get(key);
+    if (!series) {
+      series = { labels: { ...labels }, counts: this.buckets.map(() => 0), count: 0, sum: 0 };
+      this.series.set(key, series);
+    }
+
+    series.count += 1;
+    series.sum += value;
+    for (let index = 0; index < this.buckets.length; index += 1) {
+      if (value <= this.buckets[index]) {
+        series.counts[index] += 1;
+      }
+    }
+  }
+
+  /** Count and sum per value of `label`, summed over the other labels. */
+  totalsBy(label: string) {
+    const totals: Record<string, SeriesTotals> = {};
+    for (const series of this.series.values()) {
+      const group = series.labels[label] ?? "";
+      const current = (totals[group] ??= { count: 0, sum: 0 });
+      current.count += series.count;
+      current.sum += series.sum;
+    }
+    return totals;
+  }
+
+  render() {
+    const lines = [`# HELP ${this.name} ${this.help}`, `# TYPE ${this.name} histogram`];
+    for (const series of this.series.values()) {
+      this.buckets.forEach((bucket, index) => {
+        lines.push(`${this.name}_bucket${formatLabels(series.labels, { le: String(bucket) })} ${series.counts[index]}`);
+      });
+      lines.push(`${this.name}_bucket${formatLabels(series.labels, { le: "+Inf" })} ${series.count}`);
+      lines.push(`${this.name}_sum${formatLabels(series.labels)} ${formatNumber(series.sum)}`);
+      lines.push(`${this.name}_count${formatLabels(series.labels)} ${series.count}`);
+    }
+    return lines.join("\n");
+  }
+
+  reset() {
+    this.series.clear();
+  }
+}
+
+/**
+ * Process-local metric registry rendered in the Prometheus text format by `/api/metrics`.
+ * Metrics are registered once per name, so modules can declare them at import time.
+ */
+export class MetricsRegistry {
+  private readonly metrics = new Map<string, Counter | Histogram>();
+
+  counter(name: string, help: string) {
+    const existing = this.metrics.get(name);
+    if (existing instanceof Counter) {
+      return existing;
+    }
+    const counter = new Counter(name, help);
+    this.metrics.set(name, counter);
+    return counter;
+  }
+
+  histogram(name: string, help: string, buckets?: number[]) {
+    const existing = this.metrics.get(name);
+    if (existing instanceof Histogram) {
+      return existing;
+    }
+    const histogram = new Histogram(name, help, buckets);
+    this.metrics.set(name, histogram);
+    return histogram;
+  }
+
+  render() {
+    return Array.from(this.metrics.values(), (metric) => metric.render()).join("\n");
+  }
+
+  reset() {
+    for (const metric of this.metrics.values()) {
+      metric.reset();
+    }
+  }
+}
+
+declare global {
+  var __metrics__: MetricsRegistry | undefined;
+}
+
+// Kept on `global` like the Prisma client so dev-server reloads keep one registry.
+export const metrics = global.__metrics__ ?? (global.__metrics__ = new MetricsRegistry());
+
+export function renderGauge(name: string, help: string, samples: Array<{ labels?: Labels; value: number }>) {
+  const lines = [`# HELP ${name} ${help}`, `# TYPE ${name} gauge`];
+  for (const sample of samples) {
+    lines.push(`${name}${formatLabels(sample.labels ?? {})} ${formatNumber(sample.value)}`);
+  }
+  return lines.join("\n");
+}
+
+export const httpRequestDuration = metrics.histogram(
+  "trendyol_http_request_duration_seconds",
+  "Trendyol API request latency by endpoint family and status."
+);
+export const httpRetries = metrics.counter(
+  "trendyol_http_retries_total",
+  "Trendyol API attempts that were retried, by endpoint family and reason."
+);
+export const circuitRejections = metrics.counter(
+  "trendyol_circuit_rejections_total",
+  "Trendyol requests failed fast because their endpoint family's circuit was open."
+);
+export const circuitOpens = metrics.counter(
+  "trendyol_circuit_opens_total",
+  "Times this process opened an endpoint family's circuit (including failed probes)."
+);
+export const rateLimitWait = metrics.histogram(
+  "trendyol_rate_limit_wait_seconds",
+  "Time spent waiting for a rate-limit token before a Trendyol request."
+);
+export const dbQueryDuration = metrics.histogram(
+  "db_query_duration_seconds",
+  "Prisma statement latency by operation and table."
+);
+export const jobStageDuration = metrics.histogram(
+  "job_stage_duration_seconds",
+  "Time spent per job stage; concurrent calls of a stage are summed."
+);
+export const responseCacheRequests = metrics.counter(
+  "response_cache_requests_total",
+  "Cached API responses by cache and result (hit, miss, stale, not_modified, bypass)."
+);
+export const exportRowsWritten = metrics.counter(
+  "export_rows_total",
+  "Rows streamed by the export endpoints by source and format."
+);
+export const jobStageRows = metrics.counter("job_stage_rows_total", "Rows handled per job stage.");
+export const jobRunDuration = metrics.histogram(
+  "job_run_duration_seconds",
+  "Wall time of sync and poll runs by job and status.",
+  [1, 5, 15, 30, 60, 120, 240, 300, 600, 1200]
+);
@@ -0,0 +1,211 @@
+import type { Prisma } from "@prisma/client";
+import { publishProductChanges } from "@/lib/dashboard/product-changes";
+import { prisma } from "@/lib/db/prisma";
+import { refreshSnapshotForProduct } from "@/lib/jobs/poll-products";
+import { computeFees, enforcedFloorPrice } from "@/lib/pricing/calculator";
+import {
+  getEffectiveSettingsForProduct,
+  getOrCreateGlobalSettings,
+  mergeSettings
+} from "@/lib/pricing/effective-settings";
+import { suggestedPrice } from "@/lib/pricing/suggested-price";
+import type { EffectiveProductSettings } from "@/lib/pricing/types";
+import type { ProductsSuggestBatchEvent, ProductsSuggestBatchFailure } from "@/lib/table/products-batch";
+import { trendyolClient, trendyolErrorStatus } from "@/lib/trendyol/client";
+
+/** Prices submitted per Trendyol request; each request takes one token from the shared rate limit. */
+export const PRICE_UPDATE_BATCH_SIZE = 100;
+
+// Snapshots written after a batch is accepted, at most this many at once (like poll chunks).
+const SNAPSHOT_CONCURRENCY = 10;
+
+export type SuggestedPricePlan =
+  | { ok: true; price: number; enforcedFloor: number; projectedProfit: number }
+  | Omit<ProductsSuggestBatchFailure, "productId" | "sku">;
+
+/**
+ * The price `update-price` would apply with `method: "SUGGESTED"`, or why it would refuse:
+ * missing cost price, no suggestion, or a price under the no-loss floor (status 422).
+ */
+export function planSuggestedPrice(input: {
+  sku: string;
+  ourPrice: number | null;
+  competitorMin: number | null;
+  settings: EffectiveProductSettings;
+  minPrice: number;
+}): SuggestedPricePlan {
+  const { sku, ourPrice, competitorMin, settings, minPrice } = input;
+  if (!Number.isFinite(settings.costPrice) || settings.costPrice <= 0) {
+    return { error: `Cannot update price for ${sku}: set Cost Price first in product settings.`, status: 400 };
+  }
+
+  const enforcedFloor = enforcedFloorPrice(settings, minPrice);
+  const price = suggestedPrice({ competitorMin, ourPrice, settings, minPrice, bypassCooldown: true }).suggested;
+  if (!price) {
+    return { error: "No suggested price available", status: 400 };
+  }
+
+  const projectedProfit = computeFees(price, settings).profitSar;
+  if (price < enforcedFloor || projectedProfit < 0) {
+    return {
+      error: "Price is below enforced no-loss floor",
+      status: 422,
+      enforcedFloor,
+      attemptedPrice: price,
+      projectedProfit
+    };
+  }
+
+  return { ok: true, price, enforcedFloor, projectedProfit };
+}
+
+const toNumber = (value: unknown) => (value === null || value === undefined ? null : Number(value));
+
+interface AcceptedPrice {
+  productId: string;
+  sku: string;
+  product: Awaited<ReturnType<typeof loadProducts>>[number];
+  ourPrice: number | null;
+  price: number;
+}
+
+function loadProducts(productIds: string[]) {
+  return prisma.product.findMany({
+    where: { id: { in: productIds } },
+    include: {
+      settings: true,
+      snapshots: {
+        orderBy: { checkedAt: "desc" },
+        take: 1
+      }
+    }
+  });
+}
+
+// Global settings are loaded once and merged with each loaded settings row, like export margins;
+// only a product without a settings row goes through the per-product lookup, which creates it.
+async function loadPlans(productIds: string[]) {
+  const [products, globalSettings] = await Promise.all([loadProducts(productIds), getOrCreateGlobalSettings()]);
+  const byId = new Map(products.map((product) => [product.id, product]));
+
+  return Promise.all(
+    productIds.map(async (productId) => {
+      const product = byId.get(productId);
+      if (!product) {
+        return { productId, sku: productId, plan: { error: "Product not found", status: 404 } as SuggestedPricePlan };
+      }
+
+      const snapshot = product.snapshots[0];
+      const plan = planSuggestedPrice({
+        sku: product.sku,
+        ourPrice: toNumber(snapshot?.ourPrice),
+        competitorMin: toNumber(snapshot?.competitorMinPrice),
+        settings: product.settings
+          ? mergeSettings(globalSettings, product.settings)
+          : await getEffectiveSettingsForProduct(product.id),
+        minPrice: product.settings?.minPrice ? Number(product.settings.minPrice) : 0
+      });
+      return { productId, sku: product.sku, product, ourPrice: toNumber(snapshot?.ourPrice), plan };
+    })
+  );
+}
+
+/**
+ * Applies suggested prices to `productIds` with the same checks as the single-product route.
+ * Products are loaded in one query; accepted prices go to Trendyol in batches of
+ * `PRICE_UPDATE_BATCH_SIZE`, each logged and snapshotted with the submitted price.
+ * A failed batch fails only its own items. `onEvent` receives progress and per-item failures.
+ */
+export async function runBulkPriceApply(
+  productIds: string[],
+  onEvent: (event: ProductsSuggestBatchEvent) => void = () => {}
+) {
+  const ids = Array.from(new Set(productIds));
+  const progress = { total: ids.length, completed: 0, succeeded: 0, failed: 0 };
+  const fail = (failure: ProductsSuggestBatchFailure) => {
+    progress.completed += 1;
+    progress.failed += 1;
+    onEvent({ type: "failure", ...failure });
+  };
+
+  onEvent({ type: "progress", ...progress });
+
+  const accepted: AcceptedPrice[] = [];
+  for (const item of await loadPlans(ids)) {
+    if (!("ok" in item.plan)) {
+      fail({ productId: item.productId, sku: item.sku, ...item.plan });
+    } else if (item.product) {
+      accepted.push({
+        productId: item.productId,
+        sku: item.sku,
+        product: item.product,
+        ourPrice: item.ourPrice ?? null,
+        price: item.plan.price
+      });
+    }
+  }
+  if (progress.failed) {
+    onEvent({ type: "progress", ...progress });
+  }
+
+  for (let i = 0; i < accepted.length; i += PRICE_UPDATE_BATCH_SIZE) {
+    const batch = accepted.slice(i, i + PRICE_UPDATE_BATCH_SIZE);
+
+    let raw: unknown;
+    try {
+      const response = await trendyolClient.updatePrices(
+        batch.map(({ product, price }) => ({ reference: product.barcode || product.sku, price }))
+      );
+      raw = response.raw;
+    } catch (error) {
+      const message = error instanceof Error ? error.message : "Price update failed";
+      for (const { productId, sku } of batch) {
+        fail({ productId, sku, error: message, status: trendyolErrorStatus(error) ?? undefined });
+      }
+      onEvent({ type: "progress", ...progress });
+      continue;
+    }
+
+    await prisma.priceChangeLog.createMany({
+      data: batch.map(({ productId, ourPrice, price }) => ({
+        productId,
+        oldPrice: ourPrice,
+        newPrice: price,
+        method: "SUGGESTED" as const,
+        trendyolResponseJson: raw as Prisma.InputJsonValue
+      }))
+    });
+
+    for (let j = 0; j < batch.length; j += SNAPSHOT_CONCURRENCY) {
+      await Promise.all(
+        batch.slice(j, j + SNAPSHOT_CONCURRENCY).map(async ({ product, price }) => {
+          try {
+            // Trendyol applies batches asynchronously; the next poll confirms the live price.
+            await refreshSnapshotForProduct(product, {
+              sku: product.sku,
+              barcode: product.barcode,
+              title: product.title,
+              productId: product.trendyolProductId,
+              active: product.active,
+              ourPrice: price,
+              raw: { source: "price_update", batch: raw }
+            });
+          } catch (error) {
+            console.warn(
+              `[bulk-apply] Snapshot after price update failed for ${product.sku}:`,
+              error instanceof Error ? error.message : error
+            );
+          }
+        })
+      );
+    }
+
+    await publishProductChanges("price_change", batch.map(({ productId }) => productId));
+    progress.completed += batch.length;
+    progress.succeeded += batch.length;
+    onEvent({ type: "progress", ...progress });
+  }
+
+  onEvent({ type: "done", ...progress });
+  return progress;
+}
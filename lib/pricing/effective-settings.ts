@@ -4,6 +4,14 @@ import type {
   ProductSettings
 } from "@prisma/client";
 import { prisma } from "@/lib/db/prisma";
+import {
+  getGlobalSettingsVersion,
+  readCachedEffectiveSettings,
+  readCachedGlobalSettings,
+  settingsVersionStamp,
+  writeCachedEffectiveSettings,
+  writeCachedGlobalSettings
+} from "@/lib/pricing/settings-cache";
 import type { EffectiveProductSettings } from "@/lib/pricing/types";
 
 export const decimalToNumber = (value: unknown, fallback = 0) =>
@@ -49,7 +57,7 @@ export function mergeSettings(
   };
 }
 
-export async function getOrCreateGlobalSettings() {
+async function loadOrCreateGlobalSettings() {
   const existing = await prisma.globalSettings.findFirst();
   if (existing) {
     return existing;
@@ -62,6 +70,18 @@ export async function getOrCreateGlobalSettings() {
   });
 }
 
+export async function getOrCreateGlobalSettings() {
+  const cached = readCachedGlobalSettings();
+  if (cached) {
+    return cached;
+  }
+
+  const version = getGlobalSettingsVersion();
+  const settings = await loadOrCreateGlobalSettings();
+  writeCachedGlobalSettings(settings, version);
+  return settings;
+}
+
 export async function getOrCreateProductSettings(productId: string) {
   const settings = await prisma.productSettings.findUnique({ where: { productId } });
   if (settings) {
@@ -76,11 +96,32 @@ export async function getOrCreateProductSettings(productId: string) {
   });
 }
 
-export async function getEffectiveSettingsForProduct(productId: string): Promise<EffectiveProductSettings> {
+/**
+ * Returns merged settings for a product, memoised per product under a version stamp.
+ * Callers that already loaded the product's settings row (e.g. via `include: { settings: true }`)
+ * can pass it; that row is merged with the cached global settings and always wins over the
+ * per-product entry, which is neither read nor written.
+ */
+export async function getEffectiveSettingsForProduct(
+  productId: string,
+  knownProductSettings?: ProductSettings | null
+): Promise<EffectiveProductSettings> {
+  if (knownProductSettings) {
+    return mergeSettings(await getOrCreateGlobalSettings(), knownProductSettings);
+  }
+
+  const cached = readCachedEffectiveSettings(productId);
+  if (cached) {
+    return cached;
+  }
+
+  const version = settingsVersionStamp(productId);
   const [globalSettings, productSettings] = await Promise.all([
     getOrCreateGlobalSettings(),
     getOrCreateProductSettings(productId)
   ]);
 
-  return mergeSettings(globalSettings, productSettings);
+  const merged = mergeSettings(globalSettings, productSettings);
+  writeCachedEffectiveSettings(productId, merged, version);
+  return merged;
 }
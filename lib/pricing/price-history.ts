@@ -0,0 +1,143 @@
+import { env } from "@/lib/config/env";
+import { prisma } from "@/lib/db/prisma";
+
+export const HISTORY_RANGES = {
+  "24h": 24 * 3_600_000,
+  "7d": 7 * 86_400_000,
+  "30d": 30 * 86_400_000,
+  "90d": 90 * 86_400_000,
+  "365d": 365 * 86_400_000
+} as const;
+
+export type HistoryRange = keyof typeof HISTORY_RANGES;
+
+export const DEFAULT_HISTORY_POINTS = 200;
+export const MAX_HISTORY_POINTS = 500;
+// Buckets never get narrower than one poll interval.
+const MIN_BUCKET_SECONDS = 300;
+
+export interface HistoryWindow {
+  from: Date;
+  to: Date;
+  buckets: number;
+  bucketSeconds: number;
+}
+
+export interface PriceHistoryPoint {
+  t: string;
+  ourPrice: number | null;
+  ourPriceMin: number | null;
+  ourPriceMax: number | null;
+  competitorMin: number | null;
+  competitorMinLow: number | null;
+  competitorMinHigh: number | null;
+  /** Share of observations with a known buybox status where we held the buybox (0..1). */
+  winRatio: number | null;
+  /** Polls that fall in the bucket, including ones whose buybox status was UNKNOWN. */
+  observations: number;
+}
+
+/**
+ * Resolves `from`/`to` (ISO) or a `range` preset ending now, and a bucket count capped at
+ * MAX_HISTORY_POINTS, so the series size is bounded whatever the range.
+ */
+export function resolveHistoryWindow(
+  params: { from?: string | null; to?: string | null; range?: string | null; points?: string | null },
+  now = Date.now()
+): HistoryWindow {
+  const toMs = params.to && !Number.isNaN(Date.parse(params.to)) ? Date.parse(params.to) : now;
+  const rangeMs = HISTORY_RANGES[(params.range ?? "7d") as HistoryRange] ?? HISTORY_RANGES["7d"];
+  let fromMs = params.from && !Number.isNaN(Date.parse(params.from)) ? Date.parse(params.from) : toMs - rangeMs;
+  if (fromMs >= toMs) {
+    fromMs = toMs - rangeMs;
+  }
+
+  const requested = Math.floor(Number(params.points)) || DEFAULT_HISTORY_POINTS;
+  const spanSeconds = (toMs - fromMs) / 1000;
+  const buckets = Math.max(
+    1,
+    Math.min(MAX_HISTORY_POINTS, requested, Math.ceil(spanSeconds / MIN_BUCKET_SECONDS))
+  );
+
+  return {
+    from: new Date(fromMs),
+    to: new Date(toMs),
+    buckets,
+    bucketSeconds: spanSeconds / buckets
+  };
+}
+
+/**
+ * Time-bucketed price history. A change-only snapshot row counts towards every bucket its
+ * `checkedAt`..`lastSeenAt` run overlaps, weighted by the share of its observations that fall
+ * there, so the series matches what one row per poll would give.
+ */
+export async function loadPriceHistory(productId: string, window: HistoryWindow): Promise<PriceHistoryPoint[]> {
+  // Runs never outlast the heartbeat, so older rows can be skipped through the (productId, checkedAt) index.
+  const scanFrom = new Date(window.from.getTime() - env.SNAPSHOT_HEARTBEAT_MINUTES * 60_000);
+
+  const rows = await prisma.$queryRaw<
+    Array<{
+      bucket: number;
+      ourPrice: number | null;
+      ourPriceMin: number | null;
+      ourPriceMax: number | null;
+      competitorMin: number | null;
+      competitorMinLow: number | null;
+      competitorMinHigh: number | null;
+      wins: number;
+      decided: number | null;
+      observations: number;
+    }>
+  >`
+    WITH buckets AS (
+      SELECT b AS "bucket",
+             ${window.from}::timestamp + b * ${window.bucketSeconds}::float8 * INTERVAL '1 second' AS "start",
+             ${window.from}::timestamp + (b + 1) * ${window.bucketSeconds}::float8 * INTERVAL '1 second' AS "end"
+      FROM generate_series(0, ${window.buckets}::int - 1) AS b
+    ),
+    weighted AS (
+      SELECT k."bucket", s."ourPrice", s."competitorMinPrice", s."buyboxStatus",
+             CASE WHEN s."lastSeenAt" > s."checkedAt"
+               THEN s."observations" * EXTRACT(EPOCH FROM (LEAST(s."lastSeenAt", k."end") - GREATEST(s."checkedAt", k."start")))
+                    / EXTRACT(EPOCH FROM (s."lastSeenAt" - s."checkedAt"))
+               ELSE s."observations"
+             END AS "weight"
+      FROM "PriceSnapshot" s
+      JOIN buckets k ON s."checkedAt" < k."end" AND s."lastSeenAt" >= k."start"
+      WHERE s."productId" = ${productId}
+        AND s."checkedAt" >= ${scanFrom}
+        AND s."checkedAt" < ${window.to}
+        AND s."lastSeenAt" >= ${window.from}
+    )
+    SELECT "bucket",
+           (SUM("ourPrice" * "weight") FILTER (WHERE "ourPrice" IS NOT NULL)
+             / NULLIF(SUM("weight") FILTER (WHERE "ourPrice" IS NOT NULL), 0))::float8 AS "ourPrice",
+           MIN("ourPrice")::float8 AS "ourPriceMin",
+           MAX("ourPrice")::float8 AS "ourPriceMax",
+           (SUM("competitorMinPrice" * "weight") FILTER (WHERE "competitorMinPrice" IS NOT NULL)
+             / NULLIF(SUM("weight") FILTER (WHERE "competitorMinPrice" IS NOT NULL), 0))::float8 AS "competitorMin",
+           MIN("competitorMinPrice")::float8 AS "competitorMinLow",
+           MAX("competitorMinPrice")::float8 AS "competitorMinHigh",
+           COALESCE(SUM("weight") FILTER (WHERE "buyboxStatus" = 'WIN'), 0)::float8 AS "wins",
+           SUM("weight") FILTER (WHERE "buyboxStatus" <> 'UNKNOWN')::float8 AS "decided",
+           SUM("weight")::float8 AS "observations"
+    FROM weighted
+    WHERE "weight" > 0
+    GROUP BY "bucket"
+    ORDER BY "bucket"`;
+
+  const round = (value: number | null) => (value === null ? null : Math.round(value * 100) / 100);
+
+  return rows.map((row) => ({
+    t: new Date(window.from.getTime() + Number(row.bucket) * window.bucketSeconds * 1000).toISOString(),
+    ourPrice: round(row.ourPrice),
+    ourPriceMin: round(row.ourPriceMin),
+    ourPriceMax: round(row.ourPriceMax),
+    competitorMin: round(row.competitorMin),
+    competitorMinLow: round(row.competitorMinLow),
+    competitorMinHigh: round(row.competitorMinHigh),
+    winRatio: row.decided ? Math.round((Number(row.wins) / Number(row.decided)) * 1000) / 1000 : null,
+    observations: Math.round(Number(row.observations ?? 0))
+  }));
+}
@@ -0,0 +1,128 @@
+import type { GlobalSettings } from "@prisma/client";
+import { env } from "@/lib/config/env";
+import type { EffectiveProductSettings } from "@/lib/pricing/types";
+
+interface CachedGlobalSettings {
+  version: number;
+  cachedAt: number;
+  value: GlobalSettings;
+}
+
+interface CachedEffectiveSettings {
+  version: string;
+  cachedAt: number;
+  value: EffectiveProductSettings;
+}
+
+export interface SettingsCacheStats {
+  globalVersion: number;
+  globalCached: boolean;
+  productEntries: number;
+  hits: number;
+  misses: number;
+}
+
+// Global settings are shared by every merged entry, so bumping this counter
+// invalidates the whole per-product cache without walking it.
+let globalVersion = 0;
+const productVersions = new Map<string, number>();
+
+let globalEntry: CachedGlobalSettings | null = null;
+const effectiveEntries = new Map<string, CachedEffectiveSettings>();
+
+let hits = 0;
+let misses = 0;
+
+const ttlMs = () => env.SETTINGS_CACHE_TTL_SECONDS * 1000;
+
+function isFresh(cachedAt: number) {
+  const ttl = ttlMs();
+  return ttl > 0 && Date.now() - cachedAt < ttl;
+}
+
+export function settingsVersionStamp(productId: string) {
+  return `${globalVersion}:${productVersions.get(productId) ?? 0}`;
+}
+
+export function getGlobalSettingsVersion() {
+  return globalVersion;
+}
+
+export function readCachedGlobalSettings(): GlobalSettings | null {
+  if (globalEntry && globalEntry.version === globalVersion && isFresh(globalEntry.cachedAt)) {
+    hits += 1;
+    return globalEntry.value;
+  }
+
+  misses += 1;
+  return null;
+}
+
+/**
+ * Stores the loaded row only if no invalidation happened since `version` was read,
+ * so a slow read cannot overwrite a newer write.
+ */
+export function writeCachedGlobalSettings(value: GlobalSettings, version: number) {
+  if (version !== globalVersion) {
+    return;
+  }
+
+  globalEntry = { version, cachedAt: Date.now(), value };
+}
+
+export function readCachedEffectiveSettings(productId: string): EffectiveProductSettings | null {
+  const entry = effectiveEntries.get(productId);
+  if (entry && entry.version === settingsVersionStamp(productId) && isFresh(entry.cachedAt)) {
+    hits += 1;
+    return entry.value;
+  }
+
+  if (entry) {
+    effectiveEntries.delete(productId);
+  }
+
+  misses += 1;
+  return null;
+}
+
+export function writeCachedEffectiveSettings(
+  productId: string,
+  value: EffectiveProductSettings,
+  version: string
+) {
+  if (version !== settingsVersionStamp(productId)) {
+    return;
+  }
+
+  effectiveEntries.set(productId, { version, cachedAt: Date.now(), value });
+}
+
+export function invalidateGlobalSettingsCache() {
+  globalVersion += 1;
+  globalEntry = null;
+  effectiveEntries.clear();
+}
+
+export function invalidateProductSettingsCache(productId: string) {
+  productVersions.set(productId, (productVersions.get(productId) ?? 0) + 1);
+  effectiveEntries.delete(productId);
+}
+
+export function getSettingsCacheStats(): SettingsCacheStats {
+  return {
+    globalVersion,
+    globalCached: globalEntry !== null,
+    productEntries: effectiveEntries.size,
+    hits,
+    misses
+  };
+}
+
+export function resetSettingsCache() {
+  globalVersion = 0;
+  productVersions.clear();
+  globalEntry = null;
+  effectiveEntries.clear();
+  hits = 0;
+  misses = 0;
+}
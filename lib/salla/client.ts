@@ -198,6 +198,22 @@ export function mapSallaProduct(raw: unknown): SallaProductRecord | null {
   };
 }
 
+export function extractSallaBarcode(raw: unknown): string | null {
+  const source = toObject(raw);
+  if (!source) {
+    return null;
+  }
+
+  for (const key of ["barcode", "gtin", "mpn"]) {
+    const value = source[key];
+    if (value !== null && value !== undefined && String(value).trim()) {
+      return String(value).trim();
+    }
+  }
+
+  return null;
+}
+
 function extractListPayload(result: unknown): unknown[] {
   if (Array.isArray(result)) {
     return result;
@@ -617,6 +633,40 @@ export class SallaClient {
 
     return products;
   }
+
+  /**
+   * One catalog page. `rowCount` is the number of rows Salla returned, including ones that did
+   * not map to a product, and `perPage` the page size actually requested after clamping, so
+   * callers can tell a short page from a page with unmappable rows.
+   */
+  async fetchProductsPage(page = 1, pageSize = 100) {
+    const perPage = Math.max(1, Math.min(100, pageSize));
+    const params = new URLSearchParams({
+      page: String(page),
+      per_page: String(perPage)
+    });
+
+    const response = await this.request<unknown>(`/products?${params.toString()}`);
+    const rows = extractListPayload(response);
+
+    const products: SallaProductRecord[] = [];
+    for (const row of rows) {
+      const mapped = mapSallaProduct(row);
+      if (mapped) {
+        products.push(mapped);
+      }
+    }
+
+    const pagination = toObject(toObject(response)?.pagination);
+    const totalPages = toNumber(pagination?.totalPages ?? pagination?.total_pages);
+
+    return {
+      products,
+      rowCount: rows.length,
+      perPage,
+      totalPages: totalPages !== null && totalPages > 0 ? totalPages : null
+    };
+  }
 }
 
 export const sallaClient = new SallaClient();
@@ -0,0 +1,221 @@
+import {
+  MIN_CONFIDENCE_SCORE,
+  STOPWORDS,
+  prepareMatchText,
+  scorePreparedSimilarity,
+  type PreparedMatchText
+} from "@/lib/salla/matcher";
+import type { SallaMatchOutcome, SallaMirrorRecord } from "@/lib/salla/types";
+
+// Tokens that appear in at most this many records (or this share of the catalog, whichever
+// is larger) are "strong" and drive candidate retrieval on their own.
+const STRONG_TOKEN_MIN_DF = 50;
+const STRONG_TOKEN_MAX_SHARE = 0.05;
+// Only the best-weighted candidates are passed to the exact scorer. When more records than this
+// share the query's tokens, a record with less shared IDF weight but a higher exact score is
+// missed, so results approximate the brute-force scan rather than always equal it.
+const MAX_SCORED_CANDIDATES = 200;
+
+export interface SallaMatchInput {
+  sku?: string | null;
+  barcode?: string | null;
+  name?: string | null;
+  threshold?: number;
+}
+
+const normalizeKey = (value: string | null | undefined) => value?.trim().toLowerCase() || null;
+
+function indexableTokens(prepared: PreparedMatchText) {
+  return Array.from(prepared.tokenSet).filter((token) => !STOPWORDS.has(token));
+}
+
+function noMatch(
+  reason: SallaMatchOutcome["reason"],
+  score: number | null = null,
+  candidates: SallaMatchOutcome["candidates"] = []
+): SallaMatchOutcome {
+  return {
+    matched: false,
+    method: null,
+    score,
+    reason,
+    product: null,
+    candidates
+  };
+}
+
+/**
+ * In-memory lookup over the mirrored Salla catalog: exact SKU/barcode hashes plus an
+ * IDF-weighted token -> record posting list. Every record name is normalised and tokenised
+ * once at build time; name matching retrieves candidates sharing strong (rare) tokens and
+ * runs the exact `scoreNameSimilarity` formula only on the best-weighted of those. The best
+ * match is approximately, not always exactly, the brute-force one (see `MAX_SCORED_CANDIDATES`).
+ */
+export class SallaMatchIndex {
+  private readonly records: SallaMirrorRecord[];
+  private readonly prepared: PreparedMatchText[];
+  private readonly bySku = new Map<string, SallaMirrorRecord>();
+  private readonly byBarcode = new Map<string, SallaMirrorRecord>();
+  private readonly postings = new Map<string, number[]>();
+  private readonly idf = new Map<string, number>();
+  private readonly strongDfLimit: number;
+
+  constructor(records: SallaMirrorRecord[]) {
+    this.records = records;
+    this.prepared = records.map((record) => prepareMatchText(record.name));
+    this.strongDfLimit = Math.max(STRONG_TOKEN_MIN_DF, Math.floor(records.length * STRONG_TOKEN_MAX_SHARE));
+
+    records.forEach((record, position) => {
+      const sku = normalizeKey(record.sku);
+      if (sku && !this.bySku.has(sku)) {
+        this.bySku.set(sku, record);
+      }
+
+      const barcode = normalizeKey(record.barcode);
+      if (barcode && !this.byBarcode.has(barcode)) {
+        this.byBarcode.set(barcode, record);
+      }
+
+      for (const token of indexableTokens(this.prepared[position])) {
+        const list = this.postings.get(token);
+        if (list) {
+          list.push(position);
+        } else {
+          this.postings.set(token, [position]);
+        }
+      }
+    });
+
+    const total = Math.max(1, records.length);
+    this.postings.forEach((list, token) => {
+      this.idf.set(token, Math.log(1 + total / list.length));
+    });
+  }
+
+  get size() {
+    return this.records.length;
+  }
+
+  get vocabularySize() {
+    return this.postings.size;
+  }
+
+  findExact(input: { sku?: string | null; barcode?: string | null }) {
+    const sku = normalizeKey(input.sku);
+    const barcode = normalizeKey(input.barcode);
+
+    // Trendyol barcodes are frequently reused as Salla SKUs and vice versa.
+    return (
+      (sku ? this.bySku.get(sku) : undefined) ??
+      (barcode ? this.byBarcode.get(barcode) : undefined) ??
+      (barcode ? this.bySku.get(barcode) : undefined) ??
+      (sku ? this.byBarcode.get(sku) : undefined) ??
+      null
+    );
+  }
+
+  /**
+   * Returns record positions sharing at least one query token, ranked by the summed IDF of
+   * the shared tokens. With `strongOnly`, retrieval uses only rare tokens (falling back to
+   * the two rarest when the query has none).
+   */
+  private retrieve(query: PreparedMatchText, strongOnly: boolean) {
+    let tokens = indexableTokens(query).filter((token) => this.postings.has(token));
+
+    if (strongOnly) {
+      const strong = tokens.filter((token) => (this.postings.get(token)?.length ?? 0) <= this.strongDfLimit);
+      tokens = strong.length
+        ? strong
+        : tokens
+            .sort((a, b) => (this.postings.get(a)?.length ?? 0) - (this.postings.get(b)?.length ?? 0))
+            .slice(0, 2);
+    }
+
+    const weights = new Map<number, number>();
+    for (const token of tokens) {
+      const weight = this.idf.get(token) ?? 0;
+      for (const position of this.postings.get(token) ?? []) {
+        weights.set(position, (weights.get(position) ?? 0) + weight);
+      }
+    }
+
+    return Array.from(weights.entries())
+      .sort((a, b) => b[1] - a[1])
+      .slice(0, MAX_SCORED_CANDIDATES)
+      .map(([position]) => position);
+  }
+
+  private scoreCandidates(query: PreparedMatchText, positions: number[]) {
+    return positions
+      .map((position) => ({
+        product: this.records[position],
+        score: scorePreparedSimilarity(query, this.prepared[position])
+      }))
+      .sort((a, b) => b.score - a.score);
+  }
+
+  candidatesForName(name: string) {
+    return this.retrieve(prepareMatchText(name), true).map((position) => this.records[position]);
+  }
+
+  match(input: SallaMatchInput): SallaMatchOutcome {
+    const threshold = input.threshold ?? MIN_CONFIDENCE_SCORE;
+    const exact = this.findExact(input);
+
+    if (exact) {
+      return {
+        matched: true,
+        method: "SKU",
+        score: 1,
+        reason: "MATCHED",
+        product: exact,
+        candidates: [{ id: exact.id, sku: exact.sku, name: exact.name, score: 1 }]
+      };
+    }
+
+    const name = input.name?.trim();
+    if (!name) {
+      return noMatch("NO_CANDIDATES");
+    }
+
+    const query = prepareMatchText(name);
+    let scored = this.scoreCandidates(query, this.retrieve(query, true));
+
+    // A name made only of common tokens can still match well; widen before giving up.
+    if (!scored.length || scored[0].score < threshold) {
+      const widened = this.scoreCandidates(query, this.retrieve(query, false));
+      if (widened.length && (!scored.length || widened[0].score > scored[0].score)) {
+        scored = widened;
+      }
+    }
+
+    if (!scored.length) {
+      return noMatch("NO_CANDIDATES");
+    }
+
+    const preview = scored.slice(0, 5).map(({ product, score }) => ({
+      id: product.id,
+      sku: product.sku,
+      name: product.name,
+      score
+    }));
+
+    const best = scored[0];
+    if (best.score < threshold) {
+      return noMatch("NO_CONFIDENT_MATCH", best.score, preview);
+    }
+
+    return {
+      matched: true,
+      method: "NAME",
+      score: best.score,
+      reason: "MATCHED",
+      product: best.product,
+      candidates: preview
+    };
+  }
+
+  matchMany(inputs: SallaMatchInput[]): SallaMatchOutcome[] {
+    return inputs.map((input) => this.match(input));
+  }
+}
@@ -1,8 +1,8 @@
 import { sallaClient } from "@/lib/salla/client";
 import type { SallaMatchOutcome, SallaProductRecord } from "@/lib/salla/types";
 
-const MIN_CONFIDENCE_SCORE = 0.6;
-const STOPWORDS = new Set([
+export const MIN_CONFIDENCE_SCORE = 0.6;
+export const STOPWORDS = new Set([
   "with",
   "and",
   "for",
@@ -27,7 +27,7 @@ export function normalizeMatchText(input: string) {
     .trim();
 }
 
-function tokenize(input: string) {
+export function tokenize(input: string) {
   const normalized = normalizeMatchText(input);
   if (!normalized) {
     return [] as string[];
@@ -36,16 +36,6 @@ function tokenize(input: string) {
   return normalized.split(" ").filter((token) => token.length > 1);
 }
 
-function tokenOverlapScore(left: string[], right: string[]) {
-  if (!left.length || !right.length) {
-    return 0;
-  }
-
-  const rightSet = new Set(right);
-  const overlap = left.filter((token) => rightSet.has(token)).length;
-  return overlap / left.length;
-}
-
 function buildKeywordQuery(name: string) {
   const normalized = normalizeMatchText(name);
   if (!normalized) {
@@ -83,9 +73,26 @@ function buildKeywordQuery(name: string) {
   return unique.slice(0, 3).join(" ");
 }
 
-export function scoreNameSimilarity(query: string, candidate: string) {
-  const normalizedQuery = normalizeMatchText(query);
-  const normalizedCandidate = normalizeMatchText(candidate);
+export interface PreparedMatchText {
+  normalized: string;
+  tokens: string[];
+  tokenSet: Set<string>;
+}
+
+/** Normalises and tokenises once so a text can be scored against many others without re-work. */
+export function prepareMatchText(input: string): PreparedMatchText {
+  const normalized = normalizeMatchText(input);
+  const tokens = normalized ? tokenize(normalized) : [];
+  return {
+    normalized,
+    tokens,
+    tokenSet: new Set(tokens)
+  };
+}
+
+export function scorePreparedSimilarity(query: PreparedMatchText, candidate: PreparedMatchText) {
+  const normalizedQuery = query.normalized;
+  const normalizedCandidate = candidate.normalized;
 
   if (!normalizedQuery || !normalizedCandidate) {
     return 0;
@@ -95,9 +102,10 @@ export function scoreNameSimilarity(query: string, candidate: string) {
     return 1;
   }
 
-  const queryTokens = tokenize(normalizedQuery);
-  const candidateTokens = tokenize(normalizedCandidate);
-  const overlap = tokenOverlapScore(queryTokens, candidateTokens);
+  const overlap =
+    query.tokens.length && candidate.tokens.length
+      ? query.tokens.filter((token) => candidate.tokenSet.has(token)).length / query.tokens.length
+      : 0;
 
   const contains =
     normalizedCandidate.includes(normalizedQuery) || normalizedQuery.includes(normalizedCandidate)
@@ -112,6 +120,10 @@ export function scoreNameSimilarity(query: string, candidate: string) {
   return Number(score.toFixed(4));
 }
 
+export function scoreNameSimilarity(query: string, candidate: string) {
+  return scorePreparedSimilarity(prepareMatchText(query), prepareMatchText(candidate));
+}
+
 export function pickBestNameMatch(products: SallaProductRecord[], query: string, threshold = MIN_CONFIDENCE_SCORE) {
   const scored = products
     .map((product) => ({
@@ -0,0 +1,227 @@
+import { createHash } from "node:crypto";
+import type { Prisma } from "@prisma/client";
+import { env } from "@/lib/config/env";
+import { prisma } from "@/lib/db/prisma";
+import { extractSallaBarcode, sallaClient } from "@/lib/salla/client";
+import { SallaMatchIndex } from "@/lib/salla/match-index";
+import type {
+  SallaMirrorRecord,
+  SallaMirrorRefreshSummary,
+  SallaMirrorStatus,
+  SallaProductRecord
+} from "@/lib/salla/types";
+
+const MIRROR_PAGE_SIZE = 100;
+const MIRROR_MAX_PAGES = 1000;
+const INDEX_MAX_AGE_MS = 5 * 60 * 1000;
+
+let cachedIndex: { index: SallaMatchIndex; builtAt: number } | null = null;
+
+function fingerprint(record: SallaMirrorRecord) {
+  return createHash("sha1")
+    .update(
+      JSON.stringify([
+        record.sku,
+        record.barcode,
+        record.name,
+        record.quantity,
+        record.preTaxPrice,
+        record.costPrice
+      ])
+    )
+    .digest("hex");
+}
+
+function toMirrorRecord(product: SallaProductRecord): SallaMirrorRecord {
+  return {
+    ...product,
+    barcode: extractSallaBarcode(product.raw)
+  };
+}
+
+function toMirrorRow(record: SallaMirrorRecord, seenAt: Date) {
+  return {
+    id: record.id,
+    sku: record.sku,
+    barcode: record.barcode,
+    name: record.name,
+    quantity: record.quantity !== null ? Math.trunc(record.quantity) : null,
+    preTaxPrice: record.preTaxPrice,
+    costPrice: record.costPrice,
+    fingerprint: fingerprint(record),
+    raw: (record.raw ?? {}) as Prisma.InputJsonValue,
+    lastSeenAt: seenAt
+  };
+}
+
+export function invalidateSallaMatchIndex() {
+  cachedIndex = null;
+}
+
+/**
+ * Bulk-pages the Salla catalog into `salla_products`. Each page is diffed against the
+ * mirror by content fingerprint, so only new and changed rows are written. Rows not seen
+ * during a complete pass are removed. The end of the catalog is judged from `totalPages` or
+ * the raw row count of a page, never from how many rows mapped, so an unmappable row cannot
+ * end the pass early and prune the pages after it.
+ */
+export async function refreshSallaMirror(
+  options: { pageSize?: number; maxPages?: number } = {}
+): Promise<SallaMirrorRefreshSummary> {
+  const start = Date.now();
+  const pageSize = options.pageSize ?? MIRROR_PAGE_SIZE;
+  const maxPages = options.maxPages ?? MIRROR_MAX_PAGES;
+  const runStartedAt = new Date();
+
+  const summary: SallaMirrorRefreshSummary = {
+    pagesFetched: 0,
+    seen: 0,
+    created: 0,
+    updated: 0,
+    unchanged: 0,
+    removed: 0,
+    complete: false,
+    durationMs: 0
+  };
+
+  let page = 1;
+  while (page <= maxPages) {
+    const { products, rowCount, perPage, totalPages } = await sallaClient.fetchProductsPage(page, pageSize);
+    summary.pagesFetched += 1;
+    const lastPage = (totalPages !== null && page >= totalPages) || rowCount < perPage;
+
+    if (!products.length) {
+      if (lastPage) {
+        summary.complete = true;
+        break;
+      }
+
+      page += 1;
+      continue;
+    }
+
+    const rowsById = new Map(
+      products.map((product) => {
+        const row = toMirrorRow(toMirrorRecord(product), runStartedAt);
+        return [row.id, row] as const;
+      })
+    );
+    const rows = Array.from(rowsById.values());
+    summary.seen += rows.length;
+
+    const existing = await prisma.sallaProduct.findMany({
+      where: { id: { in: rows.map((row) => row.id) } },
+      select: { id: true, fingerprint: true }
+    });
+    const existingFingerprints = new Map(existing.map((row) => [row.id, row.fingerprint]));
+
+    const toCreate = rows.filter((row) => !existingFingerprints.has(row.id));
+    const toUpdate = rows.filter(
+      (row) => existingFingerprints.has(row.id) && existingFingerprints.get(row.id) !== row.fingerprint
+    );
+    const unchangedIds = rows
+      .filter((row) => existingFingerprints.get(row.id) === row.fingerprint)
+      .map((row) => row.id);
+
+    if (toCreate.length) {
+      const created = await prisma.sallaProduct.createMany({ data: toCreate, skipDuplicates: true });
+      summary.created += created.count;
+    }
+
+    if (toUpdate.length) {
+      await prisma.$transaction(
+        toUpdate.map(({ id, ...data }) => prisma.sallaProduct.update({ where: { id }, data }))
+      );
+      summary.updated += toUpdate.length;
+    }
+
+    if (unchangedIds.length) {
+      await prisma.sallaProduct.updateMany({
+        where: { id: { in: unchangedIds } },
+        data: { lastSeenAt: runStartedAt }
+      });
+      summary.unchanged += unchangedIds.length;
+    }
+
+    if (lastPage) {
+      summary.complete = true;
+      break;
+    }
+
+    page += 1;
+  }
+
+  if (summary.complete) {
+    const removed = await prisma.sallaProduct.deleteMany({
+      where: { lastSeenAt: { lt: runStartedAt } }
+    });
+    summary.removed = removed.count;
+  }
+
+  invalidateSallaMatchIndex();
+  summary.durationMs = Date.now() - start;
+  return summary;
+}
+
+export async function getSallaMirrorStatus(): Promise<SallaMirrorStatus> {
+  const aggregate = await prisma.sallaProduct.aggregate({
+    _count: { _all: true },
+    _max: { lastSeenAt: true }
+  });
+
+  const total = aggregate._count._all;
+  const lastSeenAt = aggregate._max.lastSeenAt;
+  const maxAgeMs = env.SALLA_MIRROR_MAX_AGE_MINUTES * 60 * 1000;
+
+  return {
+    total,
+    lastSeenAt: lastSeenAt?.toISOString() ?? null,
+    stale: total === 0 || !lastSeenAt || Date.now() - lastSeenAt.getTime() > maxAgeMs
+  };
+}
+
+/** Refreshes the mirror only when it is empty or older than SALLA_MIRROR_MAX_AGE_MINUTES. */
+export async function ensureFreshSallaMirror() {
+  const status = await getSallaMirrorStatus();
+  if (!status.stale) {
+    return null;
+  }
+
+  return refreshSallaMirror();
+}
+
+export async function loadSallaMirrorRecords(): Promise<SallaMirrorRecord[]> {
+  const rows = await prisma.sallaProduct.findMany({
+    select: {
+      id: true,
+      sku: true,
+      barcode: true,
+      name: true,
+      quantity: true,
+      preTaxPrice: true,
+      costPrice: true,
+      raw: true
+    }
+  });
+
+  return rows.map((row) => ({
+    id: row.id,
+    sku: row.sku,
+    barcode: row.barcode,
+    name: row.name,
+    quantity: row.quantity,
+    preTaxPrice: row.preTaxPrice !== null ? Number(row.preTaxPrice) : null,
+    costPrice: row.costPrice !== null ? Number(row.costPrice) : null,
+    raw: row.raw
+  }));
+}
+
+export async function loadSallaMatchIndex() {
+  if (cachedIndex && Date.now() - cachedIndex.builtAt < INDEX_MAX_AGE_MS) {
+    return cachedIndex.index;
+  }
+
+  const index = new SallaMatchIndex(await loadSallaMirrorRecords());
+  cachedIndex = { index, builtAt: Date.now() };
+  return index;
+}
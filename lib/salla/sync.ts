@@ -1,6 +1,9 @@
 import { env } from "@/lib/config/env";
+import { bumpDataVersion } from "@/lib/db/data-versions";
 import { prisma } from "@/lib/db/prisma";
+import { invalidateProductSettingsCache } from "@/lib/pricing/settings-cache";
 import { matchSallaProduct } from "@/lib/salla/matcher";
+import { ensureFreshSallaMirror, loadSallaMatchIndex } from "@/lib/salla/mirror";
 import type {
   SallaBatchSyncOptions,
   SallaBatchSyncSummary,
@@ -11,6 +14,8 @@ import type {
 } from "@/lib/salla/types";
 
 const CHUNK_SIZE = 20;
+/** Most unmatched products matched by one `unmatchedOnly` request. */
+export const UNMATCHED_BATCH_LIMIT = 500;
 
 export function selectCostWithoutTax(
   product: SallaProductRecord,
@@ -65,6 +70,7 @@ export async function persistSallaMatch(input: {
         costPrice: costWithoutTax
       }
     });
+    invalidateProductSettingsCache(input.productId);
   }
 
   return {
@@ -79,20 +85,30 @@ export async function persistSallaMatch(input: {
 
 export async function runSallaBatchSync(options: SallaBatchSyncOptions = {}): Promise<SallaBatchSyncSummary> {
   const activeOnly = options.activeOnly ?? true;
-  const limit = options.limit ?? 100;
+  const unmatchedOnly = options.unmatchedOnly ?? false;
+  // Unmatched products are matched a page at a time so one request stays short; callers
+  // continue from `nextOffset` until it is absent.
+  const limit = unmatchedOnly
+    ? Math.min(options.limit ?? UNMATCHED_BATCH_LIMIT, UNMATCHED_BATCH_LIMIT)
+    : options.limit ?? 100;
   const offset = options.offset ?? 0;
   const dryRun = options.dryRun ?? false;
   const persist = options.persist ?? true;
   const shouldPersist = persist && !dryRun;
+  const source = options.source ?? "mirror";
 
   const products = await prisma.product.findMany({
-    where: activeOnly ? { active: true } : undefined,
+    where: {
+      ...(activeOnly ? { active: true } : {}),
+      ...(unmatchedOnly ? { sallaLastSyncedAt: null } : {})
+    },
     orderBy: { updatedAt: "desc" },
     skip: offset,
     take: limit,
     select: {
       id: true,
       sku: true,
+      barcode: true,
       title: true
     }
   });
@@ -106,18 +122,40 @@ export async function runSallaBatchSync(options: SallaBatchSyncOptions = {}): Pr
     skipped: 0,
     dryRun,
     persist: shouldPersist,
+    source,
     errors: []
   };
 
+  // The mirror path matches every product against a locally indexed copy of the Salla
+  // catalog in one pass, replacing one throttled SKU lookup plus keyword search per product.
+  let localMatches: SallaMatchOutcome[] | null = null;
+  if (source === "mirror" && products.length) {
+    const refresh = await ensureFreshSallaMirror();
+    if (refresh) {
+      summary.mirrorRefresh = refresh;
+    }
+
+    const matchIndex = await loadSallaMatchIndex();
+    localMatches = matchIndex.matchMany(
+      products.map((product) => ({
+        sku: product.sku,
+        barcode: product.barcode,
+        name: product.title
+      }))
+    );
+  }
+
   for (let index = 0; index < products.length; index += CHUNK_SIZE) {
     const chunk = products.slice(index, index + CHUNK_SIZE);
 
-    for (const product of chunk) {
+    for (const [offsetInChunk, product] of chunk.entries()) {
       try {
-        const match = await matchSallaProduct({
-          sku: product.sku,
-          name: product.title
-        });
+        const match =
+          localMatches?.[index + offsetInChunk] ??
+          (await matchSallaProduct({
+            sku: product.sku,
+            name: product.title
+          }));
 
         summary.processed += 1;
 
@@ -148,6 +186,15 @@ export async function runSallaBatchSync(options: SallaBatchSyncOptions = {}): Pr
     }
   }
 
+  if (summary.updated > 0) {
+    await bumpDataVersion("products");
+  }
+
+  // Products linked in this batch drop out of the unmatched filter; the rest are skipped next time.
+  if (unmatchedOnly && products.length === limit) {
+    summary.nextOffset = offset + products.length - summary.updated;
+  }
+
   return summary;
 }
 
@@ -190,6 +237,7 @@ export async function runSingleSallaMatch(input: {
       matchScore: match.score ?? 0,
       sallaProduct: match.product
     });
+    await bumpDataVersion("products");
 
     return {
       match,
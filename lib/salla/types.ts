@@ -1,5 +1,6 @@
 export type SallaCostSource = "PRE_TAX" | "COST_PRICE";
 export type SallaMatchMethod = "SKU" | "NAME";
+export type SallaMatchSource = "mirror" | "api";
 
 export interface SallaProductRecord {
   id: string;
@@ -11,6 +12,27 @@ export interface SallaProductRecord {
   raw: unknown;
 }
 
+export interface SallaMirrorRecord extends SallaProductRecord {
+  barcode: string | null;
+}
+
+export interface SallaMirrorRefreshSummary {
+  pagesFetched: number;
+  seen: number;
+  created: number;
+  updated: number;
+  unchanged: number;
+  removed: number;
+  complete: boolean;
+  durationMs: number;
+}
+
+export interface SallaMirrorStatus {
+  total: number;
+  lastSeenAt: string | null;
+  stale: boolean;
+}
+
 export interface SallaOAuthTokenPayload {
   access_token: string;
   refresh_token?: string;
@@ -43,6 +65,8 @@ export interface SallaBatchSyncOptions {
   offset?: number;
   persist?: boolean;
   dryRun?: boolean;
+  source?: SallaMatchSource;
+  unmatchedOnly?: boolean;
 }
 
 export interface SallaBatchSyncError {
@@ -60,5 +84,9 @@ export interface SallaBatchSyncSummary {
   skipped: number;
   dryRun: boolean;
   persist: boolean;
+  source: SallaMatchSource;
+  mirrorRefresh?: SallaMirrorRefreshSummary;
+  /** With `unmatchedOnly`, the offset of the next batch when more unmatched products may remain. */
+  nextOffset?: number;
   errors: SallaBatchSyncError[];
 }
@@ -1,4 +1,5 @@
 
+import { bumpDataVersion } from "@/lib/db/data-versions";
 import { prisma as db } from "@/lib/db/prisma";
 import { trendyolClient } from "@/lib/trendyol/client";
 import { Prisma } from "@prisma/client";
@@ -34,6 +35,7 @@ export class OrderService {
                 await this.upsertOrder(pkg);
                 totalSynced++;
             }
+            await bumpDataVersion("orders");
 
             page++;
             if (page >= totalPages) {
@@ -44,7 +46,8 @@ export class OrderService {
         return { totalSynced };
     }
 
-    private async upsertOrder(pkg: any) {
+    /** Upserts the order (and replaces its items) from one shipment package payload. */
+    async upsertOrder(pkg: any) {
         // pkg is TrendyolShipmentPackage but we treat as any to access extra fields safely
 
         // Extract customer info
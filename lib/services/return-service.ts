@@ -3,10 +3,111 @@ import { prisma as db } from "@/lib/db/prisma";
 import { trendyolClient } from "@/lib/trendyol/client";
 import { Prisma } from "@prisma/client";
 
+export interface DeriveReturnsOptions {
+    /** Only these packages (the ones a shipment sync or webhook batch just stored). */
+    packageNumbers?: string[];
+    /** Only packages last modified at or after this time. */
+    since?: Date;
+}
+
+// Compared in UTC, like the rate-limit buckets; matches what Prisma writes for @updatedAt.
+const NOW_UTC = `(now() AT TIME ZONE 'UTC')`;
+
+// Upserts a return request for every `Returned` package in `shipment_packages` and rewrites the
+// items of the requests that were created or changed, in one statement; unchanged returns are not
+// touched. Same SQL as scripts/reference/returns_from_packages.py.
+const DERIVE_RETURNS_SQL = `
+WITH source AS (
+  SELECT DISTINCT ON ("claimId")
+         COALESCE(sp."rawPayload"->>'shipmentPackageId', sp."rawPayload"->>'id', sp."packageNumber") AS "claimId",
+         sp."orderNumber",
+         COALESCE(sp."lastModifiedAt", sp."createdAt", ${NOW_UTC}) AS "dateTime",
+         sp."status",
+         sp."rawPayload"->>'customerFirstName' AS "customerFirstName",
+         sp."rawPayload"->>'customerLastName' AS "customerLastName",
+         COALESCE(sp."rawPayload"->'lines', '[]'::jsonb) AS "lines"
+  FROM "shipment_packages" sp
+  WHERE sp."sellerId" = $1::bigint
+    AND sp."status" = 'Returned'
+    AND ($2::text[] IS NULL OR sp."packageNumber" = ANY($2::text[]))
+    AND ($3::timestamp IS NULL OR sp."lastModifiedAt" >= $3::timestamp)
+  ORDER BY "claimId", sp."lastModifiedAt" DESC NULLS LAST
+),
+upserted AS (
+  INSERT INTO "return_requests" (
+    "id", "claimId", "orderNumber", "dateTime", "reason", "status", "returnStatus",
+    "customerFirstName", "customerLastName", "createdAt", "updatedAt"
+  )
+  SELECT gen_random_uuid()::text, s."claimId", s."orderNumber", s."dateTime", 'Return (Order Status)', s."status",
+         'Completed', s."customerFirstName", s."customerLastName", ${NOW_UTC}, ${NOW_UTC}
+  FROM source s
+  ON CONFLICT ("claimId") DO UPDATE
+  SET "orderNumber" = EXCLUDED."orderNumber",
+      "dateTime" = EXCLUDED."dateTime",
+      "status" = EXCLUDED."status",
+      "updatedAt" = EXCLUDED."updatedAt"
+  WHERE "return_requests"."status" IS DISTINCT FROM EXCLUDED."status"
+     OR "return_requests"."orderNumber" IS DISTINCT FROM EXCLUDED."orderNumber"
+     OR "return_requests"."dateTime" IS DISTINCT FROM EXCLUDED."dateTime"
+  RETURNING "id", "claimId"
+),
+cleared AS (
+  DELETE FROM "return_items" ri
+  WHERE ri."returnRequestId" IN (SELECT "id" FROM upserted)
+  RETURNING 1
+),
+items AS (
+  INSERT INTO "return_items" ("id", "returnRequestId", "sku", "quantity", "reason")
+  SELECT gen_random_uuid()::text, u."id",
+         COALESCE(NULLIF(line->>'sku', ''), NULLIF(line->>'merchantSku', ''), 'UNKNOWN'),
+         COALESCE(NULLIF(line->>'quantity', '')::int, 1),
+         'Returned'
+  FROM upserted u
+  JOIN source s ON s."claimId" = u."claimId"
+  CROSS JOIN LATERAL jsonb_array_elements(s."lines") AS line
+  RETURNING 1
+)
+SELECT (SELECT COUNT(*) FROM upserted)::int AS "requests",
+       (SELECT COUNT(*) FROM items)::int AS "items",
+       (SELECT COUNT(*) FROM cleared)::int AS "itemsReplaced"`;
+
 export class ReturnService {
+    /**
+     * Derives return requests from shipment packages already stored by the shipment sync and
+     * webhooks, so no API call is needed. Falls back to re-scanning returned packages through the
+     * API only while `shipment_packages` is still empty for this seller.
+     */
     async syncReturns(daysToLookBack = 365) {
+        const since = new Date(Date.now() - daysToLookBack * 24 * 60 * 60 * 1000);
+        const storedPackages = await db.shipmentPackage.count({
+            where: { sellerId: BigInt(trendyolClient.getSellerId() || 0) }
+        });
+
+        if (storedPackages > 0) {
+            const { requests } = await this.deriveReturnsFromPackages({ since });
+            return { totalSynced: requests, source: "shipment_packages" as const };
+        }
+
+        return { ...(await this.syncReturnsFromApi(since.getTime())), source: "api" as const };
+    }
+
+    /** Set-based: creates or updates returns for `Returned` packages; unchanged ones cost nothing. */
+    async deriveReturnsFromPackages(options: DeriveReturnsOptions = {}) {
+        if (options.packageNumbers && !options.packageNumbers.length) {
+            return { requests: 0, items: 0, itemsReplaced: 0 };
+        }
+
+        const [result] = await db.$queryRawUnsafe<Array<{ requests: number; items: number; itemsReplaced: number }>>(
+            DERIVE_RETURNS_SQL,
+            String(trendyolClient.getSellerId() || 0),
+            options.packageNumbers ?? null,
+            options.since ?? null
+        );
+        return result ?? { requests: 0, items: 0, itemsReplaced: 0 };
+    }
+
+    private async syncReturnsFromApi(startDate: number) {
         const endDate = Date.now();
-        const startDate = endDate - daysToLookBack * 24 * 60 * 60 * 1000;
 
         console.log(`[ReturnService] Syncing returns (via Returned Orders) from ${new Date(startDate).toISOString()}`);
 
@@ -3,15 +3,6 @@ export interface ProductsSuggestBatchItem {
   sku: string;
 }
 
-export interface ProductsSuggestBatchExecutionResult {
-  ok: boolean;
-  error?: string;
-  status?: number;
-  enforcedFloor?: number;
-  attemptedPrice?: number;
-  projectedProfit?: number;
-}
-
 export interface ProductsSuggestBatchFailure {
   productId: string;
   sku: string;
@@ -36,94 +27,75 @@ export interface ProductsSuggestBatchResult {
   failures: ProductsSuggestBatchFailure[];
 }
 
-interface RunProductsSuggestBatchArgs {
-  items: ProductsSuggestBatchItem[];
-  execute: (item: ProductsSuggestBatchItem) => Promise<ProductsSuggestBatchExecutionResult>;
-  concurrency?: number;
-  onProgress?: (progress: ProductsSuggestBatchProgress) => void;
-}
-
-function toErrorMessage(error: unknown): string {
-  if (error instanceof Error) {
-    return error.message;
+/** One line of the NDJSON stream sent by `POST /api/products/update-price/bulk`. */
+export type ProductsSuggestBatchEvent =
+  | ({ type: "progress" } & ProductsSuggestBatchProgress)
+  | ({ type: "failure" } & ProductsSuggestBatchFailure)
+  | ({ type: "done" } & ProductsSuggestBatchProgress)
+  | { type: "error"; error: string };
+
+/**
+ * Reads the bulk apply stream to the end, reporting progress as it arrives. The server keeps
+ * applying prices if the stream is cut; a stream without a final `done` line is reported as an error.
+ */
+export async function readProductsSuggestBatchStream(
+  response: Response,
+  onProgress?: (progress: ProductsSuggestBatchProgress) => void
+): Promise<ProductsSuggestBatchResult> {
+  if (!response.body) {
+    throw new Error("Bulk update returned no progress stream");
   }
 
-  return "Unknown batch update error";
-}
-
-export async function runProductsSuggestBatch({
-  items,
-  execute,
-  concurrency = 3,
-  onProgress
-}: RunProductsSuggestBatchArgs): Promise<ProductsSuggestBatchResult> {
-  const total = items.length;
-  const workerCount = Math.max(1, Math.min(total || 1, Math.floor(concurrency) || 1));
   const failures: ProductsSuggestBatchFailure[] = [];
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffered = "";
+  let finished: ProductsSuggestBatchProgress | null = null;
+
+  // Returns the totals once the `done` line arrives.
+  const handle = (line: string): ProductsSuggestBatchProgress | null => {
+    if (!line.trim()) {
+      return null;
+    }
 
-  let nextIndex = 0;
-  let completed = 0;
-  let succeeded = 0;
-  let failed = 0;
-
-  const emitProgress = () => {
-    onProgress?.({
-      total,
-      completed,
-      succeeded,
-      failed
-    });
-  };
-
-  emitProgress();
+    const event = JSON.parse(line) as ProductsSuggestBatchEvent;
+    if (event.type === "error") {
+      throw new Error(event.error);
+    }
 
-  const worker = async () => {
-    while (true) {
-      const index = nextIndex;
-      nextIndex += 1;
+    if (event.type === "failure") {
+      const { type: _type, ...failure } = event;
+      failures.push(failure);
+      return null;
+    }
 
-      if (index >= total) {
-        return;
-      }
+    const { type, ...progress } = event;
+    onProgress?.(progress);
+    return type === "done" ? progress : null;
+  };
 
-      const item = items[index];
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) {
+      break;
+    }
 
-      try {
-        const result = await execute(item);
-        if (result.ok) {
-          succeeded += 1;
-        } else {
-          failed += 1;
-          failures.push({
-            productId: item.productId,
-            sku: item.sku,
-            error: result.error || "Batch update failed",
-            status: result.status,
-            enforcedFloor: result.enforcedFloor,
-            attemptedPrice: result.attemptedPrice,
-            projectedProfit: result.projectedProfit
-          });
-        }
-      } catch (error) {
-        failed += 1;
-        failures.push({
-          productId: item.productId,
-          sku: item.sku,
-          error: toErrorMessage(error)
-        });
-      } finally {
-        completed += 1;
-        emitProgress();
-      }
+    buffered += value;
+    const lines = buffered.split("\n");
+    buffered = lines.pop() ?? "";
+    for (const line of lines) {
+      finished = handle(line) ?? finished;
     }
-  };
+  }
+  finished = handle(buffered) ?? finished;
 
-  await Promise.all(Array.from({ length: workerCount }, () => worker()));
+  if (!finished) {
+    throw new Error("Bulk update stream ended early; refresh to see which prices were applied");
+  }
 
   return {
-    total,
-    succeeded,
-    failed,
+    total: finished.total,
+    succeeded: finished.succeeded,
+    failed: finished.failed,
     failures
   };
 }
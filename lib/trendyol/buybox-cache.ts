@@ -0,0 +1,418 @@
+import { env } from "@/lib/config/env";
+import {
+  PostgresBuyboxQuarantine,
+  type BuyboxQuarantineStore
+} from "@/lib/trendyol/buybox-quarantine";
+import { CircuitOpenError } from "@/lib/trendyol/circuit-breaker";
+import { trendyolClient, trendyolErrorStatus } from "@/lib/trendyol/client";
+import type { TrendyolCompetitorData } from "@/lib/trendyol/types";
+
+// Trendyol rejects buybox-information requests with more than 10 barcodes.
+export const BUYBOX_BATCH_SIZE = 10;
+const BATCH_WINDOW_MS = 20;
+const QUARANTINE_REFRESH_MS = 60_000;
+// Expired entries are kept this much longer to answer lookups while the buybox circuit is open.
+const STALE_GRACE_MS = 30 * 60_000;
+
+type FetchBatch = (barcodes: string[], options: { bisecting: boolean }) => Promise<{ entries: any[] }>;
+type ParseEntry = (entry: any) => TrendyolCompetitorData;
+
+interface CachedBuybox {
+  data: TrendyolCompetitorData;
+  found: boolean;
+}
+
+type BatchResult = { ok: true; entries: any[] } | { ok: false; error: unknown };
+
+interface PendingLookup {
+  barcode: string;
+  key: string;
+  resolve: (value: CachedBuybox) => void;
+}
+
+export interface BuyboxCacheStats {
+  hits: number;
+  misses: number;
+  coalesced: number;
+  batches: number;
+  batchedBarcodes: number;
+  errors: number;
+  bisections: number;
+  quarantined: number;
+  quarantineSkips: number;
+  staleServed: number;
+  quarantineSize: number;
+  size: number;
+  ttlSeconds: number;
+}
+
+const noEntry = (): TrendyolCompetitorData => ({
+  competitorMinPrice: null,
+  competitorCount: 0,
+  buyboxSellerId: null,
+  buyboxStatus: "UNKNOWN",
+  raw: { note: "Buybox lookup returned no entries" }
+});
+
+const unavailable = (error: unknown): TrendyolCompetitorData => ({
+  competitorMinPrice: null,
+  competitorCount: null,
+  buyboxSellerId: null,
+  buyboxStatus: "UNKNOWN",
+  raw: {
+    note: "Buybox endpoint unavailable",
+    error: error instanceof Error ? error.message : "unknown"
+  }
+});
+
+const quarantined = (reason: string): TrendyolCompetitorData => ({
+  competitorMinPrice: null,
+  competitorCount: null,
+  buyboxSellerId: null,
+  buyboxStatus: "UNKNOWN",
+  raw: { note: "Barcode quarantined: buybox-information rejects it", error: reason }
+});
+
+const emptyStats = () => ({
+  hits: 0,
+  misses: 0,
+  coalesced: 0,
+  batches: 0,
+  batchedBarcodes: 0,
+  errors: 0,
+  bisections: 0,
+  quarantined: 0,
+  quarantineSkips: 0,
+  staleServed: 0
+});
+
+/**
+ * Short-lived buybox cache keyed by storefront and barcode. Concurrent lookups for the same
+ * barcode share one in-flight request, and misses arriving within a short window are sent
+ * together as 10-barcode `fetchBuyboxInformation` batches. Failed lookups are not cached.
+ *
+ * A batch rejected with 400 is bisected until the offending barcodes are isolated; those are
+ * quarantined (persisted with an expiry) and left out of later batches so batches stay full.
+ * When both halves of a split are rejected the 400 is treated as systemic and surfaced instead.
+ * While the buybox circuit is open, lookups are answered from recently expired entries.
+ */
+export class BuyboxCache {
+  private readonly entries = new Map<string, { value: CachedBuybox; expiresAt: number }>();
+  private readonly inFlight = new Map<string, Promise<CachedBuybox>>();
+  private pending: PendingLookup[] = [];
+  private timer: ReturnType<typeof setTimeout> | null = null;
+  private stats = emptyStats();
+  private quarantinedBarcodes = new Set<string>();
+  private quarantineLoadedAt = Number.NEGATIVE_INFINITY;
+  private quarantineLoading: Promise<void> | null = null;
+
+  constructor(
+    private readonly fetchBatch: FetchBatch,
+    private readonly parseEntry: ParseEntry,
+    private readonly options: {
+      ttlMs: number;
+      storeFrontCode?: string | null;
+      windowMs?: number;
+      now?: () => number;
+      quarantine?: BuyboxQuarantineStore;
+      quarantineRefreshMs?: number;
+    }
+  ) {}
+
+  private now() {
+    return (this.options.now ?? Date.now)();
+  }
+
+  private key(barcode: string) {
+    return `${this.options.storeFrontCode ?? ""}:${barcode}`;
+  }
+
+  private refreshQuarantine() {
+    const store = this.options.quarantine;
+    if (!store || this.now() - this.quarantineLoadedAt < (this.options.quarantineRefreshMs ?? QUARANTINE_REFRESH_MS)) {
+      return Promise.resolve();
+    }
+
+    this.quarantineLoading ??= store
+      .list(this.options.storeFrontCode ?? "")
+      .then((barcodes) => {
+        this.quarantinedBarcodes = new Set(barcodes);
+      })
+      .catch((error) => {
+        console.warn("[buybox] Failed to load barcode quarantine:", error instanceof Error ? error.message : error);
+      })
+      .finally(() => {
+        this.quarantineLoadedAt = this.now();
+        this.quarantineLoading = null;
+      });
+
+    return this.quarantineLoading;
+  }
+
+  private store(key: string, value: CachedBuybox) {
+    if (this.options.ttlMs > 0) {
+      this.entries.set(key, { value, expiresAt: this.now() + this.options.ttlMs });
+    }
+  }
+
+  private lookup(barcode: string): Promise<CachedBuybox> {
+    const key = this.key(barcode);
+
+    const cached = this.entries.get(key);
+    if (cached && cached.expiresAt > this.now()) {
+      this.stats.hits += 1;
+      return Promise.resolve(cached.value);
+    }
+    if (cached && cached.expiresAt + STALE_GRACE_MS <= this.now()) {
+      this.entries.delete(key);
+    }
+
+    const existing = this.inFlight.get(key);
+    if (existing) {
+      this.stats.coalesced += 1;
+      return existing;
+    }
+
+    this.stats.misses += 1;
+    const promise = this.enqueue(barcode, key);
+    this.inFlight.set(key, promise);
+    return promise;
+  }
+
+  private async enqueue(barcode: string, key: string): Promise<CachedBuybox> {
+    // Quarantined barcodes are answered locally so they never take a slot in a batch.
+    await this.refreshQuarantine();
+    if (this.quarantinedBarcodes.has(barcode)) {
+      this.stats.quarantineSkips += 1;
+      this.inFlight.delete(key);
+      return { found: false, data: quarantined("Previously rejected by buybox-information") };
+    }
+
+    return new Promise<CachedBuybox>((resolve) => {
+      this.pending.push({ barcode, key, resolve });
+
+      if (this.pending.length >= BUYBOX_BATCH_SIZE) {
+        this.flush();
+      } else if (!this.timer) {
+        this.timer = setTimeout(() => this.flush(), this.options.windowMs ?? BATCH_WINDOW_MS);
+      }
+    });
+  }
+
+  private async quarantine(item: PendingLookup, error: unknown) {
+    const reason = error instanceof Error ? error.message : "Rejected by buybox-information";
+    this.stats.quarantined += 1;
+    this.quarantinedBarcodes.add(item.barcode);
+    console.warn(`[buybox] Quarantining barcode ${item.barcode}: ${reason.slice(0, 200)}`);
+
+    try {
+      await this.options.quarantine?.add(this.options.storeFrontCode ?? "", item.barcode, reason);
+    } catch (storeError) {
+      console.warn(
+        "[buybox] Failed to persist barcode quarantine:",
+        storeError instanceof Error ? storeError.message : storeError
+      );
+    }
+
+    this.inFlight.delete(item.key);
+    item.resolve({ found: false, data: quarantined(reason) });
+  }
+
+  private flush() {
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = null;
+    }
+
+    while (this.pending.length) {
+      void this.runBatch(this.pending.splice(0, BUYBOX_BATCH_SIZE));
+    }
+  }
+
+  private async request(batch: PendingLookup[], bisecting = false): Promise<BatchResult> {
+    this.stats.batches += 1;
+    this.stats.batchedBarcodes += batch.length;
+
+    try {
+      // Bisection requests are flagged so their 400s do not trip the buybox circuit.
+      const { entries } = await this.fetchBatch(batch.map((item) => item.barcode), { bisecting });
+      return { ok: true, entries };
+    } catch (error) {
+      return { ok: false, error };
+    }
+  }
+
+  private resolveEntries(batch: PendingLookup[], entries: any[]) {
+    const byReference = new Map<string, any>();
+    for (const entry of entries) {
+      for (const reference of [entry?.barcode, entry?.stockCode]) {
+        if (reference !== undefined && reference !== null && !byReference.has(String(reference))) {
+          byReference.set(String(reference), entry);
+        }
+      }
+    }
+
+    for (const item of batch) {
+      const entry = byReference.get(item.barcode);
+      let value: CachedBuybox;
+      if (entry) {
+        const parsed = this.parseEntry(entry);
+        value = {
+          found: true,
+          data: {
+            ...parsed,
+            raw: {
+              source: "buybox_information",
+              entry: parsed.raw,
+              responseMeta: { hasEntries: entries.length, batchSize: batch.length }
+            }
+          }
+        };
+      } else {
+        value = { found: false, data: noEntry() };
+      }
+
+      this.store(item.key, value);
+      this.inFlight.delete(item.key);
+      item.resolve(value);
+    }
+  }
+
+  private fail(batch: PendingLookup[], error: unknown) {
+    if (error instanceof CircuitOpenError) {
+      // The endpoint is failing; answer from expired entries instead of reporting it unavailable.
+      for (const item of batch) {
+        const stale = this.entries.get(item.key);
+        this.inFlight.delete(item.key);
+        if (stale) {
+          this.stats.staleServed += 1;
+          item.resolve(stale.value);
+        } else {
+          item.resolve({ found: false, data: unavailable(error) });
+        }
+      }
+      return;
+    }
+
+    this.stats.errors += 1;
+    console.error(
+      `[buybox] Failed to fetch buybox batch (${batch.length} barcodes):`,
+      error instanceof Error ? error.message : error
+    );
+    for (const item of batch) {
+      this.inFlight.delete(item.key);
+      item.resolve({ found: false, data: unavailable(error) });
+    }
+  }
+
+  private async runBatch(batch: PendingLookup[]) {
+    const result = await this.request(batch);
+    if (result.ok) {
+      this.resolveEntries(batch, result.entries);
+    } else if (trendyolErrorStatus(result.error) === 400 && batch.length > 1) {
+      await this.bisect(batch);
+    } else {
+      // A lone barcode rejected with nothing to compare against is not quarantined.
+      this.fail(batch, result.error);
+    }
+  }
+
+  /**
+   * Splits a rejected batch and retries both halves. A half is only treated as holding the bad
+   * barcode when its sibling is accepted: if both are rejected, the 400 is not about one barcode
+   * (auth, payload or endpoint trouble) and is surfaced as an error instead of quarantining.
+   */
+  private async bisect(batch: PendingLookup[]) {
+    this.stats.bisections += 1;
+    const middle = Math.ceil(batch.length / 2);
+    const halves = [batch.slice(0, middle), batch.slice(middle)];
+    const results = await Promise.all(halves.map((half) => this.request(half, true)));
+    const errors = results.map((result) => (result.ok ? null : result.error));
+    const rejected = errors.map((error) => trendyolErrorStatus(error) === 400);
+
+    if (rejected.every(Boolean)) {
+      this.fail(batch, errors[0]);
+      return;
+    }
+
+    await Promise.all(
+      halves.map(async (half, index) => {
+        const result = results[index];
+        if (result.ok) {
+          this.resolveEntries(half, result.entries);
+        } else if (!rejected[index]) {
+          this.fail(half, result.error);
+        } else if (half.length === 1) {
+          await this.quarantine(half[0], result.error);
+        } else {
+          await this.bisect(half);
+        }
+      })
+    );
+  }
+
+  /** Same contract as `TrendyolClient.fetchCompetitorPrices`, served through the cache. */
+  async fetchCompetitorPrices(productRef: { sku?: string; barcode?: string }): Promise<TrendyolCompetitorData> {
+    const reference = (productRef.barcode || productRef.sku)?.trim();
+    if (!reference) {
+      return {
+        competitorMinPrice: null,
+        competitorCount: null,
+        buyboxSellerId: null,
+        buyboxStatus: "UNKNOWN",
+        raw: { note: "No barcode/sku provided for buybox lookup" }
+      };
+    }
+
+    return (await this.lookup(reference)).data;
+  }
+
+  /** Looks up many barcodes at once; only barcodes Trendyol returned an entry for are included. */
+  async getMany(barcodes: string[]) {
+    const unique = Array.from(new Set(barcodes.map((value) => String(value).trim()).filter(Boolean)));
+    const results = await Promise.all(unique.map(async (barcode) => [barcode, await this.lookup(barcode)] as const));
+
+    const found = new Map<string, TrendyolCompetitorData>();
+    for (const [barcode, value] of results) {
+      if (value.found) {
+        found.set(barcode, value.data);
+      }
+    }
+    return found;
+  }
+
+  invalidate(barcode?: string) {
+    if (barcode === undefined) {
+      this.entries.clear();
+      return;
+    }
+    this.entries.delete(this.key(barcode.trim()));
+  }
+
+  getStats(): BuyboxCacheStats {
+    return {
+      ...this.stats,
+      quarantineSize: this.quarantinedBarcodes.size,
+      size: this.entries.size,
+      ttlSeconds: this.options.ttlMs / 1000
+    };
+  }
+
+  resetStats() {
+    this.stats = emptyStats();
+  }
+}
+
+export const buyboxCache = new BuyboxCache(
+  (barcodes, options) => trendyolClient.fetchBuyboxInformation(barcodes, options),
+  (entry) => trendyolClient.parseBuyboxEntry(entry),
+  {
+    ttlMs: env.BUYBOX_CACHE_TTL_SECONDS * 1000,
+    storeFrontCode: trendyolClient.getStoreFrontCode(),
+    quarantine: new PostgresBuyboxQuarantine(env.BUYBOX_QUARANTINE_HOURS)
+  }
+);
+
+export function getBuyboxCacheStats() {
+  return buyboxCache.getStats();
+}
@@ -0,0 +1,65 @@
+import { prisma } from "@/lib/db/prisma";
+
+export interface BuyboxQuarantineStore {
+  /** Barcodes currently quarantined for the storefront. */
+  list(storeFrontCode: string): Promise<string[]>;
+  add(storeFrontCode: string, barcode: string, reason: string): Promise<void>;
+}
+
+// Repeat offenders stay out twice as long each time, up to a week.
+const MAX_QUARANTINE_HOURS = 24 * 7;
+
+// Compared in UTC, like the rate-limit buckets, so the Python sync reads the same expiry.
+const NOW_UTC = `(now() AT TIME ZONE 'UTC')`;
+
+const LIST_SQL = `
+SELECT "barcode" FROM "buybox_quarantine"
+WHERE "storeFrontCode" = $1 AND "expiresAt" > ${NOW_UTC}`;
+
+const ADD_SQL = `
+INSERT INTO "buybox_quarantine" ("storeFrontCode", "barcode", "reason", "failures", "quarantinedAt", "expiresAt")
+VALUES ($1, $2, $3, 1, ${NOW_UTC}, ${NOW_UTC} + $4::float8 * INTERVAL '1 hour')
+ON CONFLICT ("storeFrontCode", "barcode") DO UPDATE
+SET "reason" = EXCLUDED."reason",
+    "failures" = "buybox_quarantine"."failures" + 1,
+    "quarantinedAt" = ${NOW_UTC},
+    "expiresAt" = ${NOW_UTC} + LEAST($5::float8, $4::float8 * POWER(2, "buybox_quarantine"."failures")) * INTERVAL '1 hour'`;
+
+/** Quarantine stored in `buybox_quarantine`, shared with the Python product sync. */
+export class PostgresBuyboxQuarantine implements BuyboxQuarantineStore {
+  constructor(private readonly hours: number) {}
+
+  async list(storeFrontCode: string) {
+    const rows = await prisma.$queryRawUnsafe<Array<{ barcode: string }>>(LIST_SQL, storeFrontCode);
+    return rows.map((row) => row.barcode);
+  }
+
+  async add(storeFrontCode: string, barcode: string, reason: string) {
+    await prisma.$executeRawUnsafe(ADD_SQL, storeFrontCode, barcode, reason.slice(0, 500), this.hours, MAX_QUARANTINE_HOURS);
+  }
+}
+
+/** In-process quarantine for tests and local tools. */
+export class MemoryBuyboxQuarantine implements BuyboxQuarantineStore {
+  private readonly entries = new Map<string, { expiresAt: number; failures: number }>();
+
+  constructor(
+    private readonly hours: number,
+    private readonly now: () => number = Date.now
+  ) {}
+
+  async list(storeFrontCode: string) {
+    const prefix = `${storeFrontCode}:`;
+    const now = this.now();
+    return Array.from(this.entries)
+      .filter(([key, entry]) => key.startsWith(prefix) && entry.expiresAt > now)
+      .map(([key]) => key.slice(prefix.length));
+  }
+
+  async add(storeFrontCode: string, barcode: string) {
+    const key = `${storeFrontCode}:${barcode}`;
+    const failures = (this.entries.get(key)?.failures ?? 0) + 1;
+    const hours = Math.min(MAX_QUARANTINE_HOURS, this.hours * 2 ** (failures - 1));
+    this.entries.set(key, { failures, expiresAt: this.now() + hours * 3_600_000 });
+  }
+}
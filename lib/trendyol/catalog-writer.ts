@@ -0,0 +1,157 @@
+import { randomUUID } from "node:crypto";
+import { bumpDataVersion } from "@/lib/db/data-versions";
+import { prisma } from "@/lib/db/prisma";
+import type { TrendyolProductItem } from "@/lib/trendyol/types";
+
+export interface CatalogProductFields {
+  sku: string;
+  barcode: string | null;
+  title: string;
+  trendyolProductId: string | null;
+  category: string | null;
+  active: boolean;
+}
+
+export interface ExistingCatalogProduct extends CatalogProductFields {
+  id: string;
+  currency: string;
+}
+
+export interface CatalogPageDiff {
+  creates: CatalogProductFields[];
+  updates: Array<CatalogProductFields & { id: string }>;
+  unchanged: number;
+  idsBySku: Map<string, string>;
+}
+
+export interface CatalogPageWrite {
+  idsBySku: Map<string, string>;
+  created: number;
+  updated: number;
+  unchanged: number;
+}
+
+// Compared in UTC, like the rate-limit buckets; matches what Prisma writes for @updatedAt.
+const NOW_UTC = `(now() AT TIME ZONE 'UTC')`;
+
+const UPDATE_SQL = `
+UPDATE "Product" p
+SET "barcode" = v."barcode",
+    "title" = v."title",
+    "trendyolProductId" = v."trendyolProductId",
+    "category" = v."category",
+    "active" = v."active",
+    "currency" = 'SAR',
+    "updatedAt" = ${NOW_UTC}
+FROM unnest($1::text[], $2::text[], $3::text[], $4::text[], $5::text[], $6::boolean[])
+  AS v("id", "barcode", "title", "trendyolProductId", "category", "active")
+WHERE p."id" = v."id"`;
+
+const productFields = (item: TrendyolProductItem): CatalogProductFields => ({
+  sku: item.sku,
+  barcode: item.barcode ?? null,
+  title: item.title,
+  trendyolProductId: item.productId ?? null,
+  category: item.category ?? null,
+  active: item.active
+});
+
+/** Splits a page into new products, changed products and untouched ones (last item per SKU wins). */
+export function diffCatalogPage(items: TrendyolProductItem[], existing: ExistingCatalogProduct[]): CatalogPageDiff {
+  const bySku = new Map(items.map((item) => [item.sku, productFields(item)]));
+  const existingBySku = new Map(existing.map((product) => [product.sku, product]));
+  const diff: CatalogPageDiff = { creates: [], updates: [], unchanged: 0, idsBySku: new Map() };
+
+  for (const fields of Array.from(bySku.values())) {
+    const current = existingBySku.get(fields.sku);
+    if (!current) {
+      diff.creates.push(fields);
+      continue;
+    }
+
+    diff.idsBySku.set(fields.sku, current.id);
+    const changed =
+      current.barcode !== fields.barcode ||
+      current.title !== fields.title ||
+      current.trendyolProductId !== fields.trendyolProductId ||
+      current.category !== fields.category ||
+      current.active !== fields.active ||
+      current.currency !== "SAR";
+
+    if (changed) {
+      diff.updates.push({ ...fields, id: current.id });
+    } else {
+      diff.unchanged += 1;
+    }
+  }
+
+  return diff;
+}
+
+/**
+ * Writes one catalog page in a fixed number of round trips: one read to diff against existing
+ * products, `createMany` for new products and their default settings, and one batched UPDATE
+ * for changed rows (plus a data version bump when anything changed). Returns the product id for
+ * every SKU on the page.
+ */
+export async function writeCatalogPage(items: TrendyolProductItem[]): Promise<CatalogPageWrite> {
+  const skus = Array.from(new Set(items.map((item) => item.sku)));
+  if (!skus.length) {
+    return { idsBySku: new Map(), created: 0, updated: 0, unchanged: 0 };
+  }
+
+  const existing = await prisma.product.findMany({
+    where: { sku: { in: skus } },
+    select: {
+      id: true,
+      sku: true,
+      barcode: true,
+      title: true,
+      trendyolProductId: true,
+      category: true,
+      active: true,
+      currency: true
+    }
+  });
+  const diff = diffCatalogPage(items, existing);
+  const idsBySku = diff.idsBySku;
+  let created = 0;
+
+  if (diff.creates.length) {
+    const rows = diff.creates.map((fields) => ({ ...fields, id: randomUUID(), currency: "SAR" }));
+    const { count } = await prisma.product.createMany({ data: rows, skipDuplicates: true });
+    created = count;
+
+    // Another sync may have inserted some of these SKUs first; use the ids that actually exist.
+    const stored = await prisma.product.findMany({
+      where: { sku: { in: rows.map((row) => row.sku) } },
+      select: { id: true, sku: true }
+    });
+    for (const row of stored) {
+      idsBySku.set(row.sku, row.id);
+    }
+
+    await prisma.productSettings.createMany({
+      data: stored.map((row) => ({ productId: row.id, costPrice: 0 })),
+      skipDuplicates: true
+    });
+  }
+
+  if (diff.updates.length) {
+    await prisma.$executeRawUnsafe(
+      UPDATE_SQL,
+      diff.updates.map((row) => row.id),
+      diff.updates.map((row) => row.barcode),
+      diff.updates.map((row) => row.title),
+      diff.updates.map((row) => row.trendyolProductId),
+      diff.updates.map((row) => row.category),
+      diff.updates.map((row) => row.active)
+    );
+  }
+
+  if (created || diff.updates.length) {
+    await bumpDataVersion("products");
+  }
+
+  return { idsBySku, created, updated: diff.updates.length, unchanged: diff.unchanged };
+}
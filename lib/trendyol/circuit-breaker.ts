@@ -0,0 +1,603 @@
+import { env } from "@/lib/config/env";
+import { prisma } from "@/lib/db/prisma";
+import { circuitOpens, circuitRejections } from "@/lib/metrics/registry";
+import { endpointFamilyForPath, type TrendyolEndpointFamily } from "@/lib/trendyol/rate-limiter";
+
+/** Rate-limit families, with claims split from shipments so a failing `/claims` does not stop order syncs. */
+export type CircuitFamily = TrendyolEndpointFamily | "claims";
+
+export const CIRCUIT_FAMILIES: CircuitFamily[] = ["products", "buybox", "shipments", "claims", "prices"];
+
+export type CircuitState = "CLOSED" | "OPEN" | "HALF_OPEN";
+
+export interface CircuitPolicy {
+  /** Share of failed requests in the window that opens the circuit... */
+  failureRate: number;
+  /** ...once the window holds at least this many requests. */
+  minRequests: number;
+  /** Consecutive failures that open the circuit regardless of the window. */
+  consecutiveFailures: number;
+  windowMs: number;
+  /** First open period; every failed probe doubles it, up to `maxOpenMs`. */
+  openMs: number;
+  maxOpenMs: number;
+  /** A probe that has not reported back by then lets another caller probe. */
+  probeTimeoutMs: number;
+}
+
+export interface CircuitAdmission {
+  allowed: boolean;
+  /** The one request let through a half-open circuit; its outcome closes or reopens it. */
+  probe: boolean;
+  state: CircuitState;
+  retryInMs: number;
+}
+
+export interface CircuitOutcomes {
+  requests: number;
+  failures: number;
+  /** Failures after the last success in this batch of outcomes. */
+  trailingFailures: number;
+  sawSuccess: boolean;
+  lastFailure: string | null;
+}
+
+export interface CircuitSnapshot {
+  state: CircuitState;
+  /** Time until an open circuit admits a probe. */
+  retryInMs: number;
+  /** True when this call opened the circuit. */
+  opened: boolean;
+}
+
+export interface CircuitBreakerBackend {
+  readonly name: string;
+  admit(family: CircuitFamily, policy: CircuitPolicy): Promise<CircuitAdmission>;
+  record(family: CircuitFamily, policy: CircuitPolicy, outcomes: CircuitOutcomes): Promise<CircuitSnapshot>;
+  settleProbe(family: CircuitFamily, policy: CircuitPolicy, ok: boolean, failure: string | null): Promise<CircuitSnapshot>;
+}
+
+export interface CircuitFamilyMetrics {
+  state: CircuitState;
+  requests: number;
+  failures: number;
+  rejected: number;
+  probes: number;
+  opened: number;
+}
+
+/** Thrown instead of sending a request while the family's circuit is open. */
+export class CircuitOpenError extends Error {
+  constructor(
+    readonly family: CircuitFamily,
+    readonly retryInMs: number
+  ) {
+    super(`Trendyol ${family} circuit is open; next probe in ${Math.ceil(retryInMs / 1000)}s`);
+    this.name = "CircuitOpenError";
+  }
+}
+
+export function circuitFamilyForPath(path: string): CircuitFamily {
+  return path.includes("/integration/claim/") ? "claims" : endpointFamilyForPath(path);
+}
+
+/**
+ * Responses that count against the circuit: server errors (including Trendyol's 556) and, for
+ * buybox-information, 400s. Single bad barcodes are quarantined by the buybox cache, so a high
+ * share of 400s there means the endpoint itself is rejecting requests. The requests that bisect a
+ * rejected batch are reported with `bisecting` and their 400s are not counted (see `recordResponse`).
+ */
+export function isCircuitFailure(family: CircuitFamily, status: number) {
+  return status >= 500 || (family === "buybox" && status === 400);
+}
+
+export function circuitPolicyFromEnv(): CircuitPolicy {
+  return {
+    failureRate: env.TRENDYOL_CIRCUIT_FAILURE_RATE,
+    minRequests: env.TRENDYOL_CIRCUIT_MIN_REQUESTS,
+    consecutiveFailures: env.TRENDYOL_CIRCUIT_CONSECUTIVE_FAILURES,
+    windowMs: env.TRENDYOL_CIRCUIT_WINDOW_SECONDS * 1000,
+    openMs: env.TRENDYOL_CIRCUIT_OPEN_SECONDS * 1000,
+    maxOpenMs: env.TRENDYOL_CIRCUIT_MAX_OPEN_SECONDS * 1000,
+    probeTimeoutMs: 30_000
+  };
+}
+
+const reopenMs = (policy: CircuitPolicy, opens: number) => Math.min(policy.maxOpenMs, policy.openMs * 2 ** opens);
+
+interface MemoryCircuit {
+  state: CircuitState;
+  windowStartedAt: number;
+  requests: number;
+  failures: number;
+  consecutiveFailures: number;
+  openUntil: number;
+  probeUntil: number;
+  opens: number;
+}
+
+/** Per-process circuits; used for local development and whenever the shared table is unreachable. */
+export class MemoryCircuitBreakerBackend implements CircuitBreakerBackend {
+  readonly name = "memory";
+  private readonly circuits = new Map<CircuitFamily, MemoryCircuit>();
+
+  constructor(private readonly now: () => number = Date.now) {}
+
+  private circuit(family: CircuitFamily) {
+    let circuit = this.circuits.get(family);
+    if (!circuit) {
+      circuit = {
+        state: "CLOSED",
+        windowStartedAt: this.now(),
+        requests: 0,
+        failures: 0,
+        consecutiveFailures: 0,
+        openUntil: 0,
+        probeUntil: 0,
+        opens: 0
+      };
+      this.circuits.set(family, circuit);
+    }
+    return circuit;
+  }
+
+  private snapshot(circuit: MemoryCircuit, opened = false): CircuitSnapshot {
+    return { state: circuit.state, retryInMs: Math.max(0, circuit.openUntil - this.now()), opened };
+  }
+
+  async admit(family: CircuitFamily, policy: CircuitPolicy): Promise<CircuitAdmission> {
+    const circuit = this.circuit(family);
+    const now = this.now();
+
+    if (circuit.state === "CLOSED") {
+      return { allowed: true, probe: false, state: "CLOSED", retryInMs: 0 };
+    }
+    if (circuit.state === "OPEN" && circuit.openUntil > now) {
+      return { allowed: false, probe: false, state: "OPEN", retryInMs: circuit.openUntil - now };
+    }
+    if (circuit.state === "HALF_OPEN" && circuit.probeUntil > now) {
+      return { allowed: false, probe: false, state: "HALF_OPEN", retryInMs: circuit.probeUntil - now };
+    }
+
+    circuit.state = "HALF_OPEN";
+    circuit.probeUntil = now + policy.probeTimeoutMs;
+    return { allowed: true, probe: true, state: "HALF_OPEN", retryInMs: 0 };
+  }
+
+  async record(family: CircuitFamily, policy: CircuitPolicy, outcomes: CircuitOutcomes): Promise<CircuitSnapshot> {
+    const circuit = this.circuit(family);
+    const now = this.now();
+
+    if (now - circuit.windowStartedAt >= policy.windowMs) {
+      circuit.windowStartedAt = now;
+      circuit.requests = 0;
+      circuit.failures = 0;
+    }
+    circuit.requests += outcomes.requests;
+    circuit.failures += outcomes.failures;
+    circuit.consecutiveFailures = outcomes.sawSuccess
+      ? outcomes.trailingFailures
+      : circuit.consecutiveFailures + outcomes.trailingFailures;
+
+    const trip =
+      circuit.state === "CLOSED" &&
+      ((circuit.requests >= policy.minRequests && circuit.failures >= policy.failureRate * circuit.requests) ||
+        circuit.consecutiveFailures >= policy.consecutiveFailures);
+    if (!trip) {
+      return this.snapshot(circuit);
+    }
+
+    circuit.state = "OPEN";
+    circuit.openUntil = now + policy.openMs;
+    circuit.opens = 1;
+    circuit.requests = 0;
+    circuit.failures = 0;
+    circuit.consecutiveFailures = 0;
+    return this.snapshot(circuit, true);
+  }
+
+  async settleProbe(family: CircuitFamily, policy: CircuitPolicy, ok: boolean): Promise<CircuitSnapshot> {
+    const circuit = this.circuit(family);
+    if (circuit.state !== "HALF_OPEN") {
+      return this.snapshot(circuit);
+    }
+
+    const now = this.now();
+    circuit.windowStartedAt = now;
+    circuit.requests = 0;
+    circuit.failures = 0;
+    circuit.consecutiveFailures = 0;
+    circuit.probeUntil = 0;
+    if (ok) {
+      circuit.state = "CLOSED";
+      circuit.opens = 0;
+      return this.snapshot(circuit);
+    }
+
+    circuit.state = "OPEN";
+    circuit.openUntil = now + reopenMs(policy, circuit.opens);
+    circuit.opens += 1;
+    return this.snapshot(circuit, true);
+  }
+}
+
+// All timestamps are compared in UTC, like the rate-limit buckets, so Prisma and the Python
+// scripts agree regardless of their session time zone. Same SQL as scripts/reference/circuit_breaker.py.
+const NOW_UTC = `(now() AT TIME ZONE 'UTC')`;
+
+const SEED_SQL = `
+INSERT INTO "trendyol_circuit_breakers" ("family", "windowStartedAt", "updatedAt")
+VALUES ($1, ${NOW_UTC}, ${NOW_UTC})
+ON CONFLICT ("family") DO NOTHING`;
+
+// An open circuit whose period has passed, or a half-open one whose probe timed out, hands
+// exactly one caller the probe; the row lock makes that atomic across processes.
+const ADMIT_SQL = `
+UPDATE "trendyol_circuit_breakers" AS c
+SET "state" = CASE WHEN s.probe THEN 'HALF_OPEN' ELSE c."state" END,
+    "probeUntil" = CASE WHEN s.probe THEN s.now + $2::int * INTERVAL '1 millisecond' ELSE c."probeUntil" END,
+    "updatedAt" = CASE WHEN s.probe THEN s.now ELSE c."updatedAt" END
+FROM (
+  SELECT "family",
+         ${NOW_UTC} AS now,
+         (("state" = 'OPEN' AND "openUntil" <= ${NOW_UTC})
+           OR ("state" = 'HALF_OPEN' AND ("probeUntil" IS NULL OR "probeUntil" <= ${NOW_UTC}))) AS probe
+  FROM "trendyol_circuit_breakers"
+  WHERE "family" = $1
+  FOR UPDATE
+) AS s
+WHERE c."family" = s."family"
+RETURNING
+  c."state",
+  s.probe AS "probe",
+  (c."state" = 'CLOSED' OR s.probe) AS "allowed",
+  GREATEST(0, CEIL(EXTRACT(EPOCH FROM (
+    COALESCE(CASE WHEN c."state" = 'OPEN' THEN c."openUntil" ELSE c."probeUntil" END, s.now) - s.now
+  )) * 1000))::int AS "retryInMs"`;
+
+const RECORD_SQL = `
+UPDATE "trendyol_circuit_breakers" AS c
+SET "windowStartedAt" = s."windowStartedAt",
+    "requests" = CASE WHEN s.trip THEN 0 ELSE s.requests END,
+    "failures" = CASE WHEN s.trip THEN 0 ELSE s.failures END,
+    "consecutiveFailures" = CASE WHEN s.trip THEN 0 ELSE s.consecutive END,
+    "state" = CASE WHEN s.trip THEN 'OPEN' ELSE c."state" END,
+    "openedAt" = CASE WHEN s.trip THEN s.now ELSE c."openedAt" END,
+    "openUntil" = CASE WHEN s.trip THEN s.now + $7::int * INTERVAL '1 millisecond' ELSE c."openUntil" END,
+    "opens" = CASE WHEN s.trip THEN 1 ELSE c."opens" END,
+    "openedCount" = c."openedCount" + CASE WHEN s.trip THEN 1 ELSE 0 END,
+    "lastFailure" = COALESCE($10, c."lastFailure"),
+    "updatedAt" = s.now
+FROM (
+  SELECT w.*,
+         (w."state" = 'CLOSED'
+           AND ((w.requests >= $8 AND w.failures >= $9::float8 * w.requests) OR w.consecutive >= $11)) AS trip
+  FROM (
+    SELECT "family",
+           "state",
+           ${NOW_UTC} AS now,
+           CASE WHEN "windowStartedAt" <= ${NOW_UTC} - $6::int * INTERVAL '1 millisecond'
+                THEN ${NOW_UTC} ELSE "windowStartedAt" END AS "windowStartedAt",
+           CASE WHEN "windowStartedAt" <= ${NOW_UTC} - $6::int * INTERVAL '1 millisecond'
+                THEN 0 ELSE "requests" END + $2 AS requests,
+           CASE WHEN "windowStartedAt" <= ${NOW_UTC} - $6::int * INTERVAL '1 millisecond'
+                THEN 0 ELSE "failures" END + $3 AS failures,
+           CASE WHEN $5::boolean THEN $4 ELSE "consecutiveFailures" + $4 END AS consecutive
+    FROM "trendyol_circuit_breakers"
+    WHERE "family" = $1
+    FOR UPDATE
+  ) AS w
+) AS s
+WHERE c."family" = s."family"
+RETURNING
+  c."state",
+  s.trip AS "opened",
+  GREATEST(0, CEIL(EXTRACT(EPOCH FROM (COALESCE(c."openUntil", s.now) - s.now)) * 1000))::int AS "retryInMs"`;
+
+// Only the probe's caller settles it; a failed probe reopens for twice the previous period.
+const SETTLE_SQL = `
+UPDATE "trendyol_circuit_breakers"
+SET "state" = CASE WHEN $2::boolean THEN 'CLOSED' ELSE 'OPEN' END,
+    "windowStartedAt" = ${NOW_UTC},
+    "requests" = 0,
+    "failures" = 0,
+    "consecutiveFailures" = 0,
+    "probeUntil" = NULL,
+    "openedAt" = CASE WHEN $2::boolean THEN "openedAt" ELSE ${NOW_UTC} END,
+    "openUntil" = CASE WHEN $2::boolean THEN NULL
+                       ELSE ${NOW_UTC} + LEAST($4::float8, $3::float8 * POWER(2, "opens")) * INTERVAL '1 millisecond' END,
+    "opens" = CASE WHEN $2::boolean THEN 0 ELSE "opens" + 1 END,
+    "lastFailure" = COALESCE($5, "lastFailure"),
+    "updatedAt" = ${NOW_UTC}
+WHERE "family" = $1 AND "state" = 'HALF_OPEN'
+RETURNING
+  "state",
+  NOT $2::boolean AS "opened",
+  GREATEST(0, CEIL(EXTRACT(EPOCH FROM (COALESCE("openUntil", ${NOW_UTC}) - ${NOW_UTC})) * 1000))::int AS "retryInMs"`;
+
+// A closed circuit is trusted for this long before asking the table again, and successes are
+// written at most this often; failures are written at once so the circuit opens promptly.
+const SHARED_REFRESH_MS = 1000;
+// After the shared backend fails, in-process circuits are used this long before retrying it.
+const BACKEND_RETRY_MS = 30_000;
+
+const noOutcomes = (): CircuitOutcomes => ({
+  requests: 0,
+  failures: 0,
+  trailingFailures: 0,
+  sawSuccess: false,
+  lastFailure: null
+});
+
+/** Circuits stored in `trendyol_circuit_breakers`, shared by every app instance and the Python syncs. */
+export class PostgresCircuitBreakerBackend implements CircuitBreakerBackend {
+  readonly name = "postgres";
+  private readonly seeded = new Set<CircuitFamily>();
+  private readonly known = new Map<CircuitFamily, { state: CircuitState; openUntil: number; checkedAt: number }>();
+  private readonly pending = new Map<CircuitFamily, CircuitOutcomes>();
+
+  constructor(private readonly now: () => number = Date.now) {}
+
+  private async ensureCircuit(family: CircuitFamily) {
+    if (this.seeded.has(family)) {
+      return;
+    }
+    await prisma.$executeRawUnsafe(SEED_SQL, family);
+    this.seeded.add(family);
+  }
+
+  private remember(family: CircuitFamily, state: CircuitState, retryInMs: number) {
+    const now = this.now();
+    this.known.set(family, { state, openUntil: now + retryInMs, checkedAt: now });
+  }
+
+  async admit(family: CircuitFamily, policy: CircuitPolicy): Promise<CircuitAdmission> {
+    const known = this.known.get(family);
+    const now = this.now();
+    if (known?.state === "CLOSED" && now - known.checkedAt < SHARED_REFRESH_MS) {
+      return { allowed: true, probe: false, state: "CLOSED", retryInMs: 0 };
+    }
+    if (known?.state === "OPEN" && known.openUntil > now) {
+      return { allowed: false, probe: false, state: "OPEN", retryInMs: known.openUntil - now };
+    }
+
+    await this.ensureCircuit(family);
+    const [row] = await prisma.$queryRawUnsafe<CircuitAdmission[]>(ADMIT_SQL, family, policy.probeTimeoutMs);
+    if (!row) {
+      // Row deleted underneath us; seed again on the next call.
+      this.seeded.delete(family);
+      return { allowed: true, probe: false, state: "CLOSED", retryInMs: 0 };
+    }
+
+    const retryInMs = Number(row.retryInMs);
+    this.remember(family, row.state, row.state === "HALF_OPEN" ? 0 : retryInMs);
+    return { allowed: row.allowed, probe: row.probe, state: row.state, retryInMs };
+  }
+
+  async record(family: CircuitFamily, policy: CircuitPolicy, outcomes: CircuitOutcomes): Promise<CircuitSnapshot> {
+    const pending = this.pending.get(family) ?? noOutcomes();
+    pending.requests += outcomes.requests;
+    pending.failures += outcomes.failures;
+    pending.trailingFailures = outcomes.sawSuccess
+      ? outcomes.trailingFailures
+      : pending.trailingFailures + outcomes.trailingFailures;
+    pending.sawSuccess ||= outcomes.sawSuccess;
+    pending.lastFailure = outcomes.lastFailure ?? pending.lastFailure;
+
+    const known = this.known.get(family);
+    if (!outcomes.failures && known && this.now() - known.checkedAt < SHARED_REFRESH_MS) {
+      this.pending.set(family, pending);
+      return { state: known.state, retryInMs: Math.max(0, known.openUntil - this.now()), opened: false };
+    }
+
+    this.pending.delete(family);
+    await this.ensureCircuit(family);
+    const [row] = await prisma.$queryRawUnsafe<CircuitSnapshot[]>(
+      RECORD_SQL,
+      family,
+      pending.requests,
+      pending.failures,
+      pending.trailingFailures,
+      pending.sawSuccess,
+      policy.windowMs,
+      policy.openMs,
+      policy.minRequests,
+      policy.failureRate,
+      pending.lastFailure,
+      policy.consecutiveFailures
+    );
+    if (!row) {
+      this.seeded.delete(family);
+      return { state: "CLOSED", retryInMs: 0, opened: false };
+    }
+
+    this.remember(family, row.state, Number(row.retryInMs));
+    return { state: row.state, retryInMs: Number(row.retryInMs), opened: row.opened };
+  }
+
+  async settleProbe(
+    family: CircuitFamily,
+    policy: CircuitPolicy,
+    ok: boolean,
+    failure: string | null
+  ): Promise<CircuitSnapshot> {
+    const [row] = await prisma.$queryRawUnsafe<CircuitSnapshot[]>(
+      SETTLE_SQL,
+      family,
+      ok,
+      policy.openMs,
+      policy.maxOpenMs,
+      failure
+    );
+    if (!row) {
+      // Another caller settled it (our probe timed out); read the state again next time.
+      this.known.delete(family);
+      return { state: "OPEN", retryInMs: 0, opened: false };
+    }
+
+    this.remember(family, row.state, Number(row.retryInMs));
+    return { state: row.state, retryInMs: Number(row.retryInMs), opened: row.opened };
+  }
+}
+
+const emptyMetrics = (): CircuitFamilyMetrics => ({
+  state: "CLOSED",
+  requests: 0,
+  failures: 0,
+  rejected: 0,
+  probes: 0,
+  opened: 0
+});
+
+/**
+ * Circuit breaker per Trendyol endpoint family. A family whose requests fail at
+ * `failureRate` or more within the window (or `consecutiveFailures` times in a row) opens:
+ * requests fail fast with `CircuitOpenError` instead of spending their retries. Once the open
+ * period passes one request probes the endpoint; success closes the circuit, failure reopens it
+ * for twice as long.
+ */
+export class TrendyolCircuitBreakers {
+  private readonly backend: CircuitBreakerBackend;
+  private readonly fallback: CircuitBreakerBackend;
+  private readonly policy: CircuitPolicy;
+  private readonly metrics = new Map<CircuitFamily, CircuitFamilyMetrics>();
+  private readonly backendRetryMs: number;
+  private readonly now: () => number;
+  // While set, calls go to the fallback; the shared backend is tried again once it passes.
+  private fallbackUntil = 0;
+
+  constructor(options: {
+    backend: CircuitBreakerBackend;
+    policy: CircuitPolicy;
+    fallback?: CircuitBreakerBackend;
+    backendRetryMs?: number;
+    now?: () => number;
+  }) {
+    this.backend = options.backend;
+    this.policy = options.policy;
+    this.fallback = options.fallback ?? new MemoryCircuitBreakerBackend();
+    this.backendRetryMs = options.backendRetryMs ?? BACKEND_RETRY_MS;
+    this.now = options.now ?? Date.now;
+  }
+
+  private activeBackend() {
+    return this.fallbackUntil > this.now() ? this.fallback : this.backend;
+  }
+
+  get backendName() {
+    return this.activeBackend().name;
+  }
+
+  private metricsFor(family: CircuitFamily) {
+    let metrics = this.metrics.get(family);
+    if (!metrics) {
+      metrics = emptyMetrics();
+      this.metrics.set(family, metrics);
+    }
+    return metrics;
+  }
+
+  private async withBackend<T>(run: (backend: CircuitBreakerBackend) => Promise<T>): Promise<T> {
+    const backend = this.activeBackend();
+    try {
+      return await run(backend);
+    } catch (error) {
+      if (backend === this.fallback) {
+        throw error;
+      }
+      console.warn(
+        `[circuit] ${backend.name} backend unavailable, falling back to ${this.fallback.name} ` +
+          `for ${Math.round(this.backendRetryMs / 1000)}s:`,
+        error instanceof Error ? error.message : error
+      );
+      this.fallbackUntil = this.now() + this.backendRetryMs;
+      return run(this.fallback);
+    }
+  }
+
+  /** Admits a request for `family` or throws `CircuitOpenError`. */
+  async admit(family: CircuitFamily): Promise<CircuitAdmission> {
+    const metrics = this.metricsFor(family);
+    const admission = await this.withBackend((backend) => backend.admit(family, this.policy));
+    metrics.state = admission.state;
+
+    if (!admission.allowed) {
+      metrics.rejected += 1;
+      circuitRejections.inc({ family });
+      throw new CircuitOpenError(family, admission.retryInMs);
+    }
+    if (admission.probe) {
+      metrics.probes += 1;
+    }
+    return admission;
+  }
+
+  /** Reports the outcome of an admitted request; `failure` describes it when it counts against the circuit. */
+  async record(family: CircuitFamily, admission: CircuitAdmission, failure: string | null) {
+    const metrics = this.metricsFor(family);
+    metrics.requests += 1;
+    if (failure) {
+      metrics.failures += 1;
+    }
+
+    const snapshot = await this.withBackend((backend) =>
+      admission.probe
+        ? backend.settleProbe(family, this.policy, !failure, failure)
+        : backend.record(family, this.policy, {
+            requests: 1,
+            failures: failure ? 1 : 0,
+            trailingFailures: failure ? 1 : 0,
+            sawSuccess: !failure,
+            lastFailure: failure
+          })
+    );
+
+    metrics.state = snapshot.state;
+    if (snapshot.opened) {
+      metrics.opened += 1;
+      circuitOpens.inc({ family });
+      console.warn(
+        `[circuit] ${family} circuit opened after ${failure ?? "failures"}; next probe in ${Math.ceil(snapshot.retryInMs / 1000)}s`
+      );
+    }
+    return snapshot;
+  }
+
+  /**
+   * Reports an admitted request's HTTP response. A 400 on a request bisecting a rejected buybox
+   * batch only says which barcodes are bad, so it is not counted; a half-open probe still settles
+   * as a success, since the endpoint answered.
+   */
+  async recordResponse(
+    family: CircuitFamily,
+    admission: CircuitAdmission,
+    status: number,
+    options: { bisecting?: boolean } = {}
+  ) {
+    const neutral = options.bisecting === true && status === 400;
+    if (neutral && !admission.probe) {
+      return null;
+    }
+    return this.record(family, admission, !neutral && isCircuitFailure(family, status) ? `HTTP ${status}` : null);
+  }
+
+  getMetrics() {
+    return {
+      backend: this.activeBackend().name,
+      families: Object.fromEntries(CIRCUIT_FAMILIES.map((family) => [family, { ...this.metricsFor(family) }])) as Record<
+        CircuitFamily,
+        CircuitFamilyMetrics
+      >
+    };
+  }
+}
+
+export const trendyolCircuitBreakers = new TrendyolCircuitBreakers({
+  backend:
+    env.TRENDYOL_RATE_LIMIT_BACKEND === "postgres" ? new PostgresCircuitBreakerBackend() : new MemoryCircuitBreakerBackend(),
+  policy: circuitPolicyFromEnv()
+});
+
+export function getCircuitBreakerMetrics() {
+  return trendyolCircuitBreakers.getMetrics();
+}
@@ -1,4 +1,7 @@
 import { env } from "@/lib/config/env";
+import { httpRequestDuration, httpRetries, rateLimitWait } from "@/lib/metrics/registry";
+import { circuitFamilyForPath, trendyolCircuitBreakers } from "@/lib/trendyol/circuit-breaker";
+import { endpointFamilyForPath, trendyolRateLimiter } from "@/lib/trendyol/rate-limiter";
 import type {
   TrendyolClientOptions,
   TrendyolCompetitorData,
@@ -9,7 +12,11 @@ import type {
 
 const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
 
-let lastRequestAt = 0;
+/** HTTP status of an error thrown by `TrendyolClient` requests ("Trendyol API <status>: ..."). */
+export function trendyolErrorStatus(error: unknown) {
+  const match = error instanceof Error ? /^Trendyol API (\d{3})\b/.exec(error.message) : null;
+  return match ? Number(match[1]) : null;
+}
 
 export class TrendyolClient {
   private sellerId: string;
@@ -221,31 +228,51 @@ export class TrendyolClient {
     ]);
   }
 
-  private async request<T>(path: string, init?: RequestInit, retries = 3): Promise<T> {
+  /** `bisecting` marks a request that splits a rejected buybox batch; its 400s do not count against the circuit. */
+  private async request<T>(
+    path: string,
+    init?: RequestInit,
+    options: { retries?: number; bisecting?: boolean } = {}
+  ): Promise<T> {
     if (!this.isConfigured()) {
       throw new Error("Trendyol credentials are not configured");
     }
 
-    const minGapMs = 180;
-    const elapsed = Date.now() - lastRequestAt;
-    if (elapsed < minGapMs) {
-      await sleep(minGapMs - elapsed);
-    }
-
     const url = `${this.baseUrl}${path}`;
+    const family = endpointFamilyForPath(path);
+    const circuitFamily = circuitFamilyForPath(path);
 
+    const retries = options.retries ?? 3;
     let attempt = 0;
     while (attempt <= retries) {
       attempt += 1;
-      lastRequestAt = Date.now();
-
-      const response = await fetch(url, {
-        ...init,
-        headers: {
-          ...this.defaultHeaders,
-          ...(init?.headers ?? {})
-        },
-        cache: "no-store"
+      // Throws CircuitOpenError while the endpoint is failing, so retries stop as soon as it opens.
+      const admission = await trendyolCircuitBreakers.admit(circuitFamily);
+      const waitedMs = await trendyolRateLimiter.acquire(family);
+      if (waitedMs > 0) {
+        rateLimitWait.observe({ family }, waitedMs / 1000);
+      }
+
+      const startedAt = performance.now();
+      let response: Response;
+      try {
+        response = await fetch(url, {
+          ...init,
+          headers: {
+            ...this.defaultHeaders,
+            ...(init?.headers ?? {})
+          },
+          cache: "no-store"
+        });
+      } catch (error) {
+        await trendyolCircuitBreakers.record(circuitFamily, admission, "network error");
+        throw error;
+      }
+      httpRequestDuration.observe({ family, status: String(response.status) }, (performance.now() - startedAt) / 1000);
+
+      await trendyolRateLimiter.observe(family, response.status, response.headers);
+      await trendyolCircuitBreakers.recordResponse(circuitFamily, admission, response.status, {
+        bisecting: options.bisecting
       });
 
       if (response.ok) {
@@ -258,8 +285,13 @@ export class TrendyolClient {
         throw new Error(`Trendyol API ${response.status}: ${body.slice(0, 300)}`);
       }
 
-      const backoff = 800 * 2 ** (attempt - 1) + Math.floor(Math.random() * 350);
-      await sleep(backoff);
+      httpRetries.inc({ family, reason: response.status === 429 ? "rate_limited" : "server_error" });
+
+      // 429s pause the whole family through the limiter; only server errors back off locally.
+      if (response.status !== 429) {
+        const backoff = 800 * 2 ** (attempt - 1) + Math.floor(Math.random() * 350);
+        await sleep(backoff);
+      }
     }
 
     throw new Error("Trendyol request exhausted retries");
@@ -335,7 +367,7 @@ export class TrendyolClient {
     };
   }
 
-  async fetchBuyboxInformation(barcodes: string[]) {
+  async fetchBuyboxInformation(barcodes: string[], options: { bisecting?: boolean } = {}) {
     const unique = Array.from(new Set(barcodes.map((value) => String(value).trim()).filter(Boolean)));
 
     if (!unique.length) {
@@ -351,7 +383,8 @@ export class TrendyolClient {
           barcodes: unique,
           supplierId: Number.isFinite(numericSellerId) ? numericSellerId : this.sellerId
         })
-      }
+      },
+      { bisecting: options.bisecting }
     );
 
     const entries = this.extractListPayload(raw);
@@ -630,15 +663,21 @@ export class TrendyolClient {
   }
 
   async updatePrice(barcodeOrSku: string, newPrice: number): Promise<TrendyolPriceUpdateResponse> {
+    return this.updatePrices([{ reference: barcodeOrSku, price: newPrice }]);
+  }
+
+  /**
+   * Submits several prices in one request (one rate-limit token). Trendyol applies them
+   * asynchronously under the batch request id in `raw`.
+   */
+  async updatePrices(items: Array<{ reference: string; price: number }>): Promise<TrendyolPriceUpdateResponse> {
     const payload = {
-      items: [
-        {
-          barcode: barcodeOrSku,
-          stockCode: barcodeOrSku,
-          salePrice: newPrice,
-          listPrice: newPrice
-        }
-      ]
+      items: items.map(({ reference, price }) => ({
+        barcode: reference,
+        stockCode: reference,
+        salePrice: price,
+        listPrice: price
+      }))
     };
 
     const raw = await this.request<any>(
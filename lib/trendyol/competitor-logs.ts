@@ -0,0 +1,109 @@
+import { prisma } from "@/lib/db/prisma";
+import type { TrendyolCompetitorData } from "@/lib/trendyol/types";
+
+export interface CompetitorObservation {
+  productId: string;
+  competitorName: string;
+  price: number;
+  isBuyBoxWinner: boolean;
+}
+
+export const OUR_STORE_LABEL = "Our store";
+export const UNKNOWN_HOLDER_LABEL = "BuyBox holder";
+
+const NAME_KEYS = ["buyboxSellerName", "sellerName", "merchantName", "supplierName"];
+const SELLER_ID_KEYS = ["buyboxSellerId", "winnerSellerId", "sellerId"];
+
+// Compared in UTC, like the rate-limit buckets, so rows from the Python sync line up.
+const NOW_UTC = `(now() AT TIME ZONE 'UTC')`;
+
+/**
+ * Interns competitor names, extends each product's latest row when the observation is unchanged
+ * and inserts a row otherwise, all in one statement. Same SQL as
+ * `scripts/reference/competitor_logs.py`.
+ */
+const RECORD_SQL = `
+WITH obs AS (
+  SELECT DISTINCT ON (o."productId") o."productId", o."name", o."price", o."isBuyBoxWinner"
+  FROM unnest($1::text[], $2::text[], $3::numeric[], $4::boolean[]) AS o("productId", "name", "price", "isBuyBoxWinner")
+),
+interned AS (
+  INSERT INTO "competitors" ("name")
+  SELECT DISTINCT "name" FROM obs
+  ON CONFLICT ("name") DO NOTHING
+  RETURNING "id", "name"
+),
+names AS (
+  SELECT "id", "name" FROM interned
+  UNION
+  SELECT c."id", c."name" FROM "competitors" c WHERE c."name" IN (SELECT "name" FROM obs)
+),
+resolved AS (
+  SELECT obs."productId", names."id" AS "competitorId", obs."price"::numeric(12, 2) AS "price", obs."isBuyBoxWinner"
+  FROM obs JOIN names ON names."name" = obs."name"
+),
+latest AS (
+  SELECT DISTINCT ON (l."productId") l."id", l."productId", l."competitorId", l."price", l."isBuyBoxWinner"
+  FROM "competitor_logs" l
+  WHERE l."productId" IN (SELECT "productId" FROM obs)
+  ORDER BY l."productId", l."checkedAt" DESC
+),
+extended AS (
+  UPDATE "competitor_logs" l
+  SET "lastSeenAt" = ${NOW_UTC}, "observations" = l."observations" + 1
+  FROM latest, resolved r
+  WHERE l."id" = latest."id"
+    AND r."productId" = latest."productId"
+    AND r."competitorId" = latest."competitorId"
+    AND r."price" = latest."price"
+    AND r."isBuyBoxWinner" = latest."isBuyBoxWinner"
+  RETURNING l."productId"
+)
+INSERT INTO "competitor_logs" ("productId", "competitorId", "price", "isBuyBoxWinner", "checkedAt", "lastSeenAt")
+SELECT r."productId", r."competitorId", r."price", r."isBuyBoxWinner", ${NOW_UTC}, ${NOW_UTC}
+FROM resolved r
+WHERE r."productId" NOT IN (SELECT "productId" FROM extended)`;
+
+/**
+ * The buybox holder seen for a product, or null when the entry carries no buybox price. Holder
+ * and winner come from the buybox-information entry (`raw.entry` when served by the buybox cache),
+ * read exactly as `observation_for` in the Python sync does, so both intern the same competitor.
+ */
+export function competitorObservation(
+  productId: string,
+  data: TrendyolCompetitorData
+): CompetitorObservation | null {
+  if (data.competitorMinPrice === null || !Number.isFinite(data.competitorMinPrice)) {
+    return null;
+  }
+
+  const raw = (data.raw ?? {}) as Record<string, unknown>;
+  const entry = (raw.entry && typeof raw.entry === "object" ? raw.entry : raw) as Record<string, unknown>;
+  const namedKey = NAME_KEYS.find((key) => typeof entry[key] === "string" && (entry[key] as string).trim());
+  const sellerKey = SELLER_ID_KEYS.find((key) => entry[key] !== undefined && entry[key] !== null);
+  const isBuyBoxWinner = Number(entry.buyboxOrder) === 1;
+  const competitorName = namedKey
+    ? (entry[namedKey] as string).trim()
+    : isBuyBoxWinner
+      ? OUR_STORE_LABEL
+      : sellerKey
+        ? `Seller ${entry[sellerKey]}`
+        : UNKNOWN_HOLDER_LABEL;
+
+  return { productId, competitorName, price: data.competitorMinPrice, isBuyBoxWinner };
+}
+
+/** Appends one page of observations; returns the rows inserted (extended runs are not counted). */
+export async function recordCompetitorObservations(observations: CompetitorObservation[]) {
+  if (!observations.length) {
+    return 0;
+  }
+
+  return prisma.$executeRawUnsafe(
+    RECORD_SQL,
+    observations.map((row) => row.productId),
+    observations.map((row) => row.competitorName),
+    observations.map((row) => row.price),
+    observations.map((row) => row.isBuyBoxWinner)
+  );
+}
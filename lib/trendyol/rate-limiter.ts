@@ -0,0 +1,433 @@
+import { env } from "@/lib/config/env";
+import { prisma } from "@/lib/db/prisma";
+
+export type TrendyolEndpointFamily = "products" | "buybox" | "shipments" | "prices";
+
+export const TRENDYOL_ENDPOINT_FAMILIES: TrendyolEndpointFamily[] = ["products", "buybox", "shipments", "prices"];
+
+export interface RateLimitBudget {
+  ratePerSecond: number;
+  burst: number;
+}
+
+export interface RateLimitTake {
+  granted: boolean;
+  waitMs: number;
+  ratePerSecond: number;
+}
+
+export interface RateLimitThrottle {
+  blockMs: number;
+  /** Halve the shared rate (429s); header-driven pauses keep the rate as is. */
+  slowDown: boolean;
+}
+
+export interface RateLimitBackend {
+  readonly name: string;
+  take(family: TrendyolEndpointFamily, budget: RateLimitBudget): Promise<RateLimitTake>;
+  throttle(family: TrendyolEndpointFamily, budget: RateLimitBudget, throttle: RateLimitThrottle): Promise<void>;
+  recover(family: TrendyolEndpointFamily, budget: RateLimitBudget): Promise<void>;
+}
+
+export interface RateLimitFamilyMetrics {
+  requests: number;
+  waits: number;
+  waitMsTotal: number;
+  maxWaitMs: number;
+  throttled: number;
+  headerPauses: number;
+  ratePerSecond: number;
+}
+
+export interface ParsedRateLimitHeaders {
+  retryAfterMs: number | null;
+  remaining: number | null;
+  resetMs: number | null;
+}
+
+// After a 429 the shared rate is halved, never below this share of the budget, and then
+// grows back by RECOVERY_FACTOR per successful request.
+const MIN_RATE_SHARE = 0.1;
+const RECOVERY_FACTOR = 1.05;
+const DEFAULT_429_PAUSE_MS = 2000;
+const MAX_SLEEP_SLICE_MS = 2000;
+// After the shared backend fails, the in-process fallback is used this long before retrying it.
+const BACKEND_RETRY_MS = 30_000;
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+const minRate = (budget: RateLimitBudget) => Math.max(0.2, budget.ratePerSecond * MIN_RATE_SHARE);
+
+export function endpointFamilyForPath(path: string): TrendyolEndpointFamily {
+  if (path.includes("/buybox-information")) {
+    return "buybox";
+  }
+  if (path.includes("/price-and-inventory")) {
+    return "prices";
+  }
+  if (path.includes("/integration/order/") || path.includes("/integration/claim/")) {
+    return "shipments";
+  }
+  return "products";
+}
+
+function headerNumber(headers: Headers, names: string[]) {
+  for (const name of names) {
+    const value = headers.get(name);
+    if (value === null || value.trim() === "") {
+      continue;
+    }
+    const number = Number(value);
+    if (Number.isFinite(number)) {
+      return number;
+    }
+  }
+  return null;
+}
+
+/**
+ * Reads `Retry-After` (seconds or HTTP date) and `X-RateLimit-Remaining` / `X-RateLimit-Reset`
+ * (seconds until reset, or an epoch timestamp in seconds).
+ */
+export function parseRateLimitHeaders(headers: Headers, now = Date.now()): ParsedRateLimitHeaders {
+  let retryAfterMs: number | null = null;
+  const retryAfter = headers.get("retry-after");
+  if (retryAfter) {
+    const seconds = Number(retryAfter);
+    if (Number.isFinite(seconds)) {
+      retryAfterMs = Math.max(0, seconds * 1000);
+    } else {
+      const date = Date.parse(retryAfter);
+      retryAfterMs = Number.isNaN(date) ? null : Math.max(0, date - now);
+    }
+  }
+
+  const remaining = headerNumber(headers, ["x-ratelimit-remaining", "ratelimit-remaining"]);
+  const reset = headerNumber(headers, ["x-ratelimit-reset", "ratelimit-reset"]);
+  const resetMs =
+    reset === null ? null : reset > 1_000_000_000 ? Math.max(0, reset * 1000 - now) : Math.max(0, reset * 1000);
+
+  return { retryAfterMs, remaining, resetMs };
+}
+
+export function budgetsFromEnv(): Record<TrendyolEndpointFamily, RateLimitBudget> {
+  const burst = env.TRENDYOL_RATE_LIMIT_BURST;
+  return {
+    products: { ratePerSecond: env.TRENDYOL_RATE_LIMIT_PRODUCTS_PER_SECOND, burst },
+    buybox: { ratePerSecond: env.TRENDYOL_RATE_LIMIT_BUYBOX_PER_SECOND, burst },
+    shipments: { ratePerSecond: env.TRENDYOL_RATE_LIMIT_SHIPMENTS_PER_SECOND, burst },
+    prices: { ratePerSecond: env.TRENDYOL_RATE_LIMIT_PRICES_PER_SECOND, burst }
+  };
+}
+
+interface MemoryBucket {
+  tokens: number;
+  ratePerSecond: number;
+  refilledAt: number;
+  blockedUntil: number;
+}
+
+/** Per-process buckets; used for local development and whenever the shared table is unreachable. */
+export class MemoryRateLimitBackend implements RateLimitBackend {
+  readonly name = "memory";
+  private readonly buckets = new Map<TrendyolEndpointFamily, MemoryBucket>();
+
+  constructor(private readonly now: () => number = Date.now) {}
+
+  private bucket(family: TrendyolEndpointFamily, budget: RateLimitBudget) {
+    let bucket = this.buckets.get(family);
+    if (!bucket) {
+      bucket = { tokens: budget.burst, ratePerSecond: budget.ratePerSecond, refilledAt: this.now(), blockedUntil: 0 };
+      this.buckets.set(family, bucket);
+    }
+
+    const now = this.now();
+    const elapsedSeconds = Math.max(0, now - bucket.refilledAt) / 1000;
+    bucket.tokens = Math.min(budget.burst, bucket.tokens + elapsedSeconds * bucket.ratePerSecond);
+    bucket.refilledAt = now;
+    return bucket;
+  }
+
+  async take(family: TrendyolEndpointFamily, budget: RateLimitBudget): Promise<RateLimitTake> {
+    const bucket = this.bucket(family, budget);
+    const now = this.now();
+
+    if (bucket.blockedUntil > now) {
+      return { granted: false, waitMs: bucket.blockedUntil - now, ratePerSecond: bucket.ratePerSecond };
+    }
+
+    if (bucket.tokens >= 1) {
+      bucket.tokens -= 1;
+      return { granted: true, waitMs: 0, ratePerSecond: bucket.ratePerSecond };
+    }
+
+    return {
+      granted: false,
+      waitMs: Math.ceil(((1 - bucket.tokens) / bucket.ratePerSecond) * 1000),
+      ratePerSecond: bucket.ratePerSecond
+    };
+  }
+
+  async throttle(family: TrendyolEndpointFamily, budget: RateLimitBudget, throttle: RateLimitThrottle) {
+    const bucket = this.bucket(family, budget);
+    if (throttle.slowDown) {
+      bucket.ratePerSecond = Math.max(minRate(budget), bucket.ratePerSecond / 2);
+      bucket.tokens = 0;
+    }
+    bucket.blockedUntil = Math.max(bucket.blockedUntil, this.now() + throttle.blockMs);
+  }
+
+  async recover(family: TrendyolEndpointFamily, budget: RateLimitBudget) {
+    const bucket = this.bucket(family, budget);
+    bucket.ratePerSecond = Math.min(budget.ratePerSecond, bucket.ratePerSecond * RECOVERY_FACTOR);
+  }
+}
+
+// All timestamps are compared in UTC so Prisma and the Python scripts agree regardless of
+// their session time zone. The row lock taken by UPDATE makes each take atomic across processes.
+const NOW_UTC = `(now() AT TIME ZONE 'UTC')`;
+
+const TAKE_SQL = `
+UPDATE "trendyol_rate_limits" AS b
+SET "tokens" = CASE WHEN NOT s.blocked AND s.available >= 1 THEN s.available - 1 ELSE s.available END,
+    "refilledAt" = s.now,
+    "updatedAt" = s.now
+FROM (
+  SELECT "family",
+         ${NOW_UTC} AS now,
+         LEAST("capacity", "tokens" + GREATEST(0, EXTRACT(EPOCH FROM (${NOW_UTC} - "refilledAt"))) * "ratePerSecond")::float8 AS available,
+         ("blockedUntil" IS NOT NULL AND "blockedUntil" > ${NOW_UTC}) AS blocked,
+         "blockedUntil",
+         "ratePerSecond"
+  FROM "trendyol_rate_limits"
+  WHERE "family" = $1
+  FOR UPDATE
+) AS s
+WHERE b."family" = s."family"
+RETURNING
+  (NOT s.blocked AND s.available >= 1) AS granted,
+  (CASE
+     WHEN s.blocked THEN CEIL(EXTRACT(EPOCH FROM (s."blockedUntil" - s.now)) * 1000)
+     WHEN s.available >= 1 THEN 0
+     ELSE CEIL((1 - s.available) / s."ratePerSecond" * 1000)
+   END)::int AS "waitMs",
+  s."ratePerSecond"::float8 AS "ratePerSecond"`;
+
+const SEED_SQL = `
+INSERT INTO "trendyol_rate_limits" ("family", "tokens", "capacity", "ratePerSecond", "refilledAt", "updatedAt")
+VALUES ($1, $2::float8, $2::float8, $3::float8, ${NOW_UTC}, ${NOW_UTC})
+ON CONFLICT ("family") DO UPDATE
+SET "capacity" = EXCLUDED."capacity",
+    "ratePerSecond" = LEAST("trendyol_rate_limits"."ratePerSecond", EXCLUDED."ratePerSecond")`;
+
+const THROTTLE_SQL = `
+UPDATE "trendyol_rate_limits"
+SET "ratePerSecond" = CASE WHEN $2::boolean THEN GREATEST($3::float8, "ratePerSecond" / 2) ELSE "ratePerSecond" END,
+    "tokens" = CASE WHEN $2::boolean THEN 0 ELSE "tokens" END,
+    "blockedUntil" = GREATEST(COALESCE("blockedUntil", ${NOW_UTC}), ${NOW_UTC} + $4::float8 * INTERVAL '1 millisecond'),
+    "throttledCount" = "throttledCount" + CASE WHEN $2::boolean THEN 1 ELSE 0 END,
+    "updatedAt" = ${NOW_UTC}
+WHERE "family" = $1`;
+
+const RECOVER_SQL = `
+UPDATE "trendyol_rate_limits"
+SET "ratePerSecond" = LEAST($2::float8, "ratePerSecond" * ${RECOVERY_FACTOR}),
+    "updatedAt" = ${NOW_UTC}
+WHERE "family" = $1 AND "ratePerSecond" < $2::float8`;
+
+/** Buckets stored in `trendyol_rate_limits`, shared by every app instance and the Python syncs. */
+export class PostgresRateLimitBackend implements RateLimitBackend {
+  readonly name = "postgres";
+  private readonly seeded = new Set<TrendyolEndpointFamily>();
+
+  private async ensureBucket(family: TrendyolEndpointFamily, budget: RateLimitBudget) {
+    if (this.seeded.has(family)) {
+      return;
+    }
+    await prisma.$executeRawUnsafe(SEED_SQL, family, budget.burst, budget.ratePerSecond);
+    this.seeded.add(family);
+  }
+
+  async take(family: TrendyolEndpointFamily, budget: RateLimitBudget): Promise<RateLimitTake> {
+    await this.ensureBucket(family, budget);
+    const rows = await prisma.$queryRawUnsafe<RateLimitTake[]>(TAKE_SQL, family);
+    const row = rows[0];
+    if (!row) {
+      // Row deleted underneath us; seed again on the next call.
+      this.seeded.delete(family);
+      return { granted: false, waitMs: 50, ratePerSecond: budget.ratePerSecond };
+    }
+    return { granted: row.granted, waitMs: Number(row.waitMs), ratePerSecond: Number(row.ratePerSecond) };
+  }
+
+  async throttle(family: TrendyolEndpointFamily, budget: RateLimitBudget, throttle: RateLimitThrottle) {
+    await this.ensureBucket(family, budget);
+    await prisma.$executeRawUnsafe(
+      THROTTLE_SQL,
+      family,
+      throttle.slowDown,
+      minRate(budget),
+      Math.max(0, Math.round(throttle.blockMs))
+    );
+  }
+
+  async recover(family: TrendyolEndpointFamily, budget: RateLimitBudget) {
+    await prisma.$executeRawUnsafe(RECOVER_SQL, family, budget.ratePerSecond);
+  }
+}
+
+const emptyMetrics = (ratePerSecond: number): RateLimitFamilyMetrics => ({
+  requests: 0,
+  waits: 0,
+  waitMsTotal: 0,
+  maxWaitMs: 0,
+  throttled: 0,
+  headerPauses: 0,
+  ratePerSecond
+});
+
+/**
+ * Adaptive token bucket per Trendyol endpoint family. Every request takes a token from the
+ * family's bucket; 429s halve the family rate and pause it for `Retry-After`, rate-limit
+ * headers reporting an exhausted window pause it until the reset, and successful responses
+ * grow the rate back toward the configured budget.
+ */
+export class TrendyolRateLimiter {
+  private readonly backend: RateLimitBackend;
+  private readonly fallback: RateLimitBackend;
+  private readonly budgets: Record<TrendyolEndpointFamily, RateLimitBudget>;
+  private readonly metrics = new Map<TrendyolEndpointFamily, RateLimitFamilyMetrics>();
+  private readonly backendRetryMs: number;
+  private readonly now: () => number;
+  // While set, calls go to the fallback; the shared backend is tried again once it passes.
+  private fallbackUntil = 0;
+
+  constructor(options: {
+    backend: RateLimitBackend;
+    budgets: Record<TrendyolEndpointFamily, RateLimitBudget>;
+    fallback?: RateLimitBackend;
+    backendRetryMs?: number;
+    now?: () => number;
+  }) {
+    this.backend = options.backend;
+    this.budgets = options.budgets;
+    this.fallback = options.fallback ?? new MemoryRateLimitBackend();
+    this.backendRetryMs = options.backendRetryMs ?? BACKEND_RETRY_MS;
+    this.now = options.now ?? Date.now;
+  }
+
+  private activeBackend() {
+    return this.fallbackUntil > this.now() ? this.fallback : this.backend;
+  }
+
+  get backendName() {
+    return this.activeBackend().name;
+  }
+
+  private metricsFor(family: TrendyolEndpointFamily) {
+    let metrics = this.metrics.get(family);
+    if (!metrics) {
+      metrics = emptyMetrics(this.budgets[family].ratePerSecond);
+      this.metrics.set(family, metrics);
+    }
+    return metrics;
+  }
+
+  private async withBackend<T>(run: (backend: RateLimitBackend) => Promise<T>): Promise<T> {
+    const backend = this.activeBackend();
+    try {
+      return await run(backend);
+    } catch (error) {
+      if (backend === this.fallback) {
+        throw error;
+      }
+      console.warn(
+        `[rate-limit] ${backend.name} backend unavailable, falling back to ${this.fallback.name} ` +
+          `for ${Math.round(this.backendRetryMs / 1000)}s:`,
+        error instanceof Error ? error.message : error
+      );
+      this.fallbackUntil = this.now() + this.backendRetryMs;
+      return run(this.fallback);
+    }
+  }
+
+  /** Waits until a request for `family` may be sent. Returns the time spent waiting. */
+  async acquire(family: TrendyolEndpointFamily) {
+    const budget = this.budgets[family];
+    const metrics = this.metricsFor(family);
+    const startedAt = Date.now();
+    let slept = false;
+
+    for (;;) {
+      const result = await this.withBackend((backend) => backend.take(family, budget));
+      metrics.ratePerSecond = result.ratePerSecond;
+
+      if (result.granted) {
+        break;
+      }
+
+      slept = true;
+      await sleep(Math.min(MAX_SLEEP_SLICE_MS, Math.max(5, result.waitMs)));
+    }
+
+    const waitedMs = slept ? Date.now() - startedAt : 0;
+    metrics.requests += 1;
+    if (slept) {
+      metrics.waits += 1;
+      metrics.waitMsTotal += waitedMs;
+      metrics.maxWaitMs = Math.max(metrics.maxWaitMs, waitedMs);
+    }
+    return waitedMs;
+  }
+
+  /** Feeds a response back into the family's bucket. */
+  async observe(family: TrendyolEndpointFamily, status: number, headers: Headers) {
+    const budget = this.budgets[family];
+    const metrics = this.metricsFor(family);
+    const parsed = parseRateLimitHeaders(headers);
+
+    if (status === 429) {
+      metrics.throttled += 1;
+      const blockMs = parsed.retryAfterMs ?? parsed.resetMs ?? DEFAULT_429_PAUSE_MS;
+      await this.withBackend((backend) => backend.throttle(family, budget, { blockMs, slowDown: true }));
+      return;
+    }
+
+    if (parsed.remaining !== null && parsed.remaining <= 0 && parsed.resetMs) {
+      metrics.headerPauses += 1;
+      await this.withBackend((backend) =>
+        backend.throttle(family, budget, { blockMs: parsed.resetMs ?? 0, slowDown: false })
+      );
+      return;
+    }
+
+    if (status < 400 && metrics.ratePerSecond < budget.ratePerSecond) {
+      await this.withBackend((backend) => backend.recover(family, budget));
+    }
+  }
+
+  getMetrics() {
+    return {
+      backend: this.activeBackend().name,
+      families: Object.fromEntries(
+        TRENDYOL_ENDPOINT_FAMILIES.map((family) => [
+          family,
+          { ...this.metricsFor(family), budgetPerSecond: this.budgets[family].ratePerSecond }
+        ])
+      ) as Record<TrendyolEndpointFamily, RateLimitFamilyMetrics & { budgetPerSecond: number }>
+    };
+  }
+
+  resetMetrics() {
+    this.metrics.clear();
+  }
+}
+
+export const trendyolRateLimiter = new TrendyolRateLimiter({
+  backend: env.TRENDYOL_RATE_LIMIT_BACKEND === "postgres" ? new PostgresRateLimitBackend() : new MemoryRateLimitBackend(),
+  budgets: budgetsFromEnv()
+});
+
+export function getRateLimiterMetrics() {
+  return trendyolRateLimiter.getMetrics();
+}
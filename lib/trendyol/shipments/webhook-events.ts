@@ -0,0 +1,147 @@
+import { prisma } from "@/lib/db/prisma";
+import type { TrendyolShipmentPackage } from "@/lib/trendyol/shipments/types";
+
+export interface ClaimedWebhookEvent {
+  id: bigint;
+  payload: TrendyolShipmentPackage;
+}
+
+export const WEBHOOK_SOURCE = "trendyol";
+
+/** An event that failed this many times, or whose applier died on its last try, is left as FAILED for inspection. */
+export const MAX_EVENT_ATTEMPTS = 5;
+
+// Compared in UTC, like the rate-limit buckets, so appliers on any machine agree on lease expiry.
+const NOW_UTC = `(now() AT TIME ZONE 'UTC')`;
+
+// Redelivered events share a key and are dropped by the unique index.
+const ENQUEUE_SQL = `
+INSERT INTO "webhook_events" ("source", "eventKey", "payload", "receivedAt")
+SELECT $1, e."eventKey", e."payload"::jsonb, ${NOW_UTC}
+FROM unnest($2::text[], $3::text[]) AS e("eventKey", "payload")
+ON CONFLICT ("eventKey") DO NOTHING`;
+
+// An expired lease on the final attempt can never be reclaimed, so it is failed in the same
+// statement rather than left APPLYING (and counted as pending) forever.
+const CLAIM_SQL = `
+WITH expired AS (
+  UPDATE "webhook_events"
+  SET "status" = 'FAILED',
+      "leasedBy" = NULL,
+      "leaseExpiresAt" = NULL,
+      "error" = COALESCE("error", 'Lease expired on the final attempt')
+  WHERE "status" = 'APPLYING' AND "attempts" >= $4 AND "leaseExpiresAt" < ${NOW_UTC}
+)
+UPDATE "webhook_events" w
+SET "status" = 'APPLYING',
+    "leasedBy" = $1,
+    "leaseExpiresAt" = ${NOW_UTC} + $2::int * INTERVAL '1 second',
+    "attempts" = w."attempts" + 1
+FROM (
+  SELECT e."id"
+  FROM "webhook_events" e
+  WHERE e."attempts" < $4
+    AND (e."status" = 'PENDING' OR (e."status" = 'APPLYING' AND e."leaseExpiresAt" < ${NOW_UTC}))
+  ORDER BY e."id"
+  LIMIT $3
+  FOR UPDATE OF e SKIP LOCKED
+) next
+WHERE w."id" = next."id"
+RETURNING w."id", w."payload"`;
+
+const COMPLETE_SQL = `
+UPDATE "webhook_events"
+SET "status" = 'APPLIED', "leaseExpiresAt" = NULL, "error" = NULL, "appliedAt" = ${NOW_UTC}
+WHERE "id" = ANY($1::text[]::bigint[]) AND "leasedBy" = $2 AND "status" = 'APPLYING'`;
+
+const RELEASE_SQL = `
+UPDATE "webhook_events"
+SET "status" = CASE WHEN "attempts" >= $3 THEN 'FAILED' ELSE 'PENDING' END,
+    "leasedBy" = NULL,
+    "leaseExpiresAt" = NULL,
+    "error" = $4
+WHERE "id" = ANY($1::text[]::bigint[]) AND "leasedBy" = $2 AND "status" = 'APPLYING'`;
+
+const PRUNE_SQL = `
+DELETE FROM "webhook_events"
+WHERE "status" = 'APPLIED' AND "appliedAt" < ${NOW_UTC} - $1::int * INTERVAL '1 day'`;
+
+const asPackage = (value: unknown): TrendyolShipmentPackage | null => {
+  if (!value || typeof value !== "object") {
+    return null;
+  }
+  const pkg = value as Partial<TrendyolShipmentPackage>;
+  const status = pkg.shipmentPackageStatus ?? pkg.status;
+  if (pkg.packageNumber === undefined || pkg.packageNumber === null || !status) {
+    return null;
+  }
+  return { ...pkg, shipmentPackageStatus: status, status: pkg.status ?? status } as TrendyolShipmentPackage;
+};
+
+/**
+ * Packages in a webhook body: one package, an array of them, or a `content`/`shipmentPackages`
+ * page as returned by `/shipment-packages`. Entries without a package number or status are dropped.
+ */
+export function packagesFromWebhookBody(body: unknown): TrendyolShipmentPackage[] {
+  const record = (body ?? {}) as Record<string, unknown>;
+  const entries = Array.isArray(body)
+    ? body
+    : Array.isArray(record.content)
+      ? record.content
+      : Array.isArray(record.shipmentPackages)
+        ? record.shipmentPackages
+        : [body];
+
+  return entries.map(asPackage).filter((pkg): pkg is TrendyolShipmentPackage => pkg !== null);
+}
+
+/** Identifies one status change of a package, so redeliveries of the same event are dropped. */
+export function shipmentEventKey(pkg: TrendyolShipmentPackage) {
+  const modified = pkg.packageLastModifiedDate ?? (pkg as { lastModifiedDate?: number }).lastModifiedDate ?? "";
+  return `${WEBHOOK_SOURCE}:${pkg.packageNumber}:${pkg.shipmentPackageStatus}:${modified}`;
+}
+
+/** Appends events to `webhook_events`; returns how many were new. */
+export async function enqueueShipmentEvents(packages: TrendyolShipmentPackage[]) {
+  if (!packages.length) {
+    return 0;
+  }
+
+  return prisma.$executeRawUnsafe(
+    ENQUEUE_SQL,
+    WEBHOOK_SOURCE,
+    packages.map(shipmentEventKey),
+    packages.map((pkg) => JSON.stringify(pkg))
+  );
+}
+
+/**
+ * Claims up to `limit` pending events in arrival order (or ones whose applier's lease expired),
+ * failing expired leases that have no attempts left.
+ */
+export async function claimShipmentEvents(workerId: string, limit: number, leaseSeconds: number) {
+  return prisma.$queryRawUnsafe<ClaimedWebhookEvent[]>(
+    CLAIM_SQL,
+    workerId,
+    Math.ceil(leaseSeconds),
+    limit,
+    MAX_EVENT_ATTEMPTS
+  );
+}
+
+export async function completeShipmentEvents(ids: bigint[], workerId: string) {
+  return prisma.$executeRawUnsafe(COMPLETE_SQL, ids.map(String), workerId);
+}
+
+/** Hands events back after they failed to apply; they are retried until they run out of attempts. */
+export async function releaseShipmentEvents(ids: bigint[], workerId: string, message: string) {
+  return prisma.$executeRawUnsafe(RELEASE_SQL, ids.map(String), workerId, MAX_EVENT_ATTEMPTS, message.slice(0, 500));
+}
+
+export async function pruneAppliedShipmentEvents(retentionDays: number) {
+  return prisma.$executeRawUnsafe(PRUNE_SQL, retentionDays);
+}
+
+export async function countPendingShipmentEvents() {
+  return prisma.webhookEvent.count({ where: { status: { in: ["PENDING", "APPLYING"] } } });
+}
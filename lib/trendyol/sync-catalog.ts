@@ -1,7 +1,12 @@
 import type { Prisma } from "@prisma/client";
+import { publishProductChanges } from "@/lib/dashboard/product-changes";
 import { prisma } from "@/lib/db/prisma";
+import { addStageRows, timeStage } from "@/lib/jobs/job-run";
+import { buyboxCache } from "@/lib/trendyol/buybox-cache";
 import { trendyolClient } from "@/lib/trendyol/client";
-import type { TrendyolProductItem } from "@/lib/trendyol/types";
+import { writeCatalogPage } from "@/lib/trendyol/catalog-writer";
+import { competitorObservation, recordCompetitorObservations, type CompetitorObservation } from "@/lib/trendyol/competitor-logs";
+import type { TrendyolCompetitorData, TrendyolProductItem } from "@/lib/trendyol/types";
 
 export interface CatalogSyncOptions {
   maxPages?: number;
@@ -10,6 +15,8 @@ export interface CatalogSyncOptions {
   hydrateLimit?: number;
   createInitialSnapshots?: boolean;
   includeItems?: boolean;
+  /** Look up buybox data for every synced page (fills the buybox cache for the poll). */
+  prefetchBuybox?: boolean;
 }
 
 export interface CatalogSyncSummary {
@@ -36,6 +43,7 @@ export async function syncCatalogFromTrendyol(
   const hydrateLimit = options.hydrateLimit ?? 150;
   const createInitialSnapshots = options.createInitialSnapshots ?? true;
   const includeItems = options.includeItems ?? false;
+  const prefetchBuybox = options.prefetchBuybox ?? true;
   const itemsBySku = includeItems ? new Map<string, TrendyolProductItem>() : null;
 
   let page = 0;
@@ -46,8 +54,9 @@ export async function syncCatalogFromTrendyol(
   let hydrationErrors = 0;
 
   while (page < maxPages) {
-    const result = await trendyolClient.fetchProducts(page, pageSize);
+    const result = await timeStage("catalog_pages", () => trendyolClient.fetchProducts(page, pageSize));
     pagesFetched += 1;
+    addStageRows("catalog_pages", result.items.length);
 
     if (!result.items.length) {
       break;
@@ -57,116 +66,81 @@ export async function syncCatalogFromTrendyol(
       .map((i) => i.barcode)
       .filter((b): b is string => typeof b === "string" && b.length > 0);
 
-    let buyboxMap = new Map<string, any>();
-    if (barcodes.length > 0) {
-      // Chunk into groups of 10 (Trendyol limit)
-      const chunkSize = 10;
-      for (let i = 0; i < barcodes.length; i += chunkSize) {
-        const chunk = barcodes.slice(i, i + chunkSize);
-        try {
-          const { entries } = await trendyolClient.fetchBuyboxInformation(chunk);
-          for (const entry of entries) {
-            if (typeof entry?.barcode === 'string') {
-              buyboxMap.set(entry.barcode, trendyolClient.parseBuyboxEntry(entry));
-            } else if (typeof entry?.stockCode === 'string') {
-              buyboxMap.set(entry.stockCode, trendyolClient.parseBuyboxEntry(entry));
-            }
-          }
-          // Small sleep to be gentle
-          await new Promise(r => setTimeout(r, 100));
-        } catch (error) {
-          console.warn(`Failed to batch fetch buybox info for chunk ${i}-${i + chunkSize}:`, error);
-        }
+    // Batched 10 barcodes per request by the buybox cache; the poll that follows reuses these entries.
+    const buyboxMap: Map<string, TrendyolCompetitorData> =
+      barcodes.length > 0 && (prefetchBuybox || createInitialSnapshots)
+        ? await timeStage("buybox", () => buyboxCache.getMany(barcodes))
+        : new Map();
+    addStageRows("buybox", buyboxMap.size);
+    const inStock = result.items.filter((item) => (item.stock ?? 0) > 0);
+    if (itemsBySku) {
+      for (const item of inStock) {
+        itemsBySku.set(item.sku, item);
       }
     }
 
-    for (const item of result.items) {
-      if ((item.stock ?? 0) <= 0) {
+    // Diffed against existing products: createMany for new ones, one batched UPDATE for changed ones.
+    const written = await timeStage("product_upsert", () => writeCatalogPage(inStock));
+    addStageRows("product_upsert", written.created + written.updated);
+
+    const observations: CompetitorObservation[] = [];
+    const snapshots: Prisma.PriceSnapshotCreateManyInput[] = [];
+
+    for (const item of inStock) {
+      const productId = written.idsBySku.get(item.sku);
+      if (!productId) {
         continue;
       }
 
-      if (itemsBySku) {
-        itemsBySku.set(item.sku, item);
+      const buyboxEntry = (item.barcode && buyboxMap.get(item.barcode)) || buyboxMap.get(item.sku);
+      const observation = buyboxEntry ? competitorObservation(productId, buyboxEntry) : null;
+      if (observation) {
+        observations.push(observation);
       }
 
-      const savedProduct = await prisma.product.upsert({
-        where: { sku: item.sku },
-        update: {
-          barcode: item.barcode,
-          title: item.title,
-          trendyolProductId: item.productId,
-          category: item.category,
-          active: item.active,
-          currency: "SAR"
-        },
-        create: {
-          sku: item.sku,
-          barcode: item.barcode,
-          title: item.title,
-          trendyolProductId: item.productId,
-          category: item.category,
-          active: item.active,
-          currency: "SAR",
-          settings: {
-            create: {
-              costPrice: 0
-            }
-          }
-        }
-      });
-
       if (createInitialSnapshots) {
         // Use the price/stock directly from the "approved" list item.
         // This avoids N+1 calls to fetchPriceAndStock.
         const snapshotPrice = item.ourPrice ?? null;
-
-        // We only create a snapshot if we have a price OR if we want to record "no price" state.
-        // Assuming we want to track it even if null (to show as disabled/out of stock).
-
-        let competitorMinPrice: number | null = null;
-        let competitorCount: number | null = null;
-        let buyboxStatus: "WIN" | "LOSE" | "UNKNOWN" = "UNKNOWN";
-        let buyboxSellerId: string | null = null;
-        let competitorRaw: any = null;
-
-        if (item.barcode && buyboxMap.has(item.barcode)) {
-          const entry = buyboxMap.get(item.barcode);
-          competitorMinPrice = entry.competitorMinPrice;
-          competitorCount = entry.competitorCount;
-          buyboxStatus = entry.buyboxStatus;
-          buyboxSellerId = entry.buyboxSellerId;
-          competitorRaw = entry.raw;
-        } else if (item.sku && buyboxMap.has(item.sku)) {
-          const entry = buyboxMap.get(item.sku);
-          competitorMinPrice = entry.competitorMinPrice;
-          competitorCount = entry.competitorCount;
-          buyboxStatus = entry.buyboxStatus;
-          buyboxSellerId = entry.buyboxSellerId;
-          competitorRaw = entry.raw;
-        }
+        const buyboxStatus = buyboxEntry?.buyboxStatus ?? "UNKNOWN";
 
         // Only create snapshot if we have data to record (price or buybox)
         if (snapshotPrice !== null || buyboxStatus !== "UNKNOWN") {
-          await prisma.priceSnapshot.create({
-            data: {
-              productId: savedProduct.id,
-              ourPrice: snapshotPrice,
-              competitorMinPrice,
-              competitorCount,
-              buyboxStatus,
-              buyboxSellerId,
-              rawPayloadJson: {
-                source: "catalog_sync_batched",
-                catalog: item.raw ?? item,
-                competitor: competitorRaw
-              } as Prisma.InputJsonValue
-            }
+          snapshots.push({
+            productId,
+            ourPrice: snapshotPrice,
+            competitorMinPrice: buyboxEntry?.competitorMinPrice ?? null,
+            competitorCount: buyboxEntry?.competitorCount ?? null,
+            buyboxStatus,
+            buyboxSellerId: buyboxEntry?.buyboxSellerId ?? null,
+            rawPayloadJson: {
+              source: "catalog_sync_batched",
+              catalog: item.raw ?? item,
+              competitor: buyboxEntry?.raw ?? null
+            } as Prisma.InputJsonValue
           });
-          hydratedSnapshots += 1;
         }
       }
+    }
+    totalSynced += written.idsBySku.size;
+
+    if (snapshots.length) {
+      const { count } = await timeStage("initial_snapshots", () =>
+        prisma.priceSnapshot.createMany({ data: snapshots })
+      );
+      addStageRows("initial_snapshots", count);
+      hydratedSnapshots += count;
+      await publishProductChanges("snapshot", snapshots.map((snapshot) => snapshot.productId));
+    }
 
-      totalSynced += 1;
+    if (observations.length) {
+      try {
+        const inserted = await timeStage("competitor_logs", () => recordCompetitorObservations(observations));
+        addStageRows("competitor_logs", inserted);
+      } catch (error) {
+        // Competitor history is best-effort; it must not fail the catalog sync.
+        console.warn("[catalog-sync] Failed to record competitor logs:", error);
+      }
     }
 
     page += 1;
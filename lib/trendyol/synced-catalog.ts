@@ -0,0 +1,139 @@
+import { bumpDataVersion } from "@/lib/db/data-versions";
+import { prisma } from "@/lib/db/prisma";
+import { isMissingSchemaError } from "@/lib/db/errors";
+import type { TrendyolCompetitorData, TrendyolProductItem } from "@/lib/trendyol/types";
+
+/** One active product's latest row from `trendyol_products` (written by the Python product sync). */
+export interface SyncedCatalogRow {
+  productId: string;
+  sku: string;
+  barcode: string | null;
+  salePrice: number | null;
+  quantity: number | null;
+  buyboxPrice: number | null;
+  buyboxCompetitorCount: number | null;
+  buyboxStatus: string | null;
+  syncedAt: Date;
+}
+
+export interface SyncedCatalog {
+  rows: Map<string, SyncedCatalogRow>;
+  latestSyncedAt: Date | null;
+  productsCreated: number;
+}
+
+// Product codes follow the same precedence as `mapProductItem` (productCode before stockCode),
+// so `product_code` matches `Product.sku`; barcode catches rows synced under another code.
+const LOAD_SQL = `
+SELECT p."id" AS "productId", p."sku", p."barcode",
+       tp.sale_price::float8 AS "salePrice",
+       tp.quantity AS "quantity",
+       tp.buybox_price::float8 AS "buyboxPrice",
+       tp.buybox_competitor_count AS "buyboxCompetitorCount",
+       tp.buybox_status AS "buyboxStatus",
+       tp.synced_at AS "syncedAt"
+FROM "Product" p
+JOIN LATERAL (
+  SELECT t.*
+  FROM trendyol_products t
+  WHERE t.seller_id = $1::bigint
+    AND (t.product_code = p."sku" OR (p."barcode" IS NOT NULL AND t.barcode = p."barcode"))
+  ORDER BY (t.product_code = p."sku") DESC, t.synced_at DESC
+  LIMIT 1
+) tp ON true
+WHERE p."active" = true`;
+
+const LATEST_SQL = `SELECT MAX(synced_at) AS "latest" FROM trendyol_products WHERE seller_id = $1::bigint`;
+
+// Prisma stores UTC wall-clock timestamps; `now()` alone would follow the session time zone.
+const NOW_UTC = `(now() AT TIME ZONE 'UTC')`;
+
+// New in-stock listings from the synced table become products (with default settings), as the
+// API catalog sync would have created them.
+const CREATE_MISSING_SQL = `
+WITH fresh AS (
+  SELECT DISTINCT ON (t.product_code) t.product_code, t.barcode, t.title, t.category_name, t.archived, t.raw
+  FROM trendyol_products t
+  WHERE t.seller_id = $1::bigint
+    AND COALESCE(t.quantity, 0) > 0
+    AND t.synced_at >= $2
+    AND NOT EXISTS (SELECT 1 FROM "Product" p WHERE p."sku" = t.product_code)
+  ORDER BY t.product_code, t.synced_at DESC
+),
+inserted AS (
+  INSERT INTO "Product" ("id", "sku", "barcode", "title", "trendyolProductId", "category", "active", "currency", "createdAt", "updatedAt")
+  SELECT gen_random_uuid()::text, product_code, barcode, COALESCE(title, product_code),
+         COALESCE(raw->>'productMainId', raw->>'contentId', product_code), category_name,
+         NOT COALESCE(archived, false), 'SAR', ${NOW_UTC}, ${NOW_UTC}
+  FROM fresh
+  ON CONFLICT ("sku") DO NOTHING
+  RETURNING "id"
+)
+INSERT INTO "ProductSettings" ("id", "productId", "costPrice", "createdAt", "updatedAt")
+SELECT gen_random_uuid()::text, "id", 0, ${NOW_UTC}, ${NOW_UTC} FROM inserted`;
+
+/**
+ * Reads every active product's synced row in one query. Returns null when the Python sync has
+ * never created `trendyol_products`, so the poll falls back to the API.
+ */
+export async function loadSyncedCatalog(sellerId: string, maxAgeMinutes: number): Promise<SyncedCatalog | null> {
+  try {
+    const [latest] = await prisma.$queryRawUnsafe<Array<{ latest: Date | null }>>(LATEST_SQL, sellerId);
+    const latestSyncedAt = latest?.latest ? new Date(latest.latest) : null;
+
+    const productsCreated = latestSyncedAt
+      ? await prisma.$executeRawUnsafe(
+        CREATE_MISSING_SQL,
+        sellerId,
+        new Date(Date.now() - maxAgeMinutes * 60_000)
+      )
+      : 0;
+    if (productsCreated > 0) {
+      await bumpDataVersion("products");
+    }
+
+    const rows = await prisma.$queryRawUnsafe<SyncedCatalogRow[]>(LOAD_SQL, sellerId);
+    return {
+      rows: new Map(rows.map((row) => [row.productId, { ...row, syncedAt: new Date(row.syncedAt) }])),
+      latestSyncedAt,
+      productsCreated
+    };
+  } catch (error) {
+    if (isMissingSchemaError(error)) {
+      return null;
+    }
+    throw error;
+  }
+}
+
+export function isSyncedRowFresh(row: SyncedCatalogRow | undefined, maxAgeMinutes: number, now = Date.now()) {
+  return Boolean(row && now - row.syncedAt.getTime() <= maxAgeMinutes * 60_000);
+}
+
+/** The synced row as the catalog item / buybox data the poll would otherwise fetch from the API. */
+export function syncedRowToPollInputs(row: SyncedCatalogRow): {
+  catalogItem: TrendyolProductItem;
+  competitor: TrendyolCompetitorData;
+} {
+  const buyboxStatus =
+    row.buyboxStatus === "WIN" || row.buyboxStatus === "LOSE" ? row.buyboxStatus : ("UNKNOWN" as const);
+
+  return {
+    catalogItem: {
+      sku: row.sku,
+      barcode: row.barcode,
+      title: row.sku,
+      active: true,
+      ourPrice: row.salePrice !== null && row.salePrice > 0 ? row.salePrice : null,
+      stock: row.quantity,
+      raw: { source: "trendyol_products", syncedAt: row.syncedAt.toISOString() }
+    },
+    competitor: {
+      competitorMinPrice: row.buyboxPrice,
+      competitorCount: row.buyboxCompetitorCount,
+      buyboxSellerId: null,
+      buyboxStatus,
+      raw: { source: "trendyol_products", syncedAt: row.syncedAt.toISOString() }
+    }
+  };
+}
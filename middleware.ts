@@ -20,7 +20,8 @@ export async function middleware(request: NextRequest) {
     return NextResponse.next();
   }
 
-  if (pathname.startsWith("/api/cron/poll")) {
+  // Prometheus scrapes and scripted exports use the cron secret as a bearer token.
+  if (pathname.startsWith("/api/cron/poll") || pathname === "/api/metrics" || pathname.startsWith("/api/export/")) {
     const secret =
       request.headers.get("x-cron-secret") ||
       request.headers.get("authorization")?.replace(/^Bearer\s+/i, "");
@@ -36,7 +37,9 @@ export async function middleware(request: NextRequest) {
   if (
     pathname === "/login" ||
     pathname.startsWith("/api/auth/pin") ||
-    pathname.startsWith("/api/integrations/salla/oauth/callback")
+    pathname.startsWith("/api/integrations/salla/oauth/callback") ||
+    // Authenticated by the route with TRENDYOL_WEBHOOK_SECRET.
+    pathname.startsWith("/api/webhooks/")
   ) {
     return NextResponse.next();
   }
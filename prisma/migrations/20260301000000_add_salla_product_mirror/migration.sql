@@ -0,0 +1,26 @@
+-- Local mirror of the Salla catalog used for offline SKU/barcode/name matching.
+CREATE TABLE "salla_products" (
+    "id" TEXT NOT NULL,
+    "sku" TEXT,
+    "barcode" TEXT,
+    "name" TEXT NOT NULL,
+    "quantity" INTEGER,
+    "preTaxPrice" DECIMAL(65,30),
+    "costPrice" DECIMAL(65,30),
+    "fingerprint" TEXT NOT NULL,
+    "raw" JSONB NOT NULL,
+    "lastSeenAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "createdAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "updatedAt" TIMESTAMP(3) NOT NULL,
+
+    CONSTRAINT "salla_products_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE INDEX "salla_products_sku_idx" ON "salla_products"("sku");
+
+-- CreateIndex
+CREATE INDEX "salla_products_barcode_idx" ON "salla_products"("barcode");
+
+-- CreateIndex
+CREATE INDEX "salla_products_lastSeenAt_idx" ON "salla_products"("lastSeenAt");
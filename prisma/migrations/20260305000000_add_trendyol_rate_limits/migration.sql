@@ -0,0 +1,13 @@
+-- Shared token buckets for Trendyol API endpoint families.
+CREATE TABLE "trendyol_rate_limits" (
+    "family" TEXT NOT NULL,
+    "tokens" DOUBLE PRECISION NOT NULL,
+    "capacity" DOUBLE PRECISION NOT NULL,
+    "ratePerSecond" DOUBLE PRECISION NOT NULL,
+    "refilledAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "blockedUntil" TIMESTAMP(3),
+    "throttledCount" INTEGER NOT NULL DEFAULT 0,
+    "updatedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "trendyol_rate_limits_pkey" PRIMARY KEY ("family")
+);
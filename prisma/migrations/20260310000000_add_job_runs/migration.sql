@@ -0,0 +1,18 @@
+-- Per-run stage timings for sync and poll jobs.
+CREATE TABLE "job_runs" (
+    "id" TEXT NOT NULL,
+    "job" TEXT NOT NULL,
+    "status" TEXT NOT NULL,
+    "startedAt" TIMESTAMP(3) NOT NULL,
+    "finishedAt" TIMESTAMP(3) NOT NULL,
+    "durationMs" INTEGER NOT NULL,
+    "stagesJson" JSONB NOT NULL,
+    "countersJson" JSONB NOT NULL,
+    "summaryJson" JSONB,
+    "error" TEXT,
+
+    CONSTRAINT "job_runs_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE INDEX "job_runs_job_startedAt_idx" ON "job_runs"("job", "startedAt");
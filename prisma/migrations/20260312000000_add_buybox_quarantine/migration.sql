@@ -0,0 +1,14 @@
+-- Barcodes isolated by bisecting failed buybox-information batches.
+CREATE TABLE "buybox_quarantine" (
+    "storeFrontCode" TEXT NOT NULL DEFAULT '',
+    "barcode" TEXT NOT NULL,
+    "reason" TEXT NOT NULL,
+    "failures" INTEGER NOT NULL DEFAULT 1,
+    "quarantinedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "expiresAt" TIMESTAMP(3) NOT NULL,
+
+    CONSTRAINT "buybox_quarantine_pkey" PRIMARY KEY ("storeFrontCode","barcode")
+);
+
+-- CreateIndex
+CREATE INDEX "buybox_quarantine_expiresAt_idx" ON "buybox_quarantine"("expiresAt");
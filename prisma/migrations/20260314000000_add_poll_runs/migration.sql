@@ -0,0 +1,41 @@
+-- Sharded poll runs and the batches workers lease from them.
+CREATE TABLE "poll_runs" (
+    "id" TEXT NOT NULL,
+    "status" TEXT NOT NULL,
+    "createdBy" TEXT NOT NULL,
+    "totalBatches" INTEGER NOT NULL,
+    "totalProducts" INTEGER NOT NULL,
+    "summaryJson" JSONB,
+    "createdAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "completedAt" TIMESTAMP(3),
+
+    CONSTRAINT "poll_runs_pkey" PRIMARY KEY ("id")
+);
+
+CREATE TABLE "poll_batches" (
+    "id" TEXT NOT NULL,
+    "runId" TEXT NOT NULL,
+    "position" INTEGER NOT NULL,
+    "status" TEXT NOT NULL DEFAULT 'PENDING',
+    "items" JSONB NOT NULL,
+    "leasedBy" TEXT,
+    "leaseExpiresAt" TIMESTAMP(3),
+    "attempts" INTEGER NOT NULL DEFAULT 0,
+    "resultJson" JSONB,
+    "completedAt" TIMESTAMP(3),
+    "createdAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "poll_batches_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE INDEX "poll_runs_status_createdAt_idx" ON "poll_runs"("status", "createdAt");
+
+-- CreateIndex
+CREATE INDEX "poll_batches_status_runId_position_idx" ON "poll_batches"("status", "runId", "position");
+
+-- CreateIndex
+CREATE INDEX "poll_batches_runId_idx" ON "poll_batches"("runId");
+
+-- AddForeignKey
+ALTER TABLE "poll_batches" ADD CONSTRAINT "poll_batches_runId_fkey" FOREIGN KEY ("runId") REFERENCES "poll_runs"("id") ON DELETE CASCADE ON UPDATE CASCADE;
@@ -0,0 +1,6 @@
+-- Change-only snapshots: unchanged observations extend the latest row.
+ALTER TABLE "PriceSnapshot" ADD COLUMN "lastSeenAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+ADD COLUMN "observations" INTEGER NOT NULL DEFAULT 1;
+
+-- Existing rows were single observations.
+UPDATE "PriceSnapshot" SET "lastSeenAt" = "checkedAt";
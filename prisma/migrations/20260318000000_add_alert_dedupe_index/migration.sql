@@ -0,0 +1,2 @@
+-- CreateIndex
+CREATE INDEX "Alert_productId_type_createdAt_idx" ON "Alert"("productId", "type", "createdAt");
@@ -0,0 +1,43 @@
+-- Interned competitor names.
+CREATE TABLE "competitors" (
+    "id" SERIAL NOT NULL,
+    "name" TEXT NOT NULL,
+    "createdAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "competitors_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE UNIQUE INDEX "competitors_name_key" ON "competitors"("name");
+
+INSERT INTO "competitors" ("name")
+SELECT DISTINCT "competitorName" FROM "competitor_logs";
+
+-- Compact, run-length competitor_logs: integer ids, interned names, one row per change.
+ALTER TABLE "competitor_logs"
+ADD COLUMN "competitorId" INTEGER,
+ADD COLUMN "lastSeenAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+ADD COLUMN "observations" INTEGER NOT NULL DEFAULT 1;
+
+UPDATE "competitor_logs" l
+SET "competitorId" = c."id", "lastSeenAt" = l."checkedAt"
+FROM "competitors" c
+WHERE c."name" = l."competitorName";
+
+ALTER TABLE "competitor_logs" ALTER COLUMN "competitorId" SET NOT NULL;
+ALTER TABLE "competitor_logs" ALTER COLUMN "price" TYPE DECIMAL(12,2);
+
+-- DropIndex
+DROP INDEX IF EXISTS "competitor_logs_competitorName_idx";
+ALTER TABLE "competitor_logs" DROP COLUMN "competitorName";
+
+ALTER TABLE "competitor_logs" DROP CONSTRAINT "competitor_logs_pkey";
+ALTER TABLE "competitor_logs" DROP COLUMN "id";
+ALTER TABLE "competitor_logs" ADD COLUMN "id" BIGSERIAL NOT NULL;
+ALTER TABLE "competitor_logs" ADD CONSTRAINT "competitor_logs_pkey" PRIMARY KEY ("id");
+
+-- CreateIndex
+CREATE INDEX "competitor_logs_competitorId_idx" ON "competitor_logs"("competitorId");
+
+-- AddForeignKey
+ALTER TABLE "competitor_logs" ADD CONSTRAINT "competitor_logs_competitorId_fkey" FOREIGN KEY ("competitorId") REFERENCES "competitors"("id") ON DELETE RESTRICT ON UPDATE CASCADE;
@@ -0,0 +1,26 @@
+-- Poll requests queued by the cron/manual endpoints and executed outside the HTTP request.
+CREATE TABLE "poll_jobs" (
+    "id" TEXT NOT NULL,
+    "status" TEXT NOT NULL DEFAULT 'QUEUED',
+    "requestedBy" TEXT NOT NULL,
+    "stage" TEXT,
+    "productsTotal" INTEGER NOT NULL DEFAULT 0,
+    "productsDone" INTEGER NOT NULL DEFAULT 0,
+    "leasedBy" TEXT,
+    "leaseExpiresAt" TIMESTAMP(3),
+    "attempts" INTEGER NOT NULL DEFAULT 0,
+    "summaryJson" JSONB,
+    "error" TEXT,
+    "createdAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "startedAt" TIMESTAMP(3),
+    "updatedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "finishedAt" TIMESTAMP(3),
+
+    CONSTRAINT "poll_jobs_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE INDEX "poll_jobs_status_createdAt_idx" ON "poll_jobs"("status", "createdAt");
+
+-- At most one queued or running poll: a repeated request joins the active job instead of adding one.
+CREATE UNIQUE INDEX "poll_jobs_single_active_key" ON "poll_jobs"((true)) WHERE "status" IN ('QUEUED', 'RUNNING');
@@ -0,0 +1,22 @@
+-- Durable queue of Trendyol package status events received by POST /api/webhooks/trendyol.
+CREATE TABLE "webhook_events" (
+    "id" BIGSERIAL NOT NULL,
+    "source" TEXT NOT NULL,
+    "eventKey" TEXT NOT NULL,
+    "payload" JSONB NOT NULL,
+    "status" TEXT NOT NULL DEFAULT 'PENDING',
+    "attempts" INTEGER NOT NULL DEFAULT 0,
+    "leasedBy" TEXT,
+    "leaseExpiresAt" TIMESTAMP(3),
+    "error" TEXT,
+    "receivedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "appliedAt" TIMESTAMP(3),
+
+    CONSTRAINT "webhook_events_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE UNIQUE INDEX "webhook_events_eventKey_key" ON "webhook_events"("eventKey");
+
+-- CreateIndex
+CREATE INDEX "webhook_events_status_id_idx" ON "webhook_events"("status", "id");
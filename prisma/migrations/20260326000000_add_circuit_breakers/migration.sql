@@ -0,0 +1,18 @@
+-- Circuit breakers per Trendyol endpoint family, shared by the app and the Python syncs.
+CREATE TABLE "trendyol_circuit_breakers" (
+    "family" TEXT NOT NULL,
+    "state" TEXT NOT NULL DEFAULT 'CLOSED',
+    "windowStartedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "requests" INTEGER NOT NULL DEFAULT 0,
+    "failures" INTEGER NOT NULL DEFAULT 0,
+    "consecutiveFailures" INTEGER NOT NULL DEFAULT 0,
+    "openedAt" TIMESTAMP(3),
+    "openUntil" TIMESTAMP(3),
+    "probeUntil" TIMESTAMP(3),
+    "opens" INTEGER NOT NULL DEFAULT 0,
+    "openedCount" INTEGER NOT NULL DEFAULT 0,
+    "lastFailure" TEXT,
+    "updatedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "trendyol_circuit_breakers_pkey" PRIMARY KEY ("family")
+);
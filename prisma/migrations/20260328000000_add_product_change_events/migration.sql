@@ -0,0 +1,28 @@
+-- Change feed of product ids touched by snapshot, alert and price-change writes (live dashboard updates).
+CREATE TABLE "product_change_events" (
+    "id" BIGSERIAL NOT NULL,
+    "kind" TEXT NOT NULL,
+    "productIds" TEXT[],
+    "createdAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "product_change_events_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE INDEX "product_change_events_createdAt_idx" ON "product_change_events"("createdAt");
+
+-- Every insert is announced on the `product_changes` channel. The payload stays small (NOTIFY
+-- payloads are capped at 8000 bytes); listeners read the product ids from the row.
+CREATE FUNCTION "notify_product_change"() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify(
+        'product_changes',
+        json_build_object('id', NEW."id", 'kind', NEW."kind", 'count', cardinality(NEW."productIds"))::text
+    );
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER "product_change_events_notify"
+    AFTER INSERT ON "product_change_events"
+    FOR EACH ROW EXECUTE FUNCTION "notify_product_change"();
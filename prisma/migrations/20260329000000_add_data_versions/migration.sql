@@ -0,0 +1,8 @@
+-- Change counters per data scope; cached API responses are keyed by them.
+CREATE TABLE "data_versions" (
+    "scope" TEXT NOT NULL,
+    "version" BIGINT NOT NULL DEFAULT 0,
+    "updatedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "data_versions_pkey" PRIMARY KEY ("scope")
+);
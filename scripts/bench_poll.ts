@@ -0,0 +1,19 @@
+// Runs one poll with the environment it is given (no .env loading) and prints the summary as
+// a single JSON line. Driven by scripts/reference/bench_sync.py against the Trendyol simulator.
+
+async function main() {
+  const { runPoll } = await import("../lib/jobs/poll-products");
+  const { prisma } = await import("../lib/db/prisma");
+
+  const started = performance.now();
+  const summary = await runPoll();
+  const wallMs = performance.now() - started;
+
+  console.log(JSON.stringify({ ...summary, wallMs: Math.round(wallMs) }));
+  await prisma.$disconnect();
+}
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
@@ -0,0 +1,73 @@
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+
+// Load .env manually
+const envPath = path.resolve(process.cwd(), '.env');
+if (fs.existsSync(envPath)) {
+    const envConfig = fs.readFileSync(envPath, 'utf8');
+    envConfig.split('\n').forEach(line => {
+        const parts = line.split('=');
+        if (parts.length >= 2) {
+            const key = parts[0].trim();
+            const value = parts.slice(1).join('=').trim().replace(/^["']|["']$/g, ''); // Remove quotes if present
+            if (key && value) {
+                process.env[key] = value;
+            }
+        }
+    });
+}
+
+// Each pass is recorded as one poll_worker job run.
+const PASS_MS = 5 * 60 * 1000;
+const IDLE_WAIT_MS = Number(process.env.POLL_WORKER_IDLE_MS || 5000);
+
+let stopping = false;
+let pollJobWaiting = false;
+
+async function main() {
+    // Import dynamically after env is set
+    const { runPollWorker, runQueuedPollJobs } = await import("../lib/jobs/poll-products");
+    const { hasRunnablePollJob } = await import("../lib/jobs/poll-jobs");
+    const workerId = `${os.hostname()}:${process.pid}`;
+
+    for (const signal of ['SIGINT', 'SIGTERM'] as const) {
+        process.on(signal, () => {
+            console.log(`${signal} received, finishing the current batch...`);
+            stopping = true;
+        });
+    }
+
+    // Queued poll jobs interrupt an idle batch pass so they start within one idle interval.
+    const jobWatch = setInterval(() => {
+        hasRunnablePollJob()
+            .then((waiting) => { pollJobWaiting = waiting; })
+            .catch(() => undefined);
+    }, IDLE_WAIT_MS);
+
+    console.log(`Poll worker ${workerId} started.`);
+    while (!stopping) {
+        pollJobWaiting = false;
+        const jobs = await runQueuedPollJobs(workerId, { shouldStop: () => stopping });
+        if (jobs.length > 0) {
+            console.log(JSON.stringify({ pollJobs: jobs }));
+        }
+
+        const result = await runPollWorker(workerId, {
+            deadline: Date.now() + PASS_MS,
+            idleWaitMs: IDLE_WAIT_MS,
+            shouldStop: () => stopping || pollJobWaiting
+        });
+        if (result.batches > 0) {
+            console.log(JSON.stringify({ batches: result.batches, processed: result.processed, alertsCreated: result.alertsCreated, skipped: result.skipped, lostLeases: result.lostLeases }));
+        }
+    }
+    clearInterval(jobWatch);
+    console.log("Poll worker stopped.");
+    process.exit(0);
+}
+
+main().catch((error) => {
+    console.error(error);
+    process.exit(1);
+});
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""End-to-end sync benchmarks against the local Trendyol simulator.
+
+For each catalog size the benchmark seeds a dedicated Postgres database with
+synthetic products, settings, snapshot history and orders, starts
+``trendyol_simulator.py`` over the same catalog, and runs each sync path as a
+subprocess:
+
+  products   scripts/reference/sync_trendyol_products.py
+  shipments  scripts/reference/sync_shipment_packages.py
+  poll       scripts/bench_poll.ts (runPoll, via npx tsx)
+
+Each run records wall time, API calls (from the simulator), DB calls
+(``pg_stat_statements`` when installed, otherwise committed transactions),
+rows written, rows/sec and peak RSS. Results are compared against a JSON
+baseline; ``--update-baseline`` rewrites it.
+
+The target database is wiped, so it must be given explicitly through
+``BENCH_DATABASE_URL`` (or ``--database-url``) and must already have the app
+schema (``npm run db:deploy``).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlparse
+
+import psycopg
+
+
+REFERENCE_DIR = Path(__file__).resolve().parent
+REPO_ROOT = REFERENCE_DIR.parent.parent
+DEFAULT_BASELINE = REFERENCE_DIR / "bench_baseline.json"
+
+SELLER_ID = 1111632
+SIMULATOR_SEED = 42
+PAGE_SIZE = 200
+PATHS = ("products", "shipments", "poll")
+
+# Rows that identify how much work each path did.
+ROW_COUNT_SQL = {
+    "products": "SELECT COUNT(*) FROM trendyol_products",
+    "shipments": "SELECT COUNT(*) FROM shipment_packages",
+    "poll": 'SELECT COUNT(*) FROM "PriceSnapshot"',
+}
+
+RESET_SQL = """
+TRUNCATE "Product", "orders", "shipment_packages", "JobLock", "trendyol_rate_limits" CASCADE;
+DROP TABLE IF EXISTS trendyol_products;
+"""
+
+COMPARED_METRICS = ("wallSeconds", "apiCalls", "dbCalls", "peakRssMb")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the Trendyol sync and poll paths end to end.")
+    parser.add_argument(
+        "--database-url",
+        default=os.getenv("BENCH_DATABASE_URL", ""),
+        help="Dedicated benchmark database (wiped on every size). Default: BENCH_DATABASE_URL",
+    )
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated catalog sizes")
+    parser.add_argument("--paths", default=",".join(PATHS), help=f"Comma-separated subset of {','.join(PATHS)}")
+    parser.add_argument("--history", type=int, default=5, help="Seeded snapshots per product")
+    parser.add_argument("--orders-per-product", type=float, default=0.5, help="Seeded orders per product")
+    parser.add_argument("--api-rps", type=float, default=100, help="Client-side Trendyol rate budget per family")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulator latency per request")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Write this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression (0.15 = 15%%)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 2 when a metric regresses")
+    parser.add_argument("--allow-remote", action="store_true", help="Allow a non-local database host")
+    return parser.parse_args()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def simulator_request(base_url: str, path: str, method: str = "GET") -> dict[str, Any]:
+    request = urllib.request.Request(f"{base_url}{path}", method=method)
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.loads(response.read())
+
+
+def start_simulator(size: int, orders: int, latency_ms: float) -> tuple[subprocess.Popen[bytes], str]:
+    port = free_port()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            str(REFERENCE_DIR / "trendyol_simulator.py"),
+            "--port",
+            str(port),
+            "--products",
+            str(size),
+            "--orders",
+            str(orders),
+            "--seed",
+            str(SIMULATOR_SEED),
+            "--seller-id",
+            str(SELLER_ID),
+            "--latency-ms",
+            str(latency_ms),
+            "--max-page-size",
+            str(PAGE_SIZE),
+        ],
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        try:
+            simulator_request(base_url, "/_simulator/stats")
+            return process, base_url
+        except OSError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.2)
+
+    process.kill()
+    raise RuntimeError("Trendyol simulator did not start")
+
+
+def seed_database(conn: psycopg.Connection[Any], size: int, history: int, orders_per_product: float) -> dict[str, int]:
+    """Seeds products matching the simulator catalog (same barcode/stock code scheme)."""
+    rng = random.Random(SIMULATOR_SEED)
+    now = datetime.now(timezone.utc)
+
+    with conn.cursor() as cur:
+        cur.execute(RESET_SQL)
+        cur.execute('SELECT COUNT(*) FROM "GlobalSettings"')
+        if cur.fetchone()[0] == 0:
+            cur.execute(
+                'INSERT INTO "GlobalSettings" ("id", "createdAt", "updatedAt") VALUES (%s, %s, %s)',
+                ("bench-global", now, now),
+            )
+
+        with cur.copy(
+            'COPY "Product" ("id", "sku", "barcode", "title", "active", "currency", "createdAt", "updatedAt") FROM STDIN'
+        ) as copy:
+            for index in range(size):
+                copy.write_row(
+                    (
+                        f"bench-{index}",
+                        f"SIM-{index:06d}",
+                        f"869{SIMULATOR_SEED % 1000:03d}{index:07d}",
+                        f"Bench product {index}",
+                        True,
+                        "SAR",
+                        now,
+                        now,
+                    )
+                )
+
+        with cur.copy(
+            'COPY "ProductSettings" ("id", "productId", "costPrice", "createdAt", "updatedAt") FROM STDIN'
+        ) as copy:
+            for index in range(size):
+                copy.write_row((f"bench-settings-{index}", f"bench-{index}", round(rng.uniform(10, 500), 2), now, now))
+
+        snapshots = 0
+        with cur.copy(
+            'COPY "PriceSnapshot" ("id", "productId", "checkedAt", "lastSeenAt", "ourPrice", "competitorMinPrice", '
+            '"competitorCount", "buyboxStatus") FROM STDIN'
+        ) as copy:
+            for index in range(size):
+                price = round(rng.uniform(20, 900), 2)
+                for step in range(history):
+                    checked_at = now - timedelta(minutes=5 * (history - step))
+                    copy.write_row(
+                        (
+                            f"bench-snap-{index}-{step}",
+                            f"bench-{index}",
+                            checked_at,
+                            checked_at,
+                            price,
+                            round(price * rng.uniform(0.9, 1.05), 2),
+                            2,
+                            rng.choice(("WIN", "LOSE")),
+                        )
+                    )
+                    snapshots += 1
+
+        order_count = int(size * orders_per_product)
+        with cur.copy(
+            'COPY "orders" ("id", "orderNumber", "sellerId", "status", "totalPrice", "createdDate", "updatedAt") '
+            "FROM STDIN"
+        ) as copy:
+            for index in range(order_count):
+                copy.write_row(
+                    (
+                        f"bench-order-{index}",
+                        f"BENCH{index:09d}",
+                        SELLER_ID,
+                        rng.choice(("Delivered", "Shipped", "Returned", "Cancelled")),
+                        round(rng.uniform(20, 900), 2),
+                        now - timedelta(days=rng.randint(0, 365)),
+                        now,
+                    )
+                )
+
+        with cur.copy(
+            'COPY "order_items" ("id", "orderId", "productName", "sku", "barcode", "quantity", "price") FROM STDIN'
+        ) as copy:
+            for index in range(order_count):
+                product = rng.randrange(max(1, size))
+                copy.write_row(
+                    (
+                        f"bench-item-{index}",
+                        f"bench-order-{index}",
+                        f"Bench product {product}",
+                        f"869{SIMULATOR_SEED % 1000:03d}{product:07d}",
+                        f"869{SIMULATOR_SEED % 1000:03d}{product:07d}",
+                        rng.randint(1, 3),
+                        round(rng.uniform(20, 900), 2),
+                    )
+                )
+
+    conn.commit()
+    with conn.cursor() as cur:
+        cur.execute('ANALYZE "Product", "ProductSettings", "PriceSnapshot", "orders", "order_items"')
+    conn.commit()
+    return {"products": size, "snapshots": snapshots, "orders": order_count}
+
+
+def db_call_counter(conn: psycopg.Connection[Any]) -> tuple[str, int]:
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_stat_clear_snapshot()")
+        cur.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'")
+        if cur.fetchone():
+            cur.execute(
+                "SELECT COALESCE(SUM(calls), 0) FROM pg_stat_statements "
+                "WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())"
+            )
+            return "statements", int(cur.fetchone()[0])
+        cur.execute(
+            "SELECT xact_commit + xact_rollback FROM pg_stat_database WHERE datname = current_database()"
+        )
+        return "transactions", int(cur.fetchone()[0])
+
+
+def count_rows(conn: psycopg.Connection[Any], path: str) -> int:
+    with conn.cursor() as cur:
+        try:
+            cur.execute(ROW_COUNT_SQL[path])
+            return int(cur.fetchone()[0])
+        except psycopg.errors.UndefinedTable:
+            conn.rollback()
+            return 0
+
+
+def command_for(path: str, size: int) -> list[str]:
+    pages = str(math.ceil(size / PAGE_SIZE) + 1)
+    if path == "products":
+        return [
+            sys.executable,
+            str(REFERENCE_DIR / "sync_trendyol_products.py"),
+            "--page-size",
+            str(PAGE_SIZE),
+            "--max-pages",
+            pages,
+            "--include-unapproved",
+        ]
+    if path == "shipments":
+        return [
+            sys.executable,
+            str(REFERENCE_DIR / "sync_shipment_packages.py"),
+            "--lookback-hours",
+            str(24 * 400),
+            "--page-size",
+            str(PAGE_SIZE),
+            "--max-pages",
+            str(10_000),
+        ]
+    return ["npx", "tsx", str(REPO_ROOT / "scripts" / "bench_poll.ts")]
+
+
+def run_path(
+    conn: psycopg.Connection[Any],
+    path: str,
+    size: int,
+    env: dict[str, str],
+    simulator_url: str,
+) -> dict[str, Any]:
+    rows_before = count_rows(conn, path)
+    counter_kind, calls_before = db_call_counter(conn)
+    simulator_request(simulator_url, "/_simulator/reset", method="POST")
+
+    with tempfile.TemporaryFile() as stdout_file, tempfile.TemporaryFile() as stderr_file:
+        started = time.perf_counter()
+        process = subprocess.Popen(command_for(path, size), cwd=REPO_ROOT, env=env, stdout=stdout_file, stderr=stderr_file)
+        # wait4 reports the child's own peak RSS (ru_maxrss), unlike RUSAGE_CHILDREN's running max.
+        _, status, usage = os.wait4(process.pid, 0)
+        wall = time.perf_counter() - started
+        returncode = os.waitstatus_to_exitcode(status)
+        process.returncode = returncode
+        stdout_file.seek(0)
+        stderr_file.seek(0)
+        stdout, stderr = stdout_file.read(), stderr_file.read()
+    peak_rss_kb = usage.ru_maxrss // 1024 if platform.system() == "Darwin" else usage.ru_maxrss
+
+    # Let the statistics collector flush the child's counters.
+    time.sleep(1.1)
+    _, calls_after = db_call_counter(conn)
+    rows_after = count_rows(conn, path)
+    api = simulator_request(simulator_url, "/_simulator/stats")
+
+    rows = max(0, rows_after - rows_before) if path == "poll" else rows_after
+    result = {
+        "exitCode": returncode,
+        "wallSeconds": round(wall, 3),
+        "apiCalls": api["totalRequests"],
+        "apiCallsByRoute": api["requests"],
+        "apiRateLimited": api["rateLimited"],
+        "dbCalls": calls_after - calls_before,
+        "dbCallKind": counter_kind,
+        "rows": rows,
+        "rowsPerSecond": round(rows / wall, 1) if wall > 0 else None,
+        "peakRssMb": round(peak_rss_kb / 1024, 1),
+    }
+    if returncode != 0:
+        result["stderrTail"] = stderr.decode("utf-8", "replace")[-600:]
+    elif path == "poll":
+        try:
+            result["summary"] = json.loads(stdout.decode("utf-8").strip().splitlines()[-1])
+        except (IndexError, json.JSONDecodeError):
+            pass
+    return result
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    regressions: list[str] = []
+    base_runs = baseline.get("runs", {})
+
+    print(f"\n{'run':<22}{'metric':<14}{'baseline':>12}{'current':>12}{'change':>10}")
+    for key, current in results["runs"].items():
+        previous = base_runs.get(key)
+        if not previous:
+            print(f"{key:<22}(no baseline)")
+            continue
+        for metric in COMPARED_METRICS:
+            before, after = previous.get(metric), current.get(metric)
+            if not isinstance(before, (int, float)) or not isinstance(after, (int, float)) or before <= 0:
+                continue
+            change = (after - before) / before
+            flag = ""
+            if change > tolerance:
+                flag = "  REGRESSION"
+                regressions.append(f"{key} {metric} {before} -> {after} (+{change:.0%})")
+            print(f"{key:<22}{metric:<14}{before:>12}{after:>12}{change:>+10.1%}{flag}")
+    return regressions
+
+
+def main() -> int:
+    args = parse_args()
+
+    if not args.database_url:
+        print("Configuration error: set BENCH_DATABASE_URL or pass --database-url", file=sys.stderr)
+        return 1
+    host = urlparse(args.database_url).hostname or ""
+    if host not in ("localhost", "127.0.0.1", "::1") and not args.allow_remote:
+        print(f"Refusing to wipe non-local database host {host!r} (use --allow-remote)", file=sys.stderr)
+        return 1
+
+    sizes = [int(value) for value in args.sizes.split(",") if value.strip()]
+    paths = [value.strip() for value in args.paths.split(",") if value.strip()]
+    unknown = set(paths) - set(PATHS)
+    if unknown:
+        print(f"Argument error: unknown paths {sorted(unknown)}", file=sys.stderr)
+        return 1
+
+    results: dict[str, Any] = {
+        "generatedAt": datetime.now(timezone.utc).isoformat(),
+        "host": {"platform": platform.platform(), "python": platform.python_version(), "cpus": os.cpu_count()},
+        "settings": {"history": args.history, "ordersPerProduct": args.orders_per_product, "apiRps": args.api_rps},
+        "runs": {},
+    }
+
+    try:
+        conn = psycopg.connect(args.database_url)
+    except Exception as exc:
+        print(f"Database connection error: {exc}", file=sys.stderr)
+        return 1
+
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass('\"Product\"') IS NOT NULL")
+            if not cur.fetchone()[0]:
+                print("Schema error: app tables missing; run `npm run db:deploy` against the bench database", file=sys.stderr)
+                return 1
+
+        for size in sorted(sizes):
+            seeded = seed_database(conn, size, args.history, args.orders_per_product)
+            print(f"Seeded {seeded} for size {size}", file=sys.stderr)
+
+            simulator, simulator_url = start_simulator(size, int(size * args.orders_per_product), args.latency_ms)
+            try:
+                rate = str(min(100, args.api_rps))
+                env = {
+                    **os.environ,
+                    "DATABASE_URL": args.database_url,
+                    "TRENDYOL_BASE_URL": simulator_url,
+                    "TRENDYOL_SELLER_ID": str(SELLER_ID),
+                    "TRENDYOL_SUPPLIER_ID": str(SELLER_ID),
+                    "TRENDYOL_API_KEY": "bench",
+                    "TRENDYOL_API_SECRET": "bench",
+                    "TRENDYOL_API_TOKEN": "",
+                    "TRENDYOL_RATE_LIMIT_PRODUCTS_PER_SECOND": rate,
+                    "TRENDYOL_RATE_LIMIT_BUYBOX_PER_SECOND": rate,
+                    "TRENDYOL_RATE_LIMIT_SHIPMENTS_PER_SECOND": rate,
+                    "TRENDYOL_RATE_LIMIT_PRICES_PER_SECOND": rate,
+                    "AUTO_SYNC_CATALOG": "true",
+                    "AUTO_SYNC_PAGE_SIZE": str(PAGE_SIZE),
+                    "AUTO_SYNC_MAX_PAGES": str(min(500, math.ceil(size / PAGE_SIZE) + 1)),
+                }
+                for path in paths:
+                    key = f"{path}@{size}"
+                    print(f"Running {key} ...", file=sys.stderr)
+                    results["runs"][key] = run_path(conn, path, size, env, simulator_url)
+                    run = results["runs"][key]
+                    print(
+                        f"  {run['wallSeconds']}s, {run['apiCalls']} API calls, {run['dbCalls']} DB "
+                        f"{run['dbCallKind']}, {run['rows']} rows, {run['peakRssMb']} MB peak RSS"
+                        + (f", exit {run['exitCode']}" if run["exitCode"] else ""),
+                        file=sys.stderr,
+                    )
+            finally:
+                simulator.terminate()
+                simulator.wait(timeout=10)
+    finally:
+        conn.close()
+
+    print(json.dumps(results, indent=2))
+
+    regressions: list[str] = []
+    if args.baseline.exists():
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+    else:
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to record one.", file=sys.stderr)
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+
+    if regressions:
+        print("\nRegressions:\n  " + "\n  ".join(regressions), file=sys.stderr)
+        if args.fail_on_regression:
+            return 2
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,90 @@
+"""Barcodes that make buybox-information reject a whole batch.
+
+Same table and expiry rules as ``lib/trendyol/buybox-quarantine.ts``: a barcode isolated by
+bisecting a 400 batch (its sibling half accepted) is skipped for ``BUYBOX_QUARANTINE_HOURS``
+(doubling per repeat, up to a week) by both the app and this sync.
+"""
+from __future__ import annotations
+
+import os
+import sys
+from typing import Any
+
+import psycopg
+
+
+MAX_QUARANTINE_HOURS = 24 * 7
+NOW_UTC = "(now() AT TIME ZONE 'UTC')"
+
+LIST_SQL = f"""
+SELECT "barcode" FROM "buybox_quarantine"
+WHERE "storeFrontCode" = %(store_front_code)s AND "expiresAt" > {NOW_UTC}
+"""
+
+ADD_SQL = f"""
+INSERT INTO "buybox_quarantine" ("storeFrontCode", "barcode", "reason", "failures", "quarantinedAt", "expiresAt")
+VALUES (%(store_front_code)s, %(barcode)s, %(reason)s, 1, {NOW_UTC}, {NOW_UTC} + %(hours)s * INTERVAL '1 hour')
+ON CONFLICT ("storeFrontCode", "barcode") DO UPDATE
+SET "reason" = EXCLUDED."reason",
+    "failures" = "buybox_quarantine"."failures" + 1,
+    "quarantinedAt" = {NOW_UTC},
+    "expiresAt" = {NOW_UTC} + LEAST(%(max_hours)s, %(hours)s * POWER(2, "buybox_quarantine"."failures")) * INTERVAL '1 hour'
+"""
+
+
+class BuyboxQuarantine:
+    def __init__(self, conn: psycopg.Connection[Any] | None, store_front_code: str, hours: float) -> None:
+        self.conn = conn
+        self.store_front_code = store_front_code
+        self.hours = hours
+        self.barcodes: set[str] = set()
+        self.added: list[str] = []
+
+        if self.conn is not None:
+            try:
+                rows = self.conn.execute(LIST_SQL, {"store_front_code": store_front_code}).fetchall()
+                self.barcodes = {row[0] for row in rows}
+            except Exception as exc:
+                self._fallback(exc)
+
+    @classmethod
+    def connect(cls, database_url: str | None, store_front_code: str) -> "BuyboxQuarantine":
+        hours = float(os.getenv("BUYBOX_QUARANTINE_HOURS", "24"))
+        if not database_url:
+            return cls(None, store_front_code, hours)
+        try:
+            return cls(psycopg.connect(database_url, autocommit=True), store_front_code, hours)
+        except Exception as exc:
+            print(f"Warning: buybox quarantine unavailable ({exc}); keeping it in memory", file=sys.stderr)
+            return cls(None, store_front_code, hours)
+
+    def _fallback(self, exc: Exception) -> None:
+        print(f"Warning: buybox quarantine failed ({exc}); keeping it in memory", file=sys.stderr)
+        self.close()
+        self.conn = None
+
+    def __contains__(self, barcode: str) -> bool:
+        return barcode in self.barcodes
+
+    def add(self, barcode: str, reason: str) -> None:
+        self.barcodes.add(barcode)
+        self.added.append(barcode)
+        if self.conn is None:
+            return
+        try:
+            self.conn.execute(
+                ADD_SQL,
+                {
+                    "store_front_code": self.store_front_code,
+                    "barcode": barcode,
+                    "reason": reason[:500],
+                    "hours": self.hours,
+                    "max_hours": float(MAX_QUARANTINE_HOURS),
+                },
+            )
+        except Exception as exc:
+            self._fallback(exc)
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""Circuit breakers per Trendyol endpoint family, shared with the TypeScript app.
+
+Mirrors ``lib/trendyol/circuit-breaker.ts``: one row per family (products, buybox,
+shipments, claims, prices) in ``trendyol_circuit_breakers``. A family opens when
+enough of its requests in the window fail (5xx; 400 for buybox) or several fail in
+a row; requests then raise ``CircuitOpenError`` without being sent until the open
+period passes and one probe request succeeds. A failed probe reopens the family for
+twice as long. Falls back to in-process circuits when the table is unreachable.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import psycopg
+
+from rate_limiter import family_for_path as rate_limit_family_for_path
+
+
+FAMILIES = ("products", "buybox", "shipments", "claims", "prices")
+
+NOW_UTC = "(now() AT TIME ZONE 'UTC')"
+
+# A closed circuit is trusted for this long before asking the table again.
+SHARED_REFRESH_SECONDS = 1.0
+PROBE_TIMEOUT_MS = 30_000
+
+SEED_SQL = f"""
+INSERT INTO "trendyol_circuit_breakers" ("family", "windowStartedAt", "updatedAt")
+VALUES (%(family)s, {NOW_UTC}, {NOW_UTC})
+ON CONFLICT ("family") DO NOTHING
+"""
+
+ADMIT_SQL = f"""
+UPDATE "trendyol_circuit_breakers" AS c
+SET "state" = CASE WHEN s.probe THEN 'HALF_OPEN' ELSE c."state" END,
+    "probeUntil" = CASE WHEN s.probe THEN s.now + %(probe_timeout_ms)s * INTERVAL '1 millisecond' ELSE c."probeUntil" END,
+    "updatedAt" = CASE WHEN s.probe THEN s.now ELSE c."updatedAt" END
+FROM (
+  SELECT "family",
+         {NOW_UTC} AS now,
+         (("state" = 'OPEN' AND "openUntil" <= {NOW_UTC})
+           OR ("state" = 'HALF_OPEN' AND ("probeUntil" IS NULL OR "probeUntil" <= {NOW_UTC}))) AS probe
+  FROM "trendyol_circuit_breakers"
+  WHERE "family" = %(family)s
+  FOR UPDATE
+) AS s
+WHERE c."family" = s."family"
+RETURNING
+  c."state",
+  s.probe,
+  (c."state" = 'CLOSED' OR s.probe) AS allowed,
+  GREATEST(0, CEIL(EXTRACT(EPOCH FROM (
+    COALESCE(CASE WHEN c."state" = 'OPEN' THEN c."openUntil" ELSE c."probeUntil" END, s.now) - s.now
+  )) * 1000))::int AS retry_in_ms
+"""
+
+RECORD_SQL = f"""
+UPDATE "trendyol_circuit_breakers" AS c
+SET "windowStartedAt" = s."windowStartedAt",
+    "requests" = CASE WHEN s.trip THEN 0 ELSE s.requests END,
+    "failures" = CASE WHEN s.trip THEN 0 ELSE s.failures END,
+    "consecutiveFailures" = CASE WHEN s.trip THEN 0 ELSE s.consecutive END,
+    "state" = CASE WHEN s.trip THEN 'OPEN' ELSE c."state" END,
+    "openedAt" = CASE WHEN s.trip THEN s.now ELSE c."openedAt" END,
+    "openUntil" = CASE WHEN s.trip THEN s.now + %(open_ms)s * INTERVAL '1 millisecond' ELSE c."openUntil" END,
+    "opens" = CASE WHEN s.trip THEN 1 ELSE c."opens" END,
+    "openedCount" = c."openedCount" + CASE WHEN s.trip THEN 1 ELSE 0 END,
+    "lastFailure" = COALESCE(%(last_failure)s, c."lastFailure"),
+    "updatedAt" = s.now
+FROM (
+  SELECT w.*,
+         (w."state" = 'CLOSED'
+           AND ((w.requests >= %(min_requests)s AND w.failures >= %(failure_rate)s * w.requests)
+                OR w.consecutive >= %(consecutive_failures)s)) AS trip
+  FROM (
+    SELECT "family",
+           "state",
+           {NOW_UTC} AS now,
+           CASE WHEN "windowStartedAt" <= {NOW_UTC} - %(window_ms)s * INTERVAL '1 millisecond'
+                THEN {NOW_UTC} ELSE "windowStartedAt" END AS "windowStartedAt",
+           CASE WHEN "windowStartedAt" <= {NOW_UTC} - %(window_ms)s * INTERVAL '1 millisecond'
+                THEN 0 ELSE "requests" END + %(requests)s AS requests,
+           CASE WHEN "windowStartedAt" <= {NOW_UTC} - %(window_ms)s * INTERVAL '1 millisecond'
+                THEN 0 ELSE "failures" END + %(failures)s AS failures,
+           CASE WHEN %(saw_success)s THEN %(trailing_failures)s
+                ELSE "consecutiveFailures" + %(trailing_failures)s END AS consecutive
+    FROM "trendyol_circuit_breakers"
+    WHERE "family" = %(family)s
+    FOR UPDATE
+  ) AS w
+) AS s
+WHERE c."family" = s."family"
+RETURNING
+  c."state",
+  s.trip AS opened,
+  GREATEST(0, CEIL(EXTRACT(EPOCH FROM (COALESCE(c."openUntil", s.now) - s.now)) * 1000))::int AS retry_in_ms
+"""
+
+SETTLE_SQL = f"""
+UPDATE "trendyol_circuit_breakers"
+SET "state" = CASE WHEN %(ok)s THEN 'CLOSED' ELSE 'OPEN' END,
+    "windowStartedAt" = {NOW_UTC},
+    "requests" = 0,
+    "failures" = 0,
+    "consecutiveFailures" = 0,
+    "probeUntil" = NULL,
+    "openedAt" = CASE WHEN %(ok)s THEN "openedAt" ELSE {NOW_UTC} END,
+    "openUntil" = CASE WHEN %(ok)s THEN NULL
+                       ELSE {NOW_UTC} + LEAST(%(max_open_ms)s, %(open_ms)s * POWER(2, "opens")) * INTERVAL '1 millisecond' END,
+    "opens" = CASE WHEN %(ok)s THEN 0 ELSE "opens" + 1 END,
+    "lastFailure" = COALESCE(%(last_failure)s, "lastFailure"),
+    "updatedAt" = {NOW_UTC}
+WHERE "family" = %(family)s AND "state" = 'HALF_OPEN'
+RETURNING
+  "state",
+  NOT %(ok)s AS opened,
+  GREATEST(0, CEIL(EXTRACT(EPOCH FROM (COALESCE("openUntil", {NOW_UTC}) - {NOW_UTC})) * 1000))::int AS retry_in_ms
+"""
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of sending a request while the family's circuit is open."""
+
+    def __init__(self, family: str, retry_in_seconds: float) -> None:
+        super().__init__(f"Trendyol {family} circuit is open; next probe in {retry_in_seconds:.0f}s")
+        self.family = family
+        self.retry_in_seconds = retry_in_seconds
+
+
+@dataclass(frozen=True)
+class Policy:
+    failure_rate: float
+    min_requests: int
+    consecutive_failures: int
+    window_seconds: float
+    open_seconds: float
+    max_open_seconds: float
+
+
+@dataclass
+class CircuitMetrics:
+    state: str = "CLOSED"
+    requests: int = 0
+    failures: int = 0
+    rejected: int = 0
+    probes: int = 0
+    opened: int = 0
+
+
+@dataclass
+class _MemoryCircuit:
+    window_started_at: float
+    state: str = "CLOSED"
+    requests: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    open_until: float = 0.0
+    probe_until: float = 0.0
+    opens: int = 0
+
+
+def family_for_path(path: str) -> str:
+    return "claims" if "/integration/claim/" in path else rate_limit_family_for_path(path)
+
+
+def is_failure(family: str, status_code: int) -> bool:
+    """5xx (including Trendyol's 556), plus 400 for buybox-information."""
+    return status_code >= 500 or (family == "buybox" and status_code == 400)
+
+
+def policy_from_env() -> Policy:
+    return Policy(
+        failure_rate=float(os.getenv("TRENDYOL_CIRCUIT_FAILURE_RATE", "0.5")),
+        min_requests=int(os.getenv("TRENDYOL_CIRCUIT_MIN_REQUESTS", "20")),
+        consecutive_failures=int(os.getenv("TRENDYOL_CIRCUIT_CONSECUTIVE_FAILURES", "5")),
+        window_seconds=float(os.getenv("TRENDYOL_CIRCUIT_WINDOW_SECONDS", "60")),
+        open_seconds=float(os.getenv("TRENDYOL_CIRCUIT_OPEN_SECONDS", "30")),
+        max_open_seconds=float(os.getenv("TRENDYOL_CIRCUIT_MAX_OPEN_SECONDS", "600")),
+    )
+
+
+class CircuitBreakers:
+    def __init__(self, conn: psycopg.Connection[Any] | None, policy: Policy | None = None) -> None:
+        self.conn = conn
+        self.policy = policy or policy_from_env()
+        self.metrics: dict[str, CircuitMetrics] = {family: CircuitMetrics() for family in FAMILIES}
+        self._seeded: set[str] = set()
+        self._known: dict[str, tuple[str, float, float]] = {}
+        self._memory: dict[str, _MemoryCircuit] = {}
+
+    @classmethod
+    def connect(cls, database_url: str | None) -> "CircuitBreakers":
+        backend = os.getenv("TRENDYOL_RATE_LIMIT_BACKEND", "postgres").strip().lower()
+        if backend != "postgres" or not database_url:
+            return cls(None)
+        try:
+            return cls(psycopg.connect(database_url, autocommit=True))
+        except Exception as exc:
+            print(f"Warning: shared circuit breakers unavailable ({exc}); using in-process circuits", file=sys.stderr)
+            return cls(None)
+
+    @property
+    def backend(self) -> str:
+        return "postgres" if self.conn is not None else "memory"
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+
+    def _fallback(self, exc: Exception) -> None:
+        print(f"Warning: shared circuit breakers failed ({exc}); using in-process circuits", file=sys.stderr)
+        self.close()
+        self.conn = None
+
+    def _ensure(self, family: str) -> None:
+        assert self.conn is not None
+        if family not in self._seeded:
+            self.conn.execute(SEED_SQL, {"family": family})
+            self._seeded.add(family)
+
+    def _remember(self, family: str, state: str, retry_in_ms: float) -> None:
+        now = time.monotonic()
+        self._known[family] = (state, now + retry_in_ms / 1000, now)
+
+    def _memory_circuit(self, family: str) -> _MemoryCircuit:
+        circuit = self._memory.get(family)
+        if circuit is None:
+            circuit = _MemoryCircuit(window_started_at=time.monotonic())
+            self._memory[family] = circuit
+        return circuit
+
+    def _admit(self, family: str) -> tuple[bool, bool, str, float]:
+        """Returns ``(allowed, probe, state, retry_in_seconds)``."""
+        now = time.monotonic()
+        known = self._known.get(family)
+        if known and known[0] == "CLOSED" and now - known[2] < SHARED_REFRESH_SECONDS:
+            return True, False, "CLOSED", 0.0
+        if known and known[0] == "OPEN" and known[1] > now:
+            return False, False, "OPEN", known[1] - now
+
+        if self.conn is not None:
+            try:
+                self._ensure(family)
+                row = self.conn.execute(
+                    ADMIT_SQL, {"family": family, "probe_timeout_ms": PROBE_TIMEOUT_MS}
+                ).fetchone()
+                if row is None:
+                    self._seeded.discard(family)
+                    return True, False, "CLOSED", 0.0
+                state, probe, allowed, retry_in_ms = row
+                self._remember(family, state, 0 if state == "HALF_OPEN" else retry_in_ms)
+                return bool(allowed), bool(probe), state, retry_in_ms / 1000
+            except Exception as exc:
+                self._fallback(exc)
+
+        circuit = self._memory_circuit(family)
+        if circuit.state == "CLOSED":
+            return True, False, "CLOSED", 0.0
+        if circuit.state == "OPEN" and circuit.open_until > now:
+            return False, False, "OPEN", circuit.open_until - now
+        if circuit.state == "HALF_OPEN" and circuit.probe_until > now:
+            return False, False, "HALF_OPEN", circuit.probe_until - now
+        circuit.state = "HALF_OPEN"
+        circuit.probe_until = now + PROBE_TIMEOUT_MS / 1000
+        return True, True, "HALF_OPEN", 0.0
+
+    def _record(self, family: str, failure: str | None) -> tuple[str, bool, float]:
+        """Returns ``(state, opened, retry_in_seconds)``."""
+        policy = self.policy
+        if self.conn is not None:
+            try:
+                self._ensure(family)
+                row = self.conn.execute(
+                    RECORD_SQL,
+                    {
+                        "family": family,
+                        "requests": 1,
+                        "failures": 1 if failure else 0,
+                        "trailing_failures": 1 if failure else 0,
+                        "saw_success": not failure,
+                        "window_ms": round(policy.window_seconds * 1000),
+                        "open_ms": round(policy.open_seconds * 1000),
+                        "min_requests": policy.min_requests,
+                        "failure_rate": policy.failure_rate,
+                        "last_failure": failure,
+                        "consecutive_failures": policy.consecutive_failures,
+                    },
+                ).fetchone()
+                if row is None:
+                    self._seeded.discard(family)
+                    return "CLOSED", False, 0.0
+                state, opened, retry_in_ms = row
+                self._remember(family, state, retry_in_ms)
+                return state, bool(opened), retry_in_ms / 1000
+            except Exception as exc:
+                self._fallback(exc)
+
+        circuit = self._memory_circuit(family)
+        now = time.monotonic()
+        if now - circuit.window_started_at >= policy.window_seconds:
+            circuit.window_started_at = now
+            circuit.requests = 0
+            circuit.failures = 0
+        circuit.requests += 1
+        circuit.failures += 1 if failure else 0
+        circuit.consecutive_failures = circuit.consecutive_failures + 1 if failure else 0
+
+        trip = circuit.state == "CLOSED" and (
+            (circuit.requests >= policy.min_requests and circuit.failures >= policy.failure_rate * circuit.requests)
+            or circuit.consecutive_failures >= policy.consecutive_failures
+        )
+        if not trip:
+            return circuit.state, False, max(0.0, circuit.open_until - now)
+        circuit.state = "OPEN"
+        circuit.open_until = now + policy.open_seconds
+        circuit.opens = 1
+        circuit.requests = circuit.failures = circuit.consecutive_failures = 0
+        return "OPEN", True, policy.open_seconds
+
+    def _settle(self, family: str, failure: str | None) -> tuple[str, bool, float]:
+        policy = self.policy
+        if self.conn is not None:
+            try:
+                row = self.conn.execute(
+                    SETTLE_SQL,
+                    {
+                        "family": family,
+                        "ok": not failure,
+                        "open_ms": policy.open_seconds * 1000,
+                        "max_open_ms": policy.max_open_seconds * 1000,
+                        "last_failure": failure,
+                    },
+                ).fetchone()
+                if row is None:
+                    # Another caller settled it (our probe timed out); read the state again next time.
+                    self._known.pop(family, None)
+                    return "OPEN", False, 0.0
+                state, opened, retry_in_ms = row
+                self._remember(family, state, retry_in_ms)
+                return state, bool(opened), retry_in_ms / 1000
+            except Exception as exc:
+                self._fallback(exc)
+
+        circuit = self._memory_circuit(family)
+        if circuit.state != "HALF_OPEN":
+            return circuit.state, False, 0.0
+        now = time.monotonic()
+        circuit.window_started_at = now
+        circuit.requests = circuit.failures = circuit.consecutive_failures = 0
+        circuit.probe_until = 0.0
+        if not failure:
+            circuit.state = "CLOSED"
+            circuit.opens = 0
+            return "CLOSED", False, 0.0
+        open_seconds = min(policy.max_open_seconds, policy.open_seconds * 2 ** circuit.opens)
+        circuit.state = "OPEN"
+        circuit.open_until = now + open_seconds
+        circuit.opens += 1
+        return "OPEN", True, open_seconds
+
+    def admit(self, family: str) -> bool:
+        """Admits a request for ``family`` (returns True for the half-open probe) or raises ``CircuitOpenError``."""
+        metrics = self.metrics[family]
+        allowed, probe, state, retry_in = self._admit(family)
+        metrics.state = state
+        if not allowed:
+            metrics.rejected += 1
+            raise CircuitOpenError(family, retry_in)
+        if probe:
+            metrics.probes += 1
+        return probe
+
+    def record(self, family: str, probe: bool, status_code: int | None, bisecting: bool = False) -> None:
+        """Reports an admitted request's outcome; ``None`` means it failed before a response.
+
+        A 400 on a request ``bisecting`` a rejected buybox batch only says which barcodes are bad:
+        it is not counted, and a half-open probe settles as a success since the endpoint answered.
+        """
+        neutral = bisecting and status_code == 400
+        if neutral and not probe:
+            return
+        failure = (
+            "network error"
+            if status_code is None
+            else f"HTTP {status_code}" if is_failure(family, status_code) and not neutral else None
+        )
+        metrics = self.metrics[family]
+        metrics.requests += 1
+        metrics.failures += 1 if failure else 0
+
+        state, opened, retry_in = self._settle(family, failure) if probe else self._record(family, failure)
+        metrics.state = state
+        if opened:
+            metrics.opened += 1
+            print(
+                f"Warning: {family} circuit opened after {failure}; next probe in {retry_in:.0f}s",
+                file=sys.stderr,
+            )
+
+    def counters(self) -> dict[str, dict[str, Any]]:
+        """Families that rejected or opened during the run, or are not closed; same shape as job_runs from the app."""
+        return {
+            family: {"rejected": m.rejected, "opened": m.opened, "state": m.state}
+            for family, m in self.metrics.items()
+            if m.rejected or m.opened or m.state != "CLOSED"
+        }
+
+    def summary(self) -> str:
+        parts = [
+            f"{family}: state={m.state} failures={m.failures}/{m.requests} rejected={m.rejected} opened={m.opened}"
+            for family, m in self.metrics.items()
+            if m.requests or m.rejected
+        ]
+        return f"Circuit breakers ({self.backend}): " + ("; ".join(parts) if parts else "no requests")
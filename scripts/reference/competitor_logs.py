@@ -0,0 +1,124 @@
+"""Buybox observations appended to ``competitor_logs`` by the Python product sync.
+
+Same statement and labels as ``lib/trendyol/competitor-logs.ts``: competitor names are interned
+in ``competitors`` and a product's latest row is extended (``lastSeenAt``/``observations``) while
+the buybox holder, price and winner flag are unchanged; a change inserts a new row.
+"""
+from __future__ import annotations
+
+from decimal import Decimal, InvalidOperation
+from typing import Any
+
+import psycopg
+
+
+OUR_STORE_LABEL = "Our store"
+UNKNOWN_HOLDER_LABEL = "BuyBox holder"
+NAME_KEYS = ("buyboxSellerName", "sellerName", "merchantName", "supplierName")
+SELLER_ID_KEYS = ("buyboxSellerId", "winnerSellerId", "sellerId")
+NOW_UTC = "(now() AT TIME ZONE 'UTC')"
+
+PRODUCT_IDS_SQL = 'SELECT "barcode", "id" FROM "Product" WHERE "barcode" = ANY(%(barcodes)s::text[])'
+
+RECORD_SQL = f"""
+WITH obs AS (
+  SELECT DISTINCT ON (o."productId") o."productId", o."name", o."price", o."isBuyBoxWinner"
+  FROM unnest(%(product_ids)s::text[], %(names)s::text[], %(prices)s::numeric[], %(winners)s::boolean[])
+    AS o("productId", "name", "price", "isBuyBoxWinner")
+),
+interned AS (
+  INSERT INTO "competitors" ("name")
+  SELECT DISTINCT "name" FROM obs
+  ON CONFLICT ("name") DO NOTHING
+  RETURNING "id", "name"
+),
+names AS (
+  SELECT "id", "name" FROM interned
+  UNION
+  SELECT c."id", c."name" FROM "competitors" c WHERE c."name" IN (SELECT "name" FROM obs)
+),
+resolved AS (
+  SELECT obs."productId", names."id" AS "competitorId", obs."price"::numeric(12, 2) AS "price", obs."isBuyBoxWinner"
+  FROM obs JOIN names ON names."name" = obs."name"
+),
+latest AS (
+  SELECT DISTINCT ON (l."productId") l."id", l."productId", l."competitorId", l."price", l."isBuyBoxWinner"
+  FROM "competitor_logs" l
+  WHERE l."productId" IN (SELECT "productId" FROM obs)
+  ORDER BY l."productId", l."checkedAt" DESC
+),
+extended AS (
+  UPDATE "competitor_logs" l
+  SET "lastSeenAt" = {NOW_UTC}, "observations" = l."observations" + 1
+  FROM latest, resolved r
+  WHERE l."id" = latest."id"
+    AND r."productId" = latest."productId"
+    AND r."competitorId" = latest."competitorId"
+    AND r."price" = latest."price"
+    AND r."isBuyBoxWinner" = latest."isBuyBoxWinner"
+  RETURNING l."productId"
+)
+INSERT INTO "competitor_logs" ("productId", "competitorId", "price", "isBuyBoxWinner", "checkedAt", "lastSeenAt")
+SELECT r."productId", r."competitorId", r."price", r."isBuyBoxWinner", {NOW_UTC}, {NOW_UTC}
+FROM resolved r
+WHERE r."productId" NOT IN (SELECT "productId" FROM extended)
+"""
+
+
+def buybox_order(entry: dict[str, Any]) -> float | None:
+    """``buyboxOrder`` as a number, like ``Number(entry.buyboxOrder)`` in the app."""
+    try:
+        return float(entry.get("buyboxOrder"))
+    except (TypeError, ValueError):
+        return None
+
+
+def observation_for(entry: dict[str, Any]) -> tuple[str, Decimal, bool] | None:
+    """(holder name, buybox price, we hold the buybox) for one buybox-information entry."""
+    try:
+        price = Decimal(str(entry.get("buyboxPrice")))
+    except (InvalidOperation, ValueError):
+        return None
+    if not price.is_finite():
+        return None
+
+    winner = buybox_order(entry) == 1
+    name = next(
+        (str(entry[key]).strip() for key in NAME_KEYS if isinstance(entry.get(key), str) and entry[key].strip()),
+        None,
+    )
+    if name is None:
+        seller_id = next((entry[key] for key in SELLER_ID_KEYS if entry.get(key) is not None), None)
+        if winner:
+            name = OUR_STORE_LABEL
+        elif seller_id is not None:
+            name = f"Seller {seller_id}"
+        else:
+            name = UNKNOWN_HOLDER_LABEL
+    return name, price, winner
+
+
+def record_competitor_observations(conn: psycopg.Connection[Any], buybox_map: dict[str, Any]) -> int:
+    """Appends one page of buybox entries (keyed by barcode); returns the rows inserted."""
+    if not buybox_map:
+        return 0
+
+    with conn.cursor() as cur:
+        cur.execute(PRODUCT_IDS_SQL, {"barcodes": list(buybox_map)})
+        product_ids = {barcode: product_id for barcode, product_id in cur.fetchall()}
+
+        params: dict[str, list[Any]] = {"product_ids": [], "names": [], "prices": [], "winners": []}
+        for barcode, entry in buybox_map.items():
+            observation = observation_for(entry)
+            if barcode not in product_ids or observation is None:
+                continue
+            name, price, winner = observation
+            params["product_ids"].append(product_ids[barcode])
+            params["names"].append(name)
+            params["prices"].append(price)
+            params["winners"].append(winner)
+
+        if not params["product_ids"]:
+            return 0
+        cur.execute(RECORD_SQL, params)
+        return cur.rowcount
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""Streams products, snapshots, orders or shipment packages to CSV or NDJSON.
+
+Same sources and columns as ``GET /api/export/[source]`` (``lib/export/sources.ts``), but read
+through a server-side cursor, ``--batch-size`` rows per round trip. Memory stays flat for any
+row count, and ``--gzip`` (or an ``.gz`` output path) compresses while writing:
+
+  python scripts/reference/export_data.py products --format csv > products.csv
+  python scripts/reference/export_data.py snapshots --from 2026-03-01 --to 2026-04-01 -o snapshots.ndjson.gz
+  python scripts/reference/export_data.py orders --format ndjson --gzip > orders.ndjson.gz
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import math
+import os
+import sys
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import IO, Any, Iterator
+
+import psycopg
+from dotenv import load_dotenv
+
+
+DEFAULT_RANGE_DAYS = 30
+FIXED_VAT_RATE = 0.15
+
+PRODUCTS_SQL = """
+SELECT p."id", p."sku", p."barcode", p."title", p."category", p."active", p."trendyolProductId" AS "listingId",
+       s."ourPrice"::float8, s."competitorMinPrice"::float8, s."competitorCount",
+       COALESCE(s."buyboxStatus"::text, 'UNKNOWN') AS "buyboxStatus", s."lastSeenAt" AS "lastCheckedAt",
+       ps."productId" IS NOT NULL AS "hasSettings", ps."costPrice"::float8, ps."commissionRate"::float8,
+       ps."minProfitType"::text, ps."minProfitValue"::float8, ps."minPrice"::float8
+FROM "Product" p
+LEFT JOIN LATERAL (
+  SELECT "ourPrice", "competitorMinPrice", "competitorCount", "buyboxStatus", "lastSeenAt"
+  FROM "PriceSnapshot"
+  WHERE "productId" = p."id"
+  ORDER BY "checkedAt" DESC
+  LIMIT 1
+) s ON true
+LEFT JOIN "ProductSettings" ps ON ps."productId" = p."id"
+ORDER BY p."id"
+"""
+
+GLOBAL_SETTINGS_SQL = """
+SELECT "commissionRate"::float8, "shippingCost"::float8, "minProfitType"::text, "minProfitValue"::float8
+FROM "GlobalSettings"
+LIMIT 1
+"""
+
+SNAPSHOTS_SQL = """
+SELECT s."id", s."productId", p."sku", s."checkedAt", s."lastSeenAt", s."observations",
+       s."ourPrice"::float8, s."competitorMinPrice"::float8, s."competitorCount",
+       s."buyboxStatus"::text, s."buyboxSellerId"
+FROM "PriceSnapshot" s
+JOIN "Product" p ON p."id" = s."productId"
+WHERE s."checkedAt" >= %(from)s AND s."checkedAt" < %(to)s
+  AND (%(product_id)s::text IS NULL OR s."productId" = %(product_id)s::text)
+ORDER BY s."productId", s."checkedAt", s."id"
+"""
+
+ORDERS_SQL = """
+SELECT o."id" AS "orderId", o."orderNumber", o."status", o."totalPrice"::float8, o."currency", o."createdDate",
+       o."customerFirstName", o."customerLastName", o."shipmentPackageId", oi."sku", oi."barcode",
+       oi."merchantSku", oi."productName", oi."quantity", oi."price"::float8 AS "itemPrice"
+FROM "orders" o
+LEFT JOIN "order_items" oi ON oi."orderId" = o."id"
+WHERE o."createdDate" >= %(from)s AND o."createdDate" < %(to)s
+ORDER BY o."createdDate", o."id", oi."id"
+"""
+
+SHIPMENTS_SQL = """
+SELECT "id", "sellerId"::text, "packageNumber", "orderNumber", "status", "cargoProvider", "trackingNumber",
+       "linesCount", "createdAt", "lastModifiedAt", "estimatedDeliveryStart", "estimatedDeliveryEnd", "syncedAt"
+FROM "shipment_packages"
+WHERE "lastModifiedAt" >= %(from)s AND "lastModifiedAt" < %(to)s
+ORDER BY "lastModifiedAt", "id"
+"""
+
+COLUMNS = {
+    "products": [
+        "id", "sku", "barcode", "title", "category", "active", "listingId", "ourPrice", "competitorMinPrice",
+        "competitorCount", "buyboxStatus", "lastCheckedAt", "costPrice", "breakEvenPrice", "marginSar", "marginPct",
+    ],
+    "snapshots": [
+        "id", "productId", "sku", "checkedAt", "lastSeenAt", "observations", "ourPrice", "competitorMinPrice",
+        "competitorCount", "buyboxStatus", "buyboxSellerId",
+    ],
+    "orders": [
+        "orderId", "orderNumber", "status", "totalPrice", "currency", "createdDate", "customerFirstName",
+        "customerLastName", "shipmentPackageId", "sku", "barcode", "merchantSku", "productName", "quantity", "itemPrice",
+    ],
+    "shipments": [
+        "id", "sellerId", "packageNumber", "orderNumber", "status", "cargoProvider", "trackingNumber", "linesCount",
+        "createdAt", "lastModifiedAt", "estimatedDeliveryStart", "estimatedDeliveryEnd", "syncedAt",
+    ],
+}
+
+SQL = {"products": PRODUCTS_SQL, "snapshots": SNAPSHOTS_SQL, "orders": ORDERS_SQL, "shipments": SHIPMENTS_SQL}
+
+
+def round_money(value: float) -> float:
+    """``roundMoney`` in ``lib/utils/money.ts``: half up to 2 decimals, never below zero."""
+    return max(0.0, math.floor(value * 100 + 0.5) / 100)
+
+
+def ceil_money(value: float) -> float:
+    return max(0.0, math.ceil(value * 100) / 100)
+
+
+def with_margins(row: dict[str, Any], global_settings: dict[str, Any]) -> dict[str, Any]:
+    """Break-even floor and margin at the current price, as ``lib/pricing/calculator.ts`` computes them."""
+    if not row.pop("hasSettings"):
+        return {**row, "costPrice": None, "breakEvenPrice": None, "marginSar": None, "marginPct": None}
+
+    cost = max(0.0, row.pop("costPrice") or 0.0)
+    fee = row.pop("commissionRate")
+    fee = global_settings["commissionRate"] if fee is None else fee
+    fee = fee if fee < 1 else fee / 100
+    shipping = max(0.0, global_settings["shippingCost"] or 0.0)
+    profit_type = row.pop("minProfitType") or global_settings["minProfitType"]
+    profit_value = row.pop("minProfitValue")
+    profit_value = global_settings["minProfitValue"] if profit_value is None else profit_value
+    min_price = row.pop("minPrice") or 0.0
+
+    floor = cost + cost * FIXED_VAT_RATE + shipping + cost * fee
+    if profit_type == "PERCENT":
+        denominator = 1 - profit_value / 100
+        break_even = ceil_money(floor / denominator) if denominator > 0 else None
+    else:
+        break_even = ceil_money(floor + profit_value)
+
+    price = row["ourPrice"]
+    margin_sar = margin_pct = None
+    if price is not None:
+        profit = max(0.0, price) - (cost * fee + shipping + cost * FIXED_VAT_RATE) - cost
+        margin_sar = round_money(profit)
+        margin_pct = round_money(profit / price * 100) if price > 0 else 0.0
+
+    return {
+        **row,
+        "costPrice": cost,
+        # No floor satisfies a 100% minimum profit; the app exports that as empty too.
+        "breakEvenPrice": None if break_even is None else ceil_money(max(break_even, max(0.0, min_price))),
+        "marginSar": margin_sar,
+        "marginPct": margin_pct,
+    }
+
+
+def export_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        # Stored as UTC wall-clock timestamps; written like the API's ISO strings.
+        return value.replace(tzinfo=None).isoformat(timespec="milliseconds") + "Z"
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def read_rows(
+    conn: psycopg.Connection[Any], source: str, params: dict[str, Any], batch_size: int
+) -> Iterator[dict[str, Any]]:
+    """Rows of ``source`` through a named (server-side) cursor, ``batch_size`` per fetch."""
+    global_settings: dict[str, Any] = {}
+    if source == "products":
+        with conn.cursor() as cur:
+            cur.execute(GLOBAL_SETTINGS_SQL)
+            found = cur.fetchone()
+        # Without a row the app would create one with the schema defaults.
+        global_settings = dict(
+            zip(("commissionRate", "shippingCost", "minProfitType", "minProfitValue"), found or (0.15, 0.0, "SAR", 0.0))
+        )
+
+    with conn.cursor(name=f"export_{source}") as cur:
+        cur.itersize = batch_size
+        cur.execute(SQL[source], params)
+        names = [column.name for column in cur.description or []]
+        for record in cur:
+            row = dict(zip(names, record))
+            yield with_margins(row, global_settings) if source == "products" else row
+
+
+def csv_cell(value: Any) -> Any:
+    """Empty for null and lowercase booleans, as the API's CSV writes them."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+def write_rows(out: IO[str], fmt: str, columns: list[str], rows: Iterator[dict[str, Any]]) -> int:
+    count = 0
+    writer = csv.writer(out, lineterminator="\n") if fmt == "csv" else None
+    if writer:
+        writer.writerow(columns)
+    for row in rows:
+        values = [export_value(row.get(column)) for column in columns]
+        if writer:
+            writer.writerow([csv_cell(value) for value in values])
+        else:
+            out.write(json.dumps(dict(zip(columns, values)), ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def parse_time(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Stream an export of products, snapshots, orders or shipments.")
+    parser.add_argument("source", choices=sorted(SQL))
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    parser.add_argument("--from", dest="from_", type=parse_time, help="Start of the range (UTC). Default: 30 days before --to")
+    parser.add_argument("--to", type=parse_time, help="End of the range, exclusive (UTC). Default: now")
+    parser.add_argument("--product-id", help="Only this product's snapshots")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout); a .gz name is gzipped")
+    parser.add_argument("--gzip", action="store_true", help="Gzip the output")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows fetched per round trip")
+    return parser.parse_args()
+
+
+def main() -> int:
+    load_dotenv()
+    args = parse_args()
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        print("Missing required env var: DATABASE_URL", file=sys.stderr)
+        return 1
+
+    to = args.to or datetime.now(timezone.utc).replace(tzinfo=None)
+    params = {
+        "from": args.from_ or to - timedelta(days=DEFAULT_RANGE_DAYS),
+        "to": to,
+        "product_id": args.product_id,
+    }
+    compress = args.gzip or bool(args.output and args.output.endswith(".gz"))
+
+    if args.output:
+        raw: IO[bytes] = open(args.output, "wb")
+    else:
+        raw = sys.stdout.buffer
+    binary: IO[bytes] = gzip.GzipFile(fileobj=raw, mode="wb") if compress else raw
+    out = io.TextIOWrapper(binary, encoding="utf-8", newline="")
+
+    try:
+        with psycopg.connect(database_url) as conn:
+            count = write_rows(out, args.format, COLUMNS[args.source], read_rows(conn, args.source, params, args.batch_size))
+        out.flush()
+    finally:
+        out.detach()
+        if compress:
+            binary.close()
+        if args.output:
+            raw.close()
+
+    print(f"Exported {count} {args.source} rows", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,167 @@
+"""Per-stage timing for the reference sync scripts.
+
+Mirrors ``lib/jobs/job-run.ts``: a run collects stage timings and row counts plus
+HTTP latency per endpoint family (through a ``requests`` response hook), prints them
+as JSON lines on stderr and stores the run in ``job_runs``.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Iterator
+from urllib.parse import urlparse
+
+import psycopg
+import requests
+from psycopg.types.json import Json
+
+from circuit_breaker import CircuitBreakers
+from rate_limiter import RateLimiter, family_for_path
+
+
+INSERT_RUN_SQL = """
+INSERT INTO "job_runs" (
+    "id", "job", "status", "startedAt", "finishedAt", "durationMs",
+    "stagesJson", "countersJson", "summaryJson", "error"
+) VALUES (
+    %(id)s, %(job)s, %(status)s, %(started_at)s, %(finished_at)s, %(duration_ms)s,
+    %(stages)s, %(counters)s, %(summary)s, %(error)s
+)
+"""
+
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    duration_ms: float = 0.0
+    max_ms: float = 0.0
+    rows: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "calls": self.calls,
+            "durationMs": round(self.duration_ms),
+            "maxMs": round(self.max_ms),
+            "rows": self.rows,
+        }
+
+
+@dataclass
+class HttpStats:
+    requests: int = 0
+    total_ms: float = 0.0
+    errors: int = 0
+
+
+class JobRun:
+    def __init__(self, job: str) -> None:
+        self.job = job
+        self.id = uuid.uuid4().hex
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.perf_counter()
+        self.stages: dict[str, StageStats] = defaultdict(StageStats)
+        self.http: dict[str, HttpStats] = defaultdict(HttpStats)
+        self.log = os.getenv("JOB_METRICS_LOG", "true").strip().lower() in ("1", "true", "yes", "on")
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageStats]:
+        stats = self.stages[name]
+        started = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            stats.calls += 1
+            stats.duration_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+
+    def add_rows(self, name: str, rows: int) -> None:
+        self.stages[name].rows += rows
+
+    def instrument(self, session: requests.Session) -> None:
+        """Records every response's latency (``response.elapsed``) per endpoint family."""
+
+        def on_response(response: requests.Response, *args: Any, **kwargs: Any) -> None:
+            stats = self.http[family_for_path(urlparse(response.url).path)]
+            stats.requests += 1
+            stats.total_ms += response.elapsed.total_seconds() * 1000
+            if response.status_code >= 400:
+                stats.errors += 1
+
+        session.hooks["response"].append(on_response)
+
+    def counters(
+        self, limiter: RateLimiter | None = None, breakers: CircuitBreakers | None = None
+    ) -> dict[str, Any]:
+        counters: dict[str, Any] = {
+            "http": {
+                family: {"requests": s.requests, "totalMs": round(s.total_ms), "errors": s.errors}
+                for family, s in self.http.items()
+            },
+        }
+        if limiter is not None:
+            counters["rateLimitWaits"] = {
+                family: {"waits": m.waits, "totalMs": round(m.wait_seconds_total * 1000), "throttled": m.throttled}
+                for family, m in limiter.metrics.items()
+                if m.requests
+            }
+        if breakers is not None:
+            counters["circuits"] = breakers.counters()
+        return counters
+
+    def finish(
+        self,
+        status: str,
+        *,
+        database_url: str | None,
+        limiter: RateLimiter | None = None,
+        breakers: CircuitBreakers | None = None,
+        summary: dict[str, Any] | None = None,
+        error: str | None = None,
+    ) -> None:
+        """Prints the run as JSON lines and stores it in ``job_runs``; never raises."""
+        duration_ms = round((time.perf_counter() - self._started) * 1000)
+        stages = {name: stats.as_dict() for name, stats in self.stages.items()}
+        counters = self.counters(limiter, breakers)
+
+        if self.log:
+            for name, stats in stages.items():
+                print(json.dumps({"event": "job_stage", "job": self.job, "runId": self.id, "stage": name, **stats}), file=sys.stderr)
+            print(
+                json.dumps(
+                    {"event": "job_run", "job": self.job, "runId": self.id, "status": status,
+                     "durationMs": duration_ms, **counters, "error": error}
+                ),
+                file=sys.stderr,
+            )
+
+        if not database_url:
+            return
+
+        try:
+            with psycopg.connect(database_url, autocommit=True) as conn:
+                conn.execute(
+                    INSERT_RUN_SQL,
+                    {
+                        "id": self.id,
+                        "job": self.job,
+                        "status": status,
+                        # job_runs uses TIMESTAMP(3) without time zone, stored as UTC like Prisma does.
+                        "started_at": self.started_at.replace(tzinfo=None),
+                        "finished_at": datetime.now(timezone.utc).replace(tzinfo=None),
+                        "duration_ms": duration_ms,
+                        "stages": Json(stages),
+                        "counters": Json(counters),
+                        "summary": Json(summary) if summary is not None else None,
+                        "error": error,
+                    },
+                )
+        except Exception as exc:
+            print(f"Warning: failed to record {self.job} run: {exc}", file=sys.stderr)
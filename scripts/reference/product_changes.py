@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""The ``product_change_events`` feed behind live dashboard updates.
+
+Same statement as ``lib/dashboard/product-changes.ts``: a write that touches products appends one
+row with their ids, and the table's insert trigger NOTIFYs ``product_changes`` with the row id,
+kind and id count. Run as a script, it LISTENs on that channel and prints each change as a JSON
+line, which is handy for checking that the app and workers announce their writes:
+
+  python scripts/reference/product_changes.py
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+from typing import Any, Iterable
+
+import psycopg
+from dotenv import load_dotenv
+
+
+CHANNEL = "product_changes"
+NOW_UTC = "(now() AT TIME ZONE 'UTC')"
+
+PUBLISH_SQL = f"""
+INSERT INTO "product_change_events" ("kind", "productIds", "createdAt")
+VALUES (%(kind)s, %(product_ids)s::text[], {NOW_UTC})
+"""
+
+READ_SQL = 'SELECT "productIds" FROM "product_change_events" WHERE "id" = %(id)s'
+
+
+def publish_product_changes(conn: psycopg.Connection[Any], kind: str, product_ids: Iterable[str]) -> None:
+    """Appends one change event; the caller commits, so listeners hear of it with the write."""
+    ids = list(dict.fromkeys(product_ids))
+    if not ids:
+        return
+    with conn.cursor() as cur:
+        cur.execute(PUBLISH_SQL, {"kind": kind, "product_ids": ids})
+
+
+def follow(database_url: str) -> None:
+    with psycopg.connect(database_url, autocommit=True) as conn:
+        conn.execute(f"LISTEN {CHANNEL}")
+        for notify in conn.notifies():
+            event = json.loads(notify.payload)
+            row = conn.execute(READ_SQL, {"id": event["id"]}).fetchone()
+            event["productIds"] = row[0] if row else []
+            print(json.dumps(event), flush=True)
+
+
+def main() -> int:
+    load_dotenv()
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        print("Missing required env var: DATABASE_URL", file=sys.stderr)
+        return 1
+
+    try:
+        follow(database_url)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
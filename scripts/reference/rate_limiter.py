@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""Token-bucket limiter for Trendyol API calls, shared with the TypeScript app.
+
+Mirrors ``lib/trendyol/rate-limiter.ts``: one bucket per endpoint family
+(products, buybox, shipments, prices) stored in ``trendyol_rate_limits``, so the
+app, the cron poll and these scripts draw from the same budget. 429 responses
+halve the family rate and pause it for ``Retry-After``; exhausted
+``X-RateLimit-*`` headers pause it until the reset; successes recover the rate.
+Falls back to an in-process bucket when the table is unreachable.
+"""
+from __future__ import annotations
+
+import math
+import os
+import sys
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Mapping
+
+import psycopg
+
+
+FAMILIES = ("products", "buybox", "shipments", "prices")
+
+DEFAULT_RATES = {"products": 5.0, "buybox": 5.0, "shipments": 5.0, "prices": 2.0}
+
+MIN_RATE_SHARE = 0.1
+RECOVERY_FACTOR = 1.05
+DEFAULT_429_PAUSE_SECONDS = 2.0
+MAX_SLEEP_SLICE_SECONDS = 2.0
+
+NOW_UTC = "(now() AT TIME ZONE 'UTC')"
+
+SEED_SQL = f"""
+INSERT INTO "trendyol_rate_limits" ("family", "tokens", "capacity", "ratePerSecond", "refilledAt", "updatedAt")
+VALUES (%(family)s, %(burst)s, %(burst)s, %(rate)s, {NOW_UTC}, {NOW_UTC})
+ON CONFLICT ("family") DO UPDATE
+SET "capacity" = EXCLUDED."capacity",
+    "ratePerSecond" = LEAST("trendyol_rate_limits"."ratePerSecond", EXCLUDED."ratePerSecond")
+"""
+
+TAKE_SQL = f"""
+UPDATE "trendyol_rate_limits" AS b
+SET "tokens" = CASE WHEN NOT s.blocked AND s.available >= 1 THEN s.available - 1 ELSE s.available END,
+    "refilledAt" = s.now,
+    "updatedAt" = s.now
+FROM (
+  SELECT "family",
+         {NOW_UTC} AS now,
+         LEAST("capacity", "tokens" + GREATEST(0, EXTRACT(EPOCH FROM ({NOW_UTC} - "refilledAt"))) * "ratePerSecond")::float8 AS available,
+         ("blockedUntil" IS NOT NULL AND "blockedUntil" > {NOW_UTC}) AS blocked,
+         "blockedUntil",
+         "ratePerSecond"
+  FROM "trendyol_rate_limits"
+  WHERE "family" = %(family)s
+  FOR UPDATE
+) AS s
+WHERE b."family" = s."family"
+RETURNING
+  (NOT s.blocked AND s.available >= 1) AS granted,
+  (CASE
+     WHEN s.blocked THEN CEIL(EXTRACT(EPOCH FROM (s."blockedUntil" - s.now)) * 1000)
+     WHEN s.available >= 1 THEN 0
+     ELSE CEIL((1 - s.available) / s."ratePerSecond" * 1000)
+   END)::int AS wait_ms,
+  s."ratePerSecond"::float8 AS rate
+"""
+
+THROTTLE_SQL = f"""
+UPDATE "trendyol_rate_limits"
+SET "ratePerSecond" = CASE WHEN %(slow_down)s THEN GREATEST(%(min_rate)s, "ratePerSecond" / 2) ELSE "ratePerSecond" END,
+    "tokens" = CASE WHEN %(slow_down)s THEN 0 ELSE "tokens" END,
+    "blockedUntil" = GREATEST(COALESCE("blockedUntil", {NOW_UTC}), {NOW_UTC} + %(block_ms)s * INTERVAL '1 millisecond'),
+    "throttledCount" = "throttledCount" + CASE WHEN %(slow_down)s THEN 1 ELSE 0 END,
+    "updatedAt" = {NOW_UTC}
+WHERE "family" = %(family)s
+"""
+
+RECOVER_SQL = f"""
+UPDATE "trendyol_rate_limits"
+SET "ratePerSecond" = LEAST(%(rate)s, "ratePerSecond" * {RECOVERY_FACTOR}),
+    "updatedAt" = {NOW_UTC}
+WHERE "family" = %(family)s AND "ratePerSecond" < %(rate)s
+"""
+
+
+@dataclass(frozen=True)
+class Budget:
+    rate_per_second: float
+    burst: float
+
+    @property
+    def min_rate(self) -> float:
+        return max(0.2, self.rate_per_second * MIN_RATE_SHARE)
+
+
+@dataclass
+class FamilyMetrics:
+    requests: int = 0
+    waits: int = 0
+    wait_seconds_total: float = 0.0
+    max_wait_seconds: float = 0.0
+    throttled: int = 0
+    header_pauses: int = 0
+    rate_per_second: float = 0.0
+
+
+@dataclass
+class _MemoryBucket:
+    tokens: float
+    rate_per_second: float
+    refilled_at: float
+    blocked_until: float = 0.0
+
+
+def family_for_path(path: str) -> str:
+    if "/buybox-information" in path:
+        return "buybox"
+    if "/price-and-inventory" in path:
+        return "prices"
+    if "/integration/order/" in path or "/integration/claim/" in path:
+        return "shipments"
+    return "products"
+
+
+def budgets_from_env() -> dict[str, Budget]:
+    burst = float(os.getenv("TRENDYOL_RATE_LIMIT_BURST", "5"))
+    return {
+        family: Budget(
+            rate_per_second=float(
+                os.getenv(f"TRENDYOL_RATE_LIMIT_{family.upper()}_PER_SECOND", str(DEFAULT_RATES[family]))
+            ),
+            burst=burst,
+        )
+        for family in FAMILIES
+    }
+
+
+def parse_rate_limit_headers(
+    headers: Mapping[str, str], now: float | None = None
+) -> tuple[float | None, float | None, float | None]:
+    """Returns ``(retry_after_seconds, remaining, reset_seconds)``."""
+    now = time.time() if now is None else now
+    lowered = {key.lower(): value for key, value in headers.items()}
+
+    retry_after: float | None = None
+    raw_retry = lowered.get("retry-after")
+    if raw_retry:
+        try:
+            retry_after = max(0.0, float(raw_retry))
+        except ValueError:
+            try:
+                retry_after = max(0.0, parsedate_to_datetime(raw_retry).timestamp() - now)
+            except (TypeError, ValueError):
+                retry_after = None
+
+    def number(*names: str) -> float | None:
+        for name in names:
+            value = lowered.get(name)
+            if value is None or not value.strip():
+                continue
+            try:
+                return float(value)
+            except ValueError:
+                continue
+        return None
+
+    remaining = number("x-ratelimit-remaining", "ratelimit-remaining")
+    reset = number("x-ratelimit-reset", "ratelimit-reset")
+    if reset is not None:
+        reset = max(0.0, reset - now) if reset > 1_000_000_000 else max(0.0, reset)
+
+    return retry_after, remaining, reset
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        conn: psycopg.Connection[Any] | None,
+        budgets: dict[str, Budget] | None = None,
+    ) -> None:
+        self.conn = conn
+        self.budgets = budgets or budgets_from_env()
+        self.metrics: dict[str, FamilyMetrics] = {
+            family: FamilyMetrics(rate_per_second=budget.rate_per_second)
+            for family, budget in self.budgets.items()
+        }
+        self._seeded: set[str] = set()
+        self._memory: dict[str, _MemoryBucket] = {}
+
+    @classmethod
+    def connect(cls, database_url: str | None) -> "RateLimiter":
+        backend = os.getenv("TRENDYOL_RATE_LIMIT_BACKEND", "postgres").strip().lower()
+        if backend != "postgres" or not database_url:
+            return cls(None)
+        try:
+            return cls(psycopg.connect(database_url, autocommit=True))
+        except Exception as exc:
+            print(f"Warning: shared rate limiter unavailable ({exc}); using in-process buckets", file=sys.stderr)
+            return cls(None)
+
+    @property
+    def backend(self) -> str:
+        return "postgres" if self.conn is not None else "memory"
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+
+    def _fallback(self, exc: Exception) -> None:
+        print(f"Warning: shared rate limiter failed ({exc}); using in-process buckets", file=sys.stderr)
+        self.close()
+        self.conn = None
+
+    def _memory_bucket(self, family: str) -> _MemoryBucket:
+        budget = self.budgets[family]
+        now = time.monotonic()
+        bucket = self._memory.get(family)
+        if bucket is None:
+            bucket = _MemoryBucket(tokens=budget.burst, rate_per_second=budget.rate_per_second, refilled_at=now)
+            self._memory[family] = bucket
+        bucket.tokens = min(budget.burst, bucket.tokens + max(0.0, now - bucket.refilled_at) * bucket.rate_per_second)
+        bucket.refilled_at = now
+        return bucket
+
+    def _take(self, family: str) -> tuple[bool, float, float]:
+        budget = self.budgets[family]
+        if self.conn is not None:
+            try:
+                if family not in self._seeded:
+                    self.conn.execute(
+                        SEED_SQL, {"family": family, "burst": budget.burst, "rate": budget.rate_per_second}
+                    )
+                    self._seeded.add(family)
+                row = self.conn.execute(TAKE_SQL, {"family": family}).fetchone()
+                if row is None:
+                    self._seeded.discard(family)
+                    return False, 0.05, budget.rate_per_second
+                return bool(row[0]), float(row[1]) / 1000, float(row[2])
+            except Exception as exc:
+                self._fallback(exc)
+
+        bucket = self._memory_bucket(family)
+        now = time.monotonic()
+        if bucket.blocked_until > now:
+            return False, bucket.blocked_until - now, bucket.rate_per_second
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return True, 0.0, bucket.rate_per_second
+        return False, math.ceil((1 - bucket.tokens) / bucket.rate_per_second * 1000) / 1000, bucket.rate_per_second
+
+    def _throttle(self, family: str, block_seconds: float, slow_down: bool) -> None:
+        budget = self.budgets[family]
+        if self.conn is not None:
+            try:
+                self.conn.execute(
+                    THROTTLE_SQL,
+                    {
+                        "family": family,
+                        "slow_down": slow_down,
+                        "min_rate": budget.min_rate,
+                        "block_ms": round(block_seconds * 1000),
+                    },
+                )
+                return
+            except Exception as exc:
+                self._fallback(exc)
+
+        bucket = self._memory_bucket(family)
+        if slow_down:
+            bucket.rate_per_second = max(budget.min_rate, bucket.rate_per_second / 2)
+            bucket.tokens = 0
+        bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + block_seconds)
+
+    def _recover(self, family: str) -> None:
+        budget = self.budgets[family]
+        if self.conn is not None:
+            try:
+                self.conn.execute(RECOVER_SQL, {"family": family, "rate": budget.rate_per_second})
+                return
+            except Exception as exc:
+                self._fallback(exc)
+
+        bucket = self._memory_bucket(family)
+        bucket.rate_per_second = min(budget.rate_per_second, bucket.rate_per_second * RECOVERY_FACTOR)
+
+    def acquire(self, family: str) -> float:
+        """Blocks until a request for ``family`` may be sent; returns seconds waited."""
+        metrics = self.metrics[family]
+        started = time.monotonic()
+        slept = False
+
+        while True:
+            granted, wait_seconds, rate = self._take(family)
+            metrics.rate_per_second = rate
+            if granted:
+                break
+            slept = True
+            time.sleep(min(MAX_SLEEP_SLICE_SECONDS, max(0.005, wait_seconds)))
+
+        waited = time.monotonic() - started if slept else 0.0
+        metrics.requests += 1
+        if slept:
+            metrics.waits += 1
+            metrics.wait_seconds_total += waited
+            metrics.max_wait_seconds = max(metrics.max_wait_seconds, waited)
+        return waited
+
+    def observe(self, family: str, status_code: int, headers: Mapping[str, str]) -> None:
+        metrics = self.metrics[family]
+        retry_after, remaining, reset = parse_rate_limit_headers(headers)
+
+        if status_code == 429:
+            metrics.throttled += 1
+            block = retry_after if retry_after is not None else reset
+            self._throttle(family, DEFAULT_429_PAUSE_SECONDS if block is None else block, slow_down=True)
+            return
+
+        if remaining is not None and remaining <= 0 and reset:
+            metrics.header_pauses += 1
+            self._throttle(family, reset, slow_down=False)
+            return
+
+        if status_code < 400 and metrics.rate_per_second < self.budgets[family].rate_per_second:
+            self._recover(family)
+
+    def summary(self) -> str:
+        parts = [
+            f"{family}: requests={m.requests} waits={m.waits} waited={m.wait_seconds_total:.1f}s "
+            f"throttled={m.throttled} rate={m.rate_per_second:.2f}/s"
+            for family, m in self.metrics.items()
+            if m.requests
+        ]
+        return f"Rate limiter ({self.backend}): " + ("; ".join(parts) if parts else "no requests")
@@ -0,0 +1,100 @@
+"""Return requests derived from ``shipment_packages`` rows the Python shipment sync just stored.
+
+Same statement as ``lib/services/return-service.ts``: every ``Returned`` package gets a return
+request keyed by its shipment package id, and only requests that were created or whose status,
+order number or date changed have their items rewritten from the package lines.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+import psycopg
+
+
+NOW_UTC = "(now() AT TIME ZONE 'UTC')"
+
+DERIVE_RETURNS_SQL = f"""
+WITH source AS (
+  SELECT DISTINCT ON ("claimId")
+         COALESCE(sp."rawPayload"->>'shipmentPackageId', sp."rawPayload"->>'id', sp."packageNumber") AS "claimId",
+         sp."orderNumber",
+         COALESCE(sp."lastModifiedAt", sp."createdAt", {NOW_UTC}) AS "dateTime",
+         sp."status",
+         sp."rawPayload"->>'customerFirstName' AS "customerFirstName",
+         sp."rawPayload"->>'customerLastName' AS "customerLastName",
+         COALESCE(sp."rawPayload"->'lines', '[]'::jsonb) AS "lines"
+  FROM "shipment_packages" sp
+  WHERE sp."sellerId" = %(seller_id)s::bigint
+    AND sp."status" = 'Returned'
+    AND (%(package_numbers)s::text[] IS NULL OR sp."packageNumber" = ANY(%(package_numbers)s::text[]))
+    AND (%(since)s::timestamp IS NULL OR sp."lastModifiedAt" >= %(since)s::timestamp)
+  ORDER BY "claimId", sp."lastModifiedAt" DESC NULLS LAST
+),
+upserted AS (
+  INSERT INTO "return_requests" (
+    "id", "claimId", "orderNumber", "dateTime", "reason", "status", "returnStatus",
+    "customerFirstName", "customerLastName", "createdAt", "updatedAt"
+  )
+  SELECT gen_random_uuid()::text, s."claimId", s."orderNumber", s."dateTime", 'Return (Order Status)', s."status",
+         'Completed', s."customerFirstName", s."customerLastName", {NOW_UTC}, {NOW_UTC}
+  FROM source s
+  ON CONFLICT ("claimId") DO UPDATE
+  SET "orderNumber" = EXCLUDED."orderNumber",
+      "dateTime" = EXCLUDED."dateTime",
+      "status" = EXCLUDED."status",
+      "updatedAt" = EXCLUDED."updatedAt"
+  WHERE "return_requests"."status" IS DISTINCT FROM EXCLUDED."status"
+     OR "return_requests"."orderNumber" IS DISTINCT FROM EXCLUDED."orderNumber"
+     OR "return_requests"."dateTime" IS DISTINCT FROM EXCLUDED."dateTime"
+  RETURNING "id", "claimId"
+),
+cleared AS (
+  DELETE FROM "return_items" ri
+  WHERE ri."returnRequestId" IN (SELECT "id" FROM upserted)
+  RETURNING 1
+),
+items AS (
+  INSERT INTO "return_items" ("id", "returnRequestId", "sku", "quantity", "reason")
+  SELECT gen_random_uuid()::text, u."id",
+         COALESCE(NULLIF(line->>'sku', ''), NULLIF(line->>'merchantSku', ''), 'UNKNOWN'),
+         COALESCE(NULLIF(line->>'quantity', '')::int, 1),
+         'Returned'
+  FROM upserted u
+  JOIN source s ON s."claimId" = u."claimId"
+  CROSS JOIN LATERAL jsonb_array_elements(s."lines") AS line
+  RETURNING 1
+)
+SELECT (SELECT COUNT(*) FROM upserted)::int AS "requests",
+       (SELECT COUNT(*) FROM items)::int AS "items",
+       (SELECT COUNT(*) FROM cleared)::int AS "itemsReplaced"
+"""
+
+
+def returned_package_numbers(items: list[dict[str, Any]]) -> list[str]:
+    """Package numbers of the ``Returned`` packages in one page of ``/shipment-packages`` content."""
+    numbers = []
+    for item in items:
+        number = item.get("packageNumber") or item.get("shipmentPackageId") or item.get("id")
+        if item.get("shipmentPackageStatus") == "Returned" and number is not None:
+            numbers.append(str(number))
+    return numbers
+
+
+def derive_returns(
+    conn: psycopg.Connection[Any],
+    seller_id: int,
+    package_numbers: list[str] | None = None,
+    since: datetime | None = None,
+) -> int:
+    """Creates or updates the return requests of stored ``Returned`` packages; returns how many changed."""
+    if package_numbers is not None and not package_numbers:
+        return 0
+
+    with conn.cursor() as cur:
+        cur.execute(
+            DERIVE_RETURNS_SQL,
+            {"seller_id": seller_id, "package_numbers": package_numbers, "since": since},
+        )
+        row = cur.fetchone()
+    return int(row[0]) if row else 0
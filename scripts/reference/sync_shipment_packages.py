@@ -5,7 +5,6 @@ import argparse
 import base64
 import os
 import sys
-import time
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Any
@@ -15,6 +14,11 @@ import requests
 from dotenv import load_dotenv
 from psycopg.types.json import Json
 
+from circuit_breaker import CircuitBreakers
+from job_metrics import JobRun
+from rate_limiter import RateLimiter
+from returns_from_packages import derive_returns, returned_package_numbers
+
 def ms_to_datetime(ms: int | None) -> datetime | None:
     if ms is None:
         return None
@@ -216,6 +220,8 @@ def load_settings() -> Settings:
 def fetch_shipment_packages_page(
     session: requests.Session,
     settings: Settings,
+    limiter: RateLimiter,
+    breakers: CircuitBreakers,
     page: int,
     page_size: int,
     start_date_ms: int,
@@ -242,10 +248,19 @@ def fetch_shipment_packages_page(
         params["shipmentPackageStatus"] = shipment_package_status
 
     for attempt in range(3):
-        response = session.get(url, params=params, timeout=settings.timeout_seconds)
-
+        # Raises CircuitOpenError while the endpoint is failing instead of spending the retries.
+        probe = breakers.admit("shipments")
+        limiter.acquire("shipments")
+        try:
+            response = session.get(url, params=params, timeout=settings.timeout_seconds)
+        except requests.RequestException:
+            breakers.record("shipments", probe, None)
+            raise
+        limiter.observe("shipments", response.status_code, response.headers)
+        breakers.record("shipments", probe, response.status_code)
+
+        # The limiter pauses the family for Retry-After before the next acquire.
         if response.status_code == 429 and attempt < 2:
-            time.sleep((attempt + 1) * 1.5)
             continue
 
         if response.status_code in (401, 403):
@@ -337,7 +352,11 @@ def main() -> int:
         print(f"Configuration error: {exc}", file=sys.stderr)
         return 1
 
+    limiter = RateLimiter.connect(settings.database_url)
+    breakers = CircuitBreakers.connect(settings.database_url)
+    run = JobRun("python_shipment_sync")
     session = requests.Session()
+    run.instrument(session)
     session.headers.update(
         {
             "Authorization": f"Basic {settings.api_token}",
@@ -350,7 +369,9 @@ def main() -> int:
 
     fetched = 0
     upserted = 0
+    returns_derived = 0
     page = 0
+    run_error: str | None = None
     db_conn: psycopg.Connection[Any] | None = None
 
     if not args.dry_run:
@@ -364,31 +385,46 @@ def main() -> int:
 
     try:
         while page < args.max_pages:
-            data = fetch_shipment_packages_page(
-                session=session,
-                settings=settings,
-                page=page,
-                page_size=args.page_size,
-                start_date_ms=start_date_ms,
-                end_date_ms=end_date_ms,
-                shipment_package_status=args.shipment_package_status,
-                order_by_field=args.order_by_field,
-                order_by_direction=args.order_by_direction,
-            )
+            with run.stage("shipment_pages"):
+                data = fetch_shipment_packages_page(
+                    session=session,
+                    settings=settings,
+                    limiter=limiter,
+                    breakers=breakers,
+                    page=page,
+                    page_size=args.page_size,
+                    start_date_ms=start_date_ms,
+                    end_date_ms=end_date_ms,
+                    shipment_package_status=args.shipment_package_status,
+                    order_by_field=args.order_by_field,
+                    order_by_direction=args.order_by_direction,
+                )
 
             content = data.get("content") or []
             if not isinstance(content, list):
                 raise RuntimeError("Unexpected payload: 'content' field is not a list")
 
             fetched += len(content)
+            run.add_rows("shipment_pages", len(content))
             total_pages = data.get("totalPages")
 
             if not content:
                 break
 
             if not args.dry_run and db_conn is not None:
-                upserted += upsert_packages(db_conn, settings.seller_id, content)
-                db_conn.commit()
+                with run.stage("shipment_upsert"):
+                    page_upserted = upsert_packages(db_conn, settings.seller_id, content)
+                    db_conn.commit()
+                upserted += page_upserted
+                run.add_rows("shipment_upsert", page_upserted)
+
+                with run.stage("returns_derive"):
+                    page_returns = derive_returns(
+                        db_conn, settings.seller_id, returned_package_numbers(content)
+                    )
+                    db_conn.commit()
+                returns_derived += page_returns
+                run.add_rows("returns_derive", page_returns)
 
             print(
                 f"Page {page} fetched: {len(content)} packages"
@@ -408,11 +444,29 @@ def main() -> int:
         if db_conn is not None:
             db_conn.rollback()
         print(f"Sync failed: {exc}", file=sys.stderr)
+        run_error = str(exc)
         return 1
     finally:
         if db_conn is not None:
             db_conn.close()
         session.close()
+        limiter.close()
+        breakers.close()
+        print(limiter.summary(), file=sys.stderr)
+        print(breakers.summary(), file=sys.stderr)
+        run.finish(
+            "error" if run_error else "ok",
+            database_url=None if args.dry_run else settings.database_url,
+            limiter=limiter,
+            breakers=breakers,
+            summary={
+                "fetched": fetched,
+                "upserted": upserted,
+                "returnsDerived": returns_derived,
+                "pages": page + 1,
+            },
+            error=run_error,
+        )
 
     if args.dry_run:
         print(
@@ -423,6 +477,7 @@ def main() -> int:
         print(
             "Sync complete. "
             f"Total fetched: {fetched}, total upserted: {upserted}, "
+            f"returns derived: {returns_derived}, "
             f"startDate={start_date_ms}, endDate={end_date_ms}"
         )
 
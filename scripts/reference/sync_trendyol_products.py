@@ -5,7 +5,6 @@ import argparse
 import base64
 import os
 import sys
-import time
 from dataclasses import dataclass
 from decimal import Decimal, InvalidOperation
 from typing import Any
@@ -15,6 +14,12 @@ import requests
 from dotenv import load_dotenv
 from psycopg.types.json import Json
 
+from buybox_quarantine import BuyboxQuarantine
+from competitor_logs import record_competitor_observations
+from circuit_breaker import CircuitBreakers, CircuitOpenError
+from job_metrics import JobRun
+from rate_limiter import RateLimiter
+
 
 UPSERT_SQL = """
 INSERT INTO trendyol_products (
@@ -83,9 +88,11 @@ DO UPDATE SET
     blacklisted = EXCLUDED.blacklisted,
     rejected = EXCLUDED.rejected,
     blacklisted = EXCLUDED.blacklisted,
-    buybox_price = EXCLUDED.buybox_price,
-    buybox_competitor_count = EXCLUDED.buybox_competitor_count,
-    buybox_status = EXCLUDED.buybox_status,
+    -- Keep the stored buybox when it could not be fetched this run (circuit open or request failed).
+    buybox_price = CASE WHEN %(buybox_unavailable)s THEN trendyol_products.buybox_price ELSE EXCLUDED.buybox_price END,
+    buybox_competitor_count = CASE WHEN %(buybox_unavailable)s
+        THEN trendyol_products.buybox_competitor_count ELSE EXCLUDED.buybox_competitor_count END,
+    buybox_status = CASE WHEN %(buybox_unavailable)s THEN trendyol_products.buybox_status ELSE EXCLUDED.buybox_status END,
     last_update_epoch_ms = EXCLUDED.last_update_epoch_ms,
     raw = EXCLUDED.raw,
     synced_at = NOW();
@@ -222,6 +229,8 @@ def load_settings() -> Settings:
 def fetch_products_page(
     session: requests.Session,
     settings: Settings,
+    limiter: RateLimiter,
+    breakers: CircuitBreakers,
     page: int,
     page_size: int,
     include_unapproved: bool,
@@ -241,10 +250,19 @@ def fetch_products_page(
         params["approved"] = "true"
 
     for attempt in range(3):
-        response = session.get(url, params=params, timeout=settings.timeout_seconds)
-
+        # Raises CircuitOpenError while the endpoint is failing instead of spending the retries.
+        probe = breakers.admit("products")
+        limiter.acquire("products")
+        try:
+            response = session.get(url, params=params, timeout=settings.timeout_seconds)
+        except requests.RequestException:
+            breakers.record("products", probe, None)
+            raise
+        limiter.observe("products", response.status_code, response.headers)
+        breakers.record("products", probe, response.status_code)
+
+        # The limiter pauses the family for Retry-After before the next acquire.
         if response.status_code == 429 and attempt < 2:
-            time.sleep((attempt + 1) * 1.5)
             continue
 
         if response.status_code in (401, 403):
@@ -267,71 +285,139 @@ def fetch_products_page(
     raise RuntimeError("Failed to fetch Trendyol products due to repeated rate limiting")
 
 
+class BuyboxBadRequest(Exception):
+    """buybox-information rejected a batch (400), usually because of one bad barcode."""
+
+
+def post_buybox_chunk(
+    session: requests.Session,
+    settings: Settings,
+    limiter: RateLimiter,
+    breakers: CircuitBreakers,
+    url: str,
+    chunk: list[str],
+    bisecting: bool = False,
+) -> list[dict[str, Any]]:
+    payload = {
+        "barcodes": chunk,
+        "supplierId": settings.seller_id,
+    }
+    headers = session.headers.copy()
+    headers["storeFrontCode"] = "SA"
+
+    for attempt in range(3):
+        probe = breakers.admit("buybox")
+        limiter.acquire("buybox")
+        try:
+            response = session.post(url, json=payload, headers=headers, timeout=settings.timeout_seconds)
+        except requests.RequestException:
+            breakers.record("buybox", probe, None)
+            raise
+        limiter.observe("buybox", response.status_code, response.headers)
+        breakers.record("buybox", probe, response.status_code, bisecting=bisecting)
+
+        if response.status_code == 429 and attempt < 2:
+            continue
+
+        if response.status_code == 400:
+            raise BuyboxBadRequest(f"{response.status_code} {response.text[:100]}")
+
+        if response.status_code >= 400:
+            raise RuntimeError(f"{response.status_code} {response.text[:100]}")
+
+        data = response.json()
+        if isinstance(data, dict):
+            return data.get("buyboxInfo", [])
+        if isinstance(data, list):
+            return data
+        return []
+
+    raise RuntimeError("repeated rate limiting")
+
+
 def fetch_buybox_info(
     session: requests.Session,
     settings: Settings,
+    limiter: RateLimiter,
+    breakers: CircuitBreakers,
+    quarantine: BuyboxQuarantine,
     barcodes: list[str],
-) -> dict[str, Any]:
+) -> tuple[dict[str, Any], set[str]]:
+    """Buybox entries by barcode, and the barcodes that could not be looked up."""
     if not barcodes:
-        return {}
+        return {}, set()
 
     url = (
         f"{settings.base_url}/integration/product/sellers/"
         f"{settings.seller_id}/products/buybox-information"
     )
 
-    # Dedup and filter empty or whitespace-only barcodes
-    unique_barcodes = list(set(str(b).strip() for b in barcodes if b and str(b).strip()))
+    # Dedup, filter empty or whitespace-only barcodes, and leave quarantined ones out so
+    # every chunk is filled with barcodes the API accepts.
+    unique_barcodes = sorted(
+        {str(b).strip() for b in barcodes if b and str(b).strip()} - quarantine.barcodes
+    )
     if not unique_barcodes:
         print("DEBUG: No valid barcodes to fetch buybox for.", file=sys.stderr)
-        return {}
+        return {}, set()
 
-    # Chunk requests to avoid single bad barcode failing entire batch
-    # Reduced chunk size to 10 as larger batches (20-100) were causing 400 Bad Request
+    # The API rejects batches larger than 10 barcodes.
     chunk_size = 10
-    all_results = {}
-    
+    all_results: dict[str, Any] = {}
+    unavailable: set[str] = set()
+
+    def request(chunk: list[str], bisecting: bool = False) -> tuple[list[dict[str, Any]], Exception | None]:
+        try:
+            return post_buybox_chunk(session, settings, limiter, breakers, url, chunk, bisecting), None
+        except Exception as exc:
+            return [], exc
+
+    def keep(entries: list[dict[str, Any]]) -> None:
+        for entry in entries:
+            bc = entry.get("barcode")
+            if bc:
+                all_results[bc] = entry
+
+    def give_up(chunk: list[str], exc: Exception) -> None:
+        if not isinstance(exc, CircuitOpenError):
+            print(f"Warning: Failed to fetch buybox chunk ({len(chunk)} barcodes): {exc}", file=sys.stderr)
+        unavailable.update(chunk)
+
+    def bisect(chunk: list[str]) -> None:
+        # A half only holds the bad barcode when its sibling is accepted; if both halves are
+        # rejected the 400 is not about one barcode, so it is reported instead of quarantined.
+        middle = (len(chunk) + 1) // 2
+        halves = [chunk[:middle], chunk[middle:]]
+        results = [request(half, bisecting=True) for half in halves]
+        if all(isinstance(exc, BuyboxBadRequest) for _, exc in results):
+            give_up(chunk, results[0][1])
+            return
+
+        for half, (entries, exc) in zip(halves, results):
+            if exc is None:
+                keep(entries)
+            elif not isinstance(exc, BuyboxBadRequest):
+                give_up(half, exc)
+            elif len(half) == 1:
+                print(f"Warning: quarantining barcode {half[0]}: {exc}", file=sys.stderr)
+                quarantine.add(half[0], str(exc))
+            else:
+                bisect(half)
+
+    def fetch_chunk(chunk: list[str]) -> None:
+        entries, exc = request(chunk)
+        if exc is None:
+            keep(entries)
+        elif isinstance(exc, BuyboxBadRequest) and len(chunk) > 1:
+            # One bad barcode fails the whole chunk: bisect until it is isolated, then quarantine it.
+            bisect(chunk)
+        else:
+            give_up(chunk, exc)
+
     for i in range(0, len(unique_barcodes), chunk_size):
-        chunk = unique_barcodes[i:i + chunk_size]
-        payload = {
-            "barcodes": chunk,
-            "supplierId": settings.seller_id,
-        }
-        
-        # Retry loop for each chunk
-        for attempt in range(3):
-            try:
-                headers = session.headers.copy()
-                headers["storeFrontCode"] = "SA"
-                
-                response = session.post(url, json=payload, headers=headers, timeout=settings.timeout_seconds)
-                
-                if response.status_code == 429 and attempt < 2:
-                    time.sleep((attempt + 1) * 1.5)
-                    continue
-                    
-                if response.status_code >= 400:
-                    print(f"Warning: Failed to fetch buybox chunk {i}: {response.status_code} {response.text[:100]}", file=sys.stderr)
-                    break # Skip this chunk on error (don't retry 400s as likely data issue)
-
-                data = response.json()
-                entries = []
-                if isinstance(data, dict):
-                    entries = data.get("buyboxInfo", [])
-                elif isinstance(data, list):
-                    entries = data
-                
-                for entry in entries:
-                    bc = entry.get("barcode")
-                    if bc:
-                        all_results[bc] = entry
-                break # Success, move to next chunk
-
-            except Exception as e:
-                print(f"Warning: Exception fetching buybox chunk: {e}", file=sys.stderr)
-                break
-                
-    return all_results
+        fetch_chunk(unique_barcodes[i:i + chunk_size])
+
+    return all_results, unavailable
 
 
 def ensure_schema(conn: psycopg.Connection[Any]) -> None:
@@ -382,6 +468,7 @@ def upsert_products(
                 "buybox_price": to_decimal(item.get("buybox_price")),
                 "buybox_competitor_count": item.get("buybox_competitor_count"),
                 "buybox_status": item.get("buybox_status"),
+                "buybox_unavailable": bool(item.get("buybox_unavailable")),
                 "last_update_epoch_ms": item.get("lastUpdateDate"),
                 "raw": Json(item),
             }
@@ -405,7 +492,12 @@ def main() -> int:
         print(f"Configuration error: {exc}", file=sys.stderr)
         return 1
 
+    limiter = RateLimiter.connect(settings.database_url)
+    breakers = CircuitBreakers.connect(settings.database_url)
+    quarantine = BuyboxQuarantine.connect(None if args.dry_run else settings.database_url, "SA")
+    run = JobRun("python_product_sync")
     session = requests.Session()
+    run.instrument(session)
     session.headers.update(
         {
             "Authorization": f"Basic {settings.api_token}",
@@ -419,6 +511,7 @@ def main() -> int:
     page = 0
     fetched = 0
     upserted = 0
+    run_error: str | None = None
 
     db_conn: psycopg.Connection[Any] | None = None
 
@@ -433,23 +526,31 @@ def main() -> int:
 
     try:
         while page < args.max_pages:
-            data = fetch_products_page(
-                session=session,
-                settings=settings,
-                page=page,
-                page_size=args.page_size,
-                include_unapproved=args.include_unapproved,
-            )
+            with run.stage("product_pages"):
+                data = fetch_products_page(
+                    session=session,
+                    settings=settings,
+                    limiter=limiter,
+                    breakers=breakers,
+                    page=page,
+                    page_size=args.page_size,
+                    include_unapproved=args.include_unapproved,
+                )
 
             content = data.get("content") or []
             if not isinstance(content, list):
                 raise RuntimeError("Unexpected payload: 'content' field is not a list")
 
             fetched += len(content)
+            run.add_rows("product_pages", len(content))
             
             # --- Fetch & Merge BuyBox Info ---
             barcodes = [str(item.get("barcode")) for item in content if item.get("barcode")]
-            buybox_map = fetch_buybox_info(session, settings, barcodes)
+            with run.stage("buybox"):
+                buybox_map, buybox_unavailable = fetch_buybox_info(
+                    session, settings, limiter, breakers, quarantine, barcodes
+                )
+            run.add_rows("buybox", len(buybox_map))
             
             for item in content:
                 bc = str(item.get("barcode")) if item.get("barcode") else None
@@ -480,6 +581,14 @@ def main() -> int:
                     else:
                         item["buybox_status"] = "LOSE"
                         
+                elif bc and bc in buybox_unavailable:
+                    # No answer this run; the upsert keeps the buybox stored by an earlier run.
+                    item["buybox_unavailable"] = True
+
+                elif bc and bc in quarantine:
+                    # The API rejects this barcode, so there is no competitor data to infer from.
+                    item["buybox_status"] = "UNKNOWN"
+
                 else:
                     # No data for this barcode => Solo Winner Logic
                     # If we have a valid price, we assume WIN.
@@ -498,8 +607,21 @@ def main() -> int:
                 break
 
             if not args.dry_run and db_conn is not None:
-                upserted += upsert_products(db_conn, settings.seller_id, content)
-                db_conn.commit()
+                with run.stage("product_upsert"):
+                    page_upserted = upsert_products(db_conn, settings.seller_id, content)
+                    db_conn.commit()
+                upserted += page_upserted
+                run.add_rows("product_upsert", page_upserted)
+
+                try:
+                    with run.stage("competitor_logs"):
+                        logged = record_competitor_observations(db_conn, buybox_map)
+                        db_conn.commit()
+                    run.add_rows("competitor_logs", logged)
+                except Exception as exc:
+                    # Competitor history is best-effort; it must not fail the product sync.
+                    db_conn.rollback()
+                    print(f"Warning: failed to record competitor logs: {exc}", file=sys.stderr)
 
             print(
                 f"Page {page} fetched: {len(content)} items"
@@ -519,11 +641,27 @@ def main() -> int:
         if db_conn is not None:
             db_conn.rollback()
         print(f"Sync failed: {exc}", file=sys.stderr)
+        run_error = str(exc)
         return 1
     finally:
         if db_conn is not None:
             db_conn.close()
         session.close()
+        limiter.close()
+        breakers.close()
+        quarantine.close()
+        print(limiter.summary(), file=sys.stderr)
+        print(breakers.summary(), file=sys.stderr)
+        if quarantine.added:
+            print(f"Quarantined {len(quarantine.added)} buybox barcode(s): {', '.join(quarantine.added)}", file=sys.stderr)
+        run.finish(
+            "error" if run_error else "ok",
+            database_url=None if args.dry_run else settings.database_url,
+            limiter=limiter,
+            breakers=breakers,
+            summary={"fetched": fetched, "upserted": upserted, "pages": page + 1},
+            error=run_error,
+        )
 
     if args.dry_run:
         print(f"Dry-run complete. Total fetched: {fetched}")
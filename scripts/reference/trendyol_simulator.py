@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Trendyol seller API, for throughput and fault testing.
+
+Serves the endpoints used by ``TrendyolClient`` and the reference sync scripts
+over a deterministic synthetic catalog:
+
+  GET  /integration/product/sellers/{id}/products[/approved]
+  POST /integration/product/sellers/{id}/products/buybox-information
+  GET  /integration/order/sellers/{id}/shipment-packages   (also /orders)
+  GET  /integration/claim/sellers/{id}/claims
+  POST /integration/inventory/sellers/{id}/products/price-and-inventory
+
+Faults are injected per request: latency/jitter, 429s once the simulated
+per-second budget is exceeded (with ``Retry-After`` and ``X-RateLimit-*``
+headers), random 5xx responses, and a 400 for any buybox chunk that contains
+a "bad" barcode. ``GET /_simulator/stats`` returns request counters and
+``POST /_simulator/reset`` clears them.
+
+Point clients at it with ``TRENDYOL_BASE_URL=http://127.0.0.1:8787``. Only the
+standard library is used, so it runs without the requirements file.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+
+BRANDS = ["Philips", "Braun", "Xiaomi", "Anker", "Samsung", "Apple", "Oral-B", "Remington", "Baseus", "Ugreen"]
+KINDS = ["Shaver", "Trimmer", "Charger", "Cable", "Power Bank", "Earbuds", "Toothbrush", "Hair Dryer", "Adapter", "Speaker"]
+CATEGORIES = ["Personal Care", "Electronics", "Accessories", "Audio", "Small Appliances"]
+STATUSES = ["Created", "Picking", "Invoiced", "Shipped", "Delivered", "Delivered", "Delivered", "Cancelled", "Returned"]
+CARGO = ["Aramex", "SMSA", "J&T Express", "SPL"]
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+PRODUCTS_RE = re.compile(r"^/integration/product/sellers/(\d+)/products(/approved)?$")
+BUYBOX_RE = re.compile(r"^/integration/product/sellers/(\d+)/products/buybox-information$")
+PACKAGES_RE = re.compile(r"^/integration/order/sellers/(\d+)/(shipment-packages|orders)$")
+CLAIMS_RE = re.compile(r"^/integration/claim/sellers/(\d+)/claims$")
+PRICE_RE = re.compile(r"^/integration/inventory/sellers/(\d+)/products/price-and-inventory$")
+
+
+@dataclass
+class SimulatorConfig:
+    seller_id: int
+    products: int
+    orders: int
+    seed: int
+    latency_ms: float
+    jitter_ms: float
+    rate_limit_rps: float
+    error_rate: float
+    bad_barcode_rate: float
+    buybox_change_rate: float
+    max_page_size: int
+
+
+@dataclass
+class Stats:
+    started_at: float = field(default_factory=time.time)
+    requests: Counter[str] = field(default_factory=Counter)
+    responses: Counter[str] = field(default_factory=Counter)
+    rate_limited: int = 0
+    injected_errors: int = 0
+    bad_barcode_rejections: int = 0
+    price_updates: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "uptimeSeconds": round(time.time() - self.started_at, 3),
+            "requests": dict(self.requests),
+            "totalRequests": sum(self.requests.values()),
+            "responses": dict(self.responses),
+            "rateLimited": self.rate_limited,
+            "injectedErrors": self.injected_errors,
+            "badBarcodeRejections": self.bad_barcode_rejections,
+            "priceUpdates": self.price_updates,
+        }
+
+
+class Catalog:
+    """Synthetic catalog and order history, generated once from ``seed``."""
+
+    def __init__(self, config: SimulatorConfig) -> None:
+        rng = random.Random(config.seed)
+        now_ms = int(time.time() * 1000)
+
+        self.products: list[dict[str, Any]] = []
+        self.by_barcode: dict[str, dict[str, Any]] = {}
+        self.by_stock_code: dict[str, dict[str, Any]] = {}
+        self.bad_barcodes: set[str] = set()
+        self.buybox: dict[str, dict[str, Any]] = {}
+
+        for index in range(config.products):
+            brand = rng.choice(BRANDS)
+            kind = rng.choice(KINDS)
+            barcode = f"869{config.seed % 1000:03d}{index:07d}"
+            stock_code = f"SIM-{index:06d}"
+            sale_price = round(rng.uniform(20, 900), 2)
+            archived = rng.random() < 0.03
+            product = {
+                "id": f"sim-{index}",
+                "productMainId": f"MAIN-{index // 3:06d}",
+                "productCode": stock_code,
+                "stockCode": stock_code,
+                "barcode": barcode,
+                "title": f"{brand} {kind} {rng.choice(['Pro', 'Max', 'Mini', 'Plus', 'Lite'])} {index}",
+                "brand": brand,
+                "categoryName": rng.choice(CATEGORIES),
+                "quantity": 0 if rng.random() < 0.1 else rng.randint(1, 250),
+                "listPrice": round(sale_price * rng.uniform(1.0, 1.2), 2),
+                "salePrice": sale_price,
+                "approved": rng.random() > 0.05,
+                "onSale": not archived,
+                "archived": archived,
+                "rejected": False,
+                "blacklisted": False,
+                "lastUpdateDate": now_ms - rng.randint(0, 90) * DAY_MS,
+            }
+            self.products.append(product)
+            self.by_barcode[barcode] = product
+            self.by_stock_code[stock_code] = product
+
+            if rng.random() < config.bad_barcode_rate:
+                self.bad_barcodes.add(barcode)
+
+            # Roughly 70% of listings have competitors; the rest return no buybox entry.
+            if rng.random() < 0.7:
+                self.buybox[barcode] = {
+                    "barcode": barcode,
+                    "buyboxOrder": 1 if rng.random() < 0.45 else rng.randint(2, 6),
+                    "buyboxPrice": round(sale_price * rng.uniform(0.85, 1.05), 2),
+                    "hasMultipleSeller": True,
+                }
+
+        self.packages: list[dict[str, Any]] = []
+        for index in range(config.orders):
+            created = now_ms - rng.randint(0, 365) * DAY_MS - rng.randint(0, DAY_MS)
+            status = rng.choice(STATUSES)
+            lines = []
+            for line_index in range(rng.randint(1, 3)):
+                product = rng.choice(self.products) if self.products else None
+                price = product["salePrice"] if product else 100.0
+                quantity = rng.randint(1, 3)
+                lines.append(
+                    {
+                        "id": f"line-{index}-{line_index}",
+                        "sku": product["barcode"] if product else None,
+                        "barcode": product["barcode"] if product else None,
+                        "merchantSku": product["stockCode"] if product else None,
+                        "productName": product["title"] if product else "Unknown",
+                        "quantity": quantity,
+                        "price": price,
+                        "amount": round(price * quantity, 2),
+                        "vatBaseAmount": round(price / 1.15, 2),
+                        "discount": 0,
+                        "currencyCode": "SAR",
+                        "lineItemStatus": status,
+                    }
+                )
+            self.packages.append(
+                {
+                    "id": 500000000 + index,
+                    "shipmentPackageId": 500000000 + index,
+                    "orderNumber": f"SIM{index:09d}",
+                    "packageNumber": f"PKG{index:09d}",
+                    "status": status,
+                    "shipmentPackageStatus": status,
+                    "customerFirstName": "Sim",
+                    "customerLastName": f"Customer {index % 997}",
+                    "customerEmail": f"customer{index % 997}@example.com",
+                    "totalPrice": round(sum(line["amount"] for line in lines), 2),
+                    "grossAmount": round(sum(line["amount"] for line in lines), 2),
+                    "totalDiscount": 0,
+                    "currencyCode": "SAR",
+                    "cargoProviderName": rng.choice(CARGO),
+                    "cargoTrackingNumber": f"TRK{index:010d}",
+                    "cargoTrackingLink": f"https://tracking.example.com/TRK{index:010d}",
+                    "orderDate": created,
+                    "shipmentPackageCreationDate": created,
+                    "packageLastModifiedDate": created + rng.randint(0, 5) * DAY_MS,
+                    "lastModifiedDate": created + rng.randint(0, 5) * DAY_MS,
+                    "estimatedDeliveryStartDate": created + 2 * DAY_MS,
+                    "estimatedDeliveryEndDate": created + 5 * DAY_MS,
+                    "lines": lines,
+                }
+            )
+
+
+class Simulator:
+    def __init__(self, config: SimulatorConfig) -> None:
+        self.config = config
+        self.catalog = Catalog(config)
+        self.stats = Stats()
+        self.lock = threading.Lock()
+        self.rng = random.Random(config.seed + 1)
+        self.tokens = max(1.0, config.rate_limit_rps)
+        self.refilled_at = time.monotonic()
+
+    def take_token(self) -> float | None:
+        """Returns seconds until a token is available, or None when the request may proceed."""
+        if self.config.rate_limit_rps <= 0:
+            return None
+        with self.lock:
+            now = time.monotonic()
+            capacity = max(1.0, self.config.rate_limit_rps)
+            self.tokens = min(capacity, self.tokens + (now - self.refilled_at) * self.config.rate_limit_rps)
+            self.refilled_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return None
+            return (1 - self.tokens) / self.config.rate_limit_rps
+
+    def chance(self, rate: float) -> bool:
+        with self.lock:
+            return self.rng.random() < rate
+
+    def delay(self) -> None:
+        latency = self.config.latency_ms
+        if self.config.jitter_ms > 0:
+            with self.lock:
+                latency += self.rng.uniform(0, self.config.jitter_ms)
+        if latency > 0:
+            time.sleep(latency / 1000)
+
+
+def page_params(query: dict[str, list[str]], max_size: int) -> tuple[int, int]:
+    page = max(0, int(query.get("page", ["0"])[0] or 0))
+    size = min(max_size, max(1, int(query.get("size", ["50"])[0] or 50)))
+    return page, size
+
+
+def paged(items: list[dict[str, Any]], page: int, size: int) -> dict[str, Any]:
+    total = len(items)
+    return {
+        "page": page,
+        "size": size,
+        "totalElements": total,
+        "totalPages": (total + size - 1) // size if total else 0,
+        "content": items[page * size : (page + 1) * size],
+    }
+
+
+def make_handler(sim: Simulator) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+            pass
+
+        def send_json(self, status: int, payload: Any, headers: dict[str, str] | None = None) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+            with sim.lock:
+                sim.stats.responses[str(status)] += 1
+
+        def read_json(self) -> Any:
+            length = int(self.headers.get("Content-Length") or 0)
+            if not length:
+                return None
+            try:
+                return json.loads(self.rfile.read(length))
+            except json.JSONDecodeError:
+                return None
+
+        def do_GET(self) -> None:  # noqa: N802
+            self.dispatch("GET")
+
+        def do_POST(self) -> None:  # noqa: N802
+            self.dispatch("POST")
+
+        def dispatch(self, method: str) -> None:
+            parsed = urlparse(self.path)
+            path = parsed.path.rstrip("/")
+            query = parse_qs(parsed.query)
+            body = self.read_json() if method == "POST" else None
+
+            if path == "/_simulator/stats":
+                self.send_json(200, sim.stats.as_dict())
+                return
+            if path == "/_simulator/reset" and method == "POST":
+                with sim.lock:
+                    sim.stats = Stats()
+                self.send_json(200, {"ok": True})
+                return
+
+            route = self.route_name(method, path)
+            with sim.lock:
+                sim.stats.requests[route] += 1
+
+            if route == "unknown":
+                self.send_json(404, {"errors": [{"message": f"No route for {method} {path}"}]})
+                return
+
+            if not self.headers.get("Authorization", "").startswith("Basic "):
+                self.send_json(401, {"errors": [{"message": "Missing Basic authorization"}]})
+                return
+
+            seller = re.search(r"/sellers/(\d+)/", path)
+            if seller and int(seller.group(1)) != sim.config.seller_id:
+                self.send_json(403, {"errors": [{"message": f"Seller {seller.group(1)} is not authorized"}]})
+                return
+
+            sim.delay()
+
+            wait = sim.take_token()
+            if wait is not None:
+                with sim.lock:
+                    sim.stats.rate_limited += 1
+                retry_after = max(1, round(wait + 0.5))
+                self.send_json(
+                    429,
+                    {"errors": [{"message": "Too many requests"}]},
+                    {
+                        "Retry-After": str(retry_after),
+                        "X-RateLimit-Remaining": "0",
+                        "X-RateLimit-Reset": str(retry_after),
+                    },
+                )
+                return
+
+            if sim.config.error_rate > 0 and sim.chance(sim.config.error_rate):
+                with sim.lock:
+                    sim.stats.injected_errors += 1
+                    status = sim.rng.choice([500, 502, 503, 504])
+                self.send_json(status, {"errors": [{"message": "Injected fault"}]})
+                return
+
+            handler = getattr(self, f"handle_{route}")
+            handler(query, body)
+
+        @staticmethod
+        def route_name(method: str, path: str) -> str:
+            products = PRODUCTS_RE.match(path) if method == "GET" else None
+            if products:
+                return "products_approved" if products.group(2) else "products"
+            if method == "POST" and BUYBOX_RE.match(path):
+                return "buybox"
+            if method == "GET" and PACKAGES_RE.match(path):
+                return "shipment_packages"
+            if method == "GET" and CLAIMS_RE.match(path):
+                return "claims"
+            if method == "POST" and PRICE_RE.match(path):
+                return "price_update"
+            return "unknown"
+
+        def filter_products(self, query: dict[str, list[str]], approved_only: bool) -> list[dict[str, Any]]:
+            barcode = query.get("barcode", [None])[0]
+            stock_code = query.get("stockCode", [None])[0]
+            if barcode:
+                product = sim.catalog.by_barcode.get(barcode)
+                return [product] if product else []
+            if stock_code:
+                product = sim.catalog.by_stock_code.get(stock_code)
+                return [product] if product else []
+            if approved_only or query.get("approved", [""])[0] == "true":
+                return [product for product in sim.catalog.products if product["approved"]]
+            return sim.catalog.products
+
+        def handle_products(self, query: dict[str, list[str]], _body: Any) -> None:
+            page, size = page_params(query, sim.config.max_page_size)
+            self.send_json(200, paged(self.filter_products(query, False), page, size))
+
+        def handle_products_approved(self, query: dict[str, list[str]], _body: Any) -> None:
+            page, size = page_params(query, sim.config.max_page_size)
+            self.send_json(200, paged(self.filter_products(query, True), page, size))
+
+        def handle_buybox(self, _query: dict[str, list[str]], body: Any) -> None:
+            barcodes = body.get("barcodes") if isinstance(body, dict) else None
+            if not isinstance(barcodes, list) or not barcodes:
+                self.send_json(400, {"errors": [{"message": "barcodes is required"}]})
+                return
+            if len(barcodes) > 10:
+                self.send_json(400, {"errors": [{"message": "At most 10 barcodes per request"}]})
+                return
+            bad = [barcode for barcode in barcodes if str(barcode) in sim.catalog.bad_barcodes]
+            if bad:
+                with sim.lock:
+                    sim.stats.bad_barcode_rejections += 1
+                self.send_json(400, {"errors": [{"message": f"Invalid barcode: {bad[0]}"}]})
+                return
+
+            entries = []
+            for barcode in barcodes:
+                entry = sim.catalog.buybox.get(str(barcode))
+                if entry is None:
+                    continue
+                if sim.config.buybox_change_rate > 0 and sim.chance(sim.config.buybox_change_rate):
+                    with sim.lock:
+                        entry["buyboxPrice"] = round(entry["buyboxPrice"] * sim.rng.uniform(0.95, 1.05), 2)
+                        entry["buyboxOrder"] = 1 if sim.rng.random() < 0.45 else sim.rng.randint(2, 6)
+                entries.append(dict(entry))
+            self.send_json(200, {"buyboxInfo": entries})
+
+        def handle_shipment_packages(self, query: dict[str, list[str]], _body: Any) -> None:
+            page, size = page_params(query, sim.config.max_page_size)
+            start = int(query.get("startDate", ["0"])[0] or 0)
+            end = int(query.get("endDate", [str(2**62)])[0] or 2**62)
+            status = query.get("shipmentPackageStatus", [None])[0]
+            items = [
+                package
+                for package in sim.catalog.packages
+                if start <= package["packageLastModifiedDate"] <= end
+                and (not status or package["shipmentPackageStatus"] == status)
+            ]
+            descending = query.get("orderByDirection", ["DESC"])[0] != "ASC"
+            items.sort(key=lambda package: package["packageLastModifiedDate"], reverse=descending)
+            self.send_json(200, paged(items, page, size))
+
+        def handle_claims(self, query: dict[str, list[str]], _body: Any) -> None:
+            page, size = page_params(query, sim.config.max_page_size)
+            returned = [package for package in sim.catalog.packages if package["status"] == "Returned"]
+            claims = [
+                {
+                    "id": f"claim-{package['id']}",
+                    "orderNumber": package["orderNumber"],
+                    "claimDate": package["packageLastModifiedDate"],
+                    "items": package["lines"],
+                }
+                for package in returned
+            ]
+            self.send_json(200, paged(claims, page, size))
+
+        def handle_price_update(self, _query: dict[str, list[str]], body: Any) -> None:
+            items = body.get("items") if isinstance(body, dict) else None
+            if not isinstance(items, list) or not items:
+                self.send_json(400, {"errors": [{"message": "items is required"}]})
+                return
+            with sim.lock:
+                for item in items:
+                    product = sim.catalog.by_barcode.get(str(item.get("barcode"))) or sim.catalog.by_stock_code.get(
+                        str(item.get("stockCode"))
+                    )
+                    if product is None:
+                        continue
+                    if item.get("salePrice") is not None:
+                        product["salePrice"] = float(item["salePrice"])
+                    if item.get("listPrice") is not None:
+                        product["listPrice"] = float(item["listPrice"])
+                    if item.get("quantity") is not None:
+                        product["quantity"] = int(item["quantity"])
+                    sim.stats.price_updates += 1
+            self.send_json(200, {"batchRequestId": f"sim-{int(time.time() * 1000)}"})
+
+    return Handler
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run a local Trendyol seller API simulator.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--seller-id", type=int, default=1111632)
+    parser.add_argument("--products", type=int, default=1000, help="Synthetic catalog size")
+    parser.add_argument("--orders", type=int, default=2000, help="Synthetic shipment packages")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Fixed latency added to every request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random extra latency, 0..jitter")
+    parser.add_argument(
+        "--rate-limit-rps", type=float, default=0.0, help="Requests per second before 429s (0 = unlimited)"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 5xx")
+    parser.add_argument(
+        "--bad-barcode-rate",
+        type=float,
+        default=0.0,
+        help="Share of barcodes that make their whole buybox chunk fail with 400",
+    )
+    parser.add_argument(
+        "--buybox-change-rate", type=float, default=0.05, help="Chance a buybox entry moves on each read"
+    )
+    parser.add_argument("--max-page-size", type=int, default=200)
+    return parser.parse_args()
+
+
+def build_server(config: SimulatorConfig, host: str, port: int) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(Simulator(config)))
+    server.daemon_threads = True
+    return server
+
+
+def main() -> int:
+    args = parse_args()
+    config = SimulatorConfig(
+        seller_id=args.seller_id,
+        products=args.products,
+        orders=args.orders,
+        seed=args.seed,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limit_rps=args.rate_limit_rps,
+        error_rate=args.error_rate,
+        bad_barcode_rate=args.bad_barcode_rate,
+        buybox_change_rate=args.buybox_change_rate,
+        max_page_size=args.max_page_size,
+    )
+
+    started = time.perf_counter()
+    server = build_server(config, args.host, args.port)
+    print(
+        f"Trendyol simulator on http://{args.host}:{server.server_port} "
+        f"({config.products} products, {config.orders} packages, built in {time.perf_counter() - started:.1f}s)",
+        file=sys.stderr,
+    )
+    print(f"Use TRENDYOL_BASE_URL=http://{args.host}:{server.server_port} TRENDYOL_SELLER_ID={config.seller_id}", file=sys.stderr)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
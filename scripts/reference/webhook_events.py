@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Local generator of Trendyol package status webhooks, for testing webhook ingestion.
+
+Walks packages from the simulator's synthetic order history through status
+transitions (Created -> Picking -> Invoiced -> Shipped -> Delivered, with some
+cancelled or returned) and POSTs each transition to ``/api/webhooks/trendyol``
+the way Trendyol would. Options redeliver a share of events and shuffle them
+within each request, to exercise deduplication and out-of-order handling.
+
+  python scripts/reference/webhook_events.py --url http://localhost:3000/api/webhooks/trendyol \\
+      --secret "$TRENDYOL_WEBHOOK_SECRET" --packages 200 --duplicate-rate 0.1 --shuffle
+
+``--dry-run`` prints the events as JSON lines instead of sending them. Only the
+standard library is used, like the simulator.
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import random
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Iterator
+
+from trendyol_simulator import Catalog, SimulatorConfig
+
+FORWARD = ["Created", "Picking", "Invoiced", "Shipped", "Delivered"]
+MINUTE_MS = 60 * 1000
+
+
+def transitions(package: dict[str, Any], rng: random.Random, now_ms: int) -> list[dict[str, Any]]:
+    """One event per status the package passes through, with increasing modification times."""
+    final = package["status"]
+    if final in FORWARD:
+        path = FORWARD[: FORWARD.index(final) + 1]
+    elif final == "Cancelled":
+        path = FORWARD[: rng.randint(1, 2)] + ["Cancelled"]
+    elif final == "Returned":
+        path = FORWARD + ["Returned"]
+    else:
+        path = ["Created", final]
+
+    events = []
+    modified = now_ms - len(path) * 30 * MINUTE_MS
+    for status in path:
+        modified += rng.randint(1, 30) * MINUTE_MS
+        event = copy.deepcopy(package)
+        event["status"] = status
+        event["shipmentPackageStatus"] = status
+        event["packageLastModifiedDate"] = modified
+        event["lastModifiedDate"] = modified
+        for line in event["lines"]:
+            line["lineItemStatus"] = status
+        events.append(event)
+    return events
+
+
+def event_stream(args: argparse.Namespace) -> Iterator[dict[str, Any]]:
+    config = SimulatorConfig(
+        seller_id=args.seller_id,
+        products=args.products,
+        orders=args.packages,
+        seed=args.seed,
+        latency_ms=0.0,
+        jitter_ms=0.0,
+        rate_limit_rps=0.0,
+        error_rate=0.0,
+        bad_barcode_rate=0.0,
+        buybox_change_rate=0.0,
+        max_page_size=200,
+    )
+    catalog = Catalog(config)
+    rng = random.Random(args.seed)
+    now_ms = int(time.time() * 1000)
+
+    # Interleave packages: each round emits the next transition of every package still moving.
+    pending = [transitions(package, rng, now_ms) for package in catalog.packages]
+    while pending:
+        still_moving = []
+        for events in pending:
+            event = events.pop(0)
+            yield event
+            if rng.random() < args.duplicate_rate:
+                yield copy.deepcopy(event)
+            if events:
+                still_moving.append(events)
+        pending = still_moving
+
+
+def post(url: str, secret: str, events: list[dict[str, Any]], timeout: float) -> dict[str, Any]:
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(events).encode("utf-8"),
+        headers={"Content-Type": "application/json", "x-webhook-secret": secret},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read() or b"{}")
+    except urllib.error.HTTPError as error:
+        raise RuntimeError(f"HTTP {error.code}: {error.read().decode('utf-8', 'replace')[:300]}") from error
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Send synthetic Trendyol package status webhooks.")
+    parser.add_argument("--url", default="http://localhost:3000/api/webhooks/trendyol")
+    parser.add_argument("--secret", default="", help="TRENDYOL_WEBHOOK_SECRET of the receiving app")
+    parser.add_argument("--packages", type=int, default=100, help="Synthetic packages to walk through their statuses")
+    parser.add_argument("--products", type=int, default=200, help="Synthetic catalog size for order lines")
+    parser.add_argument("--seller-id", type=int, default=1111632)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch", type=int, default=20, help="Events per webhook request")
+    parser.add_argument("--rate", type=float, default=0.0, help="Requests per second (0 = as fast as possible)")
+    parser.add_argument("--duplicate-rate", type=float, default=0.0, help="Share of events delivered twice")
+    parser.add_argument("--shuffle", action="store_true", help="Shuffle events within each request")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--dry-run", action="store_true", help="Print events as JSON lines instead of sending")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    rng = random.Random(args.seed + 1)
+    totals = {"requests": 0, "events": 0, "queued": 0, "duplicates": 0, "failures": 0}
+    started = time.perf_counter()
+
+    def flush(batch: list[dict[str, Any]]) -> None:
+        if args.shuffle:
+            rng.shuffle(batch)
+        totals["events"] += len(batch)
+        if args.dry_run:
+            for event in batch:
+                print(json.dumps(event))
+            return
+
+        totals["requests"] += 1
+        try:
+            result = post(args.url, args.secret, batch, args.timeout)
+            totals["queued"] += int(result.get("queued", 0))
+            totals["duplicates"] += int(result.get("duplicates", 0))
+        except (RuntimeError, OSError) as error:
+            totals["failures"] += 1
+            print(f"Request failed: {error}", file=sys.stderr)
+        if args.rate > 0:
+            time.sleep(1.0 / args.rate)
+
+    batch: list[dict[str, Any]] = []
+    for event in event_stream(args):
+        batch.append(event)
+        if len(batch) >= args.batch:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    totals["seconds"] = round(time.perf_counter() - started, 2)
+    print(json.dumps(totals), file=sys.stderr)
+    return 1 if totals["failures"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
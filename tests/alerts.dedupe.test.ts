@@ -0,0 +1,86 @@
+import { beforeEach, describe, expect, it, vi } from "vitest";
+
+const { alert, $executeRawUnsafe } = vi.hoisted(() => ({
+  alert: {
+    groupBy: vi.fn(),
+    createMany: vi.fn(async ({ data }: { data: unknown[] }) => ({ count: data.length }))
+  },
+  $executeRawUnsafe: vi.fn(async (..._args: unknown[]) => 1)
+}));
+
+vi.mock("@/lib/db/prisma", () => ({
+  prisma: { alert, $executeRawUnsafe }
+}));
+
+import { AlertDedupe, MISSING_DATA_DEDUPE_MINUTES } from "@/lib/alerts/dedupe";
+
+const NOW = Date.parse("2026-03-18T12:00:00Z");
+
+const lostBuybox = (productId: string) => ({
+  productId,
+  type: "LOST_BUYBOX" as const,
+  severity: "WARN" as const,
+  message: `Lost BuyBox for ${productId}`
+});
+
+describe("AlertDedupe", () => {
+  beforeEach(() => {
+    alert.groupBy.mockReset();
+    alert.createMany.mockClear();
+    $executeRawUnsafe.mockClear();
+  });
+
+  it("loads the latest alert per product and type once and suppresses in memory", async () => {
+    alert.groupBy.mockResolvedValue([
+      { productId: "p1", type: "LOST_BUYBOX", _max: { createdAt: new Date(NOW - 5 * 60_000) } },
+      { productId: "p2", type: "LOST_BUYBOX", _max: { createdAt: new Date(NOW - 20 * 60_000) } }
+    ]);
+
+    const dedupe = await AlertDedupe.load(["p1", "p2", "p3"], () => NOW);
+
+    expect(dedupe.offer(lostBuybox("p1"))).toBe(false);
+    expect(dedupe.offer(lostBuybox("p2"))).toBe(true);
+    expect(dedupe.offer(lostBuybox("p3"))).toBe(true);
+    expect(dedupe.offer(lostBuybox("p3"))).toBe(false);
+    expect(alert.groupBy).toHaveBeenCalledTimes(1);
+  });
+
+  it("honours longer windows for missing-data alerts", async () => {
+    alert.groupBy.mockResolvedValue([
+      { productId: "p1", type: "MISSING_PRODUCT_DATA", _max: { createdAt: new Date(NOW - 60 * 60_000) } }
+    ]);
+
+    const dedupe = await AlertDedupe.load(["p1"], () => NOW);
+    const missing = { productId: "p1", type: "MISSING_PRODUCT_DATA" as const, severity: "WARN" as const, message: "x" };
+
+    expect(dedupe.offer(missing, MISSING_DATA_DEDUPE_MINUTES)).toBe(false);
+    expect(dedupe.offer(missing)).toBe(true);
+  });
+
+  it("inserts the surviving alerts with one createMany", async () => {
+    alert.groupBy.mockResolvedValue([]);
+    const dedupe = await AlertDedupe.load(["p1", "p2"], () => NOW);
+    dedupe.offer(lostBuybox("p1"));
+    dedupe.offer(lostBuybox("p2"));
+
+    await expect(dedupe.flush()).resolves.toBe(2);
+    expect(alert.createMany).toHaveBeenCalledTimes(1);
+    expect(dedupe.pendingCount).toBe(0);
+    await expect(dedupe.flush()).resolves.toBe(0);
+  });
+
+  it("announces the products that got alerts on the change feed once per flush", async () => {
+    alert.groupBy.mockResolvedValue([]);
+    const dedupe = await AlertDedupe.load(["p1", "p2"], () => NOW);
+    dedupe.offer(lostBuybox("p1"));
+    dedupe.offer({ ...lostBuybox("p1"), type: "PRICE_WAR" as const });
+    dedupe.offer(lostBuybox("p2"));
+
+    await dedupe.flush();
+    await dedupe.flush();
+
+    const inserts = $executeRawUnsafe.mock.calls.filter(([sql]) => String(sql).includes("product_change_events\" ("));
+    expect(inserts).toHaveLength(1);
+    expect(inserts[0].slice(1)).toEqual(["alert", ["p1", "p2"]]);
+  });
+});
@@ -0,0 +1,168 @@
+import { afterEach, beforeEach, describe, expect, it, vi } from "vitest";
+
+const { db, buildDashboardRows } = vi.hoisted(() => ({
+  db: {
+    $queryRawUnsafe: vi.fn(),
+    alert: { findMany: vi.fn() }
+  },
+  buildDashboardRows: vi.fn(async ({ productIds }: { productIds: string[] }) =>
+    productIds.map((productId) => ({ productId, ourPrice: 10 }))
+  )
+}));
+
+vi.mock("@/lib/db/prisma", () => ({
+  prisma: db
+}));
+
+vi.mock("@/lib/dashboard/service", () => ({
+  buildDashboardRows
+}));
+
+import { mergeAlertsById, mergeRowsById } from "@/lib/dashboard/live-client";
+import {
+  DashboardLiveUpdates,
+  coalesceProductChanges,
+  formatServerSentEvent,
+  type LiveUpdate
+} from "@/lib/dashboard/live-updates";
+import type { ProductChangeEvent } from "@/lib/dashboard/product-changes";
+
+const event = (id: number, kind: ProductChangeEvent["kind"], productIds: string[], createdAt = new Date(id * 1000)) => ({
+  id: BigInt(id),
+  kind,
+  productIds,
+  createdAt
+});
+
+describe("coalesceProductChanges", () => {
+  it("unions row changes and keeps alert products apart", () => {
+    const changes = coalesceProductChanges([
+      event(1, "snapshot", ["p1", "p2"]),
+      event(2, "alert", ["p2"], new Date(5000)),
+      event(3, "price_change", ["p1"]),
+      event(4, "alert", ["p3"], new Date(4000))
+    ]);
+
+    expect(changes.rowIds).toEqual(["p1", "p2"]);
+    expect(changes.alertIds).toEqual(["p2", "p3"]);
+    expect(changes.alertsSince).toEqual(new Date(4000));
+  });
+
+  it("formats an update as one server-sent event", () => {
+    const update: LiveUpdate = { type: "rows", id: "7", rows: [] };
+    expect(formatServerSentEvent(update)).toBe('id: 7\nevent: rows\ndata: {"rows":[]}\n\n');
+  });
+});
+
+describe("DashboardLiveUpdates", () => {
+  beforeEach(() => {
+    vi.useFakeTimers();
+    db.$queryRawUnsafe.mockReset();
+    db.alert.findMany.mockReset();
+    buildDashboardRows.mockClear();
+  });
+
+  afterEach(() => {
+    vi.useRealTimers();
+  });
+
+  it("builds the changed rows once and sends them to every subscriber", async () => {
+    db.$queryRawUnsafe
+      .mockResolvedValueOnce([{ id: 10n }])
+      .mockResolvedValueOnce([event(11, "snapshot", ["p1"]), event(12, "price_change", ["p1", "p2"])])
+      .mockResolvedValue([]);
+    const hub = new DashboardLiveUpdates(1000);
+    const first: LiveUpdate[] = [];
+    const second: LiveUpdate[] = [];
+
+    const unsubscribeFirst = hub.subscribe((update) => first.push(update));
+    const unsubscribeSecond = hub.subscribe((update) => second.push(update));
+    await vi.advanceTimersByTimeAsync(0);
+    await vi.advanceTimersByTimeAsync(1000);
+
+    expect(buildDashboardRows).toHaveBeenCalledTimes(1);
+    expect(buildDashboardRows).toHaveBeenCalledWith({ productIds: ["p1", "p2"] });
+    expect(first).toEqual([{ type: "rows", id: "12", rows: [{ productId: "p1", ourPrice: 10 }, { productId: "p2", ourPrice: 10 }] }]);
+    expect(second).toEqual(first);
+    // Reads continue after the last change event seen.
+    expect(db.$queryRawUnsafe.mock.calls[1][1]).toBe("10");
+
+    unsubscribeFirst();
+    unsubscribeSecond();
+    expect(hub.subscribers).toBe(0);
+    await vi.advanceTimersByTimeAsync(5000);
+    expect(db.$queryRawUnsafe).toHaveBeenCalledTimes(2);
+  });
+
+  it("re-reads a trailing window and sends events that committed after a higher id", async () => {
+    db.$queryRawUnsafe
+      .mockResolvedValueOnce([{ id: 10n }])
+      .mockResolvedValueOnce([event(11, "snapshot", ["p1"]), event(13, "snapshot", ["p3"])])
+      .mockResolvedValueOnce([event(11, "snapshot", ["p1"]), event(12, "snapshot", ["p2"]), event(13, "snapshot", ["p3"])])
+      .mockResolvedValue([]);
+    const hub = new DashboardLiveUpdates(1000);
+    const updates: LiveUpdate[] = [];
+
+    hub.subscribe((update) => updates.push(update));
+    await vi.advanceTimersByTimeAsync(0);
+    await vi.advanceTimersByTimeAsync(1000);
+    await vi.advanceTimersByTimeAsync(1000);
+
+    // Never reaches back below the id the subscription started from.
+    expect(db.$queryRawUnsafe.mock.calls[2][1]).toBe("10");
+    expect(buildDashboardRows).toHaveBeenNthCalledWith(2, { productIds: ["p2"] });
+    expect(updates.map((update) => update.id)).toEqual(["13", "13"]);
+
+    await vi.advanceTimersByTimeAsync(1000);
+    expect(buildDashboardRows).toHaveBeenCalledTimes(2);
+  });
+
+  it("sends the alerts of products named by alert events", async () => {
+    db.$queryRawUnsafe
+      .mockResolvedValueOnce([{ id: 0n }])
+      .mockResolvedValueOnce([event(1, "alert", ["p3"], new Date(600_000))])
+      .mockResolvedValue([]);
+    db.alert.findMany.mockResolvedValue([{ id: "a1", productId: "p3" }]);
+    const hub = new DashboardLiveUpdates(1000);
+    const updates: LiveUpdate[] = [];
+
+    hub.subscribe((update) => updates.push(update));
+    await vi.advanceTimersByTimeAsync(1000);
+
+    expect(buildDashboardRows).not.toHaveBeenCalled();
+    expect(db.alert.findMany.mock.calls[0][0].where).toEqual({
+      productId: { in: ["p3"] },
+      createdAt: { gte: new Date(480_000) }
+    });
+    expect(updates).toEqual([{ type: "alerts", id: "1", alerts: [{ id: "a1", productId: "p3" }] }]);
+  });
+});
+
+describe("live client merges", () => {
+  it("patches rows in place and appends rows it did not have", () => {
+    const current = [
+      { productId: "p1", ourPrice: 1 },
+      { productId: "p2", ourPrice: 2 }
+    ];
+
+    expect(mergeRowsById(current, [{ productId: "p2", ourPrice: 20 }, { productId: "p3", ourPrice: 3 }])).toEqual([
+      { productId: "p1", ourPrice: 1 },
+      { productId: "p2", ourPrice: 20 },
+      { productId: "p3", ourPrice: 3 }
+    ]);
+    expect(mergeRowsById(current, [])).toBe(current);
+  });
+
+  it("adds unseen alerts newest first and keeps local read state", () => {
+    const current = [{ id: "a1", createdAt: "2026-03-18T10:00:00Z", isRead: true }];
+    const merged = mergeAlertsById(current, [
+      { id: "a1", createdAt: "2026-03-18T10:00:00Z", isRead: false },
+      { id: "a2", createdAt: "2026-03-18T11:00:00Z", isRead: false }
+    ]);
+
+    expect(merged.map((alert) => [alert.id, alert.isRead])).toEqual([
+      ["a2", false],
+      ["a1", true]
+    ]);
+  });
+});
@@ -0,0 +1,147 @@
+import { gunzipSync } from "node:zlib";
+import { beforeEach, describe, expect, it, vi } from "vitest";
+
+const { db } = vi.hoisted(() => ({
+  db: {
+    $queryRawUnsafe: vi.fn(),
+    productSettings: { findMany: vi.fn() }
+  }
+}));
+
+vi.mock("@/lib/db/prisma", () => ({
+  prisma: db
+}));
+
+vi.mock("@/lib/pricing/effective-settings", async (importOriginal) => ({
+  ...(await importOriginal<typeof import("@/lib/pricing/effective-settings")>()),
+  getOrCreateGlobalSettings: async () => ({
+    commissionRate: 10,
+    shippingCost: 0,
+    minProfitType: "PERCENT",
+    minProfitValue: 100,
+    undercutStep: 1,
+    alertThresholdSar: 0,
+    alertThresholdPct: 0,
+    cooldownMinutes: 0,
+    competitorDropPct: 0
+  })
+}));
+
+import { csvCell, exportStream } from "@/lib/export/format";
+import { exportRows, type ExportRow } from "@/lib/export/sources";
+
+async function* rowsOf(rows: ExportRow[]) {
+  yield* rows;
+}
+
+const readAll = async (stream: ReadableStream<Uint8Array>) => Buffer.from(await new Response(stream).arrayBuffer());
+
+const filters = { from: new Date("2026-03-01T00:00:00Z"), to: new Date("2026-04-01T00:00:00Z") };
+
+describe("export encoding", () => {
+  it("quotes CSV fields only when needed", () => {
+    expect(csvCell(null)).toBe("");
+    expect(csvCell(12.5)).toBe("12.5");
+    expect(csvCell('Cable, "USB-C"')).toBe('"Cable, ""USB-C"""');
+    expect(csvCell(new Date("2026-03-18T10:00:00Z"))).toBe("2026-03-18T10:00:00.000Z");
+    expect(csvCell(5n)).toBe("5");
+  });
+
+  it("writes a CSV header and gzips on the fly", async () => {
+    const body = await readAll(
+      exportStream("csv", ["sku", "ourPrice"], rowsOf([{ sku: "A", ourPrice: 10 }, { sku: "B", ourPrice: null }]), {
+        gzip: true
+      })
+    );
+
+    expect(gunzipSync(body).toString()).toBe("sku,ourPrice\nA,10\nB,\n");
+  });
+
+  it("writes one JSON object per line with only the export columns", async () => {
+    const body = await readAll(
+      exportStream("ndjson", ["sku", "checkedAt"], rowsOf([{ sku: "A", checkedAt: new Date(0), raw: {} }]))
+    );
+
+    expect(body.toString()).toBe('{"sku":"A","checkedAt":"1970-01-01T00:00:00.000Z"}\n');
+  });
+
+  it("pulls rows only as the consumer reads", async () => {
+    let produced = 0;
+    async function* counted() {
+      while (true) {
+        produced += 1;
+        yield { n: produced };
+      }
+    }
+    const reader = exportStream("ndjson", ["n"], counted()).getReader();
+
+    await reader.read();
+    await reader.read();
+    await reader.cancel();
+    // A few 500-row chunks at most: the chunks read plus the one the stream buffers ahead.
+    expect(produced).toBeLessThanOrEqual(2000);
+  });
+});
+
+describe("exportRows", () => {
+  beforeEach(() => {
+    db.$queryRawUnsafe.mockReset();
+  });
+
+  it("pages snapshots by keyset until a short page", async () => {
+    const checkedAt = new Date("2026-03-02T00:00:00Z");
+    db.$queryRawUnsafe
+      .mockResolvedValueOnce([
+        { id: "s1", productId: "p1", checkedAt },
+        { id: "s2", productId: "p1", checkedAt }
+      ])
+      .mockResolvedValueOnce([{ id: "s3", productId: "p2", checkedAt }]);
+
+    const rows: ExportRow[] = [];
+    for await (const row of exportRows("snapshots", filters, 2)) {
+      rows.push(row);
+    }
+
+    expect(rows.map((row) => row.id)).toEqual(["s1", "s2", "s3"]);
+    expect(db.$queryRawUnsafe).toHaveBeenCalledTimes(2);
+    expect(db.$queryRawUnsafe.mock.calls[0].slice(1, 4)).toEqual([null, null, null]);
+    expect(db.$queryRawUnsafe.mock.calls[1].slice(1, 6)).toEqual([
+      "p1",
+      "2026-03-02T00:00:00.000Z",
+      "s2",
+      "2026-03-01T00:00:00.000Z",
+      "2026-04-01T00:00:00.000Z"
+    ]);
+  });
+
+  it("exports an unreachable break-even floor as empty", async () => {
+    db.$queryRawUnsafe.mockResolvedValueOnce([{ id: "p1", sku: "A", ourPrice: 100 }]);
+    db.productSettings.findMany.mockResolvedValueOnce([{ productId: "p1", costPrice: 50, minPrice: null }]);
+
+    const rows: ExportRow[] = [];
+    for await (const row of exportRows("products", filters, 2)) {
+      rows.push(row);
+    }
+
+    expect(rows[0]).toMatchObject({ costPrice: 50, breakEvenPrice: null });
+  });
+
+  it("counts orders, not item rows, against the page size", async () => {
+    const createdDate = new Date("2026-03-05T00:00:00Z");
+    db.$queryRawUnsafe
+      .mockResolvedValueOnce([
+        { orderId: "o1", createdDate, sku: "A" },
+        { orderId: "o1", createdDate, sku: "B" },
+        { orderId: "o2", createdDate, sku: "C" }
+      ])
+      .mockResolvedValueOnce([{ orderId: "o3", createdDate, sku: "D" }]);
+
+    const rows: ExportRow[] = [];
+    for await (const row of exportRows("orders", filters, 2)) {
+      rows.push(row);
+    }
+
+    expect(rows).toHaveLength(4);
+    expect(db.$queryRawUnsafe.mock.calls[1].slice(1, 3)).toEqual(["2026-03-05T00:00:00.000Z", "o2"]);
+  });
+});
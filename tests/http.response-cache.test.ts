@@ -0,0 +1,121 @@
+import { describe, expect, it, vi } from "vitest";
+
+vi.mock("@/lib/db/prisma", () => ({
+  prisma: {}
+}));
+
+import { VersionedResponseCache, versionedJsonResponse } from "@/lib/http/response-cache";
+
+const deferred = <T>() => {
+  let resolve!: (value: T) => void;
+  const promise = new Promise<T>((done) => {
+    resolve = done;
+  });
+  return { promise, resolve };
+};
+
+describe("VersionedResponseCache", () => {
+  it("recomputes only when the version changes", async () => {
+    const cache = new VersionedResponseCache("test");
+    const compute = vi.fn(async () => ({ rows: compute.mock.calls.length }));
+
+    expect((await cache.get("all", "1", compute)).result).toBe("miss");
+    const hit = await cache.get("all", "1", compute);
+    expect(hit.result).toBe("hit");
+    expect(JSON.parse(hit.entry.payload)).toEqual({ rows: 1 });
+
+    const next = await cache.get("all", "2", compute);
+    expect(next.result).toBe("miss");
+    expect(JSON.parse(next.entry.payload)).toEqual({ rows: 2 });
+    expect(next.entry.etag).not.toBe(hit.entry.etag);
+    expect(compute).toHaveBeenCalledTimes(2);
+  });
+
+  it("shares one computation between concurrent requests", async () => {
+    const cache = new VersionedResponseCache("test");
+    const pending = deferred<unknown>();
+    const compute = vi.fn(() => pending.promise);
+
+    const first = cache.get("all", "1", compute);
+    const second = cache.get("all", "1", compute);
+    pending.resolve({ ok: true });
+
+    const [a, b] = await Promise.all([first, second]);
+    expect(compute).toHaveBeenCalledTimes(1);
+    expect(b.entry).toBe(a.entry);
+  });
+
+  it("serves the previous version while the current one is computed in the background", async () => {
+    const cache = new VersionedResponseCache("test");
+    await cache.get("all", "1", async () => ({ v: 1 }));
+    const pending = deferred<unknown>();
+    const compute = vi.fn(() => pending.promise);
+
+    const stale = await cache.get("all", "2", compute, { serveStale: true });
+    expect(stale.result).toBe("stale");
+    expect(JSON.parse(stale.entry.payload)).toEqual({ v: 1 });
+    await cache.get("all", "2", compute, { serveStale: true });
+    expect(compute).toHaveBeenCalledTimes(1);
+
+    pending.resolve({ v: 2 });
+    await new Promise((resolve) => setTimeout(resolve, 0));
+    const fresh = await cache.get("all", "2", compute, { serveStale: true });
+    expect(fresh.result).toBe("hit");
+    expect(JSON.parse(fresh.entry.payload)).toEqual({ v: 2 });
+  });
+
+  it("evicts the least recently used key", async () => {
+    const cache = new VersionedResponseCache("test", 2);
+    const compute = async () => ({});
+    await cache.get("a", "1", compute);
+    await cache.get("b", "1", compute);
+    await cache.get("a", "1", compute);
+    await cache.get("c", "1", compute);
+
+    expect(cache.size).toBe(2);
+    expect((await cache.get("a", "1", compute)).result).toBe("hit");
+    expect((await cache.get("b", "1", compute)).result).toBe("miss");
+  });
+});
+
+describe("versionedJsonResponse", () => {
+  it("answers a matching If-None-Match with 304 without computing", async () => {
+    const cache = new VersionedResponseCache("test");
+    const compute = vi.fn(async () => ({ rows: [] }));
+
+    const first = await versionedJsonResponse(new Request("http://localhost/api/dashboard"), cache, {
+      key: "all",
+      version: "5",
+      compute
+    });
+    expect(first.status).toBe(200);
+    expect(first.headers.get("cache-control")).toBe("private, no-cache");
+    expect(await first.json()).toEqual({ rows: [] });
+    const etag = first.headers.get("etag")!;
+
+    cache.clear();
+    const revalidated = await versionedJsonResponse(
+      new Request("http://localhost/api/dashboard", { headers: { "If-None-Match": etag } }),
+      cache,
+      { key: "all", version: "5", compute }
+    );
+    expect(revalidated.status).toBe(304);
+    expect(revalidated.headers.get("etag")).toBe(etag);
+    expect(compute).toHaveBeenCalledTimes(1);
+  });
+
+  it("computes uncached when the version is unknown", async () => {
+    const cache = new VersionedResponseCache("test");
+    const compute = vi.fn(async () => ({ ok: true }));
+
+    const response = await versionedJsonResponse(new Request("http://localhost/api/analytics"), cache, {
+      key: "30",
+      version: null,
+      compute
+    });
+
+    expect(response.status).toBe(200);
+    expect(response.headers.get("etag")).toBeNull();
+    expect(cache.size).toBe(0);
+  });
+});
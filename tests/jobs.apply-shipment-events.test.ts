@@ -0,0 +1,76 @@
+import { beforeEach, describe, expect, it, vi } from "vitest";
+import { applyShipmentEvents } from "@/lib/jobs/apply-shipment-events";
+import {
+  claimShipmentEvents,
+  completeShipmentEvents,
+  releaseShipmentEvents
+} from "@/lib/trendyol/shipments/webhook-events";
+
+const { queryRawMock } = vi.hoisted(() => ({ queryRawMock: vi.fn() }));
+
+vi.mock("@/lib/db/prisma", () => ({
+  prisma: { $queryRawUnsafe: queryRawMock }
+}));
+
+vi.mock("@/lib/jobs/job-run", () => ({
+  withJobRun: (_job: string, fn: () => Promise<unknown>) => fn(),
+  timeStage: (_stage: string, fn: () => Promise<unknown>) => fn(),
+  addStageRows: vi.fn()
+}));
+
+vi.mock("@/lib/db/data-versions", () => ({ bumpDataVersion: vi.fn() }));
+vi.mock("@/lib/services/order-service", () => ({ orderService: { upsertOrder: vi.fn() } }));
+vi.mock("@/lib/services/return-service", () => ({
+  returnService: { deriveReturnsFromPackages: vi.fn(async () => ({ requests: 0 })) }
+}));
+vi.mock("@/lib/trendyol/client", () => ({
+  trendyolClient: { isConfigured: () => true, getSellerId: () => 1 }
+}));
+
+vi.mock("@/lib/trendyol/shipments/webhook-events", () => ({
+  claimShipmentEvents: vi.fn(),
+  completeShipmentEvents: vi.fn(),
+  releaseShipmentEvents: vi.fn(),
+  pruneAppliedShipmentEvents: vi.fn(async () => 0)
+}));
+
+const event = (id: number, packageNumber: string) => ({
+  id: BigInt(id),
+  payload: { packageNumber, shipmentPackageStatus: "Shipped", status: "Shipped", lines: [] }
+});
+
+describe("applyShipmentEvents", () => {
+  beforeEach(() => {
+    vi.clearAllMocks();
+    queryRawMock.mockImplementation(async (_sql: string, _seller: string, packageNumbers: string[]) => {
+      if (packageNumbers.includes("BAD")) {
+        throw new Error("bad package");
+      }
+      return packageNumbers.map((packageNumber) => ({ packageNumber }));
+    });
+  });
+
+  it("applies a failed batch one event at a time and releases only the failing event", async () => {
+    vi.mocked(claimShipmentEvents).mockResolvedValueOnce([event(1, "P1"), event(2, "BAD"), event(3, "P3")] as never);
+
+    const summary = await applyShipmentEvents("worker", { deadline: Date.now() + 60_000 });
+
+    expect(summary).toMatchObject({ batches: 1, failedBatches: 1, failedEvents: 1, packagesApplied: 2 });
+    expect(completeShipmentEvents).toHaveBeenCalledWith([1n], "worker");
+    expect(completeShipmentEvents).toHaveBeenCalledWith([3n], "worker");
+    expect(releaseShipmentEvents).toHaveBeenCalledTimes(1);
+    expect(releaseShipmentEvents).toHaveBeenCalledWith([2n], "worker", "bad package");
+  });
+
+  it("completes a batch that applies cleanly in one call", async () => {
+    vi.mocked(claimShipmentEvents)
+      .mockResolvedValueOnce([event(1, "P1"), event(2, "P2")] as never)
+      .mockResolvedValueOnce([]);
+
+    const summary = await applyShipmentEvents("worker", { deadline: Date.now() + 60_000 });
+
+    expect(summary).toMatchObject({ batches: 1, failedBatches: 0, failedEvents: 0, packagesApplied: 2 });
+    expect(completeShipmentEvents).toHaveBeenCalledWith([1n, 2n], "worker");
+    expect(releaseShipmentEvents).not.toHaveBeenCalled();
+  });
+});
@@ -0,0 +1,94 @@
+import { beforeEach, describe, expect, it, vi } from "vitest";
+
+const { prisma } = vi.hoisted(() => ({
+  prisma: {
+    $executeRawUnsafe: vi.fn(async (..._args: unknown[]) => 1),
+    $queryRawUnsafe: vi.fn(),
+    pollJob: { findFirst: vi.fn() }
+  }
+}));
+
+vi.mock("@/lib/db/prisma", () => ({ prisma }));
+
+import { currentPollJob, enqueuePollJob, executePollJob, pollJobCheckpoint } from "@/lib/jobs/poll-jobs";
+
+const job = { id: "job-1", attempts: 1, startedAt: new Date("2026-03-22T10:00:00Z") };
+
+const finishCall = () =>
+  prisma.$executeRawUnsafe.mock.calls.find(([sql]) => String(sql).includes(`"finishedAt" = `) && String(sql).includes("$5"));
+
+describe("enqueuePollJob", () => {
+  beforeEach(() => {
+    prisma.$executeRawUnsafe.mockClear();
+    prisma.$queryRawUnsafe.mockReset();
+    prisma.pollJob.findFirst.mockReset();
+  });
+
+  it("returns a new job when none is active", async () => {
+    prisma.$queryRawUnsafe.mockResolvedValue([{ id: "job-1", status: "QUEUED", createdAt: new Date() }]);
+
+    await expect(enqueuePollJob("cron")).resolves.toEqual({ id: "job-1", status: "QUEUED", deduplicated: false });
+    expect(prisma.pollJob.findFirst).not.toHaveBeenCalled();
+  });
+
+  it("joins the queued or running job instead of adding another", async () => {
+    prisma.$queryRawUnsafe.mockResolvedValue([]);
+    prisma.pollJob.findFirst.mockResolvedValue({ id: "job-0", status: "RUNNING" });
+
+    await expect(enqueuePollJob("manual")).resolves.toEqual({ id: "job-0", status: "RUNNING", deduplicated: true });
+  });
+});
+
+describe("executePollJob", () => {
+  beforeEach(() => {
+    prisma.$executeRawUnsafe.mockReset();
+    prisma.$executeRawUnsafe.mockResolvedValue(1);
+  });
+
+  it("exposes the job to checkpoints and stores the summary", async () => {
+    const recorded = await executePollJob(job, "worker-a", 120, async () => {
+      expect(currentPollJob()).toEqual(job);
+      await pollJobCheckpoint({ stage: "poll_products", productsTotal: 20, productsDone: 0 });
+      return { ok: true, processed: 20 };
+    });
+
+    expect(recorded).toBe(true);
+    const checkpoint = prisma.$executeRawUnsafe.mock.calls[0];
+    expect(checkpoint.slice(1)).toEqual(["job-1", "worker-a", "poll_products", 0, 20, 120]);
+    expect(finishCall()?.slice(1)).toEqual([
+      "job-1",
+      "worker-a",
+      "COMPLETED",
+      JSON.stringify({ ok: true, processed: 20 }),
+      null
+    ]);
+    expect(currentPollJob()).toBeNull();
+  });
+
+  it("marks the job failed when the poll throws", async () => {
+    await executePollJob(job, "worker-a", 120, async () => {
+      throw new Error("catalog sync exploded");
+    });
+
+    expect(finishCall()?.slice(3)).toEqual(["FAILED", null, "catalog sync exploded"]);
+  });
+
+  it("stops at the next checkpoint and leaves the job alone once the lease is lost", async () => {
+    prisma.$executeRawUnsafe.mockResolvedValue(0);
+    const afterCheckpoint = vi.fn();
+
+    const recorded = await executePollJob(job, "worker-a", 120, async () => {
+      await pollJobCheckpoint({ stage: "poll_products" });
+      afterCheckpoint();
+    });
+
+    expect(recorded).toBe(false);
+    expect(afterCheckpoint).not.toHaveBeenCalled();
+    expect(finishCall()).toBeUndefined();
+  });
+
+  it("ignores checkpoints outside a poll job", async () => {
+    await pollJobCheckpoint({ stage: "poll_products" });
+    expect(prisma.$executeRawUnsafe).not.toHaveBeenCalled();
+  });
+});
@@ -0,0 +1,66 @@
+import { describe, expect, it, vi } from "vitest";
+import { classifyTier, planPollTick, type PollSignals } from "@/lib/jobs/poll-schedule";
+
+vi.mock("@/lib/db/prisma", () => ({
+  prisma: {}
+}));
+
+const NOW = Date.parse("2026-03-10T12:00:00Z");
+
+const signals = (overrides: Partial<PollSignals> = {}): PollSignals => ({
+  lastCheckedAt: new Date(NOW - 5 * 60_000),
+  lastStatus: "WIN",
+  lastCompetitorCount: 0,
+  priceLevels: 1,
+  recentAlerts: 0,
+  unitsSold: 0,
+  ...overrides
+});
+
+describe("classifyTier", () => {
+  it("puts lost buyboxes, recent activity alerts and volatile prices in the hot tier", () => {
+    expect(classifyTier(signals({ lastStatus: "LOSE" }))).toBe("hot");
+    expect(classifyTier(signals({ recentAlerts: 1 }))).toBe("hot");
+    expect(classifyTier(signals({ priceLevels: 4 }))).toBe("hot");
+  });
+
+  it("puts stable uncontested listings without sales in the cold tier", () => {
+    expect(classifyTier(signals())).toBe("cold");
+    expect(classifyTier(signals({ unitsSold: 3 }))).toBe("warm");
+    expect(classifyTier(signals({ lastCompetitorCount: 2 }))).toBe("warm");
+    expect(classifyTier(signals({ lastStatus: null }))).toBe("warm");
+  });
+});
+
+describe("planPollTick", () => {
+  const products = ["hot", "warm", "cold", "new"].map((id) => ({ id }));
+
+  it("refreshes only due products, most urgent first, within the budget", () => {
+    const map = new Map<string, PollSignals>([
+      ["hot", signals({ lastStatus: "LOSE", lastCheckedAt: new Date(NOW - 10 * 60_000) })],
+      ["warm", signals({ unitsSold: 2, lastCheckedAt: new Date(NOW - 20 * 60_000) })],
+      ["cold", signals({ lastCheckedAt: new Date(NOW - 30 * 60_000) })]
+    ]);
+
+    const plan = planPollTick(products, map, 2, NOW);
+
+    expect(plan.selected.map((product) => product.id)).toEqual(["new", "hot"]);
+    expect(plan.deferred).toBe(1);
+    expect(plan.tiers.hot).toMatchObject({ products: 1, due: 1, refreshed: 1, deferred: 0 });
+    expect(plan.tiers.warm).toMatchObject({ products: 2, due: 2, refreshed: 1, deferred: 1, maxAgeMinutes: 20 });
+    expect(plan.tiers.cold).toMatchObject({ products: 1, due: 0, refreshed: 0, maxAgeMinutes: 30 });
+  });
+
+  it("treats a zero budget as no limit on due products", () => {
+    const map = new Map<string, PollSignals>([
+      ["hot", signals({ lastStatus: "LOSE", lastCheckedAt: new Date(NOW - 5 * 60_000) })],
+      ["warm", signals({ unitsSold: 2, lastCheckedAt: new Date(NOW - 5 * 60_000) })],
+      ["cold", signals({ lastCheckedAt: new Date(NOW - 61 * 60_000) })],
+      ["new", signals({ lastCheckedAt: new Date(NOW - 5 * 60_000) })]
+    ]);
+
+    const plan = planPollTick(products, map, 0, NOW);
+
+    expect(plan.selected.map((product) => product.id).sort()).toEqual(["cold", "hot"]);
+  });
+});
@@ -0,0 +1,80 @@
+import { beforeEach, describe, expect, it, vi } from "vitest";
+import { chunkPollItems, createPollRun, summarizePollBatches } from "@/lib/jobs/poll-shards";
+
+const { tx } = vi.hoisted(() => ({
+  tx: {
+    pollRun: { findFirst: vi.fn(), create: vi.fn(), updateMany: vi.fn() },
+    pollBatch: { findMany: vi.fn(), createMany: vi.fn(), updateMany: vi.fn() }
+  }
+}));
+
+vi.mock("@/lib/db/prisma", () => ({
+  prisma: { $transaction: (fn: (client: typeof tx) => unknown) => fn(tx) }
+}));
+
+describe("chunkPollItems", () => {
+  it("splits items into ordered batches of the requested size", () => {
+    const items = ["a", "b", "c", "d", "e"].map((productId) => ({ productId }));
+
+    expect(chunkPollItems(items, 2).map((batch) => batch.map((item) => item.productId))).toEqual([
+      ["a", "b"],
+      ["c", "d"],
+      ["e"]
+    ]);
+    expect(chunkPollItems([], 2)).toEqual([]);
+  });
+});
+
+describe("summarizePollBatches", () => {
+  it("adds up finished batches and lists the workers that took part", () => {
+    const summary = summarizePollBatches([
+      {
+        status: "DONE",
+        leasedBy: "host-b:2",
+        resultJson: { processed: 48, alertsCreated: 3, skipped: 2, errors: [{ sku: "S1", message: "boom" }] }
+      },
+      { status: "DONE", leasedBy: "host-a:1", resultJson: { processed: 50, alertsCreated: 1, skipped: 0, errors: [] } },
+      { status: "FAILED", leasedBy: "host-c:3", resultJson: { error: "worker died" } },
+      { status: "CANCELLED", leasedBy: null, resultJson: null }
+    ]);
+
+    expect(summary).toEqual({
+      batches: { done: 2, failed: 1, cancelled: 1 },
+      processed: 98,
+      alertsCreated: 4,
+      skipped: 2,
+      errors: [{ sku: "S1", message: "boom" }],
+      workers: ["host-a:1", "host-b:2", "host-c:3"]
+    });
+  });
+});
+
+describe("createPollRun", () => {
+  beforeEach(() => {
+    vi.clearAllMocks();
+    tx.pollRun.create.mockImplementation(async ({ data }: { data: object }) => ({ id: "run-2", ...data }));
+    tx.pollBatch.findMany.mockResolvedValue([]);
+  });
+
+  it("lets a run with unleased batches finish instead of planning a new one", async () => {
+    tx.pollRun.findFirst.mockResolvedValue({ id: "run-1", status: "RUNNING" });
+
+    const run = await createPollRun([{ productId: "a" }], 10, "poll");
+
+    expect(run.id).toBe("run-1");
+    expect(tx.pollRun.create).not.toHaveBeenCalled();
+    expect(tx.pollRun.updateMany).not.toHaveBeenCalled();
+    expect(tx.pollBatch.updateMany).not.toHaveBeenCalled();
+  });
+
+  it("leaves out products whose batches are still leased", async () => {
+    tx.pollRun.findFirst.mockResolvedValue(null);
+    tx.pollBatch.findMany.mockResolvedValue([{ items: [{ productId: "b" }] }]);
+
+    await createPollRun(["a", "b", "c"].map((productId) => ({ productId })), 10, "poll");
+
+    expect(tx.pollRun.create.mock.calls[0][0].data).toMatchObject({ status: "RUNNING", totalProducts: 2, totalBatches: 1 });
+    expect(tx.pollBatch.createMany.mock.calls[0][0].data[0].items).toEqual([{ productId: "a" }, { productId: "c" }]);
+    expect(tx.pollRun.updateMany).not.toHaveBeenCalled();
+  });
+});
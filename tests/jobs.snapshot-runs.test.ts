@@ -0,0 +1,50 @@
+import { describe, expect, it } from "vitest";
+import { canExtendSnapshot, expandSnapshotRuns, type SnapshotValues } from "@/lib/jobs/snapshot-runs";
+
+const NOW = Date.parse("2026-03-16T12:00:00Z");
+
+const values: SnapshotValues = {
+  ourPrice: 99.9,
+  competitorMinPrice: 101.5,
+  competitorCount: 3,
+  buyboxStatus: "WIN",
+  buyboxSellerId: "1111632"
+};
+
+const stored = (minutesAgo: number) => ({
+  checkedAt: new Date(NOW - minutesAgo * 60_000),
+  ourPrice: "99.9",
+  competitorMinPrice: "101.5",
+  competitorCount: 3,
+  buyboxStatus: "WIN" as const,
+  buyboxSellerId: "1111632"
+});
+
+describe("canExtendSnapshot", () => {
+  it("extends the latest row while every tracked field is unchanged", () => {
+    expect(canExtendSnapshot(stored(30), values, 60, NOW)).toBe(true);
+  });
+
+  it("starts a new row on any change, without a previous row, or once the heartbeat is due", () => {
+    expect(canExtendSnapshot(stored(30), { ...values, competitorMinPrice: 100 }, 60, NOW)).toBe(false);
+    expect(canExtendSnapshot(stored(30), { ...values, competitorCount: 4 }, 60, NOW)).toBe(false);
+    expect(canExtendSnapshot(stored(30), { ...values, buyboxStatus: "LOSE" }, 60, NOW)).toBe(false);
+    expect(canExtendSnapshot(null, values, 60, NOW)).toBe(false);
+    expect(canExtendSnapshot(stored(60), values, 60, NOW)).toBe(false);
+  });
+});
+
+describe("expandSnapshotRuns", () => {
+  it("emits both ends of an extended run and single points for one-off rows", () => {
+    const rows = [
+      { id: "b", checkedAt: new Date(NOW - 10 * 60_000), lastSeenAt: new Date(NOW) },
+      { id: "a", checkedAt: new Date(NOW - 20 * 60_000), lastSeenAt: new Date(NOW - 20 * 60_000) }
+    ];
+
+    expect(expandSnapshotRuns(rows).map((point) => [point.id, point.checkedAt.getTime()])).toEqual([
+      ["b", NOW],
+      ["b", NOW - 10 * 60_000],
+      ["a", NOW - 20 * 60_000]
+    ]);
+  });
+});
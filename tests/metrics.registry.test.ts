@@ -0,0 +1,94 @@
+import { beforeEach, describe, expect, it, vi } from "vitest";
+
+const { jobRunCreate } = vi.hoisted(() => ({
+  jobRunCreate: vi.fn(async () => ({}))
+}));
+
+vi.mock("@/lib/db/prisma", () => ({
+  prisma: { jobRun: { create: jobRunCreate } }
+}));
+
+import { addStageRows, timeStage, withJobRun } from "@/lib/jobs/job-run";
+import { MetricsRegistry, httpRequestDuration, metrics, renderGauge } from "@/lib/metrics/registry";
+
+describe("MetricsRegistry", () => {
+  it("renders counters and cumulative histogram buckets in the Prometheus text format", () => {
+    const registry = new MetricsRegistry();
+    const counter = registry.counter("test_total", "Test counter.");
+    const histogram = registry.histogram("test_seconds", "Test histogram.", [0.1, 1]);
+
+    counter.inc({ family: "products" });
+    counter.inc({ family: "products" }, 2);
+    histogram.observe({ family: "buybox" }, 0.05);
+    histogram.observe({ family: "buybox" }, 0.5);
+
+    const text = registry.render();
+    expect(text).toContain("# TYPE test_total counter");
+    expect(text).toContain('test_total{family="products"} 3');
+    expect(text).toContain('test_seconds_bucket{family="buybox",le="0.1"} 1');
+    expect(text).toContain('test_seconds_bucket{family="buybox",le="1"} 2');
+    expect(text).toContain('test_seconds_bucket{family="buybox",le="+Inf"} 2');
+    expect(text).toContain('test_seconds_count{family="buybox"} 2');
+  });
+
+  it("returns the same metric for repeated registrations and sums totals by label", () => {
+    const registry = new MetricsRegistry();
+    const histogram = registry.histogram("latency_seconds", "Latency.");
+    expect(registry.histogram("latency_seconds", "Latency.")).toBe(histogram);
+
+    histogram.observe({ family: "products", status: "200" }, 0.2);
+    histogram.observe({ family: "products", status: "429" }, 0.1);
+
+    const totals = histogram.totalsBy("family");
+    expect(totals.products.count).toBe(2);
+    expect(totals.products.sum).toBeCloseTo(0.3);
+  });
+
+  it("escapes label values in gauges", () => {
+    expect(renderGauge("g", "Gauge.", [{ labels: { name: 'a"b' }, value: 1 }])).toContain('g{name="a\\"b"} 1');
+  });
+});
+
+describe("withJobRun", () => {
+  beforeEach(() => {
+    metrics.reset();
+    jobRunCreate.mockClear();
+    vi.spyOn(console, "log").mockImplementation(() => undefined);
+  });
+
+  it("records stage timings, rows and HTTP deltas and persists the run", async () => {
+    httpRequestDuration.observe({ family: "products", status: "200" }, 1);
+
+    const result = await withJobRun("poll", async (run) => {
+      await timeStage("catalog_pages", async () => {
+        httpRequestDuration.observe({ family: "products", status: "200" }, 0.25);
+      });
+      await timeStage("catalog_pages", async () => undefined);
+      addStageRows("catalog_pages", 50);
+      return { ok: true, stages: run.getStages() };
+    });
+
+    expect(result.stages.catalog_pages).toMatchObject({ calls: 2, rows: 50 });
+    expect(jobRunCreate).toHaveBeenCalledTimes(1);
+
+    const { data } = (jobRunCreate.mock.calls[0] as unknown as [{ data: any }])[0];
+    expect(data).toMatchObject({ job: "poll", status: "ok", error: null });
+    expect(data.countersJson.http).toEqual({ products: { requests: 1, totalMs: 250 } });
+  });
+
+  it("records failed runs and rethrows", async () => {
+    await expect(
+      withJobRun("shipment_sync", async () => {
+        throw new Error("boom");
+      })
+    ).rejects.toThrow("boom");
+
+    const { data } = (jobRunCreate.mock.calls[0] as unknown as [{ data: any }])[0];
+    expect(data).toMatchObject({ job: "shipment_sync", status: "error", error: "boom" });
+  });
+
+  it("runs stages untimed outside a job run", async () => {
+    await expect(timeStage("orphan", async () => 42)).resolves.toBe(42);
+    expect(jobRunCreate).not.toHaveBeenCalled();
+  });
+});
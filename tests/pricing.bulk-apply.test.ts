@@ -0,0 +1,154 @@
+import { beforeEach, describe, expect, it, vi } from "vitest";
+import type { EffectiveProductSettings } from "@/lib/pricing/types";
+import type { ProductsSuggestBatchEvent } from "@/lib/table/products-batch";
+
+const { db, updatePrices, refreshSnapshotForProduct, publishProductChanges } = vi.hoisted(() => ({
+  db: {
+    product: { findMany: vi.fn() },
+    priceChangeLog: { createMany: vi.fn(async () => ({ count: 0 })) }
+  },
+  updatePrices: vi.fn(),
+  refreshSnapshotForProduct: vi.fn(async () => ({})),
+  publishProductChanges: vi.fn(async () => {})
+}));
+
+const settings: EffectiveProductSettings = {
+  costPrice: 40,
+  feePercent: 0.1,
+  commissionRate: 0.1,
+  serviceFeeType: "PERCENT",
+  serviceFeeValue: 0,
+  shippingCost: 3,
+  handlingCost: 0,
+  vatRate: 15,
+  vatMode: "INCLUSIVE",
+  minProfitType: "SAR",
+  minProfitValue: 0,
+  undercutStep: 1,
+  alertThresholdSar: 2,
+  alertThresholdPct: 1,
+  cooldownMinutes: 15,
+  competitorDropPct: 3
+};
+
+vi.mock("@/lib/db/prisma", () => ({
+  prisma: db
+}));
+
+vi.mock("@/lib/trendyol/client", () => ({
+  trendyolClient: { updatePrices },
+  trendyolErrorStatus: (error: Error) => Number(/^Trendyol API (\d{3})/.exec(error.message)?.[1]) || null
+}));
+
+vi.mock("@/lib/jobs/poll-products", () => ({
+  refreshSnapshotForProduct
+}));
+
+vi.mock("@/lib/dashboard/product-changes", () => ({
+  publishProductChanges
+}));
+
+const { getOrCreateGlobalSettings, getEffectiveSettingsForProduct } = vi.hoisted(() => ({
+  getOrCreateGlobalSettings: vi.fn(async () => ({ id: "global" })),
+  getEffectiveSettingsForProduct: vi.fn()
+}));
+
+vi.mock("@/lib/pricing/effective-settings", () => ({
+  getOrCreateGlobalSettings,
+  getEffectiveSettingsForProduct,
+  mergeSettings: (_global: unknown, row: { costPrice: number }) => ({ ...settings, costPrice: row.costPrice })
+}));
+
+import { PRICE_UPDATE_BATCH_SIZE, planSuggestedPrice, runBulkPriceApply } from "@/lib/pricing/bulk-apply";
+
+const product = (id: string, competitorMinPrice: number | null = 120) => ({
+  id,
+  sku: `SKU-${id}`,
+  barcode: `bc-${id}`,
+  title: `Title ${id}`,
+  trendyolProductId: null,
+  active: true,
+  settings: { productId: id, costPrice: id === "no-cost" ? 0 : settings.costPrice, minPrice: null },
+  snapshots: [{ ourPrice: 130, competitorMinPrice }]
+});
+
+describe("planSuggestedPrice", () => {
+  it("undercuts the competitor without going under the no-loss floor", () => {
+    expect(planSuggestedPrice({ sku: "A", ourPrice: 130, competitorMin: 120, settings, minPrice: 0 })).toMatchObject({
+      ok: true,
+      price: 119
+    });
+    // Cost 40 + 10% commission + 15% VAT on cost + 3 shipping.
+    expect(planSuggestedPrice({ sku: "A", ourPrice: 130, competitorMin: 50, settings, minPrice: 0 })).toMatchObject({
+      ok: true,
+      price: 53,
+      enforcedFloor: 53
+    });
+    expect(
+      planSuggestedPrice({ sku: "A", ourPrice: 130, competitorMin: 120, settings: { ...settings, costPrice: 0 }, minPrice: 0 })
+    ).toMatchObject({ status: 400 });
+    expect(planSuggestedPrice({ sku: "A", ourPrice: 130, competitorMin: null, settings, minPrice: 0 })).toEqual({
+      error: "No suggested price available",
+      status: 400
+    });
+  });
+});
+
+describe("runBulkPriceApply", () => {
+  beforeEach(() => {
+    vi.clearAllMocks();
+  });
+
+  it("submits accepted prices in batches and reports per-item failures", async () => {
+    const ids = Array.from({ length: PRICE_UPDATE_BATCH_SIZE + 2 }, (_, index) => `p${index}`);
+    db.product.findMany.mockResolvedValue([...ids.map((id) => product(id)), product("no-cost"), product("no-data", null)]);
+    updatePrices.mockResolvedValue({ accepted: true, raw: { batchRequestId: "b1" } });
+    const events: ProductsSuggestBatchEvent[] = [];
+
+    const result = await runBulkPriceApply([...ids, "no-cost", "no-data", "missing", "p0"], (event) => {
+      events.push(event);
+    });
+
+    // Settings come from the loaded rows and one global settings read.
+    expect(getOrCreateGlobalSettings).toHaveBeenCalledTimes(1);
+    expect(getEffectiveSettingsForProduct).not.toHaveBeenCalled();
+    expect(updatePrices).toHaveBeenCalledTimes(2);
+    expect(updatePrices.mock.calls[0][0]).toHaveLength(PRICE_UPDATE_BATCH_SIZE);
+    expect(updatePrices.mock.calls[1][0]).toEqual([
+      { reference: `bc-p${PRICE_UPDATE_BATCH_SIZE}`, price: 119 },
+      { reference: `bc-p${PRICE_UPDATE_BATCH_SIZE + 1}`, price: 119 }
+    ]);
+    expect(db.priceChangeLog.createMany).toHaveBeenCalledTimes(2);
+    expect(refreshSnapshotForProduct).toHaveBeenCalledTimes(ids.length);
+    expect(publishProductChanges).toHaveBeenLastCalledWith("price_change", [
+      `p${PRICE_UPDATE_BATCH_SIZE}`,
+      `p${PRICE_UPDATE_BATCH_SIZE + 1}`
+    ]);
+
+    expect(result).toEqual({ total: ids.length + 3, completed: ids.length + 3, succeeded: ids.length, failed: 3 });
+    expect(
+      events.filter((event) => event.type === "failure").map((event) => "productId" in event && event.productId)
+    ).toEqual(["no-cost", "no-data", "missing"]);
+    expect(events.at(-1)).toEqual({ type: "done", ...result });
+  });
+
+  it("fails only the items of a rejected batch", async () => {
+    const ids = Array.from({ length: PRICE_UPDATE_BATCH_SIZE + 1 }, (_, index) => `p${index}`);
+    db.product.findMany.mockResolvedValue(ids.map((id) => product(id)));
+    updatePrices
+      .mockRejectedValueOnce(new Error("Trendyol API 503: unavailable"))
+      .mockResolvedValueOnce({ accepted: true, raw: {} });
+    const failures: ProductsSuggestBatchEvent[] = [];
+
+    const result = await runBulkPriceApply(ids, (event) => {
+      if (event.type === "failure") {
+        failures.push(event);
+      }
+    });
+
+    expect(result.succeeded).toBe(1);
+    expect(result.failed).toBe(PRICE_UPDATE_BATCH_SIZE);
+    expect(failures[0]).toMatchObject({ productId: "p0", status: 503, error: "Trendyol API 503: unavailable" });
+    expect(db.priceChangeLog.createMany).toHaveBeenCalledTimes(1);
+  });
+});
@@ -0,0 +1,36 @@
+import { describe, expect, it, vi } from "vitest";
+import { MAX_HISTORY_POINTS, resolveHistoryWindow } from "@/lib/pricing/price-history";
+
+vi.mock("@/lib/db/prisma", () => ({
+  prisma: {}
+}));
+
+const NOW = Date.parse("2026-03-20T12:00:00Z");
+
+describe("resolveHistoryWindow", () => {
+  it("defaults to the last 7 days in 200 buckets", () => {
+    const window = resolveHistoryWindow({}, NOW);
+
+    expect(window.to.getTime()).toBe(NOW);
+    expect(window.from.getTime()).toBe(NOW - 7 * 86_400_000);
+    expect(window.buckets).toBe(200);
+    expect(window.bucketSeconds).toBeCloseTo((7 * 86_400) / 200);
+  });
+
+  it("caps the bucket count whatever range or point count is requested", () => {
+    const year = resolveHistoryWindow({ range: "365d", points: "100000" }, NOW);
+    expect(year.buckets).toBe(MAX_HISTORY_POINTS);
+
+    // An hour never splits finer than one 5-minute poll interval.
+    const hour = resolveHistoryWindow({ from: "2026-03-20T11:00:00Z", to: "2026-03-20T12:00:00Z" }, NOW);
+    expect(hour.buckets).toBe(12);
+    expect(hour.bucketSeconds).toBe(300);
+  });
+
+  it("falls back to the preset range for invalid or inverted bounds", () => {
+    const window = resolveHistoryWindow({ from: "2026-03-21T00:00:00Z", to: "not-a-date", range: "24h" }, NOW);
+
+    expect(window.to.getTime()).toBe(NOW);
+    expect(window.from.getTime()).toBe(NOW - 24 * 3_600_000);
+  });
+});
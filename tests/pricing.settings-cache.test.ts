@@ -0,0 +1,151 @@
+import { beforeEach, describe, expect, it, vi } from "vitest";
+import { getEffectiveSettingsForProduct, getOrCreateGlobalSettings } from "@/lib/pricing/effective-settings";
+import {
+  getSettingsCacheStats,
+  invalidateGlobalSettingsCache,
+  invalidateProductSettingsCache,
+  resetSettingsCache
+} from "@/lib/pricing/settings-cache";
+
+const { globalFindFirstMock, productSettingsFindUniqueMock } = vi.hoisted(() => ({
+  globalFindFirstMock: vi.fn(),
+  productSettingsFindUniqueMock: vi.fn()
+}));
+
+vi.mock("@/lib/db/prisma", () => ({
+  prisma: {
+    globalSettings: {
+      findFirst: globalFindFirstMock,
+      create: vi.fn()
+    },
+    productSettings: {
+      findUnique: productSettingsFindUniqueMock,
+      create: vi.fn()
+    }
+  }
+}));
+
+const globalRow = (overrides: Record<string, unknown> = {}) => ({
+  id: "global",
+  currency: "SAR",
+  commissionRate: 0.15,
+  serviceFeeType: "PERCENT",
+  serviceFeeValue: 0,
+  shippingCost: 12,
+  handlingCost: 0,
+  vatRate: 15,
+  vatMode: "INCLUSIVE",
+  minProfitType: "SAR",
+  minProfitValue: 5,
+  undercutStep: 0.5,
+  alertThresholdSar: 2,
+  alertThresholdPct: 1,
+  cooldownMinutes: 15,
+  competitorDropPct: 3,
+  createdAt: new Date(),
+  updatedAt: new Date(),
+  ...overrides
+});
+
+const productRow = (overrides: Record<string, unknown> = {}) => ({
+  id: "ps-1",
+  productId: "p1",
+  costPrice: 80,
+  commissionRate: null,
+  minProfitType: null,
+  minProfitValue: null,
+  undercutStep: null,
+  alertThresholdSar: null,
+  alertThresholdPct: null,
+  cooldownMinutes: null,
+  competitorDropPct: null,
+  ...overrides
+});
+
+describe("settings cache", () => {
+  beforeEach(() => {
+    vi.clearAllMocks();
+    resetSettingsCache();
+    globalFindFirstMock.mockResolvedValue(globalRow());
+    productSettingsFindUniqueMock.mockResolvedValue(productRow());
+  });
+
+  it("loads global settings once across calls", async () => {
+    await getOrCreateGlobalSettings();
+    await getOrCreateGlobalSettings();
+    await getEffectiveSettingsForProduct("p1");
+
+    expect(globalFindFirstMock).toHaveBeenCalledTimes(1);
+  });
+
+  it("memoises merged settings per product", async () => {
+    const first = await getEffectiveSettingsForProduct("p1");
+    const second = await getEffectiveSettingsForProduct("p1");
+
+    expect(second).toBe(first);
+    expect(first.costPrice).toBe(80);
+    expect(first.shippingCost).toBe(12);
+    expect(productSettingsFindUniqueMock).toHaveBeenCalledTimes(1);
+    expect(getSettingsCacheStats().hits).toBeGreaterThan(0);
+  });
+
+  it("skips the product query when the settings row is already loaded", async () => {
+    const merged = await getEffectiveSettingsForProduct("p1", productRow({ costPrice: 42 }) as never);
+
+    expect(merged.costPrice).toBe(42);
+    expect(productSettingsFindUniqueMock).not.toHaveBeenCalled();
+  });
+
+  it("prefers a passed settings row over a stale cached entry", async () => {
+    await getEffectiveSettingsForProduct("p1");
+
+    const merged = await getEffectiveSettingsForProduct("p1", productRow({ costPrice: 64 }) as never);
+
+    expect(merged.costPrice).toBe(64);
+    expect(merged.shippingCost).toBe(12);
+    expect(globalFindFirstMock).toHaveBeenCalledTimes(1);
+  });
+
+  it("reloads a product after product-level invalidation", async () => {
+    await getEffectiveSettingsForProduct("p1");
+    productSettingsFindUniqueMock.mockResolvedValue(productRow({ costPrice: 95 }));
+    invalidateProductSettingsCache("p1");
+
+    const merged = await getEffectiveSettingsForProduct("p1");
+
+    expect(merged.costPrice).toBe(95);
+    expect(productSettingsFindUniqueMock).toHaveBeenCalledTimes(2);
+    expect(globalFindFirstMock).toHaveBeenCalledTimes(1);
+  });
+
+  it("drops every merged entry when global settings change", async () => {
+    await getEffectiveSettingsForProduct("p1");
+    globalFindFirstMock.mockResolvedValue(globalRow({ shippingCost: 20 }));
+    invalidateGlobalSettingsCache();
+
+    const merged = await getEffectiveSettingsForProduct("p1");
+
+    expect(merged.shippingCost).toBe(20);
+    expect(globalFindFirstMock).toHaveBeenCalledTimes(2);
+  });
+
+  it("does not cache a read that raced with an invalidation", async () => {
+    let release: (value: unknown) => void = () => undefined;
+    productSettingsFindUniqueMock.mockImplementationOnce(
+      () => new Promise((resolve) => {
+        release = () => resolve(productRow({ costPrice: 10 }));
+      })
+    );
+
+    const pending = getEffectiveSettingsForProduct("p1");
+    await Promise.resolve();
+    invalidateProductSettingsCache("p1");
+    release(undefined);
+    await pending;
+
+    productSettingsFindUniqueMock.mockResolvedValue(productRow({ costPrice: 99 }));
+    const merged = await getEffectiveSettingsForProduct("p1");
+
+    expect(merged.costPrice).toBe(99);
+  });
+});
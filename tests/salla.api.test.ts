@@ -146,6 +146,7 @@ describe("salla api routes", () => {
       skipped: 1,
       dryRun: false,
       persist: true,
+      source: "mirror",
       errors: []
     });
 
@@ -0,0 +1,91 @@
+import { describe, expect, it } from "vitest";
+import { SallaMatchIndex } from "@/lib/salla/match-index";
+import { pickBestNameMatch } from "@/lib/salla/matcher";
+import type { SallaMirrorRecord } from "@/lib/salla/types";
+
+const record = (overrides: Partial<SallaMirrorRecord> = {}): SallaMirrorRecord => ({
+  id: "1",
+  sku: "SKU-1",
+  barcode: null,
+  name: "Apple iPhone 15 Pro Max 256GB",
+  quantity: 12,
+  preTaxPrice: 4500,
+  costPrice: 4200,
+  raw: {},
+  ...overrides
+});
+
+const index = new SallaMatchIndex([
+  record({ id: "1", sku: "IP15PM-256", name: "Apple iPhone 15 Pro Max 256GB" }),
+  record({ id: "2", sku: "CASE-1", barcode: "8690000000017", name: "iPhone 15 Pro Case" }),
+  record({ id: "3", sku: "S24-1", name: "Samsung Galaxy S24" }),
+  record({ id: "4", sku: "HOME-1", name: "Garden Hose" })
+]);
+
+describe("salla match index", () => {
+  it("matches exact SKU case-insensitively", () => {
+    const result = index.match({ sku: " ip15pm-256 ", name: "anything" });
+
+    expect(result.matched).toBe(true);
+    expect(result.method).toBe("SKU");
+    expect(result.product?.id).toBe("1");
+  });
+
+  it("matches a Trendyol barcode against Salla barcode or SKU", () => {
+    expect(index.match({ sku: "TY-1", barcode: "8690000000017" }).product?.id).toBe("2");
+    expect(index.match({ sku: "TY-2", barcode: "S24-1" }).product?.id).toBe("3");
+  });
+
+  it("falls back to name matching over token candidates only", () => {
+    expect(index.candidatesForName("iPhone 15 Pro Max 256").map((item) => item.id).sort()).toEqual(["1", "2"]);
+
+    const result = index.match({ sku: "MISSING", name: "iPhone 15 Pro Max 256" });
+    expect(result.matched).toBe(true);
+    expect(result.method).toBe("NAME");
+    expect(result.product?.id).toBe("1");
+  });
+
+  it("reports no candidates when no token is shared", () => {
+    const result = index.match({ name: "Running Shoes Nike" });
+
+    expect(result.matched).toBe(false);
+    expect(result.reason).toBe("NO_CANDIDATES");
+  });
+
+  it("rejects low-confidence name matches", () => {
+    const result = index.match({ name: "Garden Chair Set Wooden Outdoor" });
+
+    expect(result.matched).toBe(false);
+    expect(result.reason).toBe("NO_CONFIDENT_MATCH");
+    expect(result.candidates[0]?.id).toBe("4");
+  });
+
+  it("matches a whole batch in one call", () => {
+    const results = index.matchMany([
+      { sku: "CASE-1" },
+      { name: "Samsung Galaxy S24" },
+      { name: "Running Shoes Nike" }
+    ]);
+
+    expect(results.map((result) => result.product?.id ?? null)).toEqual(["2", "3", null]);
+  });
+
+  it("retrieves by rare tokens and agrees with the brute-force scorer", () => {
+    const catalog: SallaMirrorRecord[] = [];
+    for (let i = 0; i < 400; i += 1) {
+      catalog.push(record({ id: `gen-${i}`, sku: `GEN-${i}`, name: `Generic Cable Model X${i} Black` }));
+    }
+    catalog.push(record({ id: "target", sku: "T-1", name: "Generic Cable Model Z900 White" }));
+    const large = new SallaMatchIndex(catalog);
+
+    const candidates = large.candidatesForName("Cable Z900 White");
+    expect(candidates.length).toBeLessThan(10);
+
+    const query = "Generic Cable Model Z900 White edition";
+    const brute = pickBestNameMatch(catalog, query, 0.6);
+    const indexed = large.match({ name: query });
+
+    expect(indexed.product?.id).toBe("target");
+    expect(indexed.score).toBe(brute?.score);
+  });
+});
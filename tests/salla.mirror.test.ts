@@ -0,0 +1,86 @@
+import { beforeEach, describe, expect, it, vi } from "vitest";
+import { refreshSallaMirror } from "@/lib/salla/mirror";
+import { sallaClient } from "@/lib/salla/client";
+
+const { findManyMock, createManyMock, updateManyMock, deleteManyMock } = vi.hoisted(() => ({
+  findManyMock: vi.fn(),
+  createManyMock: vi.fn(),
+  updateManyMock: vi.fn(),
+  deleteManyMock: vi.fn()
+}));
+
+vi.mock("@/lib/db/prisma", () => ({
+  prisma: {
+    sallaProduct: {
+      findMany: findManyMock,
+      createMany: createManyMock,
+      updateMany: updateManyMock,
+      deleteMany: deleteManyMock,
+      update: vi.fn()
+    },
+    $transaction: vi.fn()
+  }
+}));
+
+vi.mock("@/lib/salla/client", () => ({
+  sallaClient: { fetchProductsPage: vi.fn() },
+  extractSallaBarcode: vi.fn(() => null)
+}));
+
+const product = (id: number) => ({
+  id: `salla-${id}`,
+  sku: `SKU-${id}`,
+  name: `Product ${id}`,
+  quantity: 1,
+  preTaxPrice: 10,
+  costPrice: null,
+  raw: { id }
+});
+
+const page = (ids: number[], rowCount: number, perPage = 3) => ({
+  products: ids.map(product),
+  rowCount,
+  perPage,
+  totalPages: null
+});
+
+describe("refreshSallaMirror", () => {
+  beforeEach(() => {
+    vi.clearAllMocks();
+    findManyMock.mockResolvedValue([]);
+    createManyMock.mockImplementation(async ({ data }: { data: unknown[] }) => ({ count: data.length }));
+    deleteManyMock.mockResolvedValue({ count: 0 });
+  });
+
+  it("keeps paging past a full page with an unmappable row", async () => {
+    vi.mocked(sallaClient.fetchProductsPage)
+      .mockResolvedValueOnce(page([1, 2], 3))
+      .mockResolvedValueOnce(page([4], 1));
+
+    const summary = await refreshSallaMirror({ pageSize: 3 });
+
+    expect(sallaClient.fetchProductsPage).toHaveBeenCalledTimes(2);
+    expect(summary).toMatchObject({ pagesFetched: 2, seen: 3, created: 3, complete: true });
+    expect(deleteManyMock).toHaveBeenCalledTimes(1);
+  });
+
+  it("does not prune when the page limit stops the pass", async () => {
+    vi.mocked(sallaClient.fetchProductsPage).mockResolvedValue(page([], 3));
+
+    const summary = await refreshSallaMirror({ pageSize: 3, maxPages: 2 });
+
+    expect(summary.complete).toBe(false);
+    expect(deleteManyMock).not.toHaveBeenCalled();
+  });
+
+  it("uses the clamped page size the client requested", async () => {
+    vi.mocked(sallaClient.fetchProductsPage)
+      .mockResolvedValueOnce(page([1, 2, 3], 3, 3))
+      .mockResolvedValueOnce(page([], 0, 3));
+
+    const summary = await refreshSallaMirror({ pageSize: 500 });
+
+    expect(sallaClient.fetchProductsPage).toHaveBeenCalledTimes(2);
+    expect(summary.complete).toBe(true);
+  });
+});
@@ -1,6 +1,8 @@
 import { beforeEach, describe, expect, it, vi } from "vitest";
-import { runSallaBatchSync, runSingleSallaMatch } from "@/lib/salla/sync";
+import { UNMATCHED_BATCH_LIMIT, runSallaBatchSync, runSingleSallaMatch } from "@/lib/salla/sync";
 import { matchSallaProduct } from "@/lib/salla/matcher";
+import { SallaMatchIndex } from "@/lib/salla/match-index";
+import { ensureFreshSallaMirror, loadSallaMatchIndex } from "@/lib/salla/mirror";
 import { prisma } from "@/lib/db/prisma";
 
 const { productSettingsUpsertMock, productFindUniqueMock, productFindManyMock, productUpdateMock } = vi.hoisted(() => {
@@ -25,10 +27,16 @@ vi.mock("@/lib/db/prisma", () => ({
   }
 }));
 
-vi.mock("@/lib/salla/matcher", () => ({
+vi.mock("@/lib/salla/matcher", async (importOriginal) => ({
+  ...(await importOriginal<typeof import("@/lib/salla/matcher")>()),
   matchSallaProduct: vi.fn()
 }));
 
+vi.mock("@/lib/salla/mirror", () => ({
+  ensureFreshSallaMirror: vi.fn(),
+  loadSallaMatchIndex: vi.fn()
+}));
+
 describe("salla sync", () => {
   beforeEach(() => {
     vi.clearAllMocks();
@@ -146,7 +154,8 @@ describe("salla sync", () => {
       limit: 10,
       offset: 0,
       persist: true,
-      dryRun: true
+      dryRun: true,
+      source: "api"
     });
 
     expect(summary.total).toBe(2);
@@ -160,4 +169,71 @@ describe("salla sync", () => {
       })
     );
   });
+
+  it("matches unmatched products a page at a time and reports where to continue", async () => {
+    productFindManyMock.mockResolvedValue([]);
+    await runSallaBatchSync({ unmatchedOnly: true, limit: 20000, source: "api" });
+    expect(productFindManyMock).toHaveBeenLastCalledWith(
+      expect.objectContaining({ take: UNMATCHED_BATCH_LIMIT, where: { active: true, sallaLastSyncedAt: null } })
+    );
+
+    productFindManyMock.mockResolvedValue([
+      { id: "p1", sku: "SKU-1", title: "Product One" },
+      { id: "p2", sku: "SKU-2", title: "Product Two" }
+    ]);
+    vi.mocked(matchSallaProduct).mockResolvedValue({
+      matched: false,
+      method: null,
+      score: null,
+      reason: "NO_CANDIDATES",
+      product: null,
+      candidates: []
+    });
+
+    const summary = await runSallaBatchSync({ unmatchedOnly: true, limit: 2, offset: 4, source: "api" });
+
+    expect(summary.nextOffset).toBe(6);
+  });
+
+  it("matches against the local mirror index without per-product API calls", async () => {
+    productFindManyMock.mockResolvedValue([
+      { id: "p1", sku: "TY-1", barcode: "8690001", title: "Xiaomi Router AX1500 WiFi 6" },
+      { id: "p2", sku: "SKU-2", barcode: null, title: "Apple iPhone 15 Pro Max 256GB" },
+      { id: "p3", sku: "SKU-3", barcode: null, title: "Garden Hose" }
+    ]);
+
+    vi.mocked(ensureFreshSallaMirror).mockResolvedValue(null);
+    vi.mocked(loadSallaMatchIndex).mockResolvedValue(
+      new SallaMatchIndex([
+        {
+          id: "s1",
+          sku: "8690001",
+          barcode: null,
+          name: "Router",
+          quantity: 3,
+          preTaxPrice: 150,
+          costPrice: 120,
+          raw: {}
+        },
+        {
+          id: "s2",
+          sku: "IP15PM",
+          barcode: null,
+          name: "Apple iPhone 15 Pro Max 256GB",
+          quantity: 1,
+          preTaxPrice: 4500,
+          costPrice: 4200,
+          raw: {}
+        }
+      ])
+    );
+
+    const summary = await runSallaBatchSync({ limit: 10, dryRun: true });
+
+    expect(summary.source).toBe("mirror");
+    expect(summary.processed).toBe(3);
+    expect(summary.matched).toBe(2);
+    expect(summary.skipped).toBe(1);
+    expect(matchSallaProduct).not.toHaveBeenCalled();
+  });
 });
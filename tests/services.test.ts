@@ -41,7 +41,11 @@ vi.mock("@/lib/db/prisma", () => ({
         },
         priceSnapshot: {
             findMany: vi.fn().mockResolvedValue([]),
-        }
+        },
+        shipmentPackage: {
+            count: vi.fn().mockResolvedValue(0),
+        },
+        $queryRawUnsafe: vi.fn().mockResolvedValue([]),
     },
 }));
 
@@ -140,5 +144,30 @@ describe("ReturnService", () => {
             })
         );
         expect(result.totalSynced).toBe(1);
+        expect(result.source).toBe("api");
+    });
+
+    it("should derive returns from stored shipment packages without calling the API", async () => {
+        vi.mocked(prisma.shipmentPackage.count).mockResolvedValueOnce(12);
+        vi.mocked(prisma.$queryRawUnsafe).mockResolvedValueOnce([{ requests: 3, items: 5, itemsReplaced: 2 }]);
+
+        const result = await returnService.syncReturns(30);
+
+        expect(trendyolClient.fetchShipmentPackages).not.toHaveBeenCalled();
+        expect(prisma.returnRequest.upsert).not.toHaveBeenCalled();
+        const [, sellerId, packageNumbers, since] = vi.mocked(prisma.$queryRawUnsafe).mock.calls[0];
+        expect(sellerId).toBe("1001");
+        expect(packageNumbers).toBeNull();
+        expect(since).toBeInstanceOf(Date);
+        expect(result).toEqual({ totalSynced: 3, source: "shipment_packages" });
+    });
+
+    it("should skip the statement for an empty package list", async () => {
+        await expect(returnService.deriveReturnsFromPackages({ packageNumbers: [] })).resolves.toEqual({
+            requests: 0,
+            items: 0,
+            itemsReplaced: 0,
+        });
+        expect(prisma.$queryRawUnsafe).not.toHaveBeenCalled();
     });
 });
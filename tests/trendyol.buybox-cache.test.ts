@@ -0,0 +1,209 @@
+import { describe, expect, it, vi } from "vitest";
+import { BuyboxCache } from "@/lib/trendyol/buybox-cache";
+import { MemoryBuyboxQuarantine } from "@/lib/trendyol/buybox-quarantine";
+import { CircuitOpenError } from "@/lib/trendyol/circuit-breaker";
+import type { TrendyolCompetitorData } from "@/lib/trendyol/types";
+
+vi.mock("@/lib/db/prisma", () => ({
+  prisma: {}
+}));
+
+const parseEntry = (entry: any): TrendyolCompetitorData => ({
+  competitorMinPrice: entry.buyboxPrice,
+  competitorCount: entry.hasMultipleSeller ? 2 : 1,
+  buyboxSellerId: null,
+  buyboxStatus: entry.buyboxOrder === 1 ? "WIN" : "LOSE",
+  raw: entry
+});
+
+function buildCache(options: { ttlMs?: number; now?: () => number } = {}) {
+  const fetchBatch = vi.fn(async (barcodes: string[]) => ({
+    entries: barcodes
+      .filter((barcode) => !barcode.startsWith("missing"))
+      .map((barcode) => ({ barcode, buyboxPrice: 100, buyboxOrder: 1, hasMultipleSeller: true }))
+  }));
+
+  const cache = new BuyboxCache(fetchBatch, parseEntry, {
+    ttlMs: options.ttlMs ?? 60_000,
+    storeFrontCode: "SA",
+    windowMs: 1,
+    now: options.now
+  });
+
+  return { cache, fetchBatch };
+}
+
+describe("BuyboxCache", () => {
+  it("coalesces concurrent lookups for the same barcode into one request", async () => {
+    const { cache, fetchBatch } = buildCache();
+
+    const [first, second] = await Promise.all([
+      cache.fetchCompetitorPrices({ barcode: "111" }),
+      cache.fetchCompetitorPrices({ barcode: "111" })
+    ]);
+
+    expect(fetchBatch).toHaveBeenCalledTimes(1);
+    expect(fetchBatch).toHaveBeenCalledWith(["111"], { bisecting: false });
+    expect(first).toBe(second);
+    expect(first.buyboxStatus).toBe("WIN");
+    expect(cache.getStats()).toMatchObject({ misses: 1, coalesced: 1, batches: 1 });
+  });
+
+  it("groups misses into batches of at most 10 barcodes", async () => {
+    const { cache, fetchBatch } = buildCache();
+    const barcodes = Array.from({ length: 23 }, (_, i) => `bc-${i}`);
+
+    const found = await cache.getMany(barcodes);
+
+    expect(found.size).toBe(23);
+    expect(fetchBatch.mock.calls.map(([batch]) => batch.length)).toEqual([10, 10, 3]);
+  });
+
+  it("serves repeated lookups from the cache until the TTL expires", async () => {
+    let now = 0;
+    const { cache, fetchBatch } = buildCache({ ttlMs: 1000, now: () => now });
+
+    await cache.fetchCompetitorPrices({ barcode: "222" });
+    await cache.fetchCompetitorPrices({ barcode: "222" });
+    expect(fetchBatch).toHaveBeenCalledTimes(1);
+    expect(cache.getStats().hits).toBe(1);
+
+    now = 1500;
+    await cache.fetchCompetitorPrices({ barcode: "222" });
+    expect(fetchBatch).toHaveBeenCalledTimes(2);
+  });
+
+  it("answers from expired entries while the buybox circuit is open", async () => {
+    let now = 0;
+    const fetchBatch = vi
+      .fn()
+      .mockResolvedValueOnce({ entries: [{ barcode: "555", buyboxPrice: 80, buyboxOrder: 1 }] })
+      .mockRejectedValue(new CircuitOpenError("buybox", 30_000));
+    const cache = new BuyboxCache(fetchBatch, parseEntry, { ttlMs: 1000, windowMs: 1, now: () => now });
+
+    await cache.fetchCompetitorPrices({ barcode: "555" });
+    now = 1500;
+    const stale = await cache.fetchCompetitorPrices({ barcode: "555" });
+    const unknown = await cache.fetchCompetitorPrices({ barcode: "666" });
+
+    expect(fetchBatch).toHaveBeenCalledTimes(3);
+    expect(stale).toMatchObject({ competitorMinPrice: 80, buyboxStatus: "WIN" });
+    expect(unknown).toMatchObject({ competitorCount: null, buyboxStatus: "UNKNOWN" });
+    expect(cache.getStats()).toMatchObject({ staleServed: 1, errors: 0 });
+  });
+
+  it("reports barcodes without entries like fetchCompetitorPrices and leaves them out of getMany", async () => {
+    const { cache } = buildCache();
+
+    const missing = await cache.fetchCompetitorPrices({ barcode: "missing-1" });
+    expect(missing).toMatchObject({ competitorCount: 0, buyboxStatus: "UNKNOWN" });
+
+    const found = await cache.getMany(["missing-1", "333"]);
+    expect(Array.from(found.keys())).toEqual(["333"]);
+  });
+
+  it("does not cache failed lookups", async () => {
+    const fetchBatch = vi
+      .fn()
+      .mockRejectedValueOnce(new Error("Trendyol API 503"))
+      .mockResolvedValueOnce({ entries: [{ barcode: "444", buyboxPrice: 90, buyboxOrder: 2 }] });
+    const error = vi.spyOn(console, "error").mockImplementation(() => undefined);
+    const cache = new BuyboxCache(fetchBatch, parseEntry, { ttlMs: 60_000, windowMs: 1 });
+
+    const failed = await cache.fetchCompetitorPrices({ barcode: "444" });
+    expect(failed).toMatchObject({ competitorCount: null, buyboxStatus: "UNKNOWN" });
+
+    const retried = await cache.fetchCompetitorPrices({ barcode: "444" });
+    expect(retried).toMatchObject({ competitorMinPrice: 90, buyboxStatus: "LOSE" });
+    expect(cache.getStats()).toMatchObject({ errors: 1, misses: 2 });
+    error.mockRestore();
+  });
+
+  it("bisects a rejected batch down to the bad barcode and quarantines it", async () => {
+    const fetchBatch = vi.fn(async (barcodes: string[]) => {
+      if (barcodes.includes("bad")) {
+        throw new Error("Trendyol API 400: invalid barcode");
+      }
+      return { entries: barcodes.map((barcode) => ({ barcode, buyboxPrice: 50, buyboxOrder: 1 })) };
+    });
+    const warn = vi.spyOn(console, "warn").mockImplementation(() => undefined);
+    const quarantine = new MemoryBuyboxQuarantine(24);
+    const cache = new BuyboxCache(fetchBatch, parseEntry, {
+      ttlMs: 60_000,
+      storeFrontCode: "SA",
+      windowMs: 1,
+      quarantine
+    });
+
+    const barcodes = ["bad", ...Array.from({ length: 9 }, (_, i) => `ok-${i}`)];
+    const found = await cache.getMany(barcodes);
+
+    expect(found.size).toBe(9);
+    expect(found.has("bad")).toBe(false);
+    expect(await quarantine.list("SA")).toEqual(["bad"]);
+    expect(cache.getStats()).toMatchObject({ quarantined: 1, errors: 0 });
+
+    expect(fetchBatch.mock.calls.map(([batch]) => batch)).toContainEqual(["bad"]);
+    warn.mockRestore();
+  });
+
+  it("surfaces a 400 that rejects both halves instead of quarantining", async () => {
+    const fetchBatch = vi.fn().mockRejectedValue(new Error("Trendyol API 400: supplierId is invalid"));
+    const error = vi.spyOn(console, "error").mockImplementation(() => undefined);
+    const quarantine = new MemoryBuyboxQuarantine(24);
+    const cache = new BuyboxCache(fetchBatch, parseEntry, {
+      ttlMs: 60_000,
+      storeFrontCode: "SA",
+      windowMs: 1,
+      quarantine
+    });
+
+    const found = await cache.getMany(Array.from({ length: 10 }, (_, i) => `bc-${i}`));
+    const lone = await cache.fetchCompetitorPrices({ barcode: "solo" });
+
+    expect(found.size).toBe(0);
+    expect(lone).toMatchObject({ competitorCount: null, buyboxStatus: "UNKNOWN" });
+    expect(fetchBatch).toHaveBeenCalledTimes(4);
+    expect(await quarantine.list("SA")).toEqual([]);
+    expect(cache.getStats()).toMatchObject({ bisections: 1, quarantined: 0, errors: 2 });
+    error.mockRestore();
+  });
+
+  it("leaves quarantined barcodes out of later batches", async () => {
+    const quarantine = new MemoryBuyboxQuarantine(24);
+    await quarantine.add("SA", "bad-1");
+    const fetchBatch = vi.fn(async (barcodes: string[]) => ({
+      entries: barcodes.map((barcode) => ({ barcode, buyboxPrice: 50, buyboxOrder: 1 }))
+    }));
+    const cache = new BuyboxCache(fetchBatch, parseEntry, {
+      ttlMs: 60_000,
+      storeFrontCode: "SA",
+      windowMs: 1,
+      quarantine
+    });
+
+    const skipped = await cache.fetchCompetitorPrices({ barcode: "bad-1" });
+    const found = await cache.getMany(["bad-1", ...Array.from({ length: 10 }, (_, i) => `ok-${i}`)]);
+
+    expect(skipped).toMatchObject({ competitorCount: null, buyboxStatus: "UNKNOWN" });
+    expect(found.size).toBe(10);
+    expect(fetchBatch).toHaveBeenCalledTimes(1);
+    expect(fetchBatch.mock.calls[0][0]).toHaveLength(10);
+    expect(cache.getStats().quarantineSkips).toBe(2);
+  });
+
+  it("lets quarantined barcodes back in after they expire", async () => {
+    let now = 0;
+    const quarantine = new MemoryBuyboxQuarantine(1, () => now);
+    await quarantine.add("SA", "bc");
+    expect(await quarantine.list("SA")).toEqual(["bc"]);
+
+    now = 3_600_001;
+    expect(await quarantine.list("SA")).toEqual([]);
+
+    // A repeat offender stays out twice as long.
+    await quarantine.add("SA", "bc");
+    now += 3_600_001;
+    expect(await quarantine.list("SA")).toEqual(["bc"]);
+  });
+});
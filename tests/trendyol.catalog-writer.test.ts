@@ -0,0 +1,55 @@
+import { describe, expect, it, vi } from "vitest";
+import { diffCatalogPage, type ExistingCatalogProduct } from "@/lib/trendyol/catalog-writer";
+import type { TrendyolProductItem } from "@/lib/trendyol/types";
+
+vi.mock("@/lib/db/prisma", () => ({
+  prisma: {}
+}));
+
+const item = (sku: string, overrides: Partial<TrendyolProductItem> = {}): TrendyolProductItem => ({
+  sku,
+  barcode: `bc-${sku}`,
+  title: `Title ${sku}`,
+  productId: `pid-${sku}`,
+  category: "Toys",
+  active: true,
+  ourPrice: 10,
+  stock: 5,
+  ...overrides
+});
+
+const existing = (sku: string, overrides: Partial<ExistingCatalogProduct> = {}): ExistingCatalogProduct => ({
+  id: `id-${sku}`,
+  sku,
+  barcode: `bc-${sku}`,
+  title: `Title ${sku}`,
+  trendyolProductId: `pid-${sku}`,
+  category: "Toys",
+  active: true,
+  currency: "SAR",
+  ...overrides
+});
+
+describe("diffCatalogPage", () => {
+  it("separates new, changed and unchanged products", () => {
+    const diff = diffCatalogPage(
+      [item("A"), item("B", { title: "Renamed" }), item("C")],
+      [existing("B"), existing("C")]
+    );
+
+    expect(diff.creates.map((row) => row.sku)).toEqual(["A"]);
+    expect(diff.updates).toEqual([expect.objectContaining({ id: "id-B", sku: "B", title: "Renamed" })]);
+    expect(diff.unchanged).toBe(1);
+    expect(Object.fromEntries(diff.idsBySku)).toEqual({ B: "id-B", C: "id-C" });
+  });
+
+  it("keeps the last item for a repeated SKU and treats a currency mismatch as a change", () => {
+    const diff = diffCatalogPage(
+      [item("A", { title: "First" }), item("A", { title: "Second" }), item("B")],
+      [existing("B", { currency: "TRY" })]
+    );
+
+    expect(diff.creates).toEqual([expect.objectContaining({ sku: "A", title: "Second" })]);
+    expect(diff.updates.map((row) => row.sku)).toEqual(["B"]);
+  });
+});
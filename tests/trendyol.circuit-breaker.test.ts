@@ -0,0 +1,154 @@
+import { describe, expect, it, vi } from "vitest";
+import { BuyboxCache } from "@/lib/trendyol/buybox-cache";
+import { MemoryBuyboxQuarantine } from "@/lib/trendyol/buybox-quarantine";
+import {
+  CircuitOpenError,
+  MemoryCircuitBreakerBackend,
+  TrendyolCircuitBreakers,
+  circuitFamilyForPath,
+  isCircuitFailure,
+  type CircuitBreakerBackend,
+  type CircuitPolicy
+} from "@/lib/trendyol/circuit-breaker";
+
+vi.mock("@/lib/db/prisma", () => ({
+  prisma: {}
+}));
+
+const policy: CircuitPolicy = {
+  failureRate: 0.5,
+  minRequests: 4,
+  consecutiveFailures: 3,
+  windowMs: 60_000,
+  openMs: 1000,
+  maxOpenMs: 3000,
+  probeTimeoutMs: 500
+};
+
+async function send(breakers: TrendyolCircuitBreakers, family: "claims" | "buybox", failure: string | null) {
+  const admission = await breakers.admit(family);
+  return breakers.record(family, admission, failure);
+}
+
+describe("circuitFamilyForPath", () => {
+  it("splits claims from the shipments rate-limit family", () => {
+    expect(circuitFamilyForPath("/integration/claim/sellers/1/claims")).toBe("claims");
+    expect(circuitFamilyForPath("/integration/order/sellers/1/orders?page=0")).toBe("shipments");
+    expect(circuitFamilyForPath("/integration/product/sellers/1/products/buybox-information")).toBe("buybox");
+  });
+
+  it("counts server errors everywhere and 400s only for buybox", () => {
+    expect(isCircuitFailure("claims", 556)).toBe(true);
+    expect(isCircuitFailure("buybox", 400)).toBe(true);
+    expect(isCircuitFailure("prices", 400)).toBe(false);
+    expect(isCircuitFailure("products", 429)).toBe(false);
+  });
+});
+
+describe("TrendyolCircuitBreakers", () => {
+  it("opens at the failure rate, fails fast, and closes after a successful probe", async () => {
+    let now = 0;
+    const warn = vi.spyOn(console, "warn").mockImplementation(() => undefined);
+    const breakers = new TrendyolCircuitBreakers({ backend: new MemoryCircuitBreakerBackend(() => now), policy });
+
+    await send(breakers, "buybox", null);
+    await send(breakers, "buybox", "HTTP 400");
+    await send(breakers, "buybox", null);
+    const opened = await send(breakers, "buybox", "HTTP 400");
+    expect(opened).toMatchObject({ state: "OPEN", opened: true, retryInMs: 1000 });
+
+    await expect(breakers.admit("buybox")).rejects.toBeInstanceOf(CircuitOpenError);
+
+    now = 1000;
+    const probe = await breakers.admit("buybox");
+    expect(probe.probe).toBe(true);
+    // Only one caller probes a half-open circuit.
+    await expect(breakers.admit("buybox")).rejects.toBeInstanceOf(CircuitOpenError);
+
+    await breakers.record("buybox", probe, null);
+    expect((await breakers.admit("buybox")).state).toBe("CLOSED");
+    expect(breakers.getMetrics().families.buybox).toMatchObject({ rejected: 2, probes: 1, opened: 1, state: "CLOSED" });
+    warn.mockRestore();
+  });
+
+  it("opens on consecutive failures and doubles the open period after a failed probe", async () => {
+    let now = 0;
+    const warn = vi.spyOn(console, "warn").mockImplementation(() => undefined);
+    const breakers = new TrendyolCircuitBreakers({ backend: new MemoryCircuitBreakerBackend(() => now), policy });
+
+    await send(breakers, "claims", "HTTP 556");
+    await send(breakers, "claims", "HTTP 556");
+    expect((await send(breakers, "claims", "HTTP 556")).state).toBe("OPEN");
+
+    now = 1000;
+    const reopened = await send(breakers, "claims", "HTTP 556");
+    expect(reopened).toMatchObject({ state: "OPEN", retryInMs: 2000 });
+
+    now = 2500;
+    await expect(breakers.admit("claims")).rejects.toMatchObject({ family: "claims", retryInMs: 500 });
+    warn.mockRestore();
+  });
+
+  it("lets another caller probe when the probe never reports back", async () => {
+    let now = 0;
+    const warn = vi.spyOn(console, "warn").mockImplementation(() => undefined);
+    const breakers = new TrendyolCircuitBreakers({ backend: new MemoryCircuitBreakerBackend(() => now), policy });
+
+    for (let i = 0; i < 3; i += 1) {
+      await send(breakers, "claims", "network error");
+    }
+    now = 1000;
+    expect((await breakers.admit("claims")).probe).toBe(true);
+
+    now = 1500;
+    expect((await breakers.admit("claims")).probe).toBe(true);
+    warn.mockRestore();
+  });
+
+  it("falls back to the in-process backend when the shared one fails", async () => {
+    const failing: CircuitBreakerBackend = {
+      name: "postgres",
+      admit: vi.fn().mockRejectedValue(new Error("relation does not exist")),
+      record: vi.fn(),
+      settleProbe: vi.fn()
+    };
+    const warn = vi.spyOn(console, "warn").mockImplementation(() => undefined);
+    const breakers = new TrendyolCircuitBreakers({ backend: failing, policy });
+
+    await send(breakers, "claims", null);
+
+    expect(breakers.backendName).toBe("memory");
+    expect(breakers.getMetrics().families.claims.requests).toBe(1);
+    warn.mockRestore();
+  });
+
+  it("does not count the 400s of a buybox bisection against the circuit", async () => {
+    const warn = vi.spyOn(console, "warn").mockImplementation(() => undefined);
+    const breakers = new TrendyolCircuitBreakers({ backend: new MemoryCircuitBreakerBackend(), policy });
+    // Goes through the breaker the way TrendyolClient.request does.
+    const fetchBatch = async (barcodes: string[], options: { bisecting: boolean }) => {
+      const admission = await breakers.admit("buybox");
+      const status = barcodes.includes("bad") ? 400 : 200;
+      await breakers.recordResponse("buybox", admission, status, options);
+      if (status === 400) {
+        throw new Error("Trendyol API 400: invalid barcode");
+      }
+      return { entries: barcodes.map((barcode) => ({ barcode })) };
+    };
+    const quarantine = new MemoryBuyboxQuarantine(24);
+    const cache = new BuyboxCache(
+      fetchBatch,
+      () => ({ competitorMinPrice: 10, competitorCount: 1, buyboxSellerId: null, buyboxStatus: "WIN", raw: {} }),
+      { ttlMs: 60_000, storeFrontCode: "SA", windowMs: 1, quarantine }
+    );
+
+    const found = await cache.getMany(["bad", ...Array.from({ length: 9 }, (_, i) => `ok-${i}`)]);
+
+    expect(found.size).toBe(9);
+    expect(await quarantine.list("SA")).toEqual(["bad"]);
+    // Only the original batch's 400 counts; the four rejected halves are left out.
+    expect(breakers.getMetrics().families.buybox).toMatchObject({ state: "CLOSED", requests: 5, failures: 1 });
+    await expect(breakers.admit("buybox")).resolves.toMatchObject({ allowed: true, state: "CLOSED" });
+    warn.mockRestore();
+  });
+});
@@ -0,0 +1,48 @@
+import { describe, expect, it, vi } from "vitest";
+import { competitorObservation, OUR_STORE_LABEL, UNKNOWN_HOLDER_LABEL } from "@/lib/trendyol/competitor-logs";
+import type { TrendyolCompetitorData } from "@/lib/trendyol/types";
+
+vi.mock("@/lib/db/prisma", () => ({
+  prisma: {}
+}));
+
+// Shaped like the buybox cache serves it: the buybox-information entry is wrapped under `entry`.
+const data = (
+  entry: Record<string, unknown> = {},
+  overrides: Partial<TrendyolCompetitorData> = {}
+): TrendyolCompetitorData => ({
+  competitorMinPrice: 120.5,
+  competitorCount: 2,
+  buyboxSellerId: null,
+  buyboxStatus: "LOSE",
+  raw: { source: "buybox_information", entry: { buyboxPrice: 120.5, ...entry }, responseMeta: {} },
+  ...overrides
+});
+
+describe("competitorObservation", () => {
+  it("records the buybox holder and price, preferring a seller name from the cached entry", () => {
+    expect(competitorObservation("p1", data({ buyboxSellerName: " Rival Store ", buyboxOrder: 2 }))).toEqual({
+      productId: "p1",
+      competitorName: "Rival Store",
+      price: 120.5,
+      isBuyBoxWinner: false
+    });
+  });
+
+  it("derives the winner from buyboxOrder, like the Python sync", () => {
+    expect(competitorObservation("p1", data({ buyboxOrder: 1 }))).toMatchObject({
+      competitorName: OUR_STORE_LABEL,
+      isBuyBoxWinner: true
+    });
+    expect(competitorObservation("p1", data({ buyboxOrder: 3 }, { buyboxStatus: "WIN" }))?.isBuyBoxWinner).toBe(false);
+  });
+
+  it("falls back to the seller id or a generic holder label", () => {
+    expect(competitorObservation("p1", data({ buyboxSellerId: 42 }))?.competitorName).toBe("Seller 42");
+    expect(competitorObservation("p1", data())?.competitorName).toBe(UNKNOWN_HOLDER_LABEL);
+  });
+
+  it("skips entries without a buybox price", () => {
+    expect(competitorObservation("p1", data({}, { competitorMinPrice: null }))).toBeNull();
+  });
+});
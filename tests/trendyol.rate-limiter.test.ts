@@ -0,0 +1,153 @@
+import { describe, expect, it, vi } from "vitest";
+import {
+  MemoryRateLimitBackend,
+  TrendyolRateLimiter,
+  endpointFamilyForPath,
+  parseRateLimitHeaders,
+  type RateLimitBackend,
+  type RateLimitBudget
+} from "@/lib/trendyol/rate-limiter";
+
+vi.mock("@/lib/db/prisma", () => ({
+  prisma: {}
+}));
+
+const budgets = {
+  products: { ratePerSecond: 10, burst: 2 },
+  buybox: { ratePerSecond: 4, burst: 1 },
+  shipments: { ratePerSecond: 5, burst: 5 },
+  prices: { ratePerSecond: 2, burst: 1 }
+} satisfies Record<string, RateLimitBudget>;
+
+describe("endpointFamilyForPath", () => {
+  it("maps Trendyol paths to their endpoint family", () => {
+    expect(endpointFamilyForPath("/integration/product/sellers/1/products?page=0")).toBe("products");
+    expect(endpointFamilyForPath("/integration/product/sellers/1/products/buybox-information")).toBe("buybox");
+    expect(endpointFamilyForPath("/integration/inventory/sellers/1/products/price-and-inventory")).toBe("prices");
+    expect(endpointFamilyForPath("/integration/order/sellers/1/orders?page=0")).toBe("shipments");
+    expect(endpointFamilyForPath("/integration/claim/sellers/1/claims")).toBe("shipments");
+  });
+});
+
+describe("parseRateLimitHeaders", () => {
+  it("reads retry-after seconds and relative resets", () => {
+    const parsed = parseRateLimitHeaders(
+      new Headers({ "Retry-After": "3", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "7" })
+    );
+
+    expect(parsed).toEqual({ retryAfterMs: 3000, remaining: 0, resetMs: 7000 });
+  });
+
+  it("reads HTTP-date retry-after and epoch resets", () => {
+    const now = Date.parse("2026-03-05T10:00:00Z");
+    const parsed = parseRateLimitHeaders(
+      new Headers({
+        "Retry-After": "Thu, 05 Mar 2026 10:00:05 GMT",
+        "X-RateLimit-Reset": String(now / 1000 + 2)
+      }),
+      now
+    );
+
+    expect(parsed).toEqual({ retryAfterMs: 5000, remaining: null, resetMs: 2000 });
+  });
+});
+
+describe("MemoryRateLimitBackend", () => {
+  it("allows the burst and then spaces requests at the family rate", async () => {
+    let now = 0;
+    const backend = new MemoryRateLimitBackend(() => now);
+
+    expect((await backend.take("products", budgets.products)).granted).toBe(true);
+    expect((await backend.take("products", budgets.products)).granted).toBe(true);
+
+    const denied = await backend.take("products", budgets.products);
+    expect(denied.granted).toBe(false);
+    expect(denied.waitMs).toBe(100);
+
+    now += 100;
+    expect((await backend.take("products", budgets.products)).granted).toBe(true);
+  });
+
+  it("keeps a separate budget per endpoint family", async () => {
+    const backend = new MemoryRateLimitBackend(() => 0);
+
+    expect((await backend.take("buybox", budgets.buybox)).granted).toBe(true);
+    expect((await backend.take("buybox", budgets.buybox)).granted).toBe(false);
+    expect((await backend.take("prices", budgets.prices)).granted).toBe(true);
+  });
+
+  it("halves the rate and pauses the family on throttle, then recovers toward the budget", async () => {
+    let now = 0;
+    const backend = new MemoryRateLimitBackend(() => now);
+
+    await backend.throttle("products", budgets.products, { blockMs: 1500, slowDown: true });
+
+    const blocked = await backend.take("products", budgets.products);
+    expect(blocked).toEqual({ granted: false, waitMs: 1500, ratePerSecond: 5 });
+
+    now += 1500;
+    const resumed = await backend.take("products", budgets.products);
+    expect(resumed.granted).toBe(true);
+    expect(resumed.ratePerSecond).toBe(5);
+
+    for (let i = 0; i < 50; i += 1) {
+      await backend.recover("products", budgets.products);
+    }
+    expect((await backend.take("products", budgets.products)).ratePerSecond).toBe(10);
+  });
+});
+
+describe("TrendyolRateLimiter", () => {
+  it("feeds 429s and exhausted rate-limit headers back into the backend and records metrics", async () => {
+    const limiter = new TrendyolRateLimiter({ backend: new MemoryRateLimitBackend(), budgets });
+
+    await limiter.acquire("buybox");
+    await limiter.observe("buybox", 429, new Headers({ "Retry-After": "0" }));
+    await limiter.observe("products", 200, new Headers({ "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1" }));
+
+    const metrics = limiter.getMetrics();
+    expect(metrics.backend).toBe("memory");
+    expect(metrics.families.buybox).toMatchObject({ requests: 1, throttled: 1, budgetPerSecond: 4 });
+    expect(metrics.families.products.headerPauses).toBe(1);
+  });
+
+  it("falls back to the in-process backend when the shared one fails", async () => {
+    const failing: RateLimitBackend = {
+      name: "postgres",
+      take: vi.fn().mockRejectedValue(new Error("relation does not exist")),
+      throttle: vi.fn(),
+      recover: vi.fn()
+    };
+    const warn = vi.spyOn(console, "warn").mockImplementation(() => undefined);
+    const limiter = new TrendyolRateLimiter({ backend: failing, budgets });
+
+    await limiter.acquire("shipments");
+
+    expect(limiter.backendName).toBe("memory");
+    expect(limiter.getMetrics().families.shipments.requests).toBe(1);
+    warn.mockRestore();
+  });
+
+  it("retries the shared backend once the cool-down has passed", async () => {
+    let now = 0;
+    const take = vi
+      .fn()
+      .mockRejectedValueOnce(new Error("connection refused"))
+      .mockResolvedValue({ granted: true, waitMs: 0, ratePerSecond: 5 });
+    const shared: RateLimitBackend = { name: "postgres", take, throttle: vi.fn(), recover: vi.fn() };
+    const warn = vi.spyOn(console, "warn").mockImplementation(() => undefined);
+    const limiter = new TrendyolRateLimiter({ backend: shared, budgets, backendRetryMs: 30_000, now: () => now });
+
+    await limiter.acquire("shipments");
+    now = 10_000;
+    await limiter.acquire("shipments");
+    expect(limiter.backendName).toBe("memory");
+    expect(take).toHaveBeenCalledTimes(1);
+
+    now = 30_001;
+    await limiter.acquire("shipments");
+    expect(limiter.backendName).toBe("postgres");
+    expect(take).toHaveBeenCalledTimes(2);
+    warn.mockRestore();
+  });
+});
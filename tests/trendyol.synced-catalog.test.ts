@@ -0,0 +1,50 @@
+import { describe, expect, it, vi } from "vitest";
+import { isSyncedRowFresh, syncedRowToPollInputs, type SyncedCatalogRow } from "@/lib/trendyol/synced-catalog";
+
+vi.mock("@/lib/db/prisma", () => ({
+  prisma: {}
+}));
+
+const NOW = Date.parse("2026-03-22T12:00:00Z");
+
+const row = (overrides: Partial<SyncedCatalogRow> = {}): SyncedCatalogRow => ({
+  productId: "p1",
+  sku: "SKU-1",
+  barcode: "869000000001",
+  salePrice: 149.9,
+  quantity: 7,
+  buyboxPrice: 139.5,
+  buyboxCompetitorCount: 2,
+  buyboxStatus: "LOSE",
+  syncedAt: new Date(NOW - 5 * 60_000),
+  ...overrides
+});
+
+describe("isSyncedRowFresh", () => {
+  it("accepts rows synced within the max age only", () => {
+    expect(isSyncedRowFresh(row(), 15, NOW)).toBe(true);
+    expect(isSyncedRowFresh(row({ syncedAt: new Date(NOW - 16 * 60_000) }), 15, NOW)).toBe(false);
+    expect(isSyncedRowFresh(undefined, 15, NOW)).toBe(false);
+  });
+});
+
+describe("syncedRowToPollInputs", () => {
+  it("maps price, stock and buybox fields to what the API lookups would return", () => {
+    const { catalogItem, competitor } = syncedRowToPollInputs(row());
+
+    expect(catalogItem).toMatchObject({ sku: "SKU-1", barcode: "869000000001", ourPrice: 149.9, stock: 7 });
+    expect(competitor).toMatchObject({
+      competitorMinPrice: 139.5,
+      competitorCount: 2,
+      buyboxSellerId: null,
+      buyboxStatus: "LOSE"
+    });
+  });
+
+  it("treats non-positive prices and unknown statuses as unknown", () => {
+    const { catalogItem, competitor } = syncedRowToPollInputs(row({ salePrice: 0, buyboxStatus: null }));
+
+    expect(catalogItem.ourPrice).toBeNull();
+    expect(competitor.buyboxStatus).toBe("UNKNOWN");
+  });
+});
@@ -0,0 +1,65 @@
+import { describe, expect, it, vi } from "vitest";
+import { latestPackageEvents } from "@/lib/jobs/apply-shipment-events";
+import type { TrendyolShipmentPackage } from "@/lib/trendyol/shipments/types";
+import { packagesFromWebhookBody, shipmentEventKey } from "@/lib/trendyol/shipments/webhook-events";
+
+vi.mock("@/lib/db/prisma", () => ({
+  prisma: {}
+}));
+
+const pkg = (packageNumber: string, status: string, modified: number) =>
+  ({
+    packageNumber,
+    orderNumber: `O-${packageNumber}`,
+    shipmentPackageStatus: status,
+    status,
+    packageLastModifiedDate: modified,
+    lines: []
+  }) as unknown as TrendyolShipmentPackage;
+
+describe("packagesFromWebhookBody", () => {
+  it("accepts a single package, an array or a shipment-packages page", () => {
+    const one = { packageNumber: "P1", status: "Shipped" };
+
+    expect(packagesFromWebhookBody(one)).toHaveLength(1);
+    expect(packagesFromWebhookBody([one, one])).toHaveLength(2);
+    expect(packagesFromWebhookBody({ content: [one], totalPages: 1 })).toHaveLength(1);
+    expect(packagesFromWebhookBody({ shipmentPackages: [one] })).toHaveLength(1);
+  });
+
+  it("fills in whichever status field is missing and drops entries without package number or status", () => {
+    const events = packagesFromWebhookBody([
+      { packageNumber: 42, shipmentPackageStatus: "Delivered" },
+      { packageNumber: "P2" },
+      { status: "Shipped" },
+      null
+    ]);
+
+    expect(events).toHaveLength(1);
+    expect(events[0].status).toBe("Delivered");
+    expect(events[0].shipmentPackageStatus).toBe("Delivered");
+  });
+});
+
+describe("shipmentEventKey", () => {
+  it("is the same for a redelivered event and differs per status change", () => {
+    expect(shipmentEventKey(pkg("P1", "Shipped", 1000))).toBe(shipmentEventKey(pkg("P1", "Shipped", 1000)));
+    expect(shipmentEventKey(pkg("P1", "Shipped", 1000))).not.toBe(shipmentEventKey(pkg("P1", "Delivered", 2000)));
+  });
+});
+
+describe("latestPackageEvents", () => {
+  it("keeps the newest event per package even when events arrive out of order", () => {
+    const events = latestPackageEvents([
+      pkg("P1", "Shipped", 3000),
+      pkg("P2", "Created", 1000),
+      pkg("P1", "Picking", 2000),
+      pkg("P2", "Picking", 1500)
+    ]);
+
+    expect(events.map((event) => [event.packageNumber, event.shipmentPackageStatus])).toEqual([
+      ["P1", "Shipped"],
+      ["P2", "Picking"]
+    ]);
+  });
+});